@@ -0,0 +1,332 @@
+"""
+Load-testing benchmark for dev_server.py (stdlib only).
+
+It crawls the site's real URL set (sitemap.xml plus the CSS/JS/images those pages reference), replays it at
+a configurable concurrency against a locally started dev server (or any --url), and prints a JSON report:
+throughput, latency percentiles, status codes and error rate. Reports can be saved and compared, so
+serving-engine changes (threaded vs --async, cache on/off) are measured against a baseline.
+
+Usage:
+  python bench_dev_server.py                                   # threaded engine, 16 connections
+  python bench_dev_server.py --engine async --out async.json
+  python bench_dev_server.py --engine threaded --baseline async.json
+  python bench_dev_server.py --no-cache --concurrency 64 --requests 20000
+  python bench_dev_server.py --url http://localhost:8000       # benchmark an already running server
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import quote, urljoin, urlsplit
+
+
+SITE_ROOT = Path(__file__).resolve().parent
+DEV_SERVER = SITE_ROOT / "dev_server.py"
+SITEMAP = SITE_ROOT / "sitemap.xml"
+PUBLIC_BASE_URL = "https://sugallat.hu"
+
+SITEMAP_NS = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+
+# Report fields compared against a baseline: (key path, True when higher is better).
+COMPARED_FIELDS = [
+    (("throughput_rps",), True),
+    (("latency_ms", "p50"), False),
+    (("latency_ms", "p95"), False),
+    (("latency_ms", "p99"), False),
+    (("error_rate",), False),
+]
+
+
+class AssetCollector(HTMLParser):
+    """
+    Collects stylesheet/script/image/preload URLs referenced by a page.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.refs: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        a = {k.lower(): (v or "") for k, v in attrs}
+        if tag == "link" and a.get("rel", "").lower() in {"stylesheet", "preload", "icon", "apple-touch-icon"}:
+            self.refs.append(a.get("href", ""))
+        elif tag in {"script", "img", "source"}:
+            self.refs.append(a.get("src", ""))
+            for candidate in a.get("srcset", "").split(","):
+                self.refs.append(candidate.strip().split(" ")[0])
+
+
+def _sitemap_paths(sitemap: Path) -> list[str]:
+    root = ET.parse(sitemap).getroot()
+    if root.tag == f"{{{SITEMAP_NS['sm']}}}sitemapindex":
+        # Sharded sitemap (scripts/generate_sitemap.py): the shards sit next to the index.
+        paths = []
+        for loc in root.iterfind("sm:sitemap/sm:loc", SITEMAP_NS):
+            paths.extend(_sitemap_paths(sitemap.parent / (loc.text or "").strip().rsplit("/", 1)[-1]))
+        return paths
+    paths = []
+    for loc in root.iterfind("sm:url/sm:loc", SITEMAP_NS):
+        url = (loc.text or "").strip()
+        if url.startswith(PUBLIC_BASE_URL):
+            paths.append(url[len(PUBLIC_BASE_URL) :] or "/")
+    return paths
+
+
+def _get(conn: http.client.HTTPConnection, path: str, headers: dict[str, str]) -> tuple[int, bytes, str | None]:
+    conn.request("GET", path, headers=headers)
+    resp = conn.getresponse()
+    body = resp.read()
+    return resp.status, body, resp.getheader("Location")
+
+
+def crawl(base_url: str, page_paths: list[str], with_assets: bool) -> list[str]:
+    """
+    Resolve the URL set: sitemap pages (following redirects once) plus same-origin assets they reference.
+    """
+    host = urlsplit(base_url)
+    conn = http.client.HTTPConnection(host.hostname, host.port, timeout=10)
+    urls: list[str] = []
+    seen: set[str] = set()
+
+    def add(path: str) -> None:
+        # Pages reference some assets with literal spaces; http.client refuses those unescaped.
+        path = quote(path, safe="/%?=&;:@+,!$'()*~")
+        if path and path not in seen:
+            seen.add(path)
+            urls.append(path)
+
+    for path in page_paths:
+        add(path)
+        if not with_assets:
+            continue
+        status, body, location = _get(conn, path, {})
+        if status in (301, 302, 307, 308) and location:
+            path = urlsplit(urljoin(base_url + path, location)).path
+            add(path)
+            status, body, _ = _get(conn, path, {})
+        if status != 200:
+            continue
+        collector = AssetCollector()
+        collector.feed(body.decode("utf-8", "replace"))
+        for ref in collector.refs:
+            if not ref or ref.startswith(("data:", "#", "mailto:", "tel:", "javascript:")):
+                continue
+            absolute = urlsplit(urljoin(base_url + path, ref))
+            if absolute.netloc != host.netloc:
+                continue
+            add(absolute.path + (f"?{absolute.query}" if absolute.query else ""))
+    conn.close()
+    return urls
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+def run_load(base_url: str, urls: list[str], total_requests: int, concurrency: int, accept_encoding: str) -> dict:
+    """
+    Replay `urls` round-robin until `total_requests` are done, one persistent client connection per worker.
+    """
+    host = urlsplit(base_url)
+    headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {}
+    next_index = 0
+    index_lock = threading.Lock()
+    latencies: list[list[float]] = [[] for _ in range(concurrency)]
+    statuses: list[dict[int, int]] = [{} for _ in range(concurrency)]
+    failures = [0] * concurrency  # connection errors / timeouts (no response at all)
+    bytes_received = [0] * concurrency
+
+    def worker(slot: int) -> None:
+        nonlocal next_index
+        conn = http.client.HTTPConnection(host.hostname, host.port, timeout=30)
+        while True:
+            with index_lock:
+                i = next_index
+                next_index += 1
+            if i >= total_requests:
+                break
+            path = urls[i % len(urls)]
+            started = time.perf_counter()
+            try:
+                status, body, _ = _get(conn, path, headers)
+            except (OSError, http.client.HTTPException):
+                failures[slot] += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host.hostname, host.port, timeout=30)
+                continue
+            latencies[slot].append(time.perf_counter() - started)
+            statuses[slot][status] = statuses[slot].get(status, 0) + 1
+            bytes_received[slot] += len(body)
+        conn.close()
+
+    threads = [threading.Thread(target=worker, args=(slot,), daemon=True) for slot in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    all_latencies = sorted(x for per_worker in latencies for x in per_worker)
+    status_totals: dict[str, int] = {}
+    for per_worker in statuses:
+        for code, n in per_worker.items():
+            status_totals[str(code)] = status_totals.get(str(code), 0) + n
+    completed = len(all_latencies)
+    # Errors = no response at all, or a 5xx.
+    errors = sum(failures) + sum(n for code, n in status_totals.items() if int(code) >= 500)
+    attempted = completed + sum(failures)
+    return {
+        "requests": completed,
+        "errors": errors,
+        "error_rate": round(errors / attempted, 6) if attempted else 0.0,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(completed / elapsed, 1) if elapsed else 0.0,
+        "bytes_received": sum(bytes_received),
+        "status": dict(sorted(status_totals.items())),
+        "latency_ms": {
+            "mean": round(sum(all_latencies) / completed * 1000, 3) if completed else 0.0,
+            "p50": round(_percentile(all_latencies, 0.50) * 1000, 3),
+            "p90": round(_percentile(all_latencies, 0.90) * 1000, 3),
+            "p95": round(_percentile(all_latencies, 0.95) * 1000, 3),
+            "p99": round(_percentile(all_latencies, 0.99) * 1000, 3),
+            "max": round((all_latencies[-1] if all_latencies else 0.0) * 1000, 3),
+        },
+    }
+
+
+def compare(report: dict, baseline: dict) -> dict:
+    """
+    Relative change of the headline numbers vs a baseline report (positive = better).
+    """
+    result = {}
+    for key_path, higher_is_better in COMPARED_FIELDS:
+        current, previous = report, baseline
+        for key in key_path:
+            current, previous = current.get(key), previous.get(key)
+        name = ".".join(key_path)
+        if not isinstance(current, (int, float)) or not isinstance(previous, (int, float)):
+            continue
+        if previous == 0:
+            change = 0.0 if current == 0 else None
+        else:
+            change = (current - previous) / previous * 100
+            if not higher_is_better:
+                change = -change
+        result[name] = {"baseline": previous, "current": current, "improvement_pct": None if change is None else round(change, 1)}
+    return result
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(engine: str, cache: bool, port: int) -> subprocess.Popen:
+    cmd = [sys.executable, str(DEV_SERVER), str(port)]
+    if engine == "async":
+        cmd.append("--async")
+    if not cache:
+        cmd += ["--cache-mb", "0"]
+    proc = subprocess.Popen(cmd, cwd=SITE_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"dev_server.py exited with code {proc.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("dev_server.py did not start listening in time")
+
+
+def _server_metrics(base_url: str, reset: bool) -> dict | None:
+    host = urlsplit(base_url)
+    conn = http.client.HTTPConnection(host.hostname, host.port, timeout=10)
+    try:
+        status, body, _ = _get(conn, "/__metrics" + ("?reset=1" if reset else ""), {})
+    except (OSError, http.client.HTTPException):
+        return None
+    finally:
+        conn.close()
+    return json.loads(body) if status == 200 else None
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog=Path(argv[0]).name, description="Benchmark dev_server.py with the site's real URL set.")
+    parser.add_argument("--engine", choices=["threaded", "async"], default="threaded")
+    parser.add_argument("--no-cache", action="store_true", help="Start the server with its file cache disabled.")
+    parser.add_argument("--url", help="Benchmark an already running server instead of starting one.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=5000, help="Measured requests (after warm-up).")
+    parser.add_argument("--warmup", type=int, default=1, help="Passes over the URL set before measuring.")
+    parser.add_argument("--pages-only", action="store_true", help="Only sitemap pages, no referenced assets.")
+    parser.add_argument("--accept-encoding", default="gzip, deflate", help='Sent with every request ("" to disable).')
+    parser.add_argument("--out", type=Path, help="Write the JSON report here.")
+    parser.add_argument("--baseline", type=Path, help="Compare against a previously saved report.")
+    args = parser.parse_args(argv[1:])
+
+    proc = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        port = _free_port()
+        proc = start_server(args.engine, not args.no_cache, port)
+        base_url = f"http://localhost:{port}"
+
+    try:
+        urls = crawl(base_url, _sitemap_paths(SITEMAP), with_assets=not args.pages_only)
+        for _ in range(args.warmup):
+            run_load(base_url, urls, len(urls), min(args.concurrency, len(urls)), args.accept_encoding)
+        _server_metrics(base_url, reset=True)
+
+        report = {
+            "config": {
+                "engine": None if args.url else args.engine,
+                "cache": None if args.url else not args.no_cache,
+                "url": base_url if args.url else None,
+                "concurrency": args.concurrency,
+                "accept_encoding": args.accept_encoding,
+                "unique_urls": len(urls),
+                "python": sys.version.split()[0],
+                "cpus": os.cpu_count(),
+            },
+            **run_load(base_url, urls, args.requests, args.concurrency, args.accept_encoding),
+        }
+        server = _server_metrics(base_url, reset=False)
+        if server is not None:
+            report["server"] = {key: server.get(key) for key in ("requests", "bytes_sent", "status", "latency_ms", "cache")}
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    if args.baseline:
+        report["compare"] = compare(report, json.loads(args.baseline.read_text(encoding="utf-8")))
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(text + "\n", encoding="utf-8")
+    print(text)
+    return 1 if report["requests"] == 0 else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
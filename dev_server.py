@@ -4,22 +4,143 @@ Local dev server for this static site that supports a small set of redirects to
 Why this exists:
 - Production hosting may use Apache + .htaccess rewrites/redirects.
 - `python -m http.server` does NOT read .htaccess, so local behavior can differ.
+- Redirects live in `redirects.conf` (mod_alias syntax, reloaded on change) instead of Python code.
 
 Usage:
   python dev_server.py 8000
   # then open http://localhost:8000/
+
+  python dev_server.py 8000 --cache-mb 0   # disable the in-memory file cache
+  python dev_server.py 8000 --async        # asyncio engine with HTTP/1.1 keep-alive
+  python dev_server.py 8000 --live-reload  # reload / CSS hot-swap open tabs on file changes
+  python dev_server.py 8000 --render-partials  # header/footer from partials/ at request time
+  # request metrics (per-route counters, status codes, cache ratios, p50/p95/p99): GET /__metrics
 """
 
 from __future__ import annotations
 
+import argparse
+import asyncio
+import bisect
+import datetime
+import email.utils
+import gzip
+import html
+import http.client
+import io
+import json
+import mimetypes
+import queue
+import os
+import re
+import secrets
+import stat
 import sys
 import socket
-from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import (
+    DEFAULT_ERROR_CONTENT_TYPE,
+    DEFAULT_ERROR_MESSAGE,
+    BaseHTTPRequestHandler,
+    SimpleHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
 from pathlib import Path, PurePosixPath
-from urllib.parse import unquote, urlsplit
+from typing import BinaryIO
+from urllib.parse import quote, unquote, urlsplit
+
+# The build scripts own the canonical URL rules; reuse them instead of keeping a second copy.
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from add_breadcrumbs_jsonld import REPO_ROOT as CANONICAL_ROOT, _canonical_path_for_file, _get_lang  # noqa: E402
+from fingerprint_assets import FINGERPRINT_RE, is_fingerprinted  # noqa: E402
+from page_metadata import MetadataIndex  # noqa: E402
+from set_page_features import classify_page  # noqa: E402
+from sync_header_footer import SKIP_DIRS as SYNC_SKIP_DIRS, CompiledTemplate, TemplateError, assemble_page, load_partials  # noqa: E402
 
 
 SITE_ROOT = Path(__file__).resolve().parent
+REDIRECTS_FILE = SITE_ROOT / "redirects.conf"
+
+REDIRECT_STATUS_KEYWORDS = {"permanent": 301, "temp": 302, "seeother": 303, "gone": 410}
+
+METRICS_PATH = "/__metrics"
+
+# Live reload (--live-reload): SSE endpoint + the client injected into every HTML page.
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_HEARTBEAT_SECONDS = 15.0
+LIVE_RELOAD_HEADERS = [("Content-Type", "text/event-stream; charset=utf-8"), ("Cache-Control", "no-cache")]
+LIVE_RELOAD_CLIENT = """
+(function () {
+  if (!window.EventSource) return;
+  var source = new EventSource("%s");
+  // Pages link content-hashed copies (css/main.3f9a1c2b.css) of the sources being edited.
+  var fingerprint = new RegExp(%s);
+  function stem(path) { return path.replace(fingerprint, ""); }
+  source.addEventListener("change", function (event) {
+    var paths = JSON.parse(event.data).paths || [];
+    var cssOnly = paths.length > 0 && paths.every(function (p) { return /\\.css$/i.test(p); });
+    if (!cssOnly) {
+      window.location.reload();
+      return;
+    }
+    // Hot-swap only the stylesheets that changed (preload links become rel=stylesheet on load), pointing
+    // them at the changed file itself: the hashed copy a page links is stale until the next build.
+    var stamp = String(Date.now());
+    document.querySelectorAll('link[rel="stylesheet"], link[rel="preload"][as="style"]').forEach(function (link) {
+      var url = new URL(link.getAttribute("href"), window.location.href);
+      if (url.origin !== window.location.origin) return;
+      var linked = stem(decodeURIComponent(url.pathname).replace(/^\\//, ""));
+      var changed = paths.filter(function (p) { return stem(p) === linked; })[0];
+      if (changed === undefined) return;
+      url.pathname = "/" + changed;
+      url.searchParams.set("livereload", stamp);
+      link.href = url.href;
+    });
+  });
+})();
+""".strip() % (LIVE_RELOAD_PATH, json.dumps(FINGERPRINT_RE.pattern))
+
+SERVER_VERSION = f"{SimpleHTTPRequestHandler.server_version} {BaseHTTPRequestHandler.sys_version}"
+
+# asyncio engine limits.
+DEFAULT_MAX_CONNECTIONS = 256
+KEEPALIVE_TIMEOUT_SECONDS = 5.0
+MAX_REQUESTS_PER_CONNECTION = 1000
+MAX_REQUEST_HEAD_BYTES = 64 * 1024
+MAX_REQUEST_BODY_BYTES = 1024 * 1024
+
+# Files at least this large (and not compressed) bypass the cache and are sent with sendfile().
+SENDFILE_MIN_BYTES = 256 * 1024
+# Requests asking for more ranges than this get the full body instead (RFC 9110 allows ignoring Range).
+MAX_RANGES = 16
+
+# In-memory file cache defaults. Files above the per-entry limit are always streamed from disk.
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+DEFAULT_CACHE_ENTRY_BYTES = 4 * 1024 * 1024
+
+# Content-hashed assets (scripts/fingerprint_assets.py) never change under the same name.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Content-codings we can produce, in order of preference.
+CONTENT_CODINGS = ("gzip", "deflate")
+COMPRESS_LEVEL = 6
+COMPRESS_MIN_BYTES = 256
+COMPRESS_MAX_BYTES = 8 * 1024 * 1024
+# Besides text/*, these types are worth compressing (mirrors a typical mod_deflate setup).
+COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/ld+json",
+    "application/manifest+json",
+    "application/xml",
+    "image/svg+xml",
+}
 
 
 def _safe_join(base: Path, rel_posix: str) -> Path:
@@ -37,76 +158,1237 @@ def _safe_join(base: Path, rel_posix: str) -> Path:
     return base.joinpath(*safe_parts)
 
 
-class AliasRequestHandler(SimpleHTTPRequestHandler):
-    # Python's SimpleHTTPRequestHandler supports a base directory via `directory=...`.
-    # We set it to the repo root so normal static files still work.
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=str(SITE_ROOT), **kwargs)
+def _etag_for_stat(st: os.stat_result) -> str:
+    """
+    Strong validator derived from size + mtime (same inputs Apache uses for its default ETag).
+    """
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
 
-    def do_GET(self):
-        canonical_thresholds = "/tevekenysegeink/kozbeszerzes-ajanlatkeroknek/kozbeszerzes-ertekhatar/"
 
-        # Old top-level location -> canonical nested URL
-        if self.path in (
-            "/kozbeszerzes-ertekhatar",
-            "/kozbeszerzes-ertekhatar/",
-            "/kozbeszerzes-ertekhatar/index.html",
-        ):
-            self.send_response(301)
-            self.send_header("Location", canonical_thresholds)
-            self.end_headers()
+def _etag_matches(header_value: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison function (RFC 9110 13.1.2), so ignore W/ prefixes.
+    for candidate in header_value.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _not_modified_since(header_value: str, mtime: float) -> bool:
+    try:
+        since = email.utils.parsedate_to_datetime(header_value)
+    except (TypeError, IndexError, OverflowError, ValueError):
+        # Ignore ill-formed values, like SimpleHTTPRequestHandler does.
+        return False
+    # HTTP dates have whole-second precision.
+    return int(mtime) <= since.timestamp()
+
+
+def _negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Pick a content-coding from an Accept-Encoding header (gzip preferred over deflate on ties).
+    Returns None when the identity coding should be used.
+    """
+    if not accept_encoding:
+        return None
+    qvalues: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        qvalues[name] = q
+
+    best = None
+    best_q = 0.0
+    for coding in CONTENT_CODINGS:
+        q = qvalues.get(coding, qvalues.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _is_compressible(ctype: str) -> bool:
+    ctype = ctype.split(";", 1)[0].strip().lower()
+    return ctype.startswith("text/") or ctype in COMPRESSIBLE_TYPES
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        # mtime=0 keeps the output (and therefore Content-Length) deterministic.
+        return gzip.compress(body, compresslevel=COMPRESS_LEVEL, mtime=0)
+    if encoding == "deflate":
+        # HTTP "deflate" is the zlib format (RFC 9110 8.4.1.2), not raw deflate.
+        return zlib.compress(body, COMPRESS_LEVEL)
+    raise ValueError(f"Unsupported content-coding: {encoding}")
+
+
+@dataclass(frozen=True)
+class CachedFile:
+    body: bytes
+    size: int
+    mtime_ns: int
+
+
+class FileCache:
+    """
+    Bounded, size-aware LRU cache of file bodies keyed by (absolute path, content-coding).
+
+    Compressed variants are derived from the identity body and cached alongside it. Entries are
+    revalidated against the source's (mtime, size) on every lookup, so edits on disk are picked up
+    without any explicit invalidation. Shared by all handler threads.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES, max_entry_bytes: int = DEFAULT_CACHE_ENTRY_BYTES):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self._entries: OrderedDict[tuple[str, str], CachedFile] = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, st: os.stat_result, encoding: str = "identity") -> bytes | None:
+        """
+        Return the body of `path` (optionally compressed) if it is small enough to cache, reading
+        and compressing it on a miss. Returns None for files that should be streamed instead.
+        """
+        if st.st_size > self.max_entry_bytes:
+            return None
+
+        key = (path, encoding)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.body
+            self.misses += 1
+
+        if encoding == "identity":
+            try:
+                with open(path, "rb") as f:
+                    body = f.read()
+            except OSError:
+                return None
+            if len(body) != st.st_size:
+                # File changed between stat() and read(); serve what we read but don't cache it.
+                return body
+        else:
+            identity = self.get(path, st)
+            if identity is None:
+                return None
+            body = _compress(identity, encoding)
+
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = CachedFile(body=body, size=st.st_size, mtime_ns=st.st_mtime_ns)
+            self._total += len(body)
+            while self._total > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._total -= len(evicted.body)
+        return body
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "entries": len(self._entries),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+            }
+
+    def invalidate(self, path: str) -> None:
+        with self._lock:
+            for encoding in ("identity", *CONTENT_CODINGS):
+                self._discard((path, encoding))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total = 0
+
+    def _discard(self, key: tuple[str, str]) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._total -= len(old.body)
+
+
+@dataclass(frozen=True)
+class RedirectRule:
+    status: int
+    target: str | None  # None for 410 Gone
+    pattern: re.Pattern[str] | None = None  # RedirectMatch only
+
+
+class RedirectTable:
+    """
+    Compiled redirect rules loaded from an Apache mod_alias style rules file (see redirects.conf).
+
+    `Redirect` sources live in a dict, so a lookup costs one dict probe per path segment no matter how
+    many rules there are; `RedirectMatch` regexes are tried afterwards in file order. The file is
+    re-read when its mtime changes (checked at most every RELOAD_CHECK_SECONDS).
+    """
+
+    RELOAD_CHECK_SECONDS = 1.0
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime_ns: int | None = None
+        self._checked_at = 0.0
+        self._by_path: dict[str, RedirectRule] = {}
+        self._patterns: list[RedirectRule] = []
+        self._reload_if_changed(force=True)
+
+    def resolve(self, url_path: str, query: str = "") -> tuple[int, str | None] | None:
+        """
+        Return (status, location) for a request path, or None when no rule applies.
+        """
+        self._reload_if_changed()
+        by_path, patterns = self._by_path, self._patterns
+
+        location = None
+        rule = by_path.get(url_path)
+        if rule is not None:
+            location = rule.target
+        else:
+            # `Redirect /old /new` also covers /old/..., with the remainder appended (Apache semantics).
+            prefix = url_path
+            while rule is None and prefix.count("/") > 1:
+                prefix = prefix[: prefix.rindex("/")]
+                rule = by_path.get(prefix) or by_path.get(prefix + "/")
+            if rule is not None:
+                remainder = url_path[len(prefix) :]
+                if rule.target is not None and rule.target.endswith("/") and remainder.startswith("/"):
+                    remainder = remainder[1:]
+                location = None if rule.target is None else rule.target + remainder
+
+        if rule is None:
+            for candidate in patterns:
+                m = candidate.pattern.search(url_path)
+                if m:
+                    rule = candidate
+                    location = None if rule.target is None else _expand_backrefs(rule.target, m)
+                    break
+
+        if rule is None:
+            return None
+        if location is not None and query and "?" not in location:
+            location = f"{location}?{query}"
+        return rule.status, location
+
+    def _reload_if_changed(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.RELOAD_CHECK_SECONDS:
             return
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime_ns = self.path.stat().st_mtime_ns
+            except OSError:
+                mtime_ns = None
+            if not force and mtime_ns == self._mtime_ns:
+                return
+            self._mtime_ns = mtime_ns
+            by_path, patterns = self._parse() if mtime_ns is not None else ({}, [])
+            # Swap both tables in one go; readers never see a half-loaded state.
+            self._by_path, self._patterns = by_path, patterns
 
-        if self.path == "/kapcsolat.html":
-            self.send_response(301)
-            self.send_header("Location", "/kapcsolat/")
-            self.end_headers()
+    def _parse(self) -> tuple[dict[str, RedirectRule], list[RedirectRule]]:
+        by_path: dict[str, RedirectRule] = {}
+        patterns: list[RedirectRule] = []
+        text = self.path.read_text(encoding="utf-8")
+        for lineno, raw in enumerate(text.splitlines(), start=1):
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            directive, *args = line.split()
+            directive = directive.lower()
+            if directive not in ("redirect", "redirectmatch", "redirectpermanent", "redirecttemp"):
+                continue
+
+            status = 301 if directive == "redirectpermanent" else 302
+            if directive in ("redirect", "redirectmatch") and args and (args[0].lower() in REDIRECT_STATUS_KEYWORDS or args[0].isdigit()):
+                token = args.pop(0).lower()
+                status = REDIRECT_STATUS_KEYWORDS.get(token) or int(token)
+
+            expected = 1 if status == 410 else 2
+            if len(args) != expected:
+                print(f"{self.path.name}:{lineno}: expected {expected} argument(s) after status: {raw}", file=sys.stderr)
+                continue
+            source, target = args[0], (args[1] if expected == 2 else None)
+
+            if directive == "redirectmatch":
+                try:
+                    pattern = re.compile(source)
+                except re.error as exc:
+                    print(f"{self.path.name}:{lineno}: invalid regex ({exc}): {raw}", file=sys.stderr)
+                    continue
+                patterns.append(RedirectRule(status=status, target=target, pattern=pattern))
+            else:
+                # Apache keeps the first matching Redirect, so later duplicates don't override it.
+                by_path.setdefault(source, RedirectRule(status=status, target=target))
+        return by_path, patterns
+
+
+def _expand_backrefs(target: str, m: re.Match[str]) -> str:
+    # mod_alias uses $N (not \N) for captured groups; unmatched groups expand to "".
+    def group(ref: re.Match[str]) -> str:
+        idx = int(ref.group(1))
+        return (m.group(idx) or "") if idx <= m.re.groups else ""
+
+    return re.sub(r"\$(\d)", group, target)
+
+
+@dataclass(frozen=True)
+class Route:
+    path: str | None = None  # file to serve
+    location: str | None = None  # DirectorySlash-style redirect target
+
+
+class RouteIndex:
+    """
+    Precomputed URL -> file map for the site tree, mirroring the production rewrites:
+
+    - every file is served at its own path (`/arak.html`, `/css/main.css`)
+    - `dir/index.html` is served at `/dir/`, and `/dir` redirects there (Apache DirectorySlash)
+    - `page.html` is also served extension-less at `/page`
+    - canonical URLs from `add_breadcrumbs_jsonld._canonical_path_for_file` (e.g. `/blog/<slug>`)
+
+    URLs that resolved to nothing are remembered in a bounded negative cache so repeated misses go straight
+    to 404.html. The index (and negative cache) is rebuilt when a directory's mtime changes, i.e. when files
+    are added, removed or renamed; this is checked at most every RELOAD_CHECK_SECONDS.
+    """
+
+    RELOAD_CHECK_SECONDS = 1.0
+    MAX_MISSING = 4096
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._lock = threading.Lock()
+        self._routes: dict[str, Route] = {}
+        self._dir_mtimes: dict[str, int] = {}
+        self._missing: OrderedDict[str, None] = OrderedDict()
+        self._checked_at = 0.0
+        # Plain counters for /__metrics; increments outside the lock may rarely drop a count, which is fine.
+        self.hits = 0
+        self.negative_hits = 0
+        self.rebuilds = 0
+        self.rebuild()
+
+    def lookup(self, url_path: str) -> Route | None:
+        self._rebuild_if_stale()
+        route = self._routes.get(url_path)
+        if route is not None:
+            self.hits += 1
+        return route
+
+    def is_missing(self, url_path: str) -> bool:
+        with self._lock:
+            missing = url_path in self._missing
+            if missing:
+                self.negative_hits += 1
+            return missing
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "routes": len(self._routes),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "negative_entries": len(self._missing),
+                "rebuilds": self.rebuilds,
+            }
+
+    def remember_missing(self, url_path: str) -> None:
+        with self._lock:
+            self._missing[url_path] = None
+            if len(self._missing) > self.MAX_MISSING:
+                self._missing.popitem(last=False)
+
+    def rebuild(self) -> None:
+        routes: dict[str, Route] = {}
+        aliases: dict[str, Route] = {}
+        dir_mtimes: dict[str, int] = {}
+
+        for root, dirs, files in os.walk(self.root):
+            # Never expose VCS metadata or bytecode caches.
+            dirs[:] = [d for d in dirs if not d.startswith(".") and d != "__pycache__"]
+            try:
+                dir_mtimes[root] = os.stat(root).st_mtime_ns
+            except OSError:
+                continue
+            rel_dir = Path(root).relative_to(self.root).as_posix()
+            url_dir = "/" if rel_dir == "." else f"/{rel_dir}/"
+
+            for name in files:
+                if name.startswith("."):
+                    continue
+                file_path = os.path.join(root, name)
+                route = Route(path=file_path)
+                routes[url_dir + name] = route
+                if name == "index.html":
+                    routes[url_dir] = route
+                    if url_dir != "/":
+                        routes[url_dir[:-1]] = Route(location=url_dir)
+                elif name.endswith(".html"):
+                    aliases[url_dir + name[: -len(".html")]] = route
+                    canonical = _canonical_url_for(Path(file_path), self.root)
+                    if canonical:
+                        aliases.setdefault(canonical, route)
+
+        # Real files and directories win over rewrite aliases (e.g. /kapcsolat -> kapcsolat/, not kapcsolat.html).
+        for url, route in aliases.items():
+            routes.setdefault(url, route)
+
+        with self._lock:
+            self._routes = routes
+            self._dir_mtimes = dir_mtimes
+            self._missing.clear()
+            self.rebuilds += 1
+
+    def _rebuild_if_stale(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.RELOAD_CHECK_SECONDS:
             return
+        self._checked_at = now
+        for path, mtime_ns in self._dir_mtimes.items():
+            try:
+                if os.stat(path).st_mtime_ns == mtime_ns:
+                    continue
+            except OSError:
+                pass
+            self.rebuild()
+            return
+
+
+def _canonical_url_for(file_path: Path, root: Path) -> str | None:
+    try:
+        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+            head = f.read(4096)
+    except OSError:
+        return None
+    # The canonical rules are written against the repo's layout; serving another tree (a copy, a test
+    # fixture) maps its files onto the same relative paths.
+    return _canonical_path_for_file(CANONICAL_ROOT / file_path.relative_to(root), _get_lang(head))
+
+
+@dataclass(frozen=True)
+class RenderedPage:
+    body: bytes | None  # None: the page has no header/footer placeholders, serve it as-is
+    size: int
+    mtime_ns: int
+    partials: tuple[int, ...]
+
+
+class PartialRenderer:
+    """
+    Request-time counterpart of `scripts/sync_header_footer.py`: pages with the `header-placeholder` /
+    `footer-placeholder` blocks get the current partials rendered in through the same `assemble_page`
+    code path, without rewriting anything on disk.
+
+    Results are kept in a bounded LRU keyed by (page, content-coding) and stay valid while the page's
+    (mtime, size) and the partials' mtimes are unchanged, so an edit to `partials/header-hu.html` shows
+    up on the next request while untouched pages are served from memory. Shared by all handler threads.
+    """
+
+    PARTIALS = ("header-hu.html", "header-en.html", "footer.html")
+    MAX_ENTRIES = 256
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str], RenderedPage] = OrderedDict()
+        self._partials_key: tuple[int, ...] = ()
+        self._partials: tuple[CompiledTemplate, CompiledTemplate, CompiledTemplate] | None = None
+        # Page types for the nav state; in memory only, the build owns the on-disk index.
+        self._metadata = MetadataIndex(root)
+        self.hits = 0
+        self.misses = 0
+        self.renders = 0
+
+    def render(self, path: str, st: os.stat_result, encoding: str = "identity") -> tuple[bytes, int] | None:
+        """
+        Return (assembled body, newest partial mtime_ns) for a page, optionally compressed, or None when
+        the page is left alone (no placeholders, a non-site directory, or the partials are unreadable).
+        """
+        try:
+            rel = Path(path).relative_to(self.root)
+        except ValueError:
+            return None
+        if len(rel.parts) > 1 and rel.parts[0] in SYNC_SKIP_DIRS:
+            return None
+        loaded = self._load_partials()
+        if loaded is None:
+            return None
+        partials_key, (header_hu, header_en, footer) = loaded
+
+        key = (path, encoding)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.mtime_ns, entry.size, entry.partials) == (st.st_mtime_ns, st.st_size, partials_key):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return (entry.body, max(partials_key)) if entry.body is not None else None
+            self.misses += 1
+
+        cacheable = True
+        if encoding == "identity":
+            try:
+                with open(path, "rb") as f:
+                    raw = f.read()
+            except OSError:
+                return None
+            # File changed between stat() and read(); render what we read but don't cache it.
+            cacheable = len(raw) == st.st_size
+            text = raw.decode("utf-8", errors="replace")
+            page_type = classify_page(rel.as_posix(), self._metadata.get(Path(path), text))
+            html = assemble_page(text, Path(path), self.root, header_hu, header_en, footer, page_type)
+            body = html.encode("utf-8") if html is not None else None
+            self.renders += 1
+        else:
+            identity = self.render(path, st)
+            body = _compress(identity[0], encoding) if identity is not None else None
+
+        if cacheable:
+            with self._lock:
+                self._entries[key] = RenderedPage(body=body, size=st.st_size, mtime_ns=st.st_mtime_ns, partials=partials_key)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.MAX_ENTRIES:
+                    self._entries.popitem(last=False)
+        return (body, max(partials_key)) if body is not None else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "renders": self.renders,
+                "entries": len(self._entries),
+                "bytes": sum(len(entry.body) for entry in self._entries.values() if entry.body is not None),
+            }
+
+    def invalidate(self, path: str) -> None:
+        with self._lock:
+            for encoding in ("identity", *CONTENT_CODINGS):
+                self._entries.pop((path, encoding), None)
+
+    def _load_partials(self) -> tuple[tuple[int, ...], tuple[CompiledTemplate, CompiledTemplate, CompiledTemplate]] | None:
+        paths = [self.root / "partials" / name for name in self.PARTIALS]
+        try:
+            key = tuple(os.stat(p).st_mtime_ns for p in paths)
+        except OSError:
+            return None
+        with self._lock:
+            if key == self._partials_key:
+                return (key, self._partials) if self._partials is not None else None
+        try:
+            partials = load_partials(self.root)
+        except OSError:
+            return None
+        except TemplateError as exc:
+            # Reported once per partials edit; pages are served as they are on disk until it's fixed.
+            print(f"[partials] {exc}", file=sys.stderr)
+            partials = None
+        with self._lock:
+            self._partials_key = key
+            self._partials = partials
+        return (key, partials) if partials is not None else None
+
+
+class LatencyHistogram:
+    """
+    Fixed log-spaced latency buckets (25 µs .. ~40 s, +20% per bucket), so recording is O(log n) and
+    percentiles come out within one bucket width of the true value.
+    """
+
+    BOUNDS = [25e-6 * 1.2**i for i in range(80)]
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for idx, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                # Interpolate linearly inside the bucket.
+                lower = self.BOUNDS[idx - 1] if idx > 0 else 0.0
+                upper = self.BOUNDS[idx] if idx < len(self.BOUNDS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def summary_ms(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50": round(self.percentile(0.50) * 1000, 3),
+            "p95": round(self.percentile(0.95) * 1000, 3),
+            "p99": round(self.percentile(0.99) * 1000, 3),
+            "max": round(self.max * 1000, 3),
+        }
+
+
+@dataclass
+class RouteStats:
+    requests: int = 0
+    bytes_sent: int = 0
+    status: dict[int, int] = field(default_factory=dict)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def record(self, status: int, bytes_sent: int, seconds: float) -> None:
+        self.requests += 1
+        self.bytes_sent += bytes_sent
+        self.status[status] = self.status.get(status, 0) + 1
+        self.latency.record(seconds)
+
+    def summary(self) -> dict:
+        return {
+            "requests": self.requests,
+            "bytes_sent": self.bytes_sent,
+            "status": {str(code): n for code, n in sorted(self.status.items())},
+            "latency_ms": self.latency.summary_ms(),
+        }
+
+
+class Metrics:
+    """
+    Request metrics for both engines: totals and per-route counters, bytes sent, status breakdown and
+    latency histograms, plus an optional structured JSONL access log. Served at METRICS_PATH.
+    """
+
+    MAX_ROUTES = 500
+
+    def __init__(self, access_log: Path | None = None):
+        self._lock = threading.Lock()
+        self._access_log = open(access_log, "a", encoding="utf-8", buffering=1) if access_log else None
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started = time.time()
+            self.total = RouteStats()
+            self.routes: dict[str, RouteStats] = {}
+
+    def record(self, client: str, method: str, target: str, status: int, bytes_sent: int, seconds: float) -> None:
+        route = unquote(urlsplit(target).path)
+        with self._lock:
+            self.total.record(status, bytes_sent, seconds)
+            stats = self.routes.get(route)
+            if stats is None:
+                # Cap cardinality so scanners hammering random URLs can't grow this without bound.
+                route = route if len(self.routes) < self.MAX_ROUTES else "(other)"
+                stats = self.routes.setdefault(route, RouteStats())
+            stats.record(status, bytes_sent, seconds)
+            if self._access_log is not None:
+                entry = {
+                    "ts": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="milliseconds"),
+                    "client": client,
+                    "method": method,
+                    "target": target,
+                    "status": status,
+                    "bytes": bytes_sent,
+                    "ms": round(seconds * 1000, 3),
+                }
+                self._access_log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def close(self) -> None:
+        # Requests still finishing after this are counted but no longer logged.
+        with self._lock:
+            if self._access_log is not None:
+                self._access_log.close()
+                self._access_log = None
+
+    def snapshot(self, site: StaticSite) -> dict:
+        with self._lock:
+            report = {
+                "uptime_seconds": round(time.time() - self.started, 3),
+                **self.total.summary(),
+                "cache": {
+                    "files": site.file_cache.stats() if site.file_cache is not None else None,
+                    "routes": site.routes.stats() if site.routes is not None else None,
+                    "partials": site.partials.stats() if site.partials is not None else None,
+                },
+                "routes": {route: stats.summary() for route, stats in sorted(self.routes.items())},
+            }
+        return report
+
 
-        # Normalize missing trailing slash + index.html for canonical nested URL
-        if self.path in (
-            canonical_thresholds[:-1],
-            canonical_thresholds + "index.html",
+class LiveReload:
+    """
+    Fan-out hub for live-reload events. Subscribers are callables taking an encoded SSE message; they
+    must not block (threaded streams put into a queue, asyncio streams hop onto their loop).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: set[Callable[[bytes], None]] = set()
+
+    def subscribe(self, deliver: Callable[[bytes], None]) -> None:
+        with self._lock:
+            self._subscribers.add(deliver)
+
+    def unsubscribe(self, deliver: Callable[[bytes], None]) -> None:
+        with self._lock:
+            self._subscribers.discard(deliver)
+
+    def publish(self, paths: list[str]) -> None:
+        message = f"event: change\ndata: {json.dumps({'paths': paths})}\n\n".encode("utf-8")
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for deliver in subscribers:
+            deliver(message)
+
+
+class SiteWatcher(threading.Thread):
+    """
+    mtime-polling watcher for the site tree (stdlib only, works the same on Windows).
+
+    Changes are batched: a batch is flushed once a poll sees no new changes (or after BATCH_MAX_SECONDS),
+    so a `sync_header_footer.py` run that rewrites dozens of pages produces a single notification.
+    `on_change(changed_abs_paths, structural)` is called from this thread.
+    """
+
+    POLL_SECONDS = 0.3
+    BATCH_MAX_SECONDS = 2.0
+
+    def __init__(self, root: Path, on_change: Callable[[list[str], bool], None]):
+        super().__init__(name="site-watcher", daemon=True)
+        self.root = root
+        self.on_change = on_change
+
+    def run(self) -> None:
+        snapshot = self._snapshot()
+        pending: set[str] = set()
+        structural = False
+        batch_started = 0.0
+        while True:
+            time.sleep(self.POLL_SECONDS)
+            current = self._snapshot()
+            added = current.keys() - snapshot.keys()
+            removed = snapshot.keys() - current.keys()
+            modified = {p for p in current.keys() & snapshot.keys() if current[p] != snapshot[p]}
+            snapshot = current
+
+            if added or removed or modified:
+                if not pending:
+                    batch_started = time.monotonic()
+                pending |= added | removed | modified
+                structural = structural or bool(added or removed)
+                if time.monotonic() - batch_started < self.BATCH_MAX_SECONDS:
+                    continue
+            if pending:
+                self.on_change(sorted(pending), structural)
+                pending = set()
+                structural = False
+
+    def _snapshot(self) -> dict[str, tuple[int, int]]:
+        files: dict[str, tuple[int, int]] = {}
+        for root, dirs, names in os.walk(self.root):
+            dirs[:] = [d for d in dirs if not d.startswith(".") and d != "__pycache__"]
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files[path] = (st.st_mtime_ns, st.st_size)
+        return files
+
+
+@dataclass
+class Response:
+    """
+    A fully decided response. Exactly one of `body` / `file` carries the payload. `file` is an open
+    handle the engine must close; its payload is `segments`, a list of literal bytes (multipart
+    boundaries) and (offset, count) slices of the file that engines send with sendfile().
+    """
+
+    status: int
+    headers: list[tuple[str, str]] = field(default_factory=list)
+    body: bytes = b""
+    file: BinaryIO | None = None
+    segments: list[bytes | tuple[int, int]] = field(default_factory=list)
+    length: int = 0
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class StaticSite:
+    """
+    Transport-independent request handling shared by the threaded and asyncio engines: redirects,
+    clean-URL routing, path safety, conditional requests, content negotiation and the file cache.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        file_cache: FileCache | None = None,
+        redirects: RedirectTable | None = None,
+        routes: RouteIndex | None = None,
+        live_reload: LiveReload | None = None,
+        metrics: Metrics | None = None,
+        partials: PartialRenderer | None = None,
+    ):
+        self.root = root
+        self.file_cache = file_cache
+        self.redirects = redirects
+        self.routes = routes
+        self.live_reload = live_reload
+        self.metrics = metrics
+        self.partials = partials
+
+    def invalidate(self, paths: list[str], structural: bool) -> None:
+        """
+        Drop cached state for changed files; `structural` means files were added or removed.
+        """
+        for path in paths:
+            if self.file_cache is not None:
+                self.file_cache.invalidate(path)
+            if self.partials is not None:
+                self.partials.invalidate(path)
+        if structural and self.routes is not None:
+            self.routes.rebuild()
+
+    def respond(self, method: str, target: str, headers: Mapping[str, str]) -> Response:
+        """
+        Resolve a GET/HEAD request. The caller decides whether to send the payload (HEAD doesn't).
+        """
+        parts = urlsplit(target)
+        if self.metrics is not None and parts.path == METRICS_PATH:
+            return self._metrics_response(reset="reset=1" in parts.query.split("&"))
+
+        if self.redirects is not None:
+            redirect = self.redirects.resolve(parts.path, parts.query)
+            if redirect is not None:
+                status, location = redirect
+                if location is None:
+                    return _error_response(status)
+                return _redirect_response(status, location)
+
+        url_path = unquote(parts.path)
+        route = None
+        if self.routes is not None:
+            route = self.routes.lookup(url_path)
+            if route is None and self.routes.is_missing(url_path):
+                return self._not_found()
+
+        if route is not None and route.location is not None:
+            return _redirect_response(HTTPStatus.MOVED_PERMANENTLY, route.location + (f"?{parts.query}" if parts.query else ""))
+        if route is not None:
+            path = route.path
+        else:
+            path = str(_safe_join(self.root, url_path))
+            if os.path.isdir(path):
+                if not url_path.endswith("/"):
+                    # Redirect browser - doing basically what Apache's DirectorySlash does.
+                    location = parts.path + "/" + (f"?{parts.query}" if parts.query else "")
+                    return _redirect_response(HTTPStatus.MOVED_PERMANENTLY, location)
+                index = os.path.join(path, "index.html")
+                if not os.path.isfile(index):
+                    return _directory_listing(path, url_path)
+                path = index
+            elif url_path.endswith("/"):
+                # A file requested as a directory (e.g. /arak.html/) doesn't exist.
+                path = None
+
+        try:
+            st = os.stat(path) if path else None
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
+            if self.routes is not None:
+                self.routes.remember_missing(url_path)
+            return self._not_found()
+
+        ctype = _guess_type(path)
+        compressible = _is_compressible(ctype)
+        # Range is only defined for GET; ranged requests get the identity coding so offsets refer to the file.
+        range_header = headers.get("Range") if method == "GET" else None
+        encoding = _negotiate_encoding(headers.get("Accept-Encoding")) if compressible else None
+        if range_header is not None or not COMPRESS_MIN_BYTES <= st.st_size <= COMPRESS_MAX_BYTES:
+            # Not worth it for tiny files; huge ones are streamed as-is.
+            encoding = None
+        # With live reload on, pages get the client script appended, so they're served uncompressed from memory.
+        inject_live_reload = self.live_reload is not None and ctype.startswith("text/html")
+        if inject_live_reload:
+            encoding = None
+        # Pages with header/footer placeholders are assembled from partials/ and always served from memory.
+        rendered = None
+        if self.partials is not None and ctype.startswith("text/html"):
+            rendered = self.partials.render(path, st, encoding or "identity")
+        mtime = max(st.st_mtime, rendered[1] / 1e9) if rendered is not None else st.st_mtime
+
+        # Prefer a precompressed sibling (e.g. main.css.gz), as Apache/MultiViews setups do,
+        # as long as it is not older than the source.
+        body_path, body_st = path, st
+        if encoding == "gzip" and rendered is None:
+            try:
+                gz_st = os.stat(path + ".gz")
+            except OSError:
+                gz_st = None
+            if gz_st is not None and stat.S_ISREG(gz_st.st_mode) and gz_st.st_mtime_ns >= st.st_mtime_ns:
+                body_path, body_st = path + ".gz", gz_st
+
+        etag = _etag_for_stat(body_st)
+        if rendered is not None:
+            etag = f'{etag[:-1]}-p{rendered[1]:x}"'
+        if encoding is not None:
+            etag = f'{etag[:-1]}-{encoding}"'
+        if inject_live_reload:
+            etag = f'{etag[:-1]}-lr"'
+        validators = [
+            ("Last-Modified", email.utils.formatdate(mtime, usegmt=True)),
+            ("ETag", etag),
+            # Revalidate everything but hashed assets: cheap 304s locally, and edits show up on the next reload.
+            ("Cache-Control", IMMUTABLE_CACHE_CONTROL if is_fingerprinted(path) else "no-cache"),
+        ]
+        if compressible:
+            validators.append(("Vary", "Accept-Encoding"))
+
+        if_none_match = headers.get("If-None-Match")
+        if_modified_since = headers.get("If-Modified-Since")
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2).
+        if (if_none_match is not None and _etag_matches(if_none_match, etag)) or (
+            if_none_match is None and if_modified_since is not None and _not_modified_since(if_modified_since, mtime)
         ):
-            self.send_response(301)
-            self.send_header("Location", canonical_thresholds)
-            self.end_headers()
-            return
-        return super().do_GET()
+            return Response(HTTPStatus.NOT_MODIFIED, validators)
+
+        body = None
+        if rendered is not None:
+            body = rendered[0]
+        elif encoding is None and body_st.st_size >= SENDFILE_MIN_BYTES and not inject_live_reload:
+            # Large binaries (PDFs, hero images) go straight from disk with sendfile(); copying them
+            # through the cache would only cost memory.
+            pass
+        elif self.file_cache is not None:
+            if body_path != path:
+                # Already compressed on disk: serve the sibling's bytes untouched.
+                body = self.file_cache.get(body_path, body_st)
+            else:
+                body = self.file_cache.get(path, st, encoding or "identity")
+        if body is None and encoding is not None and body_path == path:
+            try:
+                with open(path, "rb") as src:
+                    body = _compress(src.read(), encoding)
+            except OSError:
+                return self._not_found()
+        if inject_live_reload:
+            if body is None:
+                try:
+                    body = Path(path).read_bytes()
+                except OSError:
+                    return self._not_found()
+            body = _inject_live_reload_client(body)
+
+        total = len(body) if body is not None else body_st.st_size
+        ranges = None
+        if range_header is not None:
+            if_range = headers.get("If-Range")
+            if if_range is None or _if_range_matches(if_range, etag, mtime):
+                ranges = _parse_ranges(range_header, total)
+        if ranges == []:
+            response = _error_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            response.headers.append(("Content-Range", f"bytes */{total}"))
+            return response
+
+        if ranges is None:
+            response = Response(HTTPStatus.OK, [("Content-Type", ctype)])
+            segments: list[bytes | tuple[int, int]] = [(0, total)]
+        elif len(ranges) == 1:
+            start, end = ranges[0]
+            response = Response(HTTPStatus.PARTIAL_CONTENT, [("Content-Type", ctype), ("Content-Range", f"bytes {start}-{end}/{total}")])
+            segments = [(start, end - start + 1)]
+        else:
+            boundary = secrets.token_hex(16)
+            response = Response(HTTPStatus.PARTIAL_CONTENT, [("Content-Type", f"multipart/byteranges; boundary={boundary}")])
+            segments = _multipart_segments(ranges, total, ctype, boundary)
+
+        if body is not None:
+            if ranges is not None:
+                body = b"".join(seg if isinstance(seg, bytes) else body[seg[0] : seg[0] + seg[1]] for seg in segments)
+            response.body = body
+            response.length = len(body)
+        else:
+            try:
+                response.file = open(body_path, "rb")
+            except OSError:
+                return self._not_found()
+            response.segments = segments
+            response.length = sum(len(seg) if isinstance(seg, bytes) else seg[1] for seg in segments)
+
+        response.headers.append(("Content-Length", str(response.length)))
+        response.headers.append(("Accept-Ranges", "bytes"))
+        if encoding is not None:
+            response.headers.append(("Content-Encoding", encoding))
+        response.headers.extend(validators)
+        return response
+
+    def _metrics_response(self, reset: bool) -> Response:
+        body = json.dumps(self.metrics.snapshot(self), indent=2).encode("utf-8")
+        if reset:
+            self.metrics.reset()
+        headers = [
+            ("Content-Type", "application/json"),
+            ("Content-Length", str(len(body))),
+            ("Cache-Control", "no-store"),
+        ]
+        return Response(HTTPStatus.OK, headers, body=body, length=len(body))
+
+    def _not_found(self) -> Response:
+        """
+        Serve the site's 404.html with a 404 status (like an ErrorDocument), falling back to the stock error page.
+        """
+        page = self.root / "404.html"
+        try:
+            st = os.stat(page)
+            body = self.file_cache.get(str(page), st) if self.file_cache is not None else None
+            if body is None:
+                body = page.read_bytes()
+        except OSError:
+            return _error_response(HTTPStatus.NOT_FOUND, "File not found")
+
+        headers = [
+            ("Content-Type", "text/html; charset=utf-8"),
+            ("Content-Length", str(len(body))),
+            ("Cache-Control", "no-cache"),
+        ]
+        return Response(HTTPStatus.NOT_FOUND, headers, body=body, length=len(body))
+
+
+def _parse_ranges(header: str, size: int) -> list[tuple[int, int]] | None:
+    """
+    Parse a `Range: bytes=...` header into inclusive (start, end) pairs clipped to `size`.
+
+    Returns None when the header must be ignored (other units, bad syntax, too many ranges) and an
+    empty list when none of the ranges is satisfiable (-> 416).
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+    specs = spec.split(",")
+    if len(specs) > MAX_RANGES:
+        return None
+
+    ranges: list[tuple[int, int]] = []
+    for item in specs:
+        first, dash, last = item.strip().partition("-")
+        if not dash:
+            return None
+        try:
+            if first:
+                start = int(first)
+                end = int(last) if last else max(start, size - 1)
+                if start < 0 or end < start:
+                    return None
+            else:
+                # Suffix range: the last N bytes.
+                suffix = int(last)
+                if suffix < 0:
+                    return None
+                if suffix == 0:
+                    continue
+                start, end = max(size - suffix, 0), size - 1
+        except ValueError:
+            return None
+        if start >= size:
+            continue
+        ranges.append((start, min(end, size - 1)))
+    return ranges
+
+
+def _if_range_matches(value: str, etag: str, mtime: float) -> bool:
+    value = value.strip()
+    if value.startswith('"') or value.startswith("W/"):
+        # If-Range requires the strong comparison function.
+        return value == etag
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp() == int(mtime)
+    except (TypeError, IndexError, OverflowError, ValueError):
+        return False
+
+
+def _multipart_segments(ranges: list[tuple[int, int]], size: int, ctype: str, boundary: str) -> list[bytes | tuple[int, int]]:
+    # multipart/byteranges body (RFC 9110 14.6): part headers as literal bytes, part data as file slices.
+    segments: list[bytes | tuple[int, int]] = []
+    for start, end in ranges:
+        part_head = f"\r\n--{boundary}\r\nContent-Type: {ctype}\r\nContent-Range: bytes {start}-{end}/{size}\r\n\r\n"
+        segments.append(part_head.encode("latin-1"))
+        segments.append((start, end - start + 1))
+    segments.append(f"\r\n--{boundary}--\r\n".encode("latin-1"))
+    return segments
+
+
+def _inject_live_reload_client(body: bytes) -> bytes:
+    snippet = f"<script>{LIVE_RELOAD_CLIENT}</script>\n".encode("utf-8")
+    idx = body.lower().rfind(b"</body>")
+    if idx == -1:
+        return body + snippet
+    return body[:idx] + snippet + body[idx:]
+
+
+def _guess_type(path: str) -> str:
+    # Same lookup order as SimpleHTTPRequestHandler.guess_type.
+    ext = os.path.splitext(path)[1]
+    extensions_map = SimpleHTTPRequestHandler.extensions_map
+    if ext in extensions_map:
+        return extensions_map[ext]
+    if ext.lower() in extensions_map:
+        return extensions_map[ext.lower()]
+    guess, _ = mimetypes.guess_type(path)
+    return guess or "application/octet-stream"
+
+
+def _redirect_response(status: int, location: str) -> Response:
+    return Response(status, [("Location", location), ("Content-Length", "0")])
+
+
+def _error_response(status: int, message: str | None = None) -> Response:
+    status = HTTPStatus(status)
+    body = (
+        DEFAULT_ERROR_MESSAGE
+        % {
+            "code": status.value,
+            "message": html.escape(message or status.phrase, quote=False),
+            "explain": html.escape(status.description, quote=False),
+        }
+    ).encode("utf-8", "replace")
+    headers = [("Content-Type", DEFAULT_ERROR_CONTENT_TYPE), ("Content-Length", str(len(body)))]
+    return Response(status, headers, body=body, length=len(body))
+
+
+def _directory_listing(path: str, url_path: str) -> Response:
+    # Minimal equivalent of SimpleHTTPRequestHandler.list_directory.
+    try:
+        names = sorted(os.listdir(path), key=str.lower)
+    except OSError:
+        return _error_response(HTTPStatus.NOT_FOUND, "No permission to list directory")
+    title = html.escape(f"Directory listing for {url_path}", quote=False)
+    items = []
+    for name in names:
+        display = name + ("/" if os.path.isdir(os.path.join(path, name)) else "")
+        items.append(f'<li><a href="{quote(display)}">{html.escape(display, quote=False)}</a></li>')
+    doc = (
+        "<!DOCTYPE HTML>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+        f"<title>{title}</title>\n</head>\n<body>\n<h1>{title}</h1>\n<hr>\n<ul>\n"
+        + "\n".join(items)
+        + "\n</ul>\n<hr>\n</body>\n</html>\n"
+    )
+    body = doc.encode("utf-8", "surrogateescape")
+    headers = [("Content-Type", "text/html; charset=utf-8"), ("Content-Length", str(len(body)))]
+    return Response(HTTPStatus.OK, headers, body=body, length=len(body))
+
+
+class AliasRequestHandler(SimpleHTTPRequestHandler):
+    # Shared by all requests; set by main().
+    site: StaticSite | None = None
+
+    # Python's SimpleHTTPRequestHandler supports a base directory via `directory=...`.
+    # We set it to the repo root so normal static files still work.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=str(SITE_ROOT), **kwargs)
+
+    def do_GET(self):
+        if self.site.live_reload is not None and urlsplit(self.path).path == LIVE_RELOAD_PATH:
+            return self._stream_live_reload()
+        return self._timed(super().do_GET)
 
     def do_HEAD(self):
-        canonical_thresholds = "/tevekenysegeink/kozbeszerzes-ajanlatkeroknek/kozbeszerzes-ertekhatar/"
+        return self._timed(super().do_HEAD)
 
-        if self.path in (
-            "/kozbeszerzes-ertekhatar",
-            "/kozbeszerzes-ertekhatar/",
-            "/kozbeszerzes-ertekhatar/index.html",
-        ):
-            self.send_response(301)
-            self.send_header("Location", canonical_thresholds)
-            self.end_headers()
-            return
+    def _timed(self, handle: Callable[[], None]) -> None:
+        started = time.perf_counter()
+        self._response: Response | None = None
+        try:
+            handle()
+        finally:
+            response = self._response
+            if self.site.metrics is not None and response is not None:
+                sent = response.length if self.command != "HEAD" and response.status != HTTPStatus.NOT_MODIFIED else 0
+                self.site.metrics.record(
+                    self.client_address[0], self.command, self.path, response.status, sent, time.perf_counter() - started
+                )
 
-        if self.path == "/kapcsolat.html":
-            self.send_response(301)
-            self.send_header("Location", "/kapcsolat/")
+    def _stream_live_reload(self) -> None:
+        # Holds this connection's thread until the browser goes away.
+        events: queue.SimpleQueue[bytes] = queue.SimpleQueue()
+        self.site.live_reload.subscribe(events.put)
+        try:
+            self.send_response(HTTPStatus.OK)
+            for name, value in LIVE_RELOAD_HEADERS:
+                self.send_header(name, value)
             self.end_headers()
-            return
+            self.wfile.write(b"retry: 1000\n\n")
+            while True:
+                try:
+                    message = events.get(timeout=LIVE_RELOAD_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    message = b": ping\n\n"
+                self.wfile.write(message)
+        except OSError:
+            pass
+        finally:
+            self.site.live_reload.unsubscribe(events.put)
+            self.close_connection = True
 
-        if self.path in (
-            canonical_thresholds[:-1],
-            canonical_thresholds + "index.html",
-        ):
-            self.send_response(301)
-            self.send_header("Location", canonical_thresholds)
-            self.end_headers()
-            return
-        return super().do_HEAD()
+    def send_head(self):
+        """
+        Send status + headers decided by the shared StaticSite; return the payload as a file object
+        (copied by do_GET, discarded by do_HEAD).
+        """
+        response = self._response = self.site.respond(self.command, self.path, self.headers)
+        self.send_response(response.status)
+        for name, value in response.headers:
+            self.send_header(name, value)
+        self.end_headers()
+        if response.file is None and not response.body:
+            return None
+        return response
 
-    def translate_path(self, path: str) -> str:
-        # Strip query/fragment, URL-decode
-        url_path = unquote(urlsplit(path).path)
-        return super().translate_path(url_path)
+    def copyfile(self, source, outputfile):
+        if not isinstance(source, Response):
+            return super().copyfile(source, outputfile)
+        if source.file is None:
+            outputfile.write(source.body)
+            return
+        for segment in source.segments:
+            if isinstance(segment, bytes):
+                outputfile.write(segment)
+            else:
+                # wfile is unbuffered, so the headers are already on the wire. socket.sendfile() uses
+                # os.sendfile() where available and falls back to read/send elsewhere.
+                offset, count = segment
+                self.connection.sendfile(source.file, offset, count)
 
 
 class DualStackServer(ThreadingHTTPServer):
@@ -126,13 +1408,310 @@ class DualStackServer(ThreadingHTTPServer):
         return super().server_bind()
 
 
+class AsyncSiteServer:
+    """
+    asyncio engine (`--async`): HTTP/1.1 persistent connections on asyncio streams, serving the same
+    StaticSite as the threaded engine.
+
+    - At most `max_connections` connections are served at once; extra ones wait for a slot, and while
+      anyone is waiting, responses carry `Connection: close` so idle keep-alive slots are released.
+    - Payloads are flushed with `await drain()` and files go out via loop.sendfile(), so slow clients
+      can't make us buffer whole files.
+    - Building a response (StaticSite.respond) does blocking file I/O, so it runs in the default
+      executor's worker threads rather than on the event loop.
+    """
+
+    def __init__(
+        self,
+        site: StaticSite,
+        port: int,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        idle_timeout: float = KEEPALIVE_TIMEOUT_SECONDS,
+    ):
+        self.site = site
+        self.port = port
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self._slots: asyncio.Semaphore | None = None
+        self._waiting = 0
+
+    async def serve_forever(self) -> None:
+        self._slots = asyncio.Semaphore(self.max_connections)
+        server = await asyncio.start_server(self._handle_connection, sock=_dual_stack_socket(self.port), limit=MAX_REQUEST_HEAD_BYTES)
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info("peername")
+        client = peer[0] if peer else "-"
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            # asyncio only enables TCP_NODELAY when the listening socket was created with
+            # proto=IPPROTO_TCP; without it every header/body pair waits out a delayed ACK.
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        except BaseException:
+            writer.close()
+            raise
+        finally:
+            self._waiting -= 1
+
+        try:
+            for _ in range(MAX_REQUESTS_PER_CONNECTION):
+                if not await self._handle_one(reader, writer, client):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        finally:
+            self._slots.release()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _handle_one(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, client: str) -> bool:
+        """
+        Serve a single request. Returns True when the connection should stay open.
+        """
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.idle_timeout)
+            started = time.perf_counter()
+        except asyncio.IncompleteReadError as exc:
+            if exc.partial.strip():
+                await self._write(writer, _error_response(HTTPStatus.BAD_REQUEST), "HEAD", "-", client, False)
+            return False
+        except asyncio.LimitOverrunError:
+            await self._write(writer, _error_response(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE), "GET", "-", client, False)
+            return False
+
+        request_line, _, header_block = head.partition(b"\r\n")
+        words = request_line.decode("iso-8859-1").split()
+        if len(words) != 3 or not words[2].startswith("HTTP/1."):
+            await self._write(writer, _error_response(HTTPStatus.BAD_REQUEST), "GET", request_line.decode("iso-8859-1"), client, False)
+            return False
+        method, target, version = words
+        try:
+            headers = http.client.parse_headers(io.BytesIO(header_block))
+        except http.client.HTTPException:
+            await self._write(writer, _error_response(HTTPStatus.BAD_REQUEST), method, " ".join(words), client, False)
+            return False
+
+        connection = (headers.get("Connection") or "").lower()
+        if version == "HTTP/1.1":
+            keep_alive = "close" not in connection
+        else:
+            keep_alive = "keep-alive" in connection
+
+        # GET/HEAD bodies have no meaning here; drain them so the next request parses cleanly.
+        if headers.get("Transfer-Encoding"):
+            await self._write(writer, _error_response(HTTPStatus.NOT_IMPLEMENTED, "Chunked request bodies are not supported"), method, " ".join(words), client, False)
+            return False
+        try:
+            content_length = int(headers.get("Content-Length") or 0)
+        except ValueError:
+            content_length = -1
+        if content_length < 0 or content_length > MAX_REQUEST_BODY_BYTES:
+            await self._write(writer, _error_response(HTTPStatus.BAD_REQUEST), method, " ".join(words), client, False)
+            return False
+        if content_length:
+            await reader.readexactly(content_length)
+
+        if method == "GET" and self.site.live_reload is not None and urlsplit(target).path == LIVE_RELOAD_PATH:
+            await self._stream_live_reload(writer, " ".join(words), client)
+            return False
+
+        if method not in ("GET", "HEAD"):
+            response = _error_response(HTTPStatus.NOT_IMPLEMENTED, f"Unsupported method ({method!r})")
+            response.headers.append(("Allow", "GET, HEAD"))
+        else:
+            # Blocking file I/O; StaticSite is thread-safe (the threaded engine shares it across threads).
+            response = await asyncio.to_thread(self.site.respond, method, target, headers)
+
+        if self._waiting:
+            # Others are queued for a slot: finish this request and hand the slot over.
+            keep_alive = False
+        await self._write(writer, response, method, " ".join(words), client, keep_alive)
+        if self.site.metrics is not None:
+            sent = response.length if method != "HEAD" and response.status != HTTPStatus.NOT_MODIFIED else 0
+            self.site.metrics.record(client, method, target, response.status, sent, time.perf_counter() - started)
+        return keep_alive
+
+    async def _stream_live_reload(self, writer: asyncio.StreamWriter, request_line: str, client: str) -> None:
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue[bytes] = asyncio.Queue()
+
+        def deliver(message: bytes) -> None:
+            # Called from the watcher thread.
+            loop.call_soon_threadsafe(events.put_nowait, message)
+
+        self.site.live_reload.subscribe(deliver)
+        _log_request(client, request_line, HTTPStatus.OK, 0)
+        try:
+            head = [
+                "HTTP/1.1 200 OK",
+                f"Server: {SERVER_VERSION}",
+                f"Date: {email.utils.formatdate(usegmt=True)}",
+                *(f"{name}: {value}" for name, value in LIVE_RELOAD_HEADERS),
+                "Connection: close",
+            ]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + b"retry: 1000\n\n")
+            await writer.drain()
+            while True:
+                try:
+                    message = await asyncio.wait_for(events.get(), LIVE_RELOAD_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    message = b": ping\n\n"
+                writer.write(message)
+                await writer.drain()
+        finally:
+            self.site.live_reload.unsubscribe(deliver)
+
+    async def _write(
+        self,
+        writer: asyncio.StreamWriter,
+        response: Response,
+        method: str,
+        request_line: str,
+        client: str,
+        keep_alive: bool,
+    ) -> None:
+        try:
+            status = HTTPStatus(response.status)
+            lines = [
+                f"HTTP/1.1 {status.value} {status.phrase}",
+                f"Server: {SERVER_VERSION}",
+                f"Date: {email.utils.formatdate(usegmt=True)}",
+                *(f"{name}: {value}" for name, value in response.headers),
+                "Connection: keep-alive" if keep_alive else "Connection: close",
+                "",
+                "",
+            ]
+            writer.write("\r\n".join(lines).encode("latin-1", "strict"))
+
+            send_body = method != "HEAD" and status.value not in (HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED)
+            if send_body and response.file is not None:
+                loop = asyncio.get_running_loop()
+                await writer.drain()
+                for segment in response.segments:
+                    if isinstance(segment, bytes):
+                        writer.write(segment)
+                        await writer.drain()
+                    else:
+                        # Zero-copy where the loop supports it; falls back to chunked read/write otherwise.
+                        offset, count = segment
+                        await loop.sendfile(writer.transport, response.file, offset, count)
+            elif send_body and response.body:
+                writer.write(response.body)
+            await writer.drain()
+        finally:
+            response.close()
+        _log_request(client, request_line, status.value, response.length)
+
+
+def _dual_stack_socket(port: int) -> socket.socket:
+    # Same bind semantics as DualStackServer, for the asyncio engine.
+    sock = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    try:
+        sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 0)
+    except OSError:
+        pass
+    sock.bind(("::", port))
+    sock.listen(socket.SOMAXCONN)
+    sock.setblocking(False)
+    return sock
+
+
+def _log_request(client: str, request_line: str, status: int, size: int) -> None:
+    # Same access log format as BaseHTTPRequestHandler.log_request.
+    timestamp = time.strftime("%d/%b/%Y %H:%M:%S")
+    sys.stderr.write(f'{client} - - [{timestamp}] "{request_line}" {status} {size or "-"}\n')
+
+
 def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog=Path(argv[0]).name, description="Local dev server for the static site.")
+    parser.add_argument("port", nargs="?", default="8000")
+    parser.add_argument(
+        "--cache-mb",
+        type=float,
+        default=DEFAULT_CACHE_BYTES / (1024 * 1024),
+        help="In-memory file cache size in MiB (0 disables caching).",
+    )
+    parser.add_argument(
+        "--redirects",
+        type=Path,
+        default=REDIRECTS_FILE,
+        help="Apache mod_alias style redirect rules file (default: redirects.conf).",
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Use the asyncio engine (HTTP/1.1 keep-alive) instead of one thread per connection.",
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=DEFAULT_MAX_CONNECTIONS,
+        help="Concurrent connection cap for --async (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--live-reload",
+        action="store_true",
+        help="Watch the site tree and push CSS hot-swaps / page reloads to open browser tabs.",
+    )
+    parser.add_argument(
+        "--render-partials",
+        action="store_true",
+        help="Assemble the shared header/footer from partials/ into pages at request time (no sync script run needed).",
+    )
+    parser.add_argument(
+        "--access-log",
+        type=Path,
+        help="Also append a structured JSONL access log to this file.",
+    )
+    args = parser.parse_args(argv[1:])
     try:
-        port = int(argv[1]) if len(argv) > 1 else 8000
+        port = int(args.port)
     except ValueError:
         print("Port must be an integer, e.g. 8000", file=sys.stderr)
         return 2
 
+    cache_bytes = int(args.cache_mb * 1024 * 1024)
+    site = StaticSite(
+        SITE_ROOT,
+        file_cache=FileCache(max_bytes=cache_bytes) if cache_bytes > 0 else None,
+        redirects=RedirectTable(args.redirects),
+        routes=RouteIndex(SITE_ROOT),
+        live_reload=LiveReload() if args.live_reload else None,
+        metrics=Metrics(access_log=args.access_log),
+        partials=PartialRenderer(SITE_ROOT) if args.render_partials else None,
+    )
+
+    if site.live_reload is not None:
+
+        def on_change(paths: list[str], structural: bool) -> None:
+            site.invalidate(paths, structural)
+            rel_paths = [Path(p).relative_to(SITE_ROOT).as_posix() for p in paths]
+            print(f"[live-reload] {len(rel_paths)} file(s) changed", file=sys.stderr)
+            site.live_reload.publish(rel_paths)
+
+        SiteWatcher(SITE_ROOT, on_change).start()
+
+    if args.use_async:
+        print(f"Serving {SITE_ROOT} at http://localhost:{port}/ (dual-stack, asyncio)")
+        try:
+            asyncio.run(AsyncSiteServer(site, port, max_connections=args.max_connections).serve_forever())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            site.metrics.close()
+        return 0
+
+    AliasRequestHandler.site = site
     server = DualStackServer(("::", port), AliasRequestHandler)
     print(f"Serving {SITE_ROOT} at http://localhost:{port}/ (dual-stack)")
     try:
@@ -141,6 +1720,7 @@ def main(argv: list[str]) -> int:
         pass
     finally:
         server.server_close()
+        site.metrics.close()
     return 0
 
 
@@ -0,0 +1 @@
+async function sha256Hash(v){const d=new TextEncoder().encode(v.trim().toLowerCase()),b=await crypto.subtle.digest("SHA-256",d);return Array.from(new Uint8Array(b)).map(x=>x.toString(16).padStart(2,"0")).join("")}const EMAILJS_CONFIG={publicKey:"klvidjuePqBFE5eAb",serviceId:"service_pn1nrz6",notificationTemplateId:"template_thoqnhx",autoReplyTemplateId:"template_v5ail7e"},EMAILJS_CDN_SRC="https://cdn.jsdelivr.net/npm/@emailjs/browser@4/dist/email.min.js";let emailJsLoadPromise=null,emailJsInitialized=!1;function loadEmailJsScript(){return window.emailjs?Promise.resolve():emailJsLoadPromise||(emailJsLoadPromise=new Promise((e,t)=>{const n=document.createElement("script");n.src=EMAILJS_CDN_SRC,n.async=!0,n.onload=()=>e(),n.onerror=()=>t(new Error("EmailJS failed to load")),document.head.appendChild(n)}),emailJsLoadPromise)}async function ensureEmailJsReady(){if(await loadEmailJsScript(),!window.emailjs)throw new Error("EmailJS not available after load");emailJsInitialized||(window.emailjs.init(EMAILJS_CONFIG.publicKey),emailJsInitialized=!0)}async function handleFormSubmit(e){e.preventDefault();const t=e.target,n=t.querySelector('button[type="submit"]'),a=(document.getElementById("form-status"),new FormData(t)),s=Object.fromEntries(a.entries()),o=validateForm(s);if(!o.isValid)return void showFormStatus("error",o.message);const i=n.textContent;n.disabled=!0,n.textContent=n.textContent.includes("Send")?"Sending...":"Küldés...";try{await ensureEmailJsReady();const e={name:s.name||"",email:s.email||"",message:s.message||"",phone:s.phone||"Nem adott meg",company:s.company||"Nem adott meg",subject:s.subject||"Általános megkeresés",sent_time:(new Date).toLocaleTimeString("hu-HU"),sent_date:(new Date).toLocaleDateString("hu-HU"),user_ip:await getUserIP()},[a,o]=await Promise.all([window.emailjs.send(EMAILJS_CONFIG.serviceId,EMAILJS_CONFIG.notificationTemplateId,e),window.emailjs.send(EMAILJS_CONFIG.serviceId,EMAILJS_CONFIG.autoReplyTemplateId,{name:s.name||"",email:s.email||"",message:s.message||"",sent_date:(new Date).toLocaleDateString("hu-HU")})]);t.reset(),"undefined"!=typeof gtag&&gtag("event","form_submit",{event_category:"Contact",event_label:"Contact Form Submission"});try{sessionStorage.setItem("sugallat_lead_email_hash",await sha256Hash(s.email))}catch(hashErr){}window.location.href=("en"===(document.documentElement.lang||"").toLowerCase()?"/en/contact/thank-you/":"/kapcsolat/koszonjuk/")}catch(e){if(String(e&&e.message||"").toLowerCase().includes("emailjs failed to load")){return void showFormStatus("error",n.textContent.includes("Send")?"The message service failed to load. Please email us directly at benko@sugallat.hu":"Az üzenetküldő szolgáltatás nem töltődött be. Kérjük, írjon nekünk közvetlenül: benko@sugallat.hu")}e.status,e.text;let t;t=422===e.status?n.textContent.includes("Send")?"Email configuration error. Please contact us directly at benko@sugallat.hu":"Email konfigurációs hiba. Kérjük, írjon nekünk közvetlenül: benko@sugallat.hu":n.textContent.includes("Send")?"An error occurred while sending your message. Please try again.":"Hiba történt az üzenet küldése során. Kérjük, próbálja meg később.",showFormStatus("error",t)}finally{n.disabled=!1,n.textContent=i}}function validateForm(e){const t=[];(!e.name||e.name.trim().length<2)&&t.push("A név megadása kötelező (minimum 2 karakter)."),e.email&&isValidEmail(e.email)||t.push("Érvényes email cím megadása kötelező."),(!e.message||e.message.trim().length<10)&&t.push("Az üzenet megadása kötelező (minimum 10 karakter).");const n=document.getElementById("gdpr-consent");return n&&!n.checked&&t.push("Az adatkezelési tájékoztató elfogadása kötelező."),{isValid:0===t.length,message:t.join(" ")}}function isValidEmail(e){return/^[^\s@]+@[^\s@]+\.[^\s@]+$/.test(e)}function showFormStatus(e,t){const n=document.getElementById("form-status");n&&(n.style.display="block",n.className=`form-status ${e}`,n.textContent=t,"success"===e&&setTimeout(()=>{n.style.display="none"},5e3))}async function getUserIP(){try{const e=["https://api.ipify.org?format=json","https://ipapi.co/json/","https://httpbin.org/ip"];for(const t of e)try{const e=await fetch(t),n=await e.json();return n.ip||n.origin||"Ismeretlen"}catch(e){continue}return"Ismeretlen"}catch(e){return"Ismeretlen"}}document.addEventListener("DOMContentLoaded",function(){const e=document.getElementById("contactForm");document.getElementById("form-status");e&&(e.addEventListener("focusin",()=>{ensureEmailJsReady().catch(()=>{})},{once:!0}),e.addEventListener("submit",handleFormSubmit))});const statusStyles="\n<style>\n.form-status {\n    padding: 12px 16px;\n    border-radius: 8px;\n    font-weight: 500;\n    margin-top: 1rem;\n}\n\n.form-status.success {\n    background-color: #d1fae5;\n    color: #065f46;\n    border: 1px solid #a7f3d0;\n}\n\n.form-status.error {\n    background-color: #fee2e2;\n    color: #991b1b;\n    border: 1px solid #fca5a5;\n}\n\n.form-status.loading {\n    background-color: #dbeafe;\n    color: #1e40af;\n    border: 1px solid #93c5fd;\n}\n</style>\n";document.head.insertAdjacentHTML("beforeend",statusStyles);
\ No newline at end of file
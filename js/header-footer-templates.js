@@ -1 +0,0 @@
-export function buildHeaderHTML({isEnglish:a,urls:n,imagePath:l,logoPath:s}){return a?`\n            <nav class="navbar">\n                <div class="nav-container">\n                    <div class="nav-logo">\n                        <a href="${s}" class="nav-logo-link">\n                            <img src="${l}" alt="Sugallat Ltd. Logo" class="logo">\n                            <h2>Sugallat Ltd.</h2>\n                        </a>\n                    </div>\n                    <ul class="nav-menu">\n                        <li class="nav-item">\n                            <a href="${n.homeUrl}" class="nav-link" data-nav="home">Home</a>\n                        </li>\n                        <li class="nav-item dropdown">\n                            <a href="${n.servicesUrl}" class="nav-link" data-nav="services">Our Services</a>\n                            <div class="dropdown-menu">\n                                <a href="${n.servicesUrl}#public-procurement" class="dropdown-link">Public Procurement</a>\n                                <a href="${n.servicesUrl}#project-management" class="dropdown-link">Project Management</a>\n                                <a href="${n.servicesUrl}#technical-design" class="dropdown-link">Technical Design</a>\n                                <a href="${n.servicesUrl}#environmental" class="dropdown-link">Environmental Management</a>\n                            </div>\n                        </li>\n                        <li class="nav-item">\n                            <a href="${n.pricesUrl}" class="nav-link" data-nav="pricing">Pricing</a>\n                        </li>\n                        <li class="nav-item dropdown">\n                            <a href="#" class="nav-link" data-nav="more">More</a>\n                            <div class="dropdown-menu">\n                                <a href="${n.contactUrl}" class="dropdown-link">Contact</a>\n                                <a href="${n.aboutUrl}" class="dropdown-link">About</a>\n                                <a href="${n.referencesUrl}" class="dropdown-link">Clients</a>\n                                <a href="${n.aboutUrl}#company-data" class="dropdown-link">Company Data</a>\n                            </div>\n                        </li>\n                    </ul>\n                    <div class="language-switcher">\n                        <a href="#" class="lang-link" data-lang="hu" onclick="switchToLanguage('hu'); return false;">Magyar</a>\n                        <span class="lang-separator">|</span>\n                        <a href="#" class="lang-link active" data-lang="en" onclick="switchToLanguage('en'); return false;">English</a>\n                    </div>\n                    <div class="hamburger">\n                        <span class="bar"></span>\n                        <span class="bar"></span>\n                        <span class="bar"></span>\n                    </div>\n                </div>\n            </nav>\n        `:`\n        <nav class="navbar">\n            <div class="nav-container">\n                <div class="nav-logo">\n                    <a href="${s}" class="nav-logo-link">\n                        <img src="${l}" alt="Sugallat Kft. Logo" class="logo">\n                        <h2>Sugallat Kft.</h2>\n                    </a>\n                </div>\n                <ul class="nav-menu">\n                    <li class="nav-item">\n                        <a href="${n.homeUrl}" class="nav-link" data-nav="home">Főoldal</a>\n                    </li>\n                    <li class="nav-item dropdown">\n                        <a href="${n.tevekenysegeinkUrl}" class="nav-link" data-nav="services">Szolgáltatásaink</a>\n                        <div class="dropdown-menu">\n                            <a href="${n.szorgKozbeszAjanlatkeroknekUrl}" class="dropdown-link">Közbeszerzés Ajánlatkérőknek</a>\n                            <a href="${n.szorgKozbeszAjanlattevoknekUrl}" class="dropdown-link">Közbeszerzés Ajánlattevőknek</a>\n                            <a href="${n.szorgJogorvoslatUrl}" class="dropdown-link">Jogorvoslat</a>\n                            <a href="${n.szorgPalyazatirasUrl}" class="dropdown-link">Pályázatírás</a>\n                            <a href="${n.szorgMuszakiTervezesUrl}" class="dropdown-link">Műszaki Tervezés</a>\n                        </div>\n                    </li>\n                    <li class="nav-item">\n                        <a href="${n.arakUrl}" class="nav-link" data-nav="pricing">Áraink</a>\n                    </li>\n                    <li class="nav-item dropdown">\n                        <a href="${n.bemutatkozasUrl}" class="nav-link" data-nav="more">Rólunk</a>\n                        <div class="dropdown-menu">\n                            <a href="${n.kapcsolatUrl}" class="dropdown-link">Kapcsolat</a>\n                            <a href="${n.referenciakUrl}" class="dropdown-link">Ügyfeleink</a>\n                        </div>\n                    </li>\n                </ul>\n                <div class="language-switcher">\n                    <a href="#" class="lang-link active" data-lang="hu" onclick="switchToLanguage('hu'); return false;">Magyar</a>\n                    <span class="lang-separator">|</span>\n                    <a href="#" class="lang-link" data-lang="en" onclick="switchToLanguage('en'); return false;">English</a>\n                </div>\n                <div class="hamburger">\n                    <span class="bar"></span>\n                    <span class="bar"></span>\n                    <span class="bar"></span>\n                </div>\n            </div>\n        </nav>\n        \n        \x3c!-- Mobile Secondary Navigation --\x3e\n        <div class="mobile-secondary-nav" id="mobileSecondaryNav">\n            <div class="mobile-nav-back" onclick="closeMobileSecondaryNav()">Vissza</div>\n            <ul class="mobile-secondary-menu" id="mobileSecondaryMenu">\n                \x3c!-- Dynamic content will be inserted here --\x3e\n            </ul>\n        </div>\n    `}export function buildFooterHTML({urls:a}){return`\n        \x3c!-- Footer --\x3e\n        <footer class="footer has-square-patterns">\n            <div class="container">\n                <div class="footer-content">\n                    <div class="footer-section">\n                        <h3>Sugallat Kft.</h3>\n                        <p>Szakmai szolgáltatások a legmagasabb színvonalon</p>\n                    </div>\n                    <div class="footer-section">\n                        <h4>Szolgáltatásaink</h4>\n                        <ul>\n                            <li><a href="${a.tevekenysegeinkUrl}">Összes szolgáltatás</a></li>\n                            <li><a href="${a.szorgKozbeszAjanlatkeroknekUrl}">Közbeszerzés ajánlatkérőknek</a></li>\n                            <li><a href="${a.szorgKozbeszAjanlattevoknekUrl}">Közbeszerzés ajánlattevőknek</a></li>\n                            <li><a href="${a.szorgJogorvoslatUrl}">Jogorvoslat</a></li>\n                            <li><a href="${a.szorgPalyazatirasUrl}">Pályázatírás</a></li>\n                            <li><a href="${a.szorgMuszakiTervezesUrl}">Műszaki tervezés</a></li>\n                        </ul>\n                    </div>\n                    <div class="footer-section">\n                        <h4>Kapcsolat</h4>\n                        <p>2461 Tárnok, Ősz u. 12.</p>\n                        <p>Tel/fax: +36-23-333-853</p>\n                        <p>Mobil: +36-20-424-5411</p>\n                        <p>E-mail: <a href="mailto:benko@sugallat.hu">benko@sugallat.hu</a></p>\n                    </div>\n                    <div class="footer-section">\n                        <h4>Hasznos linkek</h4>\n                        <ul>\n                            <li><a href="${a.hasznoslinkekUrl}">Hasznos linkek</a></li>\n                            <li><a href="${a.referenciakUrl}">Referenciák</a></li>\n                            <li><a href="${a.rolunkUrl}">Rólunk</a></li>\n                            <li><a href="${a.blogUrl}">Blog</a></li>\n                            <li><a href="${a.adatkezelesiUrl}">Adatkezelési tájékoztató</a></li>\n                            <li><a href="${a.adatkezelesiUrl}#cookie-policy">Cookie szabályzat</a></li>\n                            <li><a href="${a.sitemapUrl}">Oldaltérkép</a></li>\n                        </ul>\n                    </div>\n                    <div class="footer-section">\n                        <h4>Kövess minket</h4>\n                        <div class="social-links">\n                            <a href="https://www.facebook.com/sugallatkft/" target="_blank" class="social-link">\n                                <svg width="24" height="24" viewBox="0 0 24 24" fill="currentColor">\n                                    <path d="M24 12.073c0-6.627-5.373-12-12-12s-12 5.373-12 12c0 5.99 4.388 10.954 10.125 11.854v-8.385H7.078v-3.47h3.047V9.43c0-3.007 1.792-4.669 4.533-4.669 1.312 0 2.686.235 2.686.235v2.953H15.83c-1.491 0-1.956.925-1.956 1.874v2.25h3.328l-.532 3.47h-2.796v8.385C19.612 23.027 24 18.062 24 12.073z"/>\n                                </svg>\n                                Facebook\n                            </a>\n                        </div>\n                    </div>\n                </div>\n                <div class="footer-bottom">\n                    <p>&copy; 2025 Sugallat Kft. Minden jog fenntartva.</p>\n                </div>\n            </div>\n        </footer>\n    `}
\ No newline at end of file
@@ -0,0 +1 @@
+try{document.documentElement.classList.add("js-enabled")}catch(e){}function runAfterFirstPaint(e){try{requestAnimationFrame(()=>requestAnimationFrame(()=>e()))}catch(t){setTimeout(e,0)}}function runWhenIdle(e,t=3e3){"requestIdleCallback"in window?requestIdleCallback(()=>{try{e()}catch(e){}},{timeout:t}):setTimeout(()=>{try{e()}catch(e){}},900)}function runAfterPaintWhenIdle(e,t=3e3){runAfterFirstPaint(()=>runWhenIdle(e,t))}function fixFolderIndexLinksForFileProtocol(e=document){try{if("file:"!==window.location.protocol)return;if(!e||!e.querySelectorAll)return;e.querySelectorAll("a[href]").forEach(e=>{const t=e.getAttribute("href");if(!t)return;const n=String(t).trim();n&&(n.startsWith("#")||/^[a-zA-Z][a-zA-Z0-9+.-]*:/.test(n)&&!n.startsWith("file:")||n.includes("index.html")||(n.endsWith("/")?e.setAttribute("href",n+"index.html"):"."!==n&&".."!==n||e.setAttribute("href",n+"/index.html")))})}catch(e){}}function getDeclaredBootConfig(){const e=document.body,t=e&&e.dataset&&e.dataset.page||"",n=e&&e.dataset&&e.dataset.features||"",r=(t||getCurrentPageName()||"other").toLowerCase(),a=new Set(n.split(/\s+/).map(e=>e.trim().toLowerCase()).filter(Boolean));if(0===a.size){inferFeaturesForPage(r).forEach(e=>a.add(e))}return document.getElementById("client-marquee-track")||(a.delete("client-marquee"),a.delete("client-marquee-bg")),document.querySelector(".text-gallery")||a.delete("text-galleries"),document.querySelector(".faq-section")||a.delete("faq"),{page:r,features:a,has:e=>a.has(String(e).toLowerCase())}}function inferFeaturesForPage(e){switch(e){case"home":return new Set(["latest-blogs","client-marquee","client-marquee-bg","text-galleries","faq","services-row","drag-scroll","square-patterns"]);case"pricing":return new Set(["text-galleries","faq","square-patterns"]);case"services":return new Set(["text-galleries","faq","square-patterns","drag-scroll"]);case"references":return new Set(["reference-search","reference-table-scrollbar","square-patterns"]);case"blog":return new Set(["latest-blogs","square-patterns"]);default:return new Set(["square-patterns"])}}function getSiteRootPrefix(){try{const e=Array.from(document.scripts||[]).find(e=>e&&e.src&&String(e.src).includes("/js/main.js"));if(e&&e.src){const t=new URL("../../",e.src).toString();return t.endsWith("/")?t:t+"/"}const t=(window.location.pathname||"").split("/").filter(Boolean),n=(t[t.length-1]||"").includes(".")?t.slice(0,-1):t;let r=-1;if(["pages","blog","tevekenysegeink","en"].forEach(e=>{const t=n.lastIndexOf(e);t>r&&(r=t)}),-1===r)return"";const a=n.length-r;return"../".repeat(Math.max(0,a))}catch(e){return""}}function deferSquarePatternsInit(){const e=()=>{const e=Array.from(document.scripts||[]).find(e=>(e.src||"").includes("/js/main.js"));loadScriptOnce(e?.src?new URL("square-background.js",e.src).toString():getSiteRootPrefix()+"js/square-background.js").then(()=>{initCanvasBackgrounds()}).catch(()=>{})};"requestIdleCallback"in window?requestIdleCallback(e,{timeout:2e3}):setTimeout(e,800)}function getCurrentPageName(){try{const e=document.body&&document.body.dataset&&document.body.dataset.page||"";if(e)return String(e).toLowerCase()}catch(e){}const e=window.location.pathname,t=e.split("/").pop();return e.includes("/tevekenysegeink/")?"services":e.includes("/blog/")?"blog":{"index.html":"home","kapcsolat.html":"contact","contact.html":"contact","bemutatkozas.html":"about","arak.html":"pricing","sitemap.html":"sitemap","tevekenysegeink.html":"services","referenciak.html":"references","blog.html":"blog"}[t]||"other"}function initMobileMenu(){const e=document.querySelector(".hamburger"),t=document.querySelector(".nav-menu"),n=document.getElementById("mobileSecondaryNav");if(e&&t){ensureMobileLanguageToggle(t,e,n),e.addEventListener("click",function(){e.classList.contains("active")?(e.classList.remove("active"),t.classList.remove("active"),n&&n.classList.remove("active"),document.querySelectorAll(".nav-item.dropdown.mobile-open").forEach(e=>e.classList.remove("mobile-open"))):(e.classList.add("active"),t.classList.add("active"),n&&n.classList.remove("active"))});document.querySelectorAll(".nav-link:not(.nav-item.dropdown .nav-link)").forEach(r=>{r.addEventListener("click",function(){e.classList.remove("active"),t.classList.remove("active"),n&&n.classList.remove("active")})}),document.addEventListener("click",function(r){r.target.closest(".mobile-secondary-menu .nav-link")&&(e.classList.remove("active"),t.classList.remove("active"),n&&n.classList.remove("active"))})}}function ensureMobileLanguageToggle(e,t,n){try{e.querySelectorAll(".mobile-lang-item").forEach(e=>e.remove());const r=document.querySelector(".language-switcher");if(!r)return;const a=r.querySelectorAll("a");if(!a||a.length<2)return;const i=document.createElement("li");i.className="nav-item mobile-lang-item";const o=document.createElement("div");o.className="mobile-lang-toggle",o.setAttribute("role","group"),o.setAttribute("aria-label","Language");const s=a[0].cloneNode(!0),c=a[1].cloneNode(!0);s.classList.add("mobile-lang-btn"),c.classList.add("mobile-lang-btn");const l=()=>{try{t.classList.remove("active")}catch(e){}try{e.classList.remove("active")}catch(e){}try{n&&n.classList.remove("active")}catch(e){}};s.addEventListener("click",l),c.addEventListener("click",l),o.appendChild(s),o.appendChild(c),i.appendChild(o),e.appendChild(i)}catch(e){}}function closeMobileSecondaryNav(){const e=document.getElementById("mobileSecondaryNav"),t=document.querySelector(".nav-menu");e&&t&&(e.classList.remove("active"),t.classList.add("active"))}function initDropdowns(){const e=document.querySelectorAll(".nav-item.dropdown");e.forEach(t=>{const n=t.querySelector(".dropdown-menu"),r=t.querySelector(".nav-link");if(n&&r){r.addEventListener("click",function(n){if(window.innerWidth<=768||null!==document.querySelector(".hamburger").offsetParent){r.getAttribute("href"),t.classList.contains("mobile-open");e.forEach(e=>{e!==t&&e.classList.remove("mobile-open")}),n.preventDefault(),n.stopPropagation(),t.classList.toggle("mobile-open")}else{const a=r.getAttribute("href")||"";if("#"===a||""===a){n.preventDefault(),n.stopPropagation();const r=t.classList.contains("active");return e.forEach(e=>e.classList.remove("active")),void(r||t.classList.add("active"))}const i=e=>{try{return e?(e.startsWith("/")||(e="/"+e),e.length>1&&e.endsWith("/")&&(e=e.slice(0,-1)),e):"/"}catch(t){return e||"/"}};let o=!1;try{const e=i(new URL(r.getAttribute("href")||"",window.location.href).pathname);o=e===i(window.location.pathname||"/")}catch(e){o=!1}if(o){n.preventDefault(),n.stopPropagation();const r=t.classList.contains("active");e.forEach(e=>{e.classList.remove("active")}),r||t.classList.add("active")}else e.forEach(e=>{e.classList.remove("active")})}});t.querySelectorAll(".dropdown-link").forEach(e=>{e.addEventListener("click",function(e){t.classList.remove("active"),t.classList.remove("mobile-open");const n=document.querySelector(".hamburger"),r=document.querySelector(".nav-menu");n&&r&&(n.classList.remove("active"),r.classList.remove("active"))})})}}),document.addEventListener("click",function(t){t.target.closest(".nav-item.dropdown")||e.forEach(e=>{e.classList.remove("active")})})}function handleAnchorScrolling(){const e=window.location.hash;e&&setTimeout(()=>{const t=document.querySelector(e);t&&t.scrollIntoView({behavior:"smooth",block:"start"})},100),document.addEventListener("click",function(e){const t=e.target&&e.target.closest?e.target.closest('a[href*="#"]'):null;if(!t)return;if("_blank"===t.target)return;const n=t.getAttribute("href")||"";const h=n.indexOf("#");if(h<0)return;const i=n.slice(h+1);if(!i)return;let samePath=false;try{const u=new URL(t.href,window.location.href);if(u.origin!==window.location.origin)return;const norm=p=>{p=p||"/";return p.length>1&&p.endsWith("/")?p.slice(0,-1):p};samePath=0===h||norm(u.pathname)===norm(window.location.pathname)}catch(err){return}if(samePath){e.preventDefault();const el=document.getElementById(i);el&&el.scrollIntoView({behavior:"smooth",block:"start"})}},{passive:!1})}function initReferenceSearch(){const e=document.getElementById("reference-search");if(!e)return;const t=document.querySelector(".reference-table tbody");if(!t)return;const n=Array.from(t.querySelectorAll("tr"));function r(e,t,n){if(n>0){e.style.display="",t.forEach(e=>e.style.display="");const n=e.querySelector("td:first-child");n&&(n.hasAttribute("data-original-rowspan")||n.setAttribute("data-original-rowspan",n.rowSpan),n.rowSpan=t.length+1)}else e.style.display="none",t.forEach(e=>e.style.display="none")}e.addEventListener("input",function(){const e=this.value.toLowerCase().trim();if(""===e)return void n.forEach(e=>{if(e.style.display="",e.classList.contains("category-header")){const t=e.querySelector("td:first-child");t&&t.hasAttribute("data-original-rowspan")&&(t.rowSpan=parseInt(t.getAttribute("data-original-rowspan")))}});let t=[],a=null,i=0;n.forEach((o,s)=>{if(o.classList.contains("category-header")){a&&r(a,t,i),a=o,t=[],i=0;const n=o.querySelector("td:nth-child(2)");n&&n.textContent.toLowerCase().includes(e)&&i++}else{t.push(o);const n=o.querySelector("td:nth-child(1)");n&&n.textContent.toLowerCase().includes(e)&&i++}s===n.length-1&&a&&r(a,t,i)})}),e.addEventListener("keydown",function(e){"Escape"===e.key&&(this.value="",this.dispatchEvent(new Event("input")))})}function initReferenceTableScrollbar(){const e=Array.from(document.querySelectorAll(".reference-table-container"));if(!e.length)return;const t=()=>{const t=document.documentElement.clientWidth||window.innerWidth,n=window.innerHeight||document.documentElement.clientHeight;let r=null,a=0;return e.forEach(e=>{if(!e)return;if(e.scrollWidth-e.clientWidth<=0)return;const i=e.getBoundingClientRect(),o=Math.max(0,i.left),s=Math.min(t,i.right),c=Math.max(0,i.top),l=Math.min(n,i.bottom),d=Math.max(0,s-o)*Math.max(0,l-c);d>a&&(a=d,r=e)}),r},n=document.createElement("div");n.className="reference-scrollbar fixed";const r=document.createElement("div");r.className="reference-scrollbar-thumb",n.appendChild(r),document.body.appendChild(n);const a=()=>{const e=t();if(!e)return void(n.style.display="none");const a=e.scrollWidth-e.clientWidth;if(a<=0)return void(n.style.display="none");n.style.display="";const i=e.getBoundingClientRect(),o=document.documentElement.clientWidth||window.innerWidth,s=Math.max(0,i.left),c=Math.min(o,i.right),l=Math.max(0,c-s);n.style.width=Math.round(l)+"px",n.style.left=Math.round(s)+"px";const d=window.innerHeight||document.documentElement.clientHeight;if(i.bottom<=d){const e=Math.max(0,d-i.bottom);n.style.bottom=Math.max(12,e+8)+"px"}else n.style.bottom="12px";const u=n.clientWidth,m=e.clientWidth/e.scrollWidth,h=Math.max(28,Math.round(m*u));r.style.width=h+"px";const g=u-h,f=e.scrollLeft/a,v=Math.round(g*f);r.style.transform=`translateX(${v}px)`};e.forEach(e=>e.addEventListener("scroll",a,{passive:!0})),window.addEventListener("resize",a),window.addEventListener("scroll",a,{passive:!0}),n.addEventListener("click",e=>{if(e.target===r)return;const a=n.getBoundingClientRect(),i=e.clientX-a.left,o=(Math.max(r.offsetWidth/2,Math.min(n.clientWidth-r.offsetWidth/2,i))-r.offsetWidth/2)/(n.clientWidth-r.offsetWidth),s=t();if(!s)return;const c=s.scrollWidth-s.clientWidth;s.scrollLeft=o*c});let i=!1,o=0,s=0;r.addEventListener("pointerdown",e=>{i=!0,o=e.clientX;const t=(r.style.transform||"").match(/translateX\(([-0-9.]+)px\)/);s=t?parseFloat(t[1]):0,r.setPointerCapture(e.pointerId),e.preventDefault()}),r.addEventListener("pointermove",e=>{if(!i)return;const a=e.clientX-o,c=n.clientWidth-r.offsetWidth,l=Math.max(0,Math.min(c,s+a));r.style.transform=`translateX(${l}px)`;const d=c>0?l/c:0,u=t();if(!u)return;const m=u.scrollWidth-u.clientWidth;u.scrollLeft=d*m}),r.addEventListener("pointerup",e=>{i=!1,r.releasePointerCapture(e.pointerId)}),setTimeout(a,0);try{requestAnimationFrame(()=>requestAnimationFrame(a))}catch(e){}window.addEventListener("load",()=>{try{a()}catch(e){}},{once:!0})}function loadScriptOnce(e){return new Promise((t,n)=>{if(window.drawBackground)return void t();const r=Array.from(document.scripts).find(t=>t.src&&t.src.includes(e));if(r)return void r.addEventListener("load",()=>t());const a=document.createElement("script");a.src=e,a.defer=!0;try{const e=document.querySelector("script[nonce]"),t=e&&(e.nonce||e.getAttribute("nonce"));t&&a.setAttribute("nonce",t)}catch(e){}a.onload=()=>t(),a.onerror=e=>n(e),document.head.appendChild(a)})}function initCanvasBackgrounds(){const e=document.querySelectorAll(".hero, .page-hero, .cta, .footer"),t=[];let n;function r(){t.forEach(({canvas:e,options:t})=>{window.drawBackground&&window.drawBackground(e,t)})}e.forEach(e=>{if(!e)return;e.classList.contains("has-square-patterns")||e.classList.add("has-square-patterns");"static"===window.getComputedStyle(e).position&&(e.style.position="relative");let n=e.querySelector("canvas.bg-squares");n||(n=document.createElement("canvas"),n.className="bg-squares",n.style.position="absolute",n.style.inset="0",n.style.width="100%",n.style.height="100%",n.style.pointerEvents="none",e.prepend(n));const r=e.classList.contains("footer");n.style.zIndex="0";const a=r?{baseGrid:128,seed:"sugallat-blue-squares",fullGrid:!0,softRate:.45,accentRate:.08,opacityMin:.24,opacityMax:.34,largeRate:0,strokeColor:"rgba(51, 65, 85, 1)",accentStrokeColor:"rgba(71, 85, 105, 1)",shadowAlpha:0}:{baseGrid:128,seed:"sugallat-blue-squares",fullGrid:!0,softRate:.65,midRate:.2,opacityMedMin:.4,opacityMedMax:.5,accentRate:.05,dashRate:0,weightVarRate:.2,heavyWeight:2,opacityMin:.28,opacityMax:.42,largeRate:0,shadowAlpha:.02};t.push({el:e,canvas:n,options:a}),window.drawBackground&&window.drawBackground(n,a)}),window.addEventListener("resize",()=>{clearTimeout(n),n=setTimeout(r,120)})}document.addEventListener("DOMContentLoaded",function(){fixFolderIndexLinksForFileProtocol(document);const e=getDeclaredBootConfig(),t=()=>{if(!e.has("latest-blogs"))return;if(window.__sugallatLatestBlogsLoaded)return;window.__sugallatLatestBlogsLoaded=!0;if(!!document.querySelector(".blog-grid"))try{loadLatestBlogs()}catch(e){}else runAfterPaintWhenIdle(()=>loadLatestBlogs(),4e3)};t(),Promise.resolve().then(()=>{fixFolderIndexLinksForFileProtocol(document),initMobileMenu(),initDropdowns(),handleAnchorScrolling(),e.has("reference-search")&&initReferenceSearch(),e.has("reference-table-scrollbar")&&initReferenceTableScrollbar(),e.has("client-marquee")&&scheduleClientMarqueeInit(),e.has("client-marquee-bg")&&runAfterPaintWhenIdle(()=>deferClientMarqueeBackground(),4e3),e.has("text-galleries")&&initTextGalleries(),e.has("square-patterns")&&runAfterPaintWhenIdle(()=>deferSquarePatternsInit(),4e3),e.has("faq")&&initFaqAccordion(),e.has("services-row")&&initServicesRowAlignment(),e.has("drag-scroll")&&initHorizontalDragScroll()}).catch(function(n){fixFolderIndexLinksForFileProtocol(document),t(),e.has("services-row")&&initServicesRowAlignment(),e.has("drag-scroll")&&initHorizontalDragScroll()})}),window.addEventListener("pageshow",()=>{try{window.drawBackground&&initCanvasBackgrounds()}catch(e){}});
\ No newline at end of file
@@ -0,0 +1 @@
+try{document.documentElement.classList.add("js-enabled")}catch(e){}function runAfterFirstPaint(e){try{requestAnimationFrame(()=>requestAnimationFrame(()=>e()))}catch(t){setTimeout(e,0)}}function runWhenIdle(e,t=3e3){"requestIdleCallback"in window?requestIdleCallback(()=>{try{e()}catch(e){}},{timeout:t}):setTimeout(()=>{try{e()}catch(e){}},900)}function runAfterPaintWhenIdle(e,t=3e3){runAfterFirstPaint(()=>runWhenIdle(e,t))}function fixFolderIndexLinksForFileProtocol(e=document){try{if("file:"!==window.location.protocol)return;if(!e||!e.querySelectorAll)return;e.querySelectorAll("a[href]").forEach(e=>{const t=e.getAttribute("href");if(!t)return;const n=String(t).trim();n&&(n.startsWith("#")||/^[a-zA-Z][a-zA-Z0-9+.-]*:/.test(n)&&!n.startsWith("file:")||n.includes("index.html")||(n.endsWith("/")?e.setAttribute("href",n+"index.html"):"."!==n&&".."!==n||e.setAttribute("href",n+"/index.html")))})}catch(e){}}function getDeclaredBootConfig(){const e=document.body,t=e&&e.dataset&&e.dataset.page||"",n=e&&e.dataset&&e.dataset.features||"",r=(t||getCurrentPageName()||"other").toLowerCase(),a=new Set(n.split(/\s+/).map(e=>e.trim().toLowerCase()).filter(Boolean));if(0===a.size){inferFeaturesForPage(r).forEach(e=>a.add(e))}return document.getElementById("client-marquee-track")||(a.delete("client-marquee"),a.delete("client-marquee-bg")),document.querySelector(".text-gallery")||a.delete("text-galleries"),document.querySelector(".faq-section")||a.delete("faq"),{page:r,features:a,has:e=>a.has(String(e).toLowerCase())}}function inferFeaturesForPage(e){switch(e){case"home":return new Set(["latest-blogs","client-marquee","client-marquee-bg","text-galleries","faq","services-row","drag-scroll","square-patterns"]);case"pricing":return new Set(["text-galleries","faq","square-patterns"]);case"services":return new Set(["text-galleries","faq","square-patterns","drag-scroll"]);case"references":return new Set(["reference-search","reference-table-scrollbar","square-patterns"]);case"blog":return new Set(["latest-blogs","square-patterns"]);default:return new Set(["square-patterns"])}}function initHorizontalDragScroll(){const e=document.querySelectorAll(".services-grid, .values-grid");e.length&&e.forEach(e=>{if("1"===e.dataset.dragScrollInit)return;e.dataset.dragScrollInit="1",e.querySelectorAll("a, img").forEach(e=>{try{e.setAttribute("draggable","false")}catch(e){}});let t=!1,n=0,r=0,a=!1,i=0,o=null,s=!1;const c=()=>{if(t){if(t=!1,null!==o)try{e.releasePointerCapture(o)}catch(e){}e.classList.remove("is-dragging"),a&&(i=Date.now()),a=!1,o=null,s=!1}};e.addEventListener("pointerdown",i=>{if("touch"!==i.pointerType&&("mouse"!==i.pointerType||0===i.button)&&!(e.scrollWidth<=e.clientWidth+2||(t=!0,a=!1,n=i.clientX,r=e.scrollLeft,o=i.pointerId,s=!!(i.target&&i.target.closest&&i.target.closest("a, button, input, textarea, select, label")),s))){try{e.setPointerCapture(i.pointerId)}catch(e){}e.classList.add("is-dragging")}},{passive:!0}),e.addEventListener("pointermove",i=>{if(!t)return;const c=i.clientX-n;if(!a&&Math.abs(c)>=6&&(a=!0,s)){try{e.setPointerCapture(o)}catch(e){}e.classList.add("is-dragging")}a&&i.preventDefault(),e.scrollLeft=r-c},{passive:!1}),e.addEventListener("pointerup",c),e.addEventListener("pointercancel",c),e.addEventListener("pointerleave",c),e.addEventListener("click",e=>{!i||Date.now()-i>350||(e.preventDefault(),e.stopPropagation(),i=0)},!0),e.addEventListener("dragstart",e=>{e.preventDefault()})})}function getSiteRootPrefix(){try{const e=Array.from(document.scripts||[]).find(e=>e&&e.src&&String(e.src).includes("/js/main.js"));if(e&&e.src){const t=new URL("../../",e.src).toString();return t.endsWith("/")?t:t+"/"}const t=(window.location.pathname||"").split("/").filter(Boolean),n=(t[t.length-1]||"").includes(".")?t.slice(0,-1):t;let r=-1;if(["pages","blog","tevekenysegeink","en"].forEach(e=>{const t=n.lastIndexOf(e);t>r&&(r=t)}),-1===r)return"";const a=n.length-r;return"../".repeat(Math.max(0,a))}catch(e){return""}}function deferSquarePatternsInit(){const e=()=>{const e=Array.from(document.scripts||[]).find(e=>(e.src||"").includes("/js/main.js"));loadScriptOnce(e?.src?new URL("square-background.js",e.src).toString():getSiteRootPrefix()+"js/square-background.js").then(()=>{initCanvasBackgrounds()}).catch(()=>{})};"requestIdleCallback"in window?requestIdleCallback(e,{timeout:2e3}):setTimeout(e,800)}function getCurrentPageName(){try{const e=document.body&&document.body.dataset&&document.body.dataset.page||"";if(e)return String(e).toLowerCase()}catch(e){}const e=window.location.pathname,t=e.split("/").pop();return e.includes("/tevekenysegeink/")?"services":e.includes("/blog/")?"blog":{"index.html":"home","kapcsolat.html":"contact","contact.html":"contact","bemutatkozas.html":"about","arak.html":"pricing","sitemap.html":"sitemap","tevekenysegeink.html":"services","referenciak.html":"references","blog.html":"blog"}[t]||"other"}function initMobileMenu(){const e=document.querySelector(".hamburger"),t=document.querySelector(".nav-menu"),n=document.getElementById("mobileSecondaryNav");if(e&&t){ensureMobileLanguageToggle(t,e,n),e.addEventListener("click",function(){e.classList.contains("active")?(e.classList.remove("active"),t.classList.remove("active"),n&&n.classList.remove("active"),document.querySelectorAll(".nav-item.dropdown.mobile-open").forEach(e=>e.classList.remove("mobile-open"))):(e.classList.add("active"),t.classList.add("active"),n&&n.classList.remove("active"))});document.querySelectorAll(".nav-link:not(.nav-item.dropdown .nav-link)").forEach(r=>{r.addEventListener("click",function(){e.classList.remove("active"),t.classList.remove("active"),n&&n.classList.remove("active")})}),document.addEventListener("click",function(r){r.target.closest(".mobile-secondary-menu .nav-link")&&(e.classList.remove("active"),t.classList.remove("active"),n&&n.classList.remove("active"))})}}function ensureMobileLanguageToggle(e,t,n){try{e.querySelectorAll(".mobile-lang-item").forEach(e=>e.remove());const r=document.querySelector(".language-switcher");if(!r)return;const a=r.querySelectorAll("a");if(!a||a.length<2)return;const i=document.createElement("li");i.className="nav-item mobile-lang-item";const o=document.createElement("div");o.className="mobile-lang-toggle",o.setAttribute("role","group"),o.setAttribute("aria-label","Language");const s=a[0].cloneNode(!0),c=a[1].cloneNode(!0);s.classList.add("mobile-lang-btn"),c.classList.add("mobile-lang-btn");const l=()=>{try{t.classList.remove("active")}catch(e){}try{e.classList.remove("active")}catch(e){}try{n&&n.classList.remove("active")}catch(e){}};s.addEventListener("click",l),c.addEventListener("click",l),o.appendChild(s),o.appendChild(c),i.appendChild(o),e.appendChild(i)}catch(e){}}function closeMobileSecondaryNav(){const e=document.getElementById("mobileSecondaryNav"),t=document.querySelector(".nav-menu");e&&t&&(e.classList.remove("active"),t.classList.add("active"))}function initDropdowns(){const e=document.querySelectorAll(".nav-item.dropdown");e.forEach(t=>{const n=t.querySelector(".dropdown-menu"),r=t.querySelector(".nav-link");if(n&&r){r.addEventListener("click",function(n){if(window.innerWidth<=768||null!==document.querySelector(".hamburger").offsetParent){r.getAttribute("href"),t.classList.contains("mobile-open");e.forEach(e=>{e!==t&&e.classList.remove("mobile-open")}),n.preventDefault(),n.stopPropagation(),t.classList.toggle("mobile-open")}else{const a=r.getAttribute("href")||"";if("#"===a||""===a){n.preventDefault(),n.stopPropagation();const r=t.classList.contains("active");return e.forEach(e=>e.classList.remove("active")),void(r||t.classList.add("active"))}const i=e=>{try{return e?(e.startsWith("/")||(e="/"+e),e.length>1&&e.endsWith("/")&&(e=e.slice(0,-1)),e):"/"}catch(t){return e||"/"}};let o=!1;try{const e=i(new URL(r.getAttribute("href")||"",window.location.href).pathname);o=e===i(window.location.pathname||"/")}catch(e){o=!1}if(o){n.preventDefault(),n.stopPropagation();const r=t.classList.contains("active");e.forEach(e=>{e.classList.remove("active")}),r||t.classList.add("active")}else e.forEach(e=>{e.classList.remove("active")})}});t.querySelectorAll(".dropdown-link").forEach(e=>{e.addEventListener("click",function(e){t.classList.remove("active"),t.classList.remove("mobile-open");const n=document.querySelector(".hamburger"),r=document.querySelector(".nav-menu");n&&r&&(n.classList.remove("active"),r.classList.remove("active"))})})}}),document.addEventListener("click",function(t){t.target.closest(".nav-item.dropdown")||e.forEach(e=>{e.classList.remove("active")})})}function handleAnchorScrolling(){const e=window.location.hash;e&&setTimeout(()=>{const t=document.querySelector(e);t&&t.scrollIntoView({behavior:"smooth",block:"start"})},100),document.addEventListener("click",function(e){const t=e.target&&e.target.closest?e.target.closest('a[href*="#"]'):null;if(!t)return;if("_blank"===t.target)return;const n=t.getAttribute("href")||"";const h=n.indexOf("#");if(h<0)return;const i=n.slice(h+1);if(!i)return;let samePath=false;try{const u=new URL(t.href,window.location.href);if(u.origin!==window.location.origin)return;const norm=p=>{p=p||"/";return p.length>1&&p.endsWith("/")?p.slice(0,-1):p};samePath=0===h||norm(u.pathname)===norm(window.location.pathname)}catch(err){return}if(samePath){e.preventDefault();const el=document.getElementById(i);el&&el.scrollIntoView({behavior:"smooth",block:"start"})}},{passive:!1})}function loadScriptOnce(e){return new Promise((t,n)=>{if(window.drawBackground)return void t();const r=Array.from(document.scripts).find(t=>t.src&&t.src.includes(e));if(r)return void r.addEventListener("load",()=>t());const a=document.createElement("script");a.src=e,a.defer=!0;try{const e=document.querySelector("script[nonce]"),t=e&&(e.nonce||e.getAttribute("nonce"));t&&a.setAttribute("nonce",t)}catch(e){}a.onload=()=>t(),a.onerror=e=>n(e),document.head.appendChild(a)})}function initCanvasBackgrounds(){const e=document.querySelectorAll(".hero, .page-hero, .cta, .footer"),t=[];let n;function r(){t.forEach(({canvas:e,options:t})=>{window.drawBackground&&window.drawBackground(e,t)})}e.forEach(e=>{if(!e)return;e.classList.contains("has-square-patterns")||e.classList.add("has-square-patterns");"static"===window.getComputedStyle(e).position&&(e.style.position="relative");let n=e.querySelector("canvas.bg-squares");n||(n=document.createElement("canvas"),n.className="bg-squares",n.style.position="absolute",n.style.inset="0",n.style.width="100%",n.style.height="100%",n.style.pointerEvents="none",e.prepend(n));const r=e.classList.contains("footer");n.style.zIndex="0";const a=r?{baseGrid:128,seed:"sugallat-blue-squares",fullGrid:!0,softRate:.45,accentRate:.08,opacityMin:.24,opacityMax:.34,largeRate:0,strokeColor:"rgba(51, 65, 85, 1)",accentStrokeColor:"rgba(71, 85, 105, 1)",shadowAlpha:0}:{baseGrid:128,seed:"sugallat-blue-squares",fullGrid:!0,softRate:.65,midRate:.2,opacityMedMin:.4,opacityMedMax:.5,accentRate:.05,dashRate:0,weightVarRate:.2,heavyWeight:2,opacityMin:.28,opacityMax:.42,largeRate:0,shadowAlpha:.02};t.push({el:e,canvas:n,options:a}),window.drawBackground&&window.drawBackground(n,a)}),window.addEventListener("resize",()=>{clearTimeout(n),n=setTimeout(r,120)})}function initFaqAccordion(){const e=document.querySelectorAll(".faq-item");e.length&&e.forEach(e=>{const t=e.querySelector(".faq-question"),n=e.querySelector(".faq-answer");t&&n&&(n.hidden&&(n.style.maxHeight="0px"),t.addEventListener("click",e=>{e.preventDefault();const r="true"===t.getAttribute("aria-expanded");if(t.setAttribute("aria-expanded",!r),r){n.style.maxHeight="0px";const e=()=>{"false"===t.getAttribute("aria-expanded")&&(n.hidden=!0),n.removeEventListener("transitionend",e)};n.addEventListener("transitionend",e)}else n.hidden=!1,n.offsetHeight,n.style.maxHeight=n.scrollHeight+"px"}))})}function initTextGalleries(){document.querySelectorAll(".text-gallery").forEach(e=>{const t=e.querySelectorAll(".text-slide"),n=e.querySelectorAll(".dot"),r=e.querySelectorAll(".header-nav-button"),a=(e.dataset.mobileMode||"selector").toLowerCase(),i=()=>window.innerWidth<=1023,o=()=>"selector"===a,s=e=>{t.forEach(e=>e.classList.remove("active")),n.forEach(e=>e.classList.remove("active")),r.forEach(e=>e.classList.remove("active")),t[e]&&t[e].classList.add("active"),n[e]&&n[e].classList.add("active"),r[e]&&r[e].classList.add("active")},c=()=>{if(!i()||!o())return t.forEach(e=>e.classList.add("active")),n.forEach(e=>e.classList.remove("active")),void r.forEach(e=>e.classList.remove("active"));let e=0;t.forEach((t,n)=>{t.classList.contains("active")&&(e=n)}),s(e)};n.forEach((e,t)=>{e.addEventListener("click",()=>{i()&&o()&&s(t)})}),r.forEach((e,t)=>{e.addEventListener("click",()=>{i()&&o()&&s(t)})}),c(),window.addEventListener("resize",c)})}document.addEventListener("DOMContentLoaded",function(){fixFolderIndexLinksForFileProtocol(document);const e=getDeclaredBootConfig(),t=()=>{if(!e.has("latest-blogs"))return;if(window.__sugallatLatestBlogsLoaded)return;window.__sugallatLatestBlogsLoaded=!0;if(!!document.querySelector(".blog-grid"))try{loadLatestBlogs()}catch(e){}else runAfterPaintWhenIdle(()=>loadLatestBlogs(),4e3)};t(),Promise.resolve().then(()=>{fixFolderIndexLinksForFileProtocol(document),initMobileMenu(),initDropdowns(),handleAnchorScrolling(),e.has("reference-search")&&initReferenceSearch(),e.has("reference-table-scrollbar")&&initReferenceTableScrollbar(),e.has("client-marquee")&&scheduleClientMarqueeInit(),e.has("client-marquee-bg")&&runAfterPaintWhenIdle(()=>deferClientMarqueeBackground(),4e3),e.has("text-galleries")&&initTextGalleries(),e.has("square-patterns")&&runAfterPaintWhenIdle(()=>deferSquarePatternsInit(),4e3),e.has("faq")&&initFaqAccordion(),e.has("services-row")&&initServicesRowAlignment(),e.has("drag-scroll")&&initHorizontalDragScroll()}).catch(function(n){fixFolderIndexLinksForFileProtocol(document),t(),e.has("services-row")&&initServicesRowAlignment(),e.has("drag-scroll")&&initHorizontalDragScroll()})}),window.addEventListener("pageshow",()=>{try{window.drawBackground&&initCanvasBackgrounds()}catch(e){}});
\ No newline at end of file
@@ -0,0 +1 @@
+try{document.documentElement.classList.add("js-enabled")}catch(e){}function runAfterFirstPaint(e){try{requestAnimationFrame(()=>requestAnimationFrame(()=>e()))}catch(t){setTimeout(e,0)}}function runWhenIdle(e,t=3e3){"requestIdleCallback"in window?requestIdleCallback(()=>{try{e()}catch(e){}},{timeout:t}):setTimeout(()=>{try{e()}catch(e){}},900)}function runAfterPaintWhenIdle(e,t=3e3){runAfterFirstPaint(()=>runWhenIdle(e,t))}function isMarqueeTouchFirstDevice(){try{return"function"==typeof window.matchMedia&&window.matchMedia("(pointer: coarse)").matches||navigator.maxTouchPoints&&navigator.maxTouchPoints>0||(window.innerWidth||0)<=768}catch(e){return(window.innerWidth||0)<=768}}function kickMarqueeTrackAnimation(e){if(!e)return;const t=()=>{try{e.style.animation="none",e.offsetWidth,e.style.animation=""}catch(e){}};try{requestAnimationFrame(()=>requestAnimationFrame(t))}catch(e){setTimeout(t,0)}}function fixFolderIndexLinksForFileProtocol(e=document){try{if("file:"!==window.location.protocol)return;if(!e||!e.querySelectorAll)return;e.querySelectorAll("a[href]").forEach(e=>{const t=e.getAttribute("href");if(!t)return;const n=String(t).trim();n&&(n.startsWith("#")||/^[a-zA-Z][a-zA-Z0-9+.-]*:/.test(n)&&!n.startsWith("file:")||n.includes("index.html")||(n.endsWith("/")?e.setAttribute("href",n+"index.html"):"."!==n&&".."!==n||e.setAttribute("href",n+"/index.html")))})}catch(e){}}function getDeclaredBootConfig(){const e=document.body,t=e&&e.dataset&&e.dataset.page||"",n=e&&e.dataset&&e.dataset.features||"",r=(t||getCurrentPageName()||"other").toLowerCase(),a=new Set(n.split(/\s+/).map(e=>e.trim().toLowerCase()).filter(Boolean));if(0===a.size){inferFeaturesForPage(r).forEach(e=>a.add(e))}return document.getElementById("client-marquee-track")||(a.delete("client-marquee"),a.delete("client-marquee-bg")),document.querySelector(".text-gallery")||a.delete("text-galleries"),document.querySelector(".faq-section")||a.delete("faq"),{page:r,features:a,has:e=>a.has(String(e).toLowerCase())}}function inferFeaturesForPage(e){switch(e){case"home":return new Set(["latest-blogs","client-marquee","client-marquee-bg","text-galleries","faq","services-row","drag-scroll","square-patterns"]);case"pricing":return new Set(["text-galleries","faq","square-patterns"]);case"services":return new Set(["text-galleries","faq","square-patterns","drag-scroll"]);case"references":return new Set(["reference-search","reference-table-scrollbar","square-patterns"]);case"blog":return new Set(["latest-blogs","square-patterns"]);default:return new Set(["square-patterns"])}}function scheduleClientMarqueeInit(){const e=document.getElementById("client-marquee-track");if(!e)return;const t=e.closest(".client-marquee")||e.closest("section")||e.parentElement,n=()=>runAfterPaintWhenIdle(()=>initClientMarquee(),5e3);if("IntersectionObserver"in window&&t){const e=new IntersectionObserver(t=>{if(t&&t[0]&&t[0].isIntersecting){try{e.disconnect()}catch(e){}n()}},{rootMargin:"250px 0px",threshold:0});e.observe(t)}else n()}function initHorizontalDragScroll(){const e=document.querySelectorAll(".services-grid, .values-grid");e.length&&e.forEach(e=>{if("1"===e.dataset.dragScrollInit)return;e.dataset.dragScrollInit="1",e.querySelectorAll("a, img").forEach(e=>{try{e.setAttribute("draggable","false")}catch(e){}});let t=!1,n=0,r=0,a=!1,i=0,o=null,s=!1;const c=()=>{if(t){if(t=!1,null!==o)try{e.releasePointerCapture(o)}catch(e){}e.classList.remove("is-dragging"),a&&(i=Date.now()),a=!1,o=null,s=!1}};e.addEventListener("pointerdown",i=>{if("touch"!==i.pointerType&&("mouse"!==i.pointerType||0===i.button)&&!(e.scrollWidth<=e.clientWidth+2||(t=!0,a=!1,n=i.clientX,r=e.scrollLeft,o=i.pointerId,s=!!(i.target&&i.target.closest&&i.target.closest("a, button, input, textarea, select, label")),s))){try{e.setPointerCapture(i.pointerId)}catch(e){}e.classList.add("is-dragging")}},{passive:!0}),e.addEventListener("pointermove",i=>{if(!t)return;const c=i.clientX-n;if(!a&&Math.abs(c)>=6&&(a=!0,s)){try{e.setPointerCapture(o)}catch(e){}e.classList.add("is-dragging")}a&&i.preventDefault(),e.scrollLeft=r-c},{passive:!1}),e.addEventListener("pointerup",c),e.addEventListener("pointercancel",c),e.addEventListener("pointerleave",c),e.addEventListener("click",e=>{!i||Date.now()-i>350||(e.preventDefault(),e.stopPropagation(),i=0)},!0),e.addEventListener("dragstart",e=>{e.preventDefault()})})}function getSiteRootPrefix(){try{const e=Array.from(document.scripts||[]).find(e=>e&&e.src&&String(e.src).includes("/js/main.js"));if(e&&e.src){const t=new URL("../../",e.src).toString();return t.endsWith("/")?t:t+"/"}const t=(window.location.pathname||"").split("/").filter(Boolean),n=(t[t.length-1]||"").includes(".")?t.slice(0,-1):t;let r=-1;if(["pages","blog","tevekenysegeink","en"].forEach(e=>{const t=n.lastIndexOf(e);t>r&&(r=t)}),-1===r)return"";const a=n.length-r;return"../".repeat(Math.max(0,a))}catch(e){return""}}function deferSquarePatternsInit(){const e=()=>{const e=Array.from(document.scripts||[]).find(e=>(e.src||"").includes("/js/main.js"));loadScriptOnce(e?.src?new URL("square-background.js",e.src).toString():getSiteRootPrefix()+"js/square-background.js").then(()=>{initCanvasBackgrounds()}).catch(()=>{})};"requestIdleCallback"in window?requestIdleCallback(e,{timeout:2e3}):setTimeout(e,800)}function deferClientMarqueeBackground(){const e=()=>{const e=document.querySelector(".client-marquee");e&&e.classList.add("is-bg-ready")};"requestIdleCallback"in window?requestIdleCallback(e,{timeout:2e3}):setTimeout(e,900)}function getCurrentPageName(){try{const e=document.body&&document.body.dataset&&document.body.dataset.page||"";if(e)return String(e).toLowerCase()}catch(e){}const e=window.location.pathname,t=e.split("/").pop();return e.includes("/tevekenysegeink/")?"services":e.includes("/blog/")?"blog":{"index.html":"home","kapcsolat.html":"contact","contact.html":"contact","bemutatkozas.html":"about","arak.html":"pricing","sitemap.html":"sitemap","tevekenysegeink.html":"services","referenciak.html":"references","blog.html":"blog"}[t]||"other"}function initMobileMenu(){const e=document.querySelector(".hamburger"),t=document.querySelector(".nav-menu"),n=document.getElementById("mobileSecondaryNav");if(e&&t){ensureMobileLanguageToggle(t,e,n),e.addEventListener("click",function(){e.classList.contains("active")?(e.classList.remove("active"),t.classList.remove("active"),n&&n.classList.remove("active"),document.querySelectorAll(".nav-item.dropdown.mobile-open").forEach(e=>e.classList.remove("mobile-open"))):(e.classList.add("active"),t.classList.add("active"),n&&n.classList.remove("active"))});document.querySelectorAll(".nav-link:not(.nav-item.dropdown .nav-link)").forEach(r=>{r.addEventListener("click",function(){e.classList.remove("active"),t.classList.remove("active"),n&&n.classList.remove("active")})}),document.addEventListener("click",function(r){r.target.closest(".mobile-secondary-menu .nav-link")&&(e.classList.remove("active"),t.classList.remove("active"),n&&n.classList.remove("active"))})}}function ensureMobileLanguageToggle(e,t,n){try{e.querySelectorAll(".mobile-lang-item").forEach(e=>e.remove());const r=document.querySelector(".language-switcher");if(!r)return;const a=r.querySelectorAll("a");if(!a||a.length<2)return;const i=document.createElement("li");i.className="nav-item mobile-lang-item";const o=document.createElement("div");o.className="mobile-lang-toggle",o.setAttribute("role","group"),o.setAttribute("aria-label","Language");const s=a[0].cloneNode(!0),c=a[1].cloneNode(!0);s.classList.add("mobile-lang-btn"),c.classList.add("mobile-lang-btn");const l=()=>{try{t.classList.remove("active")}catch(e){}try{e.classList.remove("active")}catch(e){}try{n&&n.classList.remove("active")}catch(e){}};s.addEventListener("click",l),c.addEventListener("click",l),o.appendChild(s),o.appendChild(c),i.appendChild(o),e.appendChild(i)}catch(e){}}function openMobileSecondaryNav(e){const t=document.getElementById("mobileSecondaryNav"),n=document.getElementById("mobileSecondaryMenu"),r=document.querySelector(".nav-menu");if(t&&n){n.innerHTML="";if(!("#"===(e.mainUrl||"")||""===(e.mainUrl||""))){const t=document.createElement("li");t.innerHTML=`<a href="${e.mainUrl}" class="nav-link">${e.mainTitle}</a>`,n.appendChild(t)}e.subItems.forEach(e=>{const t=document.createElement("li");t.innerHTML=`<a href="${e.url}" class="nav-link">${e.title}</a>`,n.appendChild(t)}),r.classList.remove("active"),t.classList.add("active")}}function closeMobileSecondaryNav(){const e=document.getElementById("mobileSecondaryNav"),t=document.querySelector(".nav-menu");e&&t&&(e.classList.remove("active"),t.classList.add("active"))}function initDropdowns(){const e=document.querySelectorAll(".nav-item.dropdown");e.forEach(t=>{const n=t.querySelector(".dropdown-menu"),r=t.querySelector(".nav-link");if(n&&r){r.addEventListener("click",function(n){if(window.innerWidth<=768||null!==document.querySelector(".hamburger").offsetParent){r.getAttribute("href"),t.classList.contains("mobile-open");e.forEach(e=>{e!==t&&e.classList.remove("mobile-open")}),n.preventDefault(),n.stopPropagation(),t.classList.toggle("mobile-open")}else{const a=r.getAttribute("href")||"";if("#"===a||""===a){n.preventDefault(),n.stopPropagation();const r=t.classList.contains("active");return e.forEach(e=>e.classList.remove("active")),void(r||t.classList.add("active"))}const i=e=>{try{return e?(e.startsWith("/")||(e="/"+e),e.length>1&&e.endsWith("/")&&(e=e.slice(0,-1)),e):"/"}catch(t){return e||"/"}};let o=!1;try{const e=i(new URL(r.getAttribute("href")||"",window.location.href).pathname);o=e===i(window.location.pathname||"/")}catch(e){o=!1}if(o){n.preventDefault(),n.stopPropagation();const r=t.classList.contains("active");e.forEach(e=>{e.classList.remove("active")}),r||t.classList.add("active")}else e.forEach(e=>{e.classList.remove("active")})}});t.querySelectorAll(".dropdown-link").forEach(e=>{e.addEventListener("click",function(e){t.classList.remove("active"),t.classList.remove("mobile-open");const n=document.querySelector(".hamburger"),r=document.querySelector(".nav-menu");n&&r&&(n.classList.remove("active"),r.classList.remove("active"))})})}}),document.addEventListener("click",function(t){t.target.closest(".nav-item.dropdown")||e.forEach(e=>{e.classList.remove("active")})})}function handleAnchorScrolling(){const e=window.location.hash;e&&setTimeout(()=>{const t=document.querySelector(e);t&&t.scrollIntoView({behavior:"smooth",block:"start"})},100),document.addEventListener("click",function(e){const t=e.target&&e.target.closest?e.target.closest('a[href*="#"]'):null;if(!t)return;if("_blank"===t.target)return;const n=t.getAttribute("href")||"";const h=n.indexOf("#");if(h<0)return;const i=n.slice(h+1);if(!i)return;let samePath=false;try{const u=new URL(t.href,window.location.href);if(u.origin!==window.location.origin)return;const norm=p=>{p=p||"/";return p.length>1&&p.endsWith("/")?p.slice(0,-1):p};samePath=0===h||norm(u.pathname)===norm(window.location.pathname)}catch(err){return}if(samePath){e.preventDefault();const el=document.getElementById(i);el&&el.scrollIntoView({behavior:"smooth",block:"start"})}},{passive:!1})}function loadLatestBlogs(){let e;e=window.location.pathname.includes("/en/")?[{title:"Public Procurement Changes in 2024: What to Expect?",description:"The new year has brought significant changes to public procurement procedures. We summarize the most important modifications and their practical implications.",category:"Public Procurement",date:"2024-03-15",author:"Sugallat Kft.",readTime:0,url:"../blog/procurement-changes-2024.html"}]:[{title:"EKR Változások 2020 Március",description:"2020. március 31-től az EKR-ben módosulnak az elektronikus nyilatkozat űrlapok. Rövid összefoglaló az új és korábban létrehozott eljárások eltérő kezeléséről.",category:"Közbeszerzés",date:"2020-04-06",author:"Sugallat Kft.",readTime:1,url:"pages/blog/ekr-valtozasok-2020-marcius.html"}],e.sort((e,t)=>{const n=e?.date?Date.parse(e.date):NaN,r=t?.date?Date.parse(t.date):NaN,a=Number.isFinite(n),i=Number.isFinite(r);return a||i?a?i?r-n:-1:1:0});const t=document.querySelector(".blog-preview-grid"),n=document.querySelector(".blog-grid");if(t||n){if(t){if(e.length<3){const e=t.closest("section.blog-preview");return void(e&&(e.style.display="none"))}const n=document.createDocumentFragment();e.slice(0,3).forEach(e=>{try{n.appendChild(createBlogCard(e,e.url,"homepage"))}catch(e){}}),t.appendChild(n)}if(n){const t=document.createDocumentFragment();e.forEach(e=>{try{t.appendChild(createBlogCard(e,e.url,"blog"))}catch(e){}}),n.appendChild(t)}}}async function fetchBlogMetadata(e){try{const t=await fetch(e);if(!t.ok)throw new Error(`HTTP error! status: ${t.status}`);const n=await t.text(),r=(new DOMParser).parseFromString(n,"text/html"),a=r.querySelector("title")?.textContent||"",i=r.querySelector('meta[name="description"]')?.getAttribute("content")||"",o=r.querySelector('meta[name="blog-category"]')?.getAttribute("content")||"",s=r.querySelector('meta[name="blog-date"]')?.getAttribute("content")||"",c=r.querySelector('meta[name="blog-author"]')?.getAttribute("content")||"",l=(r.querySelector(".blog-content")?.textContent||"").replace(/\s+/g," ").trim(),d=l.length>0?l.split(" ").filter(e=>e.length>0).length:0;let u=0;return d>10&&(u=Math.max(1,Math.ceil(d/200))),{title:a,description:i,category:o,date:s,author:c,readTime:u,wordCount:d,url:e}}catch(e){return null}}function createBlogCard(e,t,n="homepage"){const r=document.createElement("article"),a=formatBlogDate(e.date),i=window.location.pathname.includes("/en/"),o=0===e.readTime?i?"Coming Soon":"Hamarosan":i?`${e.readTime} min read`:`${e.readTime} perc olvasás`;return"blog"===n?(r.className="blog-card",r.innerHTML=`\n            <div class="blog-card-content">\n                <div class="blog-category">${e.category}</div>\n                <div class="blog-meta">\n                    <span class="blog-date">${a}</span>\n                    <span class="blog-read-time">${o}</span>\n                </div>\n                <h2 class="blog-title">\n                    <a href="${e.url}">${e.title}</a>\n                </h2>\n                <p class="blog-excerpt">${e.description}</p>\n                <a href="${e.url}" class="blog-read-more">${i?"Read More →":"Tovább olvasom →"}</a>\n            </div>\n        `):(r.className="blog-preview-card",r.innerHTML=`\n            <div class="blog-preview-content">\n                <div class="blog-preview-category">${e.category}</div>\n                <div class="blog-preview-meta">${a} • ${o}</div>\n                <h3 class="blog-preview-title">\n                    <a href="${e.url}">${e.title}</a>\n                </h3>\n                <p class="blog-preview-excerpt">${e.description}</p>\n                <a href="${e.url}" class="blog-preview-read-more">${i?"Read More →":"Tovább olvasom →"}</a>\n            </div>\n        `),r}function formatBlogDate(e){if(!e)return"";try{const t=new Date(e),n=["január","február","március","április","május","június","július","augusztus","szeptember","október","november","december"],r=t.getFullYear(),a=n[t.getMonth()];return`${r}. ${a} ${t.getDate()}.`}catch(t){return e}}function initReferenceSearch(){const e=document.getElementById("reference-search");if(!e)return;const t=document.querySelector(".reference-table tbody");if(!t)return;const n=Array.from(t.querySelectorAll("tr"));function r(e,t,n){if(n>0){e.style.display="",t.forEach(e=>e.style.display="");const n=e.querySelector("td:first-child");n&&(n.hasAttribute("data-original-rowspan")||n.setAttribute("data-original-rowspan",n.rowSpan),n.rowSpan=t.length+1)}else e.style.display="none",t.forEach(e=>e.style.display="none")}e.addEventListener("input",function(){const e=this.value.toLowerCase().trim();if(""===e)return void n.forEach(e=>{if(e.style.display="",e.classList.contains("category-header")){const t=e.querySelector("td:first-child");t&&t.hasAttribute("data-original-rowspan")&&(t.rowSpan=parseInt(t.getAttribute("data-original-rowspan")))}});let t=[],a=null,i=0;n.forEach((o,s)=>{if(o.classList.contains("category-header")){a&&r(a,t,i),a=o,t=[],i=0;const n=o.querySelector("td:nth-child(2)");n&&n.textContent.toLowerCase().includes(e)&&i++}else{t.push(o);const n=o.querySelector("td:nth-child(1)");n&&n.textContent.toLowerCase().includes(e)&&i++}s===n.length-1&&a&&r(a,t,i)})}),e.addEventListener("keydown",function(e){"Escape"===e.key&&(this.value="",this.dispatchEvent(new Event("input")))})}function initReferenceTableScrollbar(){const e=Array.from(document.querySelectorAll(".reference-table-container"));if(!e.length)return;const t=()=>{const t=document.documentElement.clientWidth||window.innerWidth,n=window.innerHeight||document.documentElement.clientHeight;let r=null,a=0;return e.forEach(e=>{if(!e)return;if(e.scrollWidth-e.clientWidth<=0)return;const i=e.getBoundingClientRect(),o=Math.max(0,i.left),s=Math.min(t,i.right),c=Math.max(0,i.top),l=Math.min(n,i.bottom),d=Math.max(0,s-o)*Math.max(0,l-c);d>a&&(a=d,r=e)}),r},n=document.createElement("div");n.className="reference-scrollbar fixed";const r=document.createElement("div");r.className="reference-scrollbar-thumb",n.appendChild(r),document.body.appendChild(n);const a=()=>{const e=t();if(!e)return void(n.style.display="none");const a=e.scrollWidth-e.clientWidth;if(a<=0)return void(n.style.display="none");n.style.display="";const i=e.getBoundingClientRect(),o=document.documentElement.clientWidth||window.innerWidth,s=Math.max(0,i.left),c=Math.min(o,i.right),l=Math.max(0,c-s);n.style.width=Math.round(l)+"px",n.style.left=Math.round(s)+"px";const d=window.innerHeight||document.documentElement.clientHeight;if(i.bottom<=d){const e=Math.max(0,d-i.bottom);n.style.bottom=Math.max(12,e+8)+"px"}else n.style.bottom="12px";const u=n.clientWidth,m=e.clientWidth/e.scrollWidth,h=Math.max(28,Math.round(m*u));r.style.width=h+"px";const g=u-h,f=e.scrollLeft/a,v=Math.round(g*f);r.style.transform=`translateX(${v}px)`};e.forEach(e=>e.addEventListener("scroll",a,{passive:!0})),window.addEventListener("resize",a),window.addEventListener("scroll",a,{passive:!0}),n.addEventListener("click",e=>{if(e.target===r)return;const a=n.getBoundingClientRect(),i=e.clientX-a.left,o=(Math.max(r.offsetWidth/2,Math.min(n.clientWidth-r.offsetWidth/2,i))-r.offsetWidth/2)/(n.clientWidth-r.offsetWidth),s=t();if(!s)return;const c=s.scrollWidth-s.clientWidth;s.scrollLeft=o*c});let i=!1,o=0,s=0;r.addEventListener("pointerdown",e=>{i=!0,o=e.clientX;const t=(r.style.transform||"").match(/translateX\(([-0-9.]+)px\)/);s=t?parseFloat(t[1]):0,r.setPointerCapture(e.pointerId),e.preventDefault()}),r.addEventListener("pointermove",e=>{if(!i)return;const a=e.clientX-o,c=n.clientWidth-r.offsetWidth,l=Math.max(0,Math.min(c,s+a));r.style.transform=`translateX(${l}px)`;const d=c>0?l/c:0,u=t();if(!u)return;const m=u.scrollWidth-u.clientWidth;u.scrollLeft=d*m}),r.addEventListener("pointerup",e=>{i=!1,r.releasePointerCapture(e.pointerId)}),setTimeout(a,0);try{requestAnimationFrame(()=>requestAnimationFrame(a))}catch(e){}window.addEventListener("load",()=>{try{a()}catch(e){}},{once:!0})}async function initClientMarquee(){const e=document.getElementById("client-marquee-track");if(!e)return;const t="sugallat_client_marquee_clients_v1";let n=[];try{const e=sessionStorage.getItem(t);if(e){const t=JSON.parse(e);Array.isArray(t)&&t.length&&(n=t)}}catch(e){}if(!n.length)try{const e=(window.location.pathname||"").includes("/en/")?"../referenciak.html":"./referenciak.html",r=await fetch(e,{cache:"force-cache"});if(!r.ok)throw new Error(`HTTP ${r.status}: ${r.statusText}`);n=parseReferencesFromHTML(await r.text());try{sessionStorage.setItem(t,JSON.stringify(n))}catch(e){}}catch(e){n=[{name:"Fővárosi Törvényszék",category:"Kormányzati/Állami szervezet",period:"2011-2014",service:"Közbeszerzés, jogi tanácsadás"},{name:"Magyar Telekom Nyrt.",category:"Vállalkozás",period:"2011-2014",service:"Műszaki tervezés, közbeszerzés"},{name:"Budapest Főváros",category:"Település, önkormányzat",period:"2008-2011",service:"Városfejlesztés, EU pályázatok"},{name:"Nyugat-Magyarországi Egyetem",category:"Oktatási intézmény",period:"2005-2008",service:"Közbeszerzés, projektmenedzsment"}]}e.innerHTML="";const r=e.parentElement;r&&!r.classList.contains("two-rows")&&r.classList.add("two-rows");let a=r?r.querySelector("#client-marquee-track-2"):null;if(!a&&r&&(a=document.createElement("div"),a.id="client-marquee-track-2",a.className="marquee-track reverse",r.appendChild(a)),!a)return;a.classList.add("reverse"),a.innerHTML="";const i=Math.ceil(n.length/2),o=n.slice(0,i),s=n.slice(i),c=e=>String(e||"").replace(/&/g,"&amp;").replace(/</g,"&lt;").replace(/>/g,"&gt;").replace(/"/g,"&quot;").replace(/'/g,"&#39;"),l=e=>`<div class="client-card">\n            <div class="client-name">${c(e.name)}</div>\n            <div class="client-category">${c(e.category)}</div>\n            <div class="client-labels">\n                <span class="client-label">${c(e.period)}</span>\n                <span class="client-label">${c(e.service)}</span>\n            </div>\n        </div>`,d=e=>{const t=(e||[]).map(l).join("");return t+t};if(e.innerHTML=d(o.length?o:n),a.innerHTML=d(s.length?s:n),isMarqueeTouchFirstDevice()&&(kickMarqueeTrackAnimation(e),kickMarqueeTrackAnimation(a)),initMarqueeDrag(e),initMarqueeDrag(a),!window.__sugallatClientMarqueeResizeBound){let e;window.__sugallatClientMarqueeResizeBound=!0,window.__sugallatClientMarqueeWidth=window.innerWidth||0,window.addEventListener("resize",()=>{clearTimeout(e),e=setTimeout(()=>{const e=window.__sugallatClientMarqueeWidth||0,t=window.innerWidth||0;if(window.__sugallatClientMarqueeWidth=t,Math.abs(t-e)>240)try{initClientMarquee()}catch(e){}},250)},{passive:!0})}}function createClientCard(e){const t=document.createElement("div");return t.className="client-card",t.innerHTML=`\n        <div class="client-name">${e.name}</div>\n        <div class="client-category">${e.category}</div>\n        <div class="client-labels">\n            <span class="client-label">${e.period}</span>\n            <span class="client-label">${e.service}</span>\n        </div>\n    `,t}function parseReferencesFromHTML(e){const t=(new DOMParser).parseFromString(e,"text/html").querySelector(".reference-table tbody");if(!t)return[];const n=[],r=t.querySelectorAll("tr");let a="";const i={"Kormányzati/Állami szervek":"Kormányzati/Állami szervezet","Települések, önkormányzatok":"Település, önkormányzat","Oktatási intézmények":"Oktatási intézmény","Civil és egyéb szervezetek":"Civil szervezet","Vállalkozások":"Vállalkozás"};return r.forEach((e,t)=>{if(e.classList.contains("category-header")){const t=e.querySelector("td:first-child"),r=e.querySelector("td:nth-child(2)"),o=e.querySelector("td:nth-child(3)"),s=e.querySelector("td:nth-child(4)");t&&r&&o&&s&&(a=i[t.textContent.trim()]||t.textContent.trim(),n.push({name:r.textContent.trim(),category:a,period:o.textContent.trim(),service:s.textContent.trim()}))}else{const t=e.querySelector("td:first-child"),r=e.querySelector("td:nth-child(2)"),i=e.querySelector("td:nth-child(3)");t&&r&&i&&a&&n.push({name:t.textContent.trim(),category:a,period:r.textContent.trim(),service:i.textContent.trim()})}}),n.sort(()=>Math.random()-.5)}function initMarqueeDrag(e){let t=!1,n=0,r=0,a=0;if(isMarqueeTouchFirstDevice())return e.addEventListener("touchstart",()=>{e.classList.add("dragging")},{passive:!0}),e.addEventListener("touchend",()=>{e.classList.remove("dragging")},{passive:!0}),void e.addEventListener("touchcancel",()=>{e.classList.remove("dragging")},{passive:!0});e.addEventListener("mousedown",r=>{!function(r){t=!0,n=r;const i=window.getComputedStyle(e).transform;if(e.classList.add("dragging"),a=0,"none"!==i){const e=i.match(/matrix.*?\((.+?)\)/);if(e){const t=e[1].split(",").map(e=>e.trim());6===t.length?a=parseFloat(t[4])||0:16===t.length&&(a=parseFloat(t[12])||0)}}}(r.clientX),r.preventDefault()}),document.addEventListener("mousemove",i=>{!function(i){if(!t)return;r=i;const o=r-n,s=isMarqueeTouchFirstDevice()?1:2,c=a+o*s;e.style.setProperty("transform",`translateX(${c}px)`,"important"),window.getComputedStyle(e)}(i.clientX),t&&i.preventDefault()}),document.addEventListener("mouseup",function(){t&&(t=!1,e.classList.remove("dragging"))}),e.addEventListener("selectstart",e=>{e.preventDefault()})}function loadScriptOnce(e){return new Promise((t,n)=>{if(window.drawBackground)return void t();const r=Array.from(document.scripts).find(t=>t.src&&t.src.includes(e));if(r)return void r.addEventListener("load",()=>t());const a=document.createElement("script");a.src=e,a.defer=!0;try{const e=document.querySelector("script[nonce]"),t=e&&(e.nonce||e.getAttribute("nonce"));t&&a.setAttribute("nonce",t)}catch(e){}a.onload=()=>t(),a.onerror=e=>n(e),document.head.appendChild(a)})}function initCanvasBackgrounds(){const e=document.querySelectorAll(".hero, .page-hero, .cta, .footer"),t=[];let n;function r(){t.forEach(({canvas:e,options:t})=>{window.drawBackground&&window.drawBackground(e,t)})}e.forEach(e=>{if(!e)return;e.classList.contains("has-square-patterns")||e.classList.add("has-square-patterns");"static"===window.getComputedStyle(e).position&&(e.style.position="relative");let n=e.querySelector("canvas.bg-squares");n||(n=document.createElement("canvas"),n.className="bg-squares",n.style.position="absolute",n.style.inset="0",n.style.width="100%",n.style.height="100%",n.style.pointerEvents="none",e.prepend(n));const r=e.classList.contains("footer");n.style.zIndex="0";const a=r?{baseGrid:128,seed:"sugallat-blue-squares",fullGrid:!0,softRate:.45,accentRate:.08,opacityMin:.24,opacityMax:.34,largeRate:0,strokeColor:"rgba(51, 65, 85, 1)",accentStrokeColor:"rgba(71, 85, 105, 1)",shadowAlpha:0}:{baseGrid:128,seed:"sugallat-blue-squares",fullGrid:!0,softRate:.65,midRate:.2,opacityMedMin:.4,opacityMedMax:.5,accentRate:.05,dashRate:0,weightVarRate:.2,heavyWeight:2,opacityMin:.28,opacityMax:.42,largeRate:0,shadowAlpha:.02};t.push({el:e,canvas:n,options:a}),window.drawBackground&&window.drawBackground(n,a)}),window.addEventListener("resize",()=>{clearTimeout(n),n=setTimeout(r,120)})}function initFaqAccordion(){const e=document.querySelectorAll(".faq-item");e.length&&e.forEach(e=>{const t=e.querySelector(".faq-question"),n=e.querySelector(".faq-answer");t&&n&&(n.hidden&&(n.style.maxHeight="0px"),t.addEventListener("click",e=>{e.preventDefault();const r="true"===t.getAttribute("aria-expanded");if(t.setAttribute("aria-expanded",!r),r){n.style.maxHeight="0px";const e=()=>{"false"===t.getAttribute("aria-expanded")&&(n.hidden=!0),n.removeEventListener("transitionend",e)};n.addEventListener("transitionend",e)}else n.hidden=!1,n.offsetHeight,n.style.maxHeight=n.scrollHeight+"px"}))})}function initServicesRowAlignment(){const e=document.querySelectorAll(".services.light-bg .services-grid");if(!e.length)return;const t=()=>{try{if(window.matchMedia)return window.matchMedia("(max-width: 1023px)").matches}catch(e){}return(window.innerWidth||0)<=1023},n=e=>{const t=(e=>{const t=e.closest(".services-grid-wrap");if(!t)return null;let n=t.querySelector(".services-dots");if(!n){const e=(()=>{try{if((document.documentElement.getAttribute("lang")||"").toLowerCase().startsWith("en"))return!0}catch(e){}try{return(window.location.pathname||"").includes("/en/")}catch(e){return!1}})();n=document.createElement("div"),n.className="services-dots",n.setAttribute("aria-label",e?"Services pagination":"Szolgáltatások lapozása"),t.appendChild(n)}return n})(e);if(!t)return;const n=Array.from(e.querySelectorAll(".service-card"));if(n.length<=1)return t.innerHTML="",void(t.dataset.count="0");(t.dataset.count||"")===String(n.length)&&t.querySelector("button.dot")||(t.innerHTML="",t.dataset.count=String(n.length),n.forEach((n,r)=>{const a=(n.querySelector("h3")?.textContent||"").trim(),i=(()=>{try{if((document.documentElement.getAttribute("lang")||"").toLowerCase().startsWith("en"))return!0}catch(e){}try{return(window.location.pathname||"").includes("/en/")}catch(e){return!1}})(),o=a||(i?`Card ${r+1}`:`Kártya ${r+1}`),s=document.createElement("button");s.type="button",s.className="dot",s.dataset.index=String(r),s.setAttribute("aria-label",o),s.addEventListener("click",()=>{try{n.scrollIntoView({behavior:"smooth",inline:"start",block:"nearest"})}catch(t){e.scrollTo({left:n.offsetLeft,behavior:"smooth"})}}),t.appendChild(s)}))},r=(e,t)=>{const n=e.closest(".services-grid-wrap"),r=n?n.querySelector(".services-dots"):null;if(!r)return;const a=Array.from(r.querySelectorAll("button.dot"));a.length&&a.forEach((e,n)=>{const r=n===t;e.classList.toggle("active",r),r?e.setAttribute("aria-current","true"):e.removeAttribute("aria-current")})},a=e=>{const t=Array.from(e.querySelectorAll(".service-card"));if(!t.length)return 0;const n=e.scrollLeft;let r=0,a=1/0;for(let e=0;e<t.length;e++){const i=Math.abs(t[e].offsetLeft-n);i<a&&(a=i,r=e)}return r};let i;e.forEach(e=>{if("1"===e.dataset.servicesDotsInit)return;e.dataset.servicesDotsInit="1";let i=0;e.addEventListener("scroll",()=>{i||(i=requestAnimationFrame(()=>{i=0,(e=>{if(!t())return;if(e.scrollWidth<=e.clientWidth+2)return;n(e);const i=a(e);r(e,i)})(e)}))},{passive:!0})});const o=()=>{e.forEach(e=>{const i=e.scrollWidth>e.clientWidth+2;e.classList.toggle("is-scrollable",i);const o=e.closest(".services-grid-wrap");o&&o.classList.toggle("is-scrollable",i),i||(e.scrollLeft=0),i&&t()&&(n(e),r(e,a(e)))})};requestAnimationFrame(o),setTimeout(o,200),window.addEventListener("resize",()=>{clearTimeout(i),i=setTimeout(o,120)},{passive:!0})}function initTextGalleries(){document.querySelectorAll(".text-gallery").forEach(e=>{const t=e.querySelectorAll(".text-slide"),n=e.querySelectorAll(".dot"),r=e.querySelectorAll(".header-nav-button"),a=(e.dataset.mobileMode||"selector").toLowerCase(),i=()=>window.innerWidth<=1023,o=()=>"selector"===a,s=e=>{t.forEach(e=>e.classList.remove("active")),n.forEach(e=>e.classList.remove("active")),r.forEach(e=>e.classList.remove("active")),t[e]&&t[e].classList.add("active"),n[e]&&n[e].classList.add("active"),r[e]&&r[e].classList.add("active")},c=()=>{if(!i()||!o())return t.forEach(e=>e.classList.add("active")),n.forEach(e=>e.classList.remove("active")),void r.forEach(e=>e.classList.remove("active"));let e=0;t.forEach((t,n)=>{t.classList.contains("active")&&(e=n)}),s(e)};n.forEach((e,t)=>{e.addEventListener("click",()=>{i()&&o()&&s(t)})}),r.forEach((e,t)=>{e.addEventListener("click",()=>{i()&&o()&&s(t)})}),c(),window.addEventListener("resize",c)})}document.addEventListener("DOMContentLoaded",function(){fixFolderIndexLinksForFileProtocol(document);const e=getDeclaredBootConfig(),t=()=>{if(!e.has("latest-blogs"))return;if(window.__sugallatLatestBlogsLoaded)return;window.__sugallatLatestBlogsLoaded=!0;if(!!document.querySelector(".blog-grid"))try{loadLatestBlogs()}catch(e){}else runAfterPaintWhenIdle(()=>loadLatestBlogs(),4e3)};t(),Promise.resolve().then(()=>{fixFolderIndexLinksForFileProtocol(document),initMobileMenu(),initDropdowns(),handleAnchorScrolling(),e.has("reference-search")&&initReferenceSearch(),e.has("reference-table-scrollbar")&&initReferenceTableScrollbar(),e.has("client-marquee")&&scheduleClientMarqueeInit(),e.has("client-marquee-bg")&&runAfterPaintWhenIdle(()=>deferClientMarqueeBackground(),4e3),e.has("text-galleries")&&initTextGalleries(),e.has("square-patterns")&&runAfterPaintWhenIdle(()=>deferSquarePatternsInit(),4e3),e.has("faq")&&initFaqAccordion(),e.has("services-row")&&initServicesRowAlignment(),e.has("drag-scroll")&&initHorizontalDragScroll()}).catch(function(n){fixFolderIndexLinksForFileProtocol(document),t(),e.has("services-row")&&initServicesRowAlignment(),e.has("drag-scroll")&&initHorizontalDragScroll()})}),window.addEventListener("pageshow",()=>{try{window.drawBackground&&initCanvasBackgrounds()}catch(e){}});
\ No newline at end of file
@@ -0,0 +1 @@
+!function(){function e(){const e=function(){const e=Array.from(document.getElementsByTagName("script")).find(e=>(e.src||"").includes("service-subpages.js"));return e&&e.src?e.src.replace(/service-subpages\.js(\?.*)?$/i,""):null}();if(!e)return;var t;(t=e+"square-background.js",new Promise((e,a)=>{if(window.drawBackground)return void e();const s=Array.from(document.scripts).find(e=>e.src&&e.src===t);if(s)return s.addEventListener("load",()=>e()),void e();const n=document.createElement("script");n.src=t,n.defer=!0,n.onload=()=>e(),n.onerror=e=>a(e),document.head.appendChild(n)})).then(()=>function(){const e=document.querySelectorAll(".hero, .page-hero, .cta, .footer"),t=[];let a;function s(){t.forEach(({canvas:e,options:t})=>{window.drawBackground&&window.drawBackground(e,t)})}e.forEach(e=>{if(!e)return;e.classList.contains("has-square-patterns")||e.classList.add("has-square-patterns"),"static"===window.getComputedStyle(e).position&&(e.style.position="relative");let a=e.querySelector("canvas.bg-squares");a||(a=document.createElement("canvas"),a.className="bg-squares",a.style.position="absolute",a.style.inset="0",a.style.width="100%",a.style.height="100%",a.style.pointerEvents="none",e.prepend(a));const s=e.classList.contains("footer");a.style.zIndex="0";const n=s?{baseGrid:128,seed:"sugallat-blue-squares",fullGrid:!0,softRate:.45,accentRate:.08,opacityMin:.24,opacityMax:.34,largeRate:0,strokeColor:"rgba(51, 65, 85, 1)",accentStrokeColor:"rgba(71, 85, 105, 1)",shadowAlpha:0}:{baseGrid:128,seed:"sugallat-blue-squares",fullGrid:!0,softRate:.65,midRate:.2,opacityMedMin:.4,opacityMedMax:.5,accentRate:.05,dashRate:0,weightVarRate:.2,heavyWeight:2,opacityMin:.28,opacityMax:.42,largeRate:0,shadowAlpha:.02};t.push({canvas:a,options:n}),window.drawBackground&&window.drawBackground(a,n)}),window.addEventListener("resize",()=>{clearTimeout(a),a=setTimeout(s,120)})}()).catch(()=>{})}"loading"===document.readyState?document.addEventListener("DOMContentLoaded",e):e(),window.addEventListener("pageshow",()=>{try{e()}catch(e){}})}();
\ No newline at end of file
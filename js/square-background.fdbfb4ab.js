@@ -0,0 +1 @@
+!function(){"use strict";function t(t){let a=t>>>0;return function(){a+=1831565813;let t=Math.imul(a^a>>>15,1|a);return t^=t+Math.imul(t^t>>>7,61|t),((t^t>>>14)>>>0)/4294967296}}function a(t,a,o){let e=(t^374761393*a^668265263*o)>>>0;return e=Math.imul(e^e>>>13,1274126177)>>>0,e^=e>>>16,e>>>0}function o(t,a,o,e,l,n){const{baseGrid:i,strokeColor:h,strokeWidth:r,opacityMin:s,opacityMax:d}=l,c=null!=l.accentRate?l.accentRate:.1,u=null!=l.gutter?l.gutter:Math.round(.12*i),M=null!=l.softRate?l.softRate:.3,f=t=>Math.round(t)+.5;function w(a,o,e,l,n){const i=Math.max(0,Math.min(n,Math.min(e,l)/2));t.beginPath(),t.moveTo(a+i,o),t.lineTo(a+e-i,o),t.arc(a+e-i,o+i,i,-Math.PI/2,0),t.lineTo(a+e,o+l-i),t.arc(a+e-i,o+l-i,i,0,Math.PI/2),t.lineTo(a+i,o+l),t.arc(a+i,o+l-i,i,Math.PI/2,Math.PI),t.lineTo(a,o+i),t.arc(a+i,o+i,i,Math.PI,1.5*Math.PI),t.stroke()}if(l.fullGrid){const g=Math.max(1,i-2*u),p=Math.round(.125*i);t.lineWidth=r,t.lineJoin="round",t.lineCap="butt";for(let b=o;b<o+e;b+=i)for(let o=a;o<a+e;o+=i){const a=n()<c,e=n(),i=null!=l.midRate?l.midRate:0;let m;if(e<M)m=.3+n()*(.45-.3);else if(e<M+i){const t=null!=l.opacityMedMin?l.opacityMedMin:.5,a=null!=l.opacityMedMax?l.opacityMedMax:.65;m=t+n()*(a-t)}else m=s+n()*(d-s);t.globalAlpha=m,t.strokeStyle=a?l.accentStrokeColor||"rgba(96, 165, 250, 1)":h;const y=null!=l.weightVarRate?l.weightVarRate:0,R=null!=l.heavyWeight?l.heavyWeight:1.75;t.lineWidth=n()<y?r*R:r;const C=null!=l.dashRate?l.dashRate:0;n()<C?t.setLineDash([6,4]):t.setLineDash([]);const x=t.shadowColor,k=t.shadowBlur,B=null!=l.shadowAlpha?l.shadowAlpha:.08,W=null!=l.shadowBlur?l.shadowBlur:1;t.shadowColor=`rgba(0, 0, 0, ${B})`,t.shadowBlur=W,w(f(o+u),f(b+u),g,g,p),t.shadowColor=x,t.shadowBlur=k,t.setLineDash([])}return}const g=6*i;for(let u=a;u<a+e;u+=g)for(let a=o;a<o+e;a+=g){if(n()>.55)continue;const o=(Math.floor(3*n())-1)*i,e=(Math.floor(3*n())-1)*i,p=Math.round((u+g/2)/i)*i+o,b=Math.round((a+g/2)/i)*i+e,m=5+Math.floor(5*n()),y=3,R=[],C=new Set,x=(t,a)=>`${t},${a}`;let k=0,B=0;for(R.push([0,0]),C.add(x(0,0));R.length<m;){if(n()<.35){const t=R[Math.floor(n()*R.length)];k=t[0],B=t[1]}const t=Math.floor(4*n());if(0===t?k+=1:1===t?k-=1:2===t?B+=1:B-=1,Math.abs(k)>y||Math.abs(B)>y){0===t?k-=1:1===t?k+=1:2===t?B-=1:B+=1;continue}const a=x(k,B);C.has(a)||(C.add(a),R.push([k,B]))}t.lineWidth=r,t.lineJoin="round",t.lineCap="butt";for(let a=0;a<R.length;a++){const o=p+R[a][0]*i,e=b+R[a][1]*i,r=n()<c,u=n()<M?.3+n()*(.45-.3):s+n()*(d-s);t.globalAlpha=u,t.strokeStyle=r?l.accentStrokeColor||"rgba(96, 165, 250, 1)":h;const g=t.shadowColor,m=t.shadowBlur;t.shadowColor="rgba(0, 0, 0, 0.08)",t.shadowBlur=1;const y=Math.round(.125*i);w(f(o),f(e),i,i,y),t.shadowColor=g,t.shadowBlur=m}}}"undefined"!=typeof window&&(window.drawBackground=function(e,l){if(!e)return;const n=Object.assign({},{baseGrid:56,seed:"sugallat-blue-squares",strokeColor:"rgba(59, 130, 246, 1)",strokeWidth:1,opacityMin:.6,opacityMax:.85,clear:!0,shadowAlpha:.08,shadowBlur:1,midRate:0,opacityMedMin:.5,opacityMedMax:.65,dashRate:0,weightVarRate:0,heavyWeight:1.75},l||{}),i=Math.max(1,Math.min(window.devicePixelRatio||1,2)),h=Math.max(1,Math.floor(e.clientWidth||e.width||1)),r=Math.max(1,Math.floor(e.clientHeight||e.height||1)),s=Math.floor(h*i),d=Math.floor(r*i);e.width===s&&e.height===d||(e.width=s,e.height=d);const c=e.getContext("2d");if(!c)return;c.setTransform(i,0,0,i,0,0),n.clear&&c.clearRect(0,0,h,r);const u=null!=n.tileSize?n.tileSize:16*n.baseGrid,M="number"==typeof n.seed?n.seed>>>0:function(t){let a=2166136261;for(let o=0;o<t.length;o++)a^=t.charCodeAt(o),a=Math.imul(a,16777619);return a>>>0}(String(n.seed)),f=Math.ceil(h/u)+1,w=Math.ceil(r/u)+1;for(let e=0;e<w;e++)for(let l=0;l<f;l++)o(c,l*u,e*u,u,n,t(a(M,l,e)))})}();
\ No newline at end of file
@@ -0,0 +1 @@
+!function(){"use strict";let n="YOUR_PIXEL_ID_HERE",e="G-XXXXXXXXXX",t="consent_only",o=!1,i=!1;const _lang="en"===document.documentElement.lang,_t=_lang?{bt:"Cookie Notice",bp:"This website uses cookies to ensure a better user experience and (optionally) for analytics and advertising purposes.",ba:"Accept all",bs:"Settings",mt:"Cookie Settings",nt:"Necessary Cookies",nd:"These cookies are essential for the basic operation of the website and cannot be disabled.",nl:"Necessary cookies (always active)",at:"Analytics and advertising cookies",ad:"These cookies help us understand how the website is used, enable the display of ads tailored to your interests, and allow cross-device user behaviour analysis (Google Signals).",al:"Analytics, ads personalisation and remarketing (Google Analytics, Google Signals, Facebook Pixel)",ms:"Save settings",ma:"Accept all",dp:"Details: ",dl:"Cookie policy"}:{bt:"Süti (Cookie) tájékoztató",bp:"Ez a weboldal sütiket használ a jobb felhasználói élmény biztosításához, valamint (opcionálisan) analitikai és hirdetési célokra.",ba:"Összes elfogadása",bs:"Beállítások",mt:"Süti beállítások",nt:"Szükséges sütik",nd:"Ezek a sütik a weboldal alapvető működéséhez szükségesek és nem kapcsolhatók ki.",nl:"Szükséges sütik (mindig aktív)",at:"Analitikai és hirdetési sütik",ad:"Ezek a sütik segítenek megérteni a weboldal használatát, lehetővé teszik az Ön érdeklődési körének megfelelő hirdetések megjelenítését, valamint az eszközök közötti felhasználói viselkedés elemzését (Google Signals).",al:"Analitika, hirdetések személyre szabása és remarketing (Google Analytics, Google Signals, Facebook Pixel)",ms:"Beállítások mentése",ma:"Összes elfogadása",dp:"Részletek: ",dl:"Cookie szabályzat"};function a(){try{const n=window.siteData&&window.siteData.config||"undefined"!=typeof siteData&&siteData&&siteData.config||null;if(!n)return null;const e=n.tracking||n;return{facebook_pixel:e.facebook_pixel||e.facebookPixel||null,gtag_config:e.gtag_config||e.ga4||e.ga_measurement_id||null,privacy_mode:e.privacy_mode||e.privacyMode||"consent_only"}}catch(n){return null}}function c(n){return!!(!0===n||n&&"object"==typeof n&&!0===n.marketing)&&((!navigator||!0!==navigator.globalPrivacyControl)&&("strict"!==t||!function(){const n=navigator&&(navigator.doNotTrack||navigator.msDoNotTrack)||window&&window.doNotTrack;return"1"===n||1===n}()))}function s(){if(i)return;if(!e||"G-XXXXXXXXXX"===e)return;const n=document.createElement("script");function t(){dataLayer.push(arguments)}n.async=!0,n.src=`https://www.googletagmanager.com/gtag/js?id=${e}`,document.head.appendChild(n),window.dataLayer=window.dataLayer||[],t("js",new Date),t("config",e,{anonymize_ip:!0,cookie_flags:"SameSite=None;Secure"}),window.gtag=t,i=!0}function r(){if(o)return;if(!n||"YOUR_PIXEL_ID_HERE"===n)return;var e,t,i,a,c,s;e=window,t=document,i="script",e.fbq||(a=e.fbq=function(){a.callMethod?a.callMethod.apply(a,arguments):a.queue.push(arguments)},e._fbq||(e._fbq=a),a.push=a,a.loaded=!0,a.version="2.0",a.queue=[],(c=t.createElement(i)).async=!0,c.src="https://connect.facebook.net/en_US/fbevents.js",(s=t.getElementsByTagName(i)[0]).parentNode.insertBefore(c,s)),fbq("init",n),fbq("track","PageView");const r=document.createElement("noscript");r.innerHTML=`<img height="1" width="1" style="display:none" src="https://www.facebook.com/tr?id=${n}&ev=PageView&noscript=1" />`,document.body.appendChild(r),o=!0}function l(){const n=function(){const n=window.location.pathname,e=n.split("/").pop(),t={"index.html":"home","index.html":"home","kapcsolat.html":"contact","contact.html":"contact","bemutatkozas.html":"about","about.html":"about","arak.html":"pricing","prices.html":"pricing","tevekenysegeink.html":"services","services.html":"services","referenciak.html":"references","references.html":"references"};return n.includes("/tevekenysegeink/")?"services":n.includes("/blog/")?"blog":t[e]||"other"}(),e=window.location.pathname;switch(n){case"home":fbq("track","ViewContent",{content_type:"homepage",content_name:"Főoldal - Sugallat Kft."});break;case"services":fbq("track","ViewContent",{content_type:"services",content_name:"Szolgáltatások"});break;case"pricing":fbq("track","ViewContent",{content_type:"pricing",content_name:"Áraink"});break;case"contact":fbq("track","ViewContent",{content_type:"contact",content_name:"Kapcsolat"});break;case"about":fbq("track","ViewContent",{content_type:"about",content_name:"Rólunk"});break;case"references":fbq("track","ViewContent",{content_type:"references",content_name:"Referenciák"});break;default:e.includes("/blog/")?fbq("track","ViewContent",{content_type:"blog_post",content_name:document.title}):e.includes("blog.html")?fbq("track","ViewContent",{content_type:"blog_listing",content_name:"Blog"}):e.includes("sitemap.html")&&fbq("track","ViewContent",{content_type:"sitemap",content_name:"Oldaltérkép"})}if(window.gtag)switch(gtag("event","page_view",{page_title:document.title,page_location:window.location.href,page_path:window.location.pathname,content_group1:n}),n){case"services":gtag("event","view_services",{event_category:"engagement",event_label:"services_page"});break;case"pricing":gtag("event","view_pricing",{event_category:"engagement",event_label:"pricing_page",value:1});break;case"contact":gtag("event","view_contact",{event_category:"engagement",event_label:"contact_page",value:2});break;case"references":gtag("event","view_references",{event_category:"engagement",event_label:"references_page"});break;case"about":gtag("event","view_about",{event_category:"engagement",event_label:"about_page"})}}function d(){return _lang?"/en/privacy-policy/#cookie-policy":`${function(){try{const n=(window.location.pathname||"/").split("/").filter(Boolean);if(0===n.length)return"";const e=n[n.length-1].includes(".")?n.length-1:n.length;return"../".repeat(Math.max(0,e))}catch(n){return""}}()}adatkezelesi-tajekoztato.html#cookie-policy`}function g(){if(document.getElementById("cookie-consent-styles"))return;const n=document.createElement("style");n.id="cookie-consent-styles",n.textContent='\n            .cookie-consent-banner {\n                position: fixed;\n                bottom: 0;\n                left: 0;\n                right: 0;\n                background: rgba(255, 255, 255, 0.98);\n                backdrop-filter: blur(10px);\n                border-top: 1px solid #e5e7eb;\n                box-shadow: 0 -4px 20px rgba(0, 0, 0, 0.1);\n                z-index: 10000;\n                transform: translateY(100%);\n                transition: transform 0.3s ease;\n                padding: 1rem 0;\n            }\n            \n            .cookie-consent-banner.show {\n                transform: translateY(0);\n            }\n            \n            .cookie-consent-banner.hide {\n                transform: translateY(100%);\n            }\n            \n            .cookie-consent-content {\n                max-width: 1200px;\n                margin: 0 auto;\n                padding: 0 1rem;\n                display: flex;\n                align-items: center;\n                gap: 2rem;\n                flex-wrap: wrap;\n            }\n            \n            .cookie-consent-text {\n                flex: 1;\n                min-width: 300px;\n            }\n            \n            .cookie-consent-text h3 {\n                color: #1e40af;\n                font-size: 1.25rem;\n                margin-bottom: 0.5rem;\n            }\n            \n            .cookie-consent-text p {\n                color: #374151;\n                font-size: 0.9rem;\n                line-height: 1.5;\n                margin: 0;\n            }\n\n\t\t\t.cookie-consent-text a,\n\t\t\t.cookie-modal a {\n\t\t\t\tcolor: #1e40af;\n\t\t\t\ttext-decoration: underline;\n\t\t\t\ttext-underline-offset: 2px;\n\t\t\t}\n\n\t\t\t.cookie-consent-text a:hover,\n\t\t\t.cookie-modal a:hover {\n\t\t\t\tcolor: #1d4ed8;\n\t\t\t}\n            \n            .cookie-consent-buttons {\n                display: flex;\n                gap: 0.75rem;\n                flex-wrap: wrap;\n            }\n            \n            .cookie-consent-buttons .btn {\n                padding: 0.5rem 1rem;\n                font-size: 0.9rem;\n                white-space: nowrap;\n                border-radius: 50px;\n                text-decoration: none;\n                font-weight: 600;\n                transition: all 0.3s ease;\n                border: 2px solid transparent;\n                cursor: pointer;\n                text-align: center;\n            }\n            \n            .cookie-consent-buttons .btn-primary {\n                background: linear-gradient(135deg, #1e40af, #1d4ed8);\n                color: white;\n                box-shadow: 0 4px 15px rgba(30, 64, 175, 0.4);\n            }\n            \n            .cookie-consent-buttons .btn-primary:hover {\n                background: linear-gradient(135deg, #1d4ed8, #1e40af);\n                transform: translateY(-2px);\n            }\n            \n            .cookie-consent-buttons .btn-outline {\n                background: transparent;\n                color: #1e40af;\n                border: 2px solid #1e40af;\n            }\n            \n            .cookie-consent-buttons .btn-outline:hover {\n                background: #1e40af;\n                color: white;\n                transform: translateY(-2px);\n            }\n            \n            .cookie-consent-buttons .btn-secondary {\n                background: #f8fafc;\n                color: #374151;\n                border: 2px solid #d1d5db;\n            }\n            \n            .cookie-consent-buttons .btn-secondary:hover {\n                background: #e5e7eb;\n                border-color: #9ca3af;\n                transform: translateY(-2px);\n            }\n            \n            .cookie-modal {\n                position: fixed;\n                top: 0;\n                left: 0;\n                right: 0;\n                bottom: 0;\n                background: rgba(0, 0, 0, 0.5);\n                z-index: 10001;\n                display: flex;\n                align-items: center;\n                justify-content: center;\n                opacity: 0;\n                visibility: hidden;\n                transition: all 0.3s ease;\n                padding: 1rem;\n            }\n            \n            .cookie-modal.show {\n                opacity: 1;\n                visibility: visible;\n            }\n            \n            .cookie-modal-content {\n                background: white;\n                border-radius: 15px;\n                max-width: 600px;\n                width: 100%;\n                max-height: 80vh;\n                overflow-y: auto;\n                transform: translateY(20px);\n                transition: transform 0.3s ease;\n            }\n            \n            .cookie-modal.show .cookie-modal-content {\n                transform: translateY(0);\n            }\n            \n            .cookie-modal-header {\n                padding: 1.5rem;\n                border-bottom: 1px solid #e5e7eb;\n                display: flex;\n                align-items: center;\n                justify-content: space-between;\n            }\n            \n            .cookie-modal-header h2 {\n                color: #1e40af;\n                font-size: 1.5rem;\n                margin: 0;\n            }\n            \n            .cookie-modal-close {\n                background: none;\n                border: none;\n                font-size: 1.5rem;\n                color: #6b7280;\n                cursor: pointer;\n                padding: 0;\n                width: 30px;\n                height: 30px;\n                display: flex;\n                align-items: center;\n                justify-content: center;\n            }\n            \n            .cookie-modal-close:hover {\n                color: #374151;\n            }\n            \n            .cookie-modal-body {\n                padding: 1.5rem;\n            }\n            \n            .cookie-category {\n                margin-bottom: 2rem;\n            }\n            \n            .cookie-category h3 {\n                color: #374151;\n                font-size: 1.1rem;\n                margin-bottom: 0.5rem;\n            }\n            \n            .cookie-category p {\n                color: #6b7280;\n                font-size: 0.9rem;\n                margin-bottom: 1rem;\n                line-height: 1.5;\n            }\n            \n            .cookie-toggle {\n                display: flex;\n                align-items: center;\n                gap: 0.75rem;\n                cursor: pointer;\n                font-size: 0.9rem;\n                color: #374151;\n            }\n            \n            .cookie-toggle input[type="checkbox"] {\n                display: none;\n            }\n            \n            .cookie-slider {\n                width: 50px;\n                height: 26px;\n                background: #d1d5db;\n                border-radius: 13px;\n                position: relative;\n                transition: background 0.3s ease;\n            }\n            \n            .cookie-slider::before {\n                content: \'\';\n                position: absolute;\n                top: 2px;\n                left: 2px;\n                width: 22px;\n                height: 22px;\n                background: white;\n                border-radius: 50%;\n                transition: transform 0.3s ease;\n            }\n            \n            .cookie-toggle input[type="checkbox"]:checked + .cookie-slider {\n                background: #2563eb;\n            }\n            \n            .cookie-toggle input[type="checkbox"]:checked + .cookie-slider::before {\n                transform: translateX(24px);\n            }\n            \n            .cookie-toggle input[type="checkbox"]:disabled + .cookie-slider {\n                background: #9ca3af;\n                cursor: not-allowed;\n            }\n            \n            .cookie-modal-footer {\n                padding: 1.5rem;\n                border-top: 1px solid #e5e7eb;\n                display: flex;\n                gap: 1rem;\n                justify-content: flex-end;\n            }\n            \n            @media (max-width: 768px) {\n                .cookie-consent-content {\n                    flex-direction: column;\n                    text-align: center;\n                    gap: 1rem;\n                }\n                \n                .cookie-consent-buttons {\n                    justify-content: center;\n                }\n            }\n        ',document.head.appendChild(n)}function m(){h({necessary:!0,marketing:!0}),f();c(y())&&(s(),r(),setTimeout(()=>{l()},100))}function k(){g();const n=y(),e=`\n            <div id="cookie-settings-modal" class="cookie-modal">\n                <div class="cookie-modal-content">\n                    <div class="cookie-modal-header">\n                        <h2>${_t.mt}</h2>\n                        <button id="close-cookie-modal" class="cookie-modal-close">&times;</button>\n                    </div>\n                    <div class="cookie-modal-body">\n                        <div class="cookie-category">\n                            <h3>${_t.nt}</h3>\n                            <p>${_t.nd}</p>\n                            <label class="cookie-toggle">\n                                <input type="checkbox" checked disabled>\n                                <span class="cookie-slider"></span>\n                                ${_t.nl}\n                            </label>\n                        </div>\n                        <div class="cookie-category">\n                            <h3>${_t.at}</h3>\n                            <p>${_t.ad}</p>\n                            <label class="cookie-toggle">\n                                <input type="checkbox" id="marketing-cookies" ${!0===n||!!n&&"object"==typeof n&&!0===n.marketing?"checked":""}>\n                                <span class="cookie-slider"></span>\n                                ${_t.al}\n                            </label>\n                        </div>\n\t\t\t\t\t\t<p style="margin: 0; color: #6b7280; font-size: 0.9rem; line-height: 1.5;">\n\t\t\t\t\t\t\t${_t.dp}<a href="${d()}" target="_blank" rel="noopener">${_t.dl}</a>.\n\t\t\t\t\t\t</p>\n                    </div>\n                    <div class="cookie-modal-footer">\n                        <button id="save-cookie-settings" class="btn btn-primary">${_t.ms}</button>\n                        <button id="accept-all-modal" class="btn btn-outline">${_t.ma}</button>\n                    </div>\n                </div>\n            </div>\n        `;document.body.insertAdjacentHTML("beforeend",e),document.getElementById("close-cookie-modal").addEventListener("click",p),document.getElementById("save-cookie-settings").addEventListener("click",b),document.getElementById("accept-all-modal").addEventListener("click",u),setTimeout(()=>{const n=document.getElementById("cookie-settings-modal");n&&n.classList.add("show")},100)}function p(){const n=document.getElementById("cookie-settings-modal");n&&n.remove()}function b(){h({necessary:!0,marketing:document.getElementById("marketing-cookies").checked}),c(y())&&(s(),r(),setTimeout(()=>{l()},100)),p(),f()}function u(){document.getElementById("marketing-cookies").checked=!0,b()}function f(){const n=document.getElementById("cookie-consent-banner");n&&(n.classList.add("hide"),setTimeout(()=>n.remove(),300))}function h(n){const e={timestamp:(new Date).toISOString(),consent:n};localStorage.setItem("sugallat_cookie_consent",JSON.stringify(e))}function y(){try{const n=localStorage.getItem("sugallat_cookie_consent");if(n){return JSON.parse(n).consent}}catch(n){}return null}async function v(){const o=await function(n=1500){return new Promise(e=>{const t=a();if(t)return void e(t);let o=!1;window.addEventListener("siteConfigReady",()=>{if(o)return;const n=a();n&&(o=!0,e(n))},{once:!0}),setTimeout(()=>{o||e(a())},n)})}();o&&(o.facebook_pixel&&(n=o.facebook_pixel),o.gtag_config&&(e=o.gtag_config),o.privacy_mode&&(t=o.privacy_mode));const i=y();null!==i?c(i)&&(s(),r(),setTimeout(()=>{l()},100)):function(){if(g(),null!==y())return;document.body.insertAdjacentHTML("beforeend",`\n            <div id="cookie-consent-banner" class="cookie-consent-banner">\n                <div class="cookie-consent-content">\n                    <div class="cookie-consent-text">\n                        <h3>${_t.bt}</h3>\n                        <p>${_t.bp}</p>\n                    </div>\n                    <div class="cookie-consent-buttons">\n                        <button id="cookie-accept" class="btn btn-primary">${_t.ba}</button>\n                        <button id="cookie-settings" class="btn btn-secondary">${_t.bs}</button>\n                    </div>\n                </div>\n            </div>\n        `),document.getElementById("cookie-accept").addEventListener("click",m),document.getElementById("cookie-settings").addEventListener("click",k),setTimeout(()=>{const n=document.getElementById("cookie-consent-banner");n&&n.classList.add("show")},500)}()}"loading"===document.readyState?document.addEventListener("DOMContentLoaded",v):v(),window.UniversalTracking={initFacebookPixel:r,trackPageEvents:l,getCookieConsent:y,setCookieConsent:h,showCookieSettings:k}}();
\ No newline at end of file
@@ -1,8 +1,12 @@
+import argparse
 import html
 import json
 import re
 from pathlib import Path
 
+from page_metadata import MetadataIndex, PageMetadata
+from site_output import OutputBatch, add_dry_run_argument
+
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 BASE_URL = "https://sugallat.hu"
@@ -86,8 +90,9 @@ def _canonical_path_for_file(file_path: Path, lang: str) -> str | None:
     return None
 
 
-def _breadcrumbs_for_file(file_path: Path, doc: str) -> list[dict] | None:
-    lang = _get_lang(doc)
+def _breadcrumbs_for_file(file_path: Path, doc: str, meta: PageMetadata | None = None) -> list[dict] | None:
+    # `meta` (from the metadata index) saves re-deriving lang/title/h1 from `doc`.
+    lang = meta.language if meta is not None else _get_lang(doc)
     rel = file_path.relative_to(REPO_ROOT).as_posix()
 
     # Do not add breadcrumbs to the homepage itself
@@ -98,8 +103,8 @@ def _breadcrumbs_for_file(file_path: Path, doc: str) -> list[dict] | None:
     if not canonical_path:
         return None
 
-    title = _get_title(doc)
-    h1 = _get_first_h1(doc)
+    title = meta.title if meta is not None else _get_title(doc)
+    h1 = meta.h1 if meta is not None else _get_first_h1(doc)
     # Prefer on-page H1/title, but allow overrides where navigation wording differs
     label_overrides_hu = {
         "/bemutatkozas": "Rólunk",
@@ -173,34 +178,46 @@ def _render_breadcrumb_jsonld(item_list: list[dict]) -> str:
     )
 
 
+def _splice_on_own_lines(doc: str, start: int, end: int, block: str) -> str:
+    # Put `block` in place of doc[start:end] on lines of its own: whitespace and blank lines on either side
+    # are collapsed to a single line break, keeping only the indentation of the line that follows. The
+    # result is the same whatever spacing was there before, so re-running the upsert is a no-op.
+    before = doc[:start].rstrip()
+    after = doc[end:]
+    rest = after.lstrip()
+    gap = after[: len(after) - len(rest)]
+    indent = gap[gap.rfind("\n") + 1 :] if "\n" in gap else ""
+    return before + "\n" + block + "\n" + indent + rest
+
+
 def _upsert_breadcrumbs(doc: str, breadcrumb_block: str) -> str:
     # Replace existing BreadcrumbList JSON-LD if present
     existing = re.search(
-        r"\s*<!--\s*Breadcrumbs.*?-->\s*<script\s+type=\"application/ld\+json\">\s*[\s\S]*?\"@type\"\s*:\s*\"BreadcrumbList\"[\s\S]*?</script>\s*",
+        r"<!--\s*Breadcrumbs.*?-->\s*<script\s+type=\"application/ld\+json\">\s*[\s\S]*?\"@type\"\s*:\s*\"BreadcrumbList\"[\s\S]*?</script>",
         doc,
         flags=re.IGNORECASE,
     )
     if existing:
-        # Ensure the script ends on its own line (avoid `</script><link...` formatting)
-        return doc[: existing.start()] + "\n" + breadcrumb_block + "\n" + doc[existing.end() :]
+        return _splice_on_own_lines(doc, existing.start(), existing.end(), breadcrumb_block)
 
     # Otherwise, insert after meta description if possible, else after title
-    meta_desc = re.search(r'<meta\s+name="description"[^>]*>\s*', doc, flags=re.IGNORECASE)
-    if meta_desc:
-        insert_at = meta_desc.end()
-        # Keep surrounding formatting stable and ensure the next tag starts on a new line
-        return doc[:insert_at] + "\n\n" + breadcrumb_block + "\n" + doc[insert_at:]
-
-    title_tag = re.search(r"</title>\s*", doc, flags=re.IGNORECASE)
-    if title_tag:
-        insert_at = title_tag.end()
-        return doc[:insert_at] + "\n\n" + breadcrumb_block + "\n" + doc[insert_at:]
+    anchor = re.search(r'<meta\s+name="description"[^>]*>', doc, flags=re.IGNORECASE) or re.search(
+        r"</title>", doc, flags=re.IGNORECASE
+    )
+    if anchor:
+        return _splice_on_own_lines(doc, anchor.end(), anchor.end(), breadcrumb_block)
 
     return doc
 
 
-def main() -> int:
-    changed = 0
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Add or refresh BreadcrumbList JSON-LD in every page.")
+    add_dry_run_argument(parser)
+    args = parser.parse_args(argv)
+
+    index = MetadataIndex(REPO_ROOT)
+    output = OutputBatch(REPO_ROOT, dry_run=args.dry_run)
+    metas: dict[Path, PageMetadata | None] = {}
 
     for file_path in REPO_ROOT.rglob("*.html"):
         rel_parts = file_path.relative_to(REPO_ROOT).parts
@@ -210,17 +227,26 @@ def main() -> int:
             continue
 
         doc = file_path.read_text(encoding="utf-8")
-        item_list = _breadcrumbs_for_file(file_path, doc)
+        meta = index.get(file_path, doc)
+        item_list = _breadcrumbs_for_file(file_path, doc, meta)
         if not item_list:
             continue
 
         breadcrumb_block = _render_breadcrumb_jsonld(item_list)
         new_doc = _upsert_breadcrumbs(doc, breadcrumb_block)
-        if new_doc != doc:
-            file_path.write_text(new_doc, encoding="utf-8")
-            changed += 1
-
-    print(f"BreadcrumbList JSON-LD updated in {changed} file(s).")
+        if new_doc != doc and output.write(file_path, new_doc):
+            metas[file_path] = meta
+
+    changed = output.commit()
+    if not args.dry_run:
+        for file_path in changed:
+            meta = metas[file_path]
+            if meta is not None:
+                # The JSON-LD block adds no links/assets and leaves lang/title/h1 alone.
+                st = file_path.stat()
+                index.put(file_path, st.st_mtime_ns, st.st_size, meta)
+    index.save()
+    print(f"BreadcrumbList JSON-LD {'would be ' if args.dry_run else ''}updated in {len(changed)} file(s).")
     return 0
 
 
@@ -0,0 +1,535 @@
+"""
+Single-pass site build: runs the page transforms from scripts/ as ordered stages.
+
+Pages are discovered once, each document is read once, every stage rewrites the in-memory text, and a
+file is written at most once (only if the final text differs). Stages, in order:
+
+  header_footer  - shared header/footer from partials/        (sync_header_footer.py)
+  page_features  - <body data-page/data-features> stamping     (set_page_features.py)
+  breadcrumbs    - BreadcrumbList JSON-LD                      (add_breadcrumbs_jsonld.py)
+  icons          - small SVG <img> icons -> inline <svg>/sprite (svg_icons.py)
+  images         - <img> dimensions, lazy loading, <picture>   (responsive_images.py)
+  critical_css   - inline the page's above-the-fold CSS rules  (optimize_css_links.py, critical_css.py)
+  css_loading    - blocking vs preload CSS <link> normalising  (optimize_css_links.py)
+  fingerprint    - CSS/JS references -> content-hashed copies  (fingerprint_assets.py, js_bundles.py)
+
+Before the pages, the CSS/JS sources are minified into content-hashed siblings listed in asset-manifest.json,
+and main.js is cut into one bundle per page type (only the features FEATURES_BY_PAGE gives it); the images
+are measured into image-manifest.json. Both are written in the same batch as the pages, together with the
+icon sprites the pages reference; hashed files and sprites nothing refers to any more are removed.
+
+A page's type (which nav item is active, which features and main.js bundle it gets) is its own
+<body data-page>, read from the metadata index (`.page-metadata.json`, see page_metadata); the path is
+only a first guess for pages that were never stamped. Rebuilt pages are written back to the index.
+
+Builds are incremental: `.build-manifest.json` records, per page, the hash of the last output and of every
+input it was built from (the partials it uses, its FEATURES_BY_PAGE entry, the CSS filename sets, the
+stylesheets, the asset and image manifests, the icons and the build scripts themselves) and the sprites it
+references. Pages whose output and inputs are unchanged are skipped without being read.
+
+Usage:
+  python scripts/build.py
+  python scripts/build.py --explain   # say why each page was rebuilt
+  python scripts/build.py --force     # ignore the manifest and rebuild every page
+  python scripts/build.py --jobs 8    # spread page processing over 8 worker processes
+  python scripts/build.py --dry-run   # print a unified diff of what would change, write nothing
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import traceback
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from add_breadcrumbs_jsonld import _breadcrumbs_for_file, _render_breadcrumb_jsonld, _upsert_breadcrumbs
+from critical_css import StylesheetCache
+from fingerprint_assets import (
+    asset_manifest,
+    build_assets,
+    is_fingerprinted,
+    remove_stale_outputs,
+    rewrite_asset_refs,
+    stage_assets,
+)
+from optimize_css_links import (
+    BLOCKING_CSS_FILENAMES,
+    TARGET_CSS_FILENAMES,
+    has_critical_css,
+    inline_critical_css,
+    normalize_css_loading,
+)
+from page_metadata import MetadataIndex, PageMetadata, extract_metadata
+from responsive_images import (
+    ImageInfo,
+    annotate_images,
+    collect_images,
+    oversized_report,
+    render_manifest,
+    stage_image_manifest,
+)
+from set_page_features import FEATURES_BY_PAGE, classify_page, stamp_body
+from site_output import OutputBatch, add_dry_run_argument
+from svg_icons import IconLibrary, icon_inputs, remove_stale_sprites, rewrite_icons
+from sync_header_footer import TemplateError, assemble_page, load_partials
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MANIFEST_PATH = REPO_ROOT / ".build-manifest.json"
+MANIFEST_VERSION = 1
+
+# Stage code is an input too: editing HU_TO_EN or a regex must invalidate every page.
+STAGE_SCRIPTS = (
+    "build.py",
+    "sync_header_footer.py",
+    "html_blocks.py",
+    "site_output.py",
+    "set_page_features.py",
+    "add_breadcrumbs_jsonld.py",
+    "optimize_css_links.py",
+    "critical_css.py",
+    "fingerprint_assets.py",
+    "js_bundles.py",
+    "responsive_images.py",
+    "svg_icons.py",
+)
+
+# One rule for every stage: generated output, source fragments and tooling are never pages.
+SKIP_DIRS = {"export", "content", "scripts", "partials", "docs", "node_modules"}
+
+
+@dataclass(frozen=True)
+class Page:
+    path: Path
+    rel: str  # posix path relative to the repo root, e.g. "en/prices/index.html"
+
+
+Stage = Callable[[str, Page], str]
+
+
+def discover_pages(repo_root: Path) -> list[Page]:
+    pages: list[Page] = []
+    for root, dirs, files in os.walk(repo_root):
+        rel_dir = Path(root).relative_to(repo_root)
+        if not rel_dir.parts:
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        # Never descend into VCS metadata or bytecode caches.
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d != "__pycache__"]
+        for f in files:
+            if f.lower().endswith(".html"):
+                path = Path(root) / f
+                pages.append(Page(path=path, rel=path.relative_to(repo_root).as_posix()))
+    pages.sort(key=lambda p: p.rel)
+    return pages
+
+
+def _read_page(path: Path) -> str:
+    try:
+        return path.read_text(encoding="utf-8")
+    except UnicodeDecodeError:
+        # Fall back to a more permissive read (keeps file editable on Windows locales).
+        return path.read_text(encoding="utf-8", errors="replace")
+
+
+def build_stages(repo_root: Path, manifest: dict[str, str], images: dict[str, ImageInfo]) -> list[tuple[str, Stage]]:
+    header_hu, header_en, footer = load_partials(repo_root)
+
+    def header_footer(doc: str, page: Page) -> str:
+        assembled = assemble_page(doc, page.path, repo_root, header_hu, header_en, footer, _page_type)
+        return doc if assembled is None else assembled
+
+    def page_features(doc: str, page: Page) -> str:
+        features = FEATURES_BY_PAGE.get(_page_type, FEATURES_BY_PAGE["other"])
+        return stamp_body(doc, _page_type, features)[0]
+
+    def breadcrumbs(doc: str, page: Page) -> str:
+        item_list = _breadcrumbs_for_file(page.path, doc)
+        if not item_list:
+            return doc
+        return _upsert_breadcrumbs(doc, _render_breadcrumb_jsonld(item_list))
+
+    icons = IconLibrary(repo_root)
+
+    def svg_icons(doc: str, page: Page) -> str:
+        doc, sprites = rewrite_icons(doc, page.rel, icons)
+        _page_assets.update(sprites)
+        return doc
+
+    def responsive_images(doc: str, page: Page) -> str:
+        return annotate_images(doc, page.rel, images, _page_type)
+
+    stylesheets = StylesheetCache()
+
+    def critical_css(doc: str, page: Page) -> str:
+        return inline_critical_css(doc, page.path, stylesheets)
+
+    def css_loading(doc: str, page: Page) -> str:
+        # Once the critical rules are inline, no global stylesheet needs to block rendering.
+        blocking = frozenset() if has_critical_css(doc) else BLOCKING_CSS_FILENAMES
+        lines, changed = normalize_css_loading(doc.splitlines(keepends=True), blocking)
+        return "".join(lines) if changed else doc
+
+    def fingerprint(doc: str, page: Page) -> str:
+        return rewrite_asset_refs(doc, page.rel, manifest)
+
+    return [
+        ("header_footer", header_footer),
+        ("page_features", page_features),
+        ("breadcrumbs", breadcrumbs),
+        ("icons", svg_icons),
+        ("images", responsive_images),
+        ("critical_css", critical_css),
+        ("css_loading", css_loading),
+        ("fingerprint", fingerprint),
+    ]
+
+
+def _sha256(data: str | bytes) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def global_inputs(repo_root: Path, manifest: dict[str, str], images: dict[str, ImageInfo]) -> dict[str, str]:
+    """
+    Hashes of the inputs shared by many pages, computed once per run.
+    """
+    scripts_dir = repo_root / "scripts"
+    inputs = {
+        f"partials/{name}": _sha256((repo_root / "partials" / name).read_bytes())
+        for name in ("header-hu.html", "header-en.html", "footer.html")
+    }
+    inputs["CSS filename sets"] = _sha256(json.dumps([sorted(TARGET_CSS_FILENAMES), sorted(BLOCKING_CSS_FILENAMES)]))
+    # Critical CSS is cut from the stylesheets' contents, so editing one rebuilds the pages that inline it.
+    inputs["stylesheets"] = _sha256(
+        b"".join(path.read_bytes() for path in sorted((repo_root / "css").glob("*.css")) if not is_fingerprinted(path.name))
+    )
+    inputs["asset manifest"] = _sha256(json.dumps(manifest, sort_keys=True))
+    inputs["image manifest"] = _sha256(render_manifest(images))
+    inputs["icons"] = _sha256(icon_inputs(repo_root))
+    inputs["build scripts"] = _sha256(b"".join((scripts_dir / name).read_bytes() for name in STAGE_SCRIPTS))
+    return inputs
+
+
+def page_dependencies(page: Page, inputs: dict[str, str], page_type: str, doc: str | None = None) -> dict[str, str]:
+    """
+    Inputs a page is built from. With `doc` (the built text), a page only depends on the partials whose
+    placeholder it has, so e.g. a footer tweak leaves 404.html and the thank-you pages alone; likewise, pages without
+    inlined critical CSS don't depend on the stylesheets, pages without images on the image manifest, and
+    pages without icons on the icon files.
+    """
+    header = "partials/header-en.html" if page.rel.startswith("en/") else "partials/header-hu.html"
+    deps = {
+        header: inputs[header],
+        "partials/footer.html": inputs["partials/footer.html"],
+        f"FEATURES_BY_PAGE[{page_type!r}]": _sha256(json.dumps(FEATURES_BY_PAGE.get(page_type, FEATURES_BY_PAGE["other"]))),
+        "CSS filename sets": inputs["CSS filename sets"],
+        "stylesheets": inputs["stylesheets"],
+        "asset manifest": inputs["asset manifest"],
+        "image manifest": inputs["image manifest"],
+        "icons": inputs["icons"],
+        "build scripts": inputs["build scripts"],
+    }
+    if doc is not None and 'id="header-placeholder"' not in doc:
+        del deps[header]
+    if doc is not None and 'id="footer-placeholder"' not in doc:
+        del deps["partials/footer.html"]
+    if doc is not None and not has_critical_css(doc):
+        del deps["stylesheets"]
+    if doc is not None and "<img" not in doc:
+        del deps["image manifest"]
+    if doc is not None and "data-icon=" not in doc:
+        del deps["icons"]
+    return deps
+
+
+class BuildManifest:
+    """
+    Persistent record of the last build: for each page, the (mtime_ns, size) and hash of the output that
+    was left on disk, the hashes of the inputs it was built from, and the generated files (icon sprites) it
+    references.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.pages: dict[str, dict] = {}
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == MANIFEST_VERSION:
+            self.pages = data.get("pages", {})
+
+    def stale_reasons(self, page: Page, st: os.stat_result, deps: dict[str, str]) -> tuple[list[str], str | None]:
+        """
+        Return (reasons the page must be rebuilt, its text if it had to be read to decide). No reasons means
+        the page is up to date. The page is only read when its stat no longer matches the recorded output.
+        """
+        entry = self.pages.get(page.rel)
+        if entry is None:
+            return ["not in the build manifest"], None
+
+        # Only the inputs recorded for this page matter (see page_dependencies).
+        reasons = [f"{name} changed" for name, digest in entry["deps"].items() if deps.get(name) != digest]
+        reasons += [f"{rel} missing" for rel in entry.get("assets", []) if not (self.path.parent / rel).is_file()]
+        doc = None
+        if (entry["mtime_ns"], entry["size"]) != (st.st_mtime_ns, st.st_size):
+            doc = _read_page(page.path)
+            if _sha256(doc) != entry["output"]:
+                reasons.insert(0, "page edited since the last build")
+            elif not reasons:
+                # Touched but identical: refresh the stat so the next run doesn't read it again.
+                entry["mtime_ns"], entry["size"] = st.st_mtime_ns, st.st_size
+        return reasons, doc
+
+    def record(
+        self, page: Page, output_sha256: str, mtime_ns: int, size: int, deps: dict[str, str], assets: list[str]
+    ) -> None:
+        entry = {"output": output_sha256, "mtime_ns": mtime_ns, "size": size, "deps": deps}
+        if assets:
+            entry["assets"] = assets
+        self.pages[page.rel] = entry
+
+    def assets(self) -> set[str]:
+        return {rel for entry in self.pages.values() for rel in entry.get("assets", [])}
+
+    def prune(self, keep: set[str]) -> None:
+        for rel in self.pages.keys() - keep:
+            del self.pages[rel]
+
+    def save(self) -> None:
+        data = {"version": MANIFEST_VERSION, "pages": dict(sorted(self.pages.items()))}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class PageResult:
+    page: Page
+    output: str | None = None  # the rebuilt text, if it differs from what was read
+    output_sha256: str = ""
+    meta: PageMetadata | None = None  # metadata of the rebuilt text, for the metadata index
+    deps: dict[str, str] = field(default_factory=dict)
+    assets: dict[str, str] = field(default_factory=dict)  # generated files the page references: {rel: text}
+    changed_stages: list[str] = field(default_factory=list)
+    timings: dict[str, float] = field(default_factory=dict)
+    error: str | None = None
+
+
+# Per-process build state, set up once by _init_worker (stage closures can't be pickled).
+_stages: list[tuple[str, Stage]] = []
+_inputs: dict[str, str] = {}
+_asset_map: dict[str, str] = {}
+_images: dict[str, ImageInfo] = {}
+# The page being built: its type (from the metadata index, see classify_page) and the generated files it
+# references, filled in by its stages.
+_page_type: str = "other"
+_page_assets: dict[str, str] = {}
+
+
+def _init_worker(repo_root: Path, inputs: dict[str, str], asset_map: dict[str, str], images: dict[str, ImageInfo]) -> None:
+    global _stages, _inputs, _asset_map, _images
+    _stages = build_stages(repo_root, asset_map, images)
+    _inputs = inputs
+    _asset_map = asset_map
+    _images = images
+
+
+def build_page(page: Page, doc: str | None, page_type: str) -> PageResult:
+    """
+    Run every stage over one page. Nothing is written here: the text comes back to the parent, which
+    commits all writes together. Errors are returned, not raised, so one broken page doesn't take down
+    the other pages in its worker's chunk.
+    """
+    global _page_type
+    result = PageResult(page=page, timings={name: 0.0 for name in ("read", *(name for name, _ in _stages))})
+    _page_type = page_type
+    try:
+        t = time.perf_counter()
+        original = doc if doc is not None else _read_page(page.path)
+        result.timings["read"] += time.perf_counter() - t
+
+        doc = original
+        _page_assets.clear()
+        for name, stage in _stages:
+            t = time.perf_counter()
+            updated = stage(doc, page)
+            result.timings[name] += time.perf_counter() - t
+            if updated != doc:
+                result.changed_stages.append(name)
+                doc = updated
+
+        if doc != original:
+            result.output = doc
+            result.meta = extract_metadata(doc)
+        result.output_sha256 = _sha256(doc)
+        result.assets = dict(_page_assets)
+        result.deps = page_dependencies(page, _inputs, page_type, doc)
+    except Exception:
+        result.error = traceback.format_exc(limit=-3).rstrip()
+    return result
+
+
+def _build_pages(todo: list[tuple[Page, str | None, str]], jobs: int) -> list[PageResult]:
+    if jobs <= 1 or len(todo) <= 1:
+        return [build_page(page, doc, page_type) for page, doc, page_type in todo]
+    # A few chunks per worker: large enough to amortise pickling, small enough to balance uneven pages.
+    chunksize = max(1, len(todo) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(REPO_ROOT, _inputs, _asset_map, _images)) as pool:
+        # map() yields in submission order, so the report is deterministic whatever finishes first.
+        return list(pool.map(build_page, *zip(*todo), chunksize=chunksize))
+
+
+def _print_timings(timings: dict[str, float], changed_by: dict[str, int]) -> None:
+    width = max(len(name) for name in timings)
+    print(f"  {'stage':<{width}}  {'ms':>9}  changed")
+    for name, seconds in timings.items():
+        changed = changed_by.get(name)
+        print(f"  {name:<{width}}  {seconds * 1000:9.1f}  {'' if changed is None else changed}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the page transforms over the site in a single pass.")
+    parser.add_argument("--force", action="store_true", help="Ignore the build manifest and rebuild every page.")
+    parser.add_argument("--explain", action="store_true", help="Print why each rebuilt page was considered stale.")
+    add_dry_run_argument(parser)
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Worker processes for page processing (0 = one per CPU; default: %(default)s).",
+    )
+    args = parser.parse_args(argv)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    started = time.perf_counter()
+    manifest = BuildManifest(MANIFEST_PATH)
+    index = MetadataIndex(REPO_ROOT)
+    timings: dict[str, float] = {"discover": 0.0, "assets": 0.0, "check": 0.0}
+
+    t = time.perf_counter()
+    pages = discover_pages(REPO_ROOT)
+    timings["discover"] += time.perf_counter() - t
+
+    t = time.perf_counter()
+    assets = build_assets(REPO_ROOT)
+    asset_map = asset_manifest(assets)
+    images = collect_images(REPO_ROOT)
+    timings["assets"] += time.perf_counter() - t
+
+    t = time.perf_counter()
+    inputs = global_inputs(REPO_ROOT, asset_map, images)
+    try:
+        _init_worker(REPO_ROOT, inputs, asset_map, images)
+    except TemplateError as exc:
+        print(f"Partial template error: {exc}", file=sys.stderr)
+        return 1
+    timings["discover"] += time.perf_counter() - t
+
+    todo: list[tuple[Page, str | None, str]] = []
+    reasons_by_page: dict[str, list[str]] = {}
+    t = time.perf_counter()
+    for page in pages:
+        # Only pages that changed on disk since they were last indexed are parsed here.
+        page_type = classify_page(page.rel, index.get(page.path))
+        if args.force:
+            reasons, doc = ["--force"], None
+        else:
+            reasons, doc = manifest.stale_reasons(page, page.path.stat(), page_dependencies(page, inputs, page_type))
+        if reasons:
+            todo.append((page, doc, page_type))
+            reasons_by_page[page.rel] = reasons
+    timings["check"] += time.perf_counter() - t
+
+    results = _build_pages(todo, jobs)
+
+    timings.update({name: 0.0 for name in ("read", *(name for name, _ in _stages), "write")})
+    changed_by: dict[str, int] = {name: 0 for name, _ in _stages}
+    failed: list[PageResult] = []
+    output = OutputBatch(REPO_ROOT, dry_run=args.dry_run)
+    for result in results:
+        for name, seconds in result.timings.items():
+            timings[name] += seconds
+        for name in result.changed_stages:
+            changed_by[name] += 1
+        if result.error is not None:
+            failed.append(result)
+        else:
+            if result.output is not None:
+                output.write(result.page.path, result.output)
+            for rel, text in result.assets.items():
+                output.write(REPO_ROOT / rel, text)
+
+    t = time.perf_counter()
+    stage_assets(output, REPO_ROOT, assets)
+    stage_image_manifest(output, REPO_ROOT, images)
+    committed = set(output.commit())
+    timings["write"] += time.perf_counter() - t
+
+    if not args.dry_run:
+        for result in results:
+            if result.error is not None:
+                # Leave failed pages out of the manifest so the next run retries them.
+                manifest.pages.pop(result.page.rel, None)
+                continue
+            st = result.page.path.stat()
+            manifest.record(result.page, result.output_sha256, st.st_mtime_ns, st.st_size, result.deps, sorted(result.assets))
+            if result.meta is not None and result.page.path in committed:
+                index.put(result.page.path, st.st_mtime_ns, st.st_size, result.meta)
+        manifest.prune({page.rel for page in pages})
+        manifest.save()
+        index.prune({page.rel for page in pages})
+        index.save()
+
+    if not failed:
+        # A failed page may still link the previous hashes, so only clean up after a complete build. Pages
+        # skipped as up to date keep the sprites recorded for them.
+        t = time.perf_counter()
+        remove_stale_outputs(REPO_ROOT, asset_map, args.dry_run)
+        built_sprites = {rel for result in results for rel in result.assets}
+        remove_stale_sprites(REPO_ROOT, manifest.assets() | built_sprites, args.dry_run)
+        timings["write"] += time.perf_counter() - t
+
+    written = [result.page.rel for result in results if result.page.path in committed]
+    written_assets = sorted(path.relative_to(REPO_ROOT).as_posix() for path in committed - {page.path for page in pages})
+    print(
+        f"Built {len(results)} of {len(pages)} pages in {time.perf_counter() - started:.2f}s "
+        f"({len(pages) - len(results)} up to date, {jobs} job{'s' if jobs != 1 else ''}), "
+        f"{'would write' if args.dry_run else 'wrote'} {len(written)}:"
+    )
+    if args.explain:
+        for result in results:
+            rel = result.page.rel
+            print(f"- {rel}{' (written)' if result.page.path in committed else ''}: {'; '.join(reasons_by_page[rel])}")
+    else:
+        for rel in written:
+            print(f"- {rel}")
+    if written_assets:
+        print(f"{'Would write' if args.dry_run else 'Wrote'} {len(written_assets)} asset file(s):")
+        for rel in written_assets:
+            print(f"- {rel}")
+    for line in oversized_report(images):
+        print(f"Oversized image: {line}")
+    # With --jobs, stage times are summed across workers (CPU time, not wall-clock).
+    _print_timings(timings, changed_by)
+
+    if failed:
+        print(f"Failed to build {len(failed)} page(s):")
+        for result in failed:
+            print(f"- {result.page.rel}:")
+            print("    " + result.error.replace("\n", "\n    "))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
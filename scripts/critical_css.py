@@ -0,0 +1,562 @@
+"""
+Per-page critical CSS: the rules of the site stylesheets that style a page's above-the-fold DOM.
+
+The stylesheets are parsed into rules (nested @media / @supports kept as groups), and every selector is
+matched against the elements of the page that are visible on first paint: <html>, <body>, the header and the
+first FOLD_SECTIONS top-level sections (fewer on page types with a tall hero, see FOLD_SECTIONS_BY_PAGE).
+Matching is deliberately conservative - structural pseudo-classes, :not(), :is() and the like count as a
+match - so a rule is only dropped when it provably can't apply on first paint: its elements are below the
+fold, or it needs :hover / :focus style interaction. Classes that scripts add before the page settles (see
+RUNTIME_CLASSES and FEATURE_RUNTIME_CLASSES, keyed by the page's data-features) are treated as present.
+
+The result keeps source order, so inlining it ahead of the full stylesheets never changes the cascade.
+Relative url()s are resolved against the stylesheet; once the rules move into the page, `rebase_urls`
+rewrites them relative to the page instead.
+"""
+
+from __future__ import annotations
+
+import posixpath
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from pathlib import Path
+
+
+# Top-level <section>s (after the header) that count as above the fold, per data-page.
+FOLD_SECTIONS = 2
+FOLD_SECTIONS_BY_PAGE = {"home": 1}
+
+# Classes main.js sets on every page before anything is revealed (<html class="js-enabled">, nav state).
+RUNTIME_CLASSES = ("js-enabled", "active")
+
+# Classes a feature's script adds to above-the-fold elements, keyed by data-features entry.
+FEATURE_RUNTIME_CLASSES = {
+    "square-patterns": ("has-square-patterns", "is-bg-ready"),
+}
+
+# Interaction states: never true on first paint.
+DYNAMIC_PSEUDO_CLASSES = {
+    "hover", "focus", "focus-visible", "focus-within", "active", "visited", "target", "target-within",
+}
+
+# Group rules whose contents are matched like top-level rules.
+GROUP_AT_RULES = ("@media", "@supports", "@layer", "@container")
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr",
+}
+NON_RENDERED_TAGS = {"head", "script", "style", "template", "noscript"}
+
+
+# --- Stylesheet parsing -----------------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class StyleRule:
+    selectors: tuple[str, ...]
+    declarations: str
+
+
+@dataclass(frozen=True)
+class GroupRule:
+    prelude: str  # e.g. "@media (max-width:768px)"
+    rules: tuple  # of StyleRule / GroupRule / AtRule
+
+
+@dataclass(frozen=True)
+class AtRule:
+    prelude: str  # e.g. "@keyframes spin", "@import url(x.css)"
+    block: str | None  # raw block contents, None for statement at-rules
+
+
+COMMENT_OR_STRING_RE = re.compile(r"""/\*.*?\*/|("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')""", re.S)
+WS_OUTSIDE_STRINGS_RE = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|\s+""")
+ANIMATION_DECL_RE = re.compile(r"animation(?:-name)?\s*:\s*([^;}]*)", re.I)
+URL_RE = re.compile(r"""\burl\(\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^)'"\s]*))\s*\)""", re.I)
+# Absolute, root-relative, fragment-only (SVG filters) and data: URLs mean the same from any directory.
+FIXED_URL_RE = re.compile(r"(?:[a-z][a-z0-9+.-]*:|/|#|$)", re.I)
+
+
+def _strip_comments(css: str) -> str:
+    return COMMENT_OR_STRING_RE.sub(lambda m: m.group(1) or "", css)
+
+
+def _compact(text: str) -> str:
+    return WS_OUTSIDE_STRINGS_RE.sub(lambda m: m.group(1) or " ", text).strip()
+
+
+def _scan_to(css: str, pos: int, stops: str) -> int:
+    """
+    Index of the first character in `stops` at bracket depth 0, skipping strings; len(css) if none.
+    """
+    depth = 0
+    n = len(css)
+    while pos < n:
+        c = css[pos]
+        if c in "\"'":
+            end = pos + 1
+            while end < n and css[end] != c:
+                end += 2 if css[end] == "\\" else 1
+            pos = end + 1
+            continue
+        if depth == 0 and c in stops:
+            return pos
+        if c in "([":
+            depth += 1
+        elif c in ")]":
+            depth -= 1
+        pos += 1
+    return n
+
+
+def _block_end(css: str, pos: int) -> int:
+    # `pos` is just past a "{"; return the index of its matching "}".
+    depth = 1
+    while True:
+        pos = _scan_to(css, pos, "{}")
+        if pos >= len(css):
+            return pos
+        depth += 1 if css[pos] == "{" else -1
+        if depth == 0:
+            return pos
+        pos += 1
+
+
+def split_selector_list(prelude: str) -> tuple[str, ...]:
+    parts = []
+    pos = 0
+    while pos <= len(prelude):
+        end = _scan_to(prelude, pos, ",")
+        part = _compact(prelude[pos:end])
+        if part:
+            parts.append(part)
+        pos = end + 1
+    return tuple(parts)
+
+
+def _parse_block(css: str, pos: int, end: int) -> list:
+    rules: list = []
+    while pos < end:
+        stop = min(_scan_to(css, pos, "{;}"), end)
+        prelude = _compact(css[pos:stop])
+        if stop >= end or css[stop] == "}":
+            break
+        if css[stop] == ";":
+            if prelude.startswith("@"):
+                rules.append(AtRule(prelude=prelude, block=None))
+            pos = stop + 1
+            continue
+
+        close = min(_block_end(css, stop + 1), end)
+        if prelude.lower().startswith(GROUP_AT_RULES):
+            rules.append(GroupRule(prelude=prelude, rules=tuple(_parse_block(css, stop + 1, close))))
+        elif prelude.startswith("@"):
+            rules.append(AtRule(prelude=prelude, block=_compact(css[stop + 1 : close])))
+        elif prelude:
+            rules.append(StyleRule(selectors=split_selector_list(prelude), declarations=_compact(css[stop + 1 : close])))
+        pos = close + 1
+    return rules
+
+
+def parse_stylesheet(css: str) -> list:
+    css = _strip_comments(css)
+    return _parse_block(css, 0, len(css))
+
+
+def serialize_rules(rules: Iterable) -> str:
+    out = []
+    for rule in rules:
+        if isinstance(rule, StyleRule):
+            out.append(f"{','.join(rule.selectors)}{{{rule.declarations}}}")
+        elif isinstance(rule, GroupRule):
+            out.append(f"{rule.prelude}{{{serialize_rules(rule.rules)}}}")
+        elif rule.block is None:
+            out.append(f"{rule.prelude};")
+        else:
+            out.append(f"{rule.prelude}{{{rule.block}}}")
+    return "".join(out)
+
+
+def rebase_urls(css: str, base: str) -> str:
+    """
+    Rewrite the relative url()s in `css`, written for a stylesheet in directory `base` (as the page links it,
+    e.g. "../css"), so they resolve the same from the page.
+    """
+    if base in ("", "."):
+        return css
+
+    def rebase(m: re.Match) -> str:
+        quote = '"' if m.group("dq") is not None else "'" if m.group("sq") is not None else ""
+        url = m.group("dq") if quote == '"' else m.group("sq") if quote else m.group("bare")
+        if FIXED_URL_RE.match(url):
+            return m.group(0)
+        return f"url({quote}{posixpath.normpath(posixpath.join(base, url))}{quote})"
+
+    return URL_RE.sub(rebase, css)
+
+
+# --- Page DOM ---------------------------------------------------------------------------------------------
+
+
+@dataclass(eq=False)
+class Element:
+    tag: str
+    attrs: dict[str, str]
+    parent: Element | None = None
+    children: list[Element] = field(default_factory=list)
+
+    @property
+    def classes(self) -> set[str]:
+        return set(self.attrs.get("class", "").split())
+
+    def iter(self):
+        yield self
+        for child in self.children:
+            yield from child.iter()
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.root = Element(tag="#document", attrs={})
+        self._open = self.root
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        el = Element(tag=tag, attrs={k.lower(): (v or "") for k, v in attrs}, parent=self._open)
+        self._open.children.append(el)
+        if tag not in VOID_TAGS:
+            self._open = el
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self._open.children.append(Element(tag=tag, attrs={k.lower(): (v or "") for k, v in attrs}, parent=self._open))
+
+    def handle_endtag(self, tag: str) -> None:
+        # Close up to the nearest open element with this tag; stray end tags are ignored.
+        el = self._open
+        while el is not self.root and el.tag != tag:
+            el = el.parent
+        if el is not self.root:
+            self._open = el.parent
+
+
+def parse_dom(doc: str) -> Element:
+    builder = _TreeBuilder()
+    builder.feed(doc)
+    builder.close()
+    return builder.root
+
+
+def _rendered(el: Element):
+    # `el` and its descendants, without the subtrees of <template>, <script> and the like.
+    if el.tag in NON_RENDERED_TAGS:
+        return
+    yield el
+    for child in el.children:
+        yield from _rendered(child)
+
+
+def fold_elements(root: Element, page_type: str | None) -> list[Element]:
+    """
+    The rendered elements visible on first paint, in document order.
+    """
+    html = next((el for el in root.children if el.tag == "html"), root)
+    body = next((el for el in html.iter() if el.tag == "body"), None)
+    if body is None:
+        return [el for el in _rendered(root) if el is not root]
+
+    visible = [html, body]
+    sections_left = FOLD_SECTIONS_BY_PAGE.get(page_type or "", FOLD_SECTIONS)
+    container = next((el for el in body.children if el.tag == "main"), None)
+    top_level = body.children if container is None else [*body.children[: body.children.index(container)], container, *container.children]
+    for el in top_level:
+        if sections_left <= 0:
+            break
+        if el.tag in NON_RENDERED_TAGS:
+            continue
+        if el is container:
+            visible.append(el)
+            continue
+        visible.extend(_rendered(el))
+        if el.tag == "section":
+            sections_left -= 1
+    return visible
+
+
+# --- Selector matching ------------------------------------------------------------------------------------
+
+
+SELECTOR_TOKEN_RE = re.compile(
+    r"""
+      (?P<ws>\s+)
+    | (?P<comb>[>+~])
+    | (?P<id>\#(?:[-\w]|\\.)+)
+    | (?P<cls>\.(?:[-\w]|\\.)+)
+    | (?P<attr>\[[^\]]*\])
+    | (?P<pseudo>::?[-\w]+(?:\((?:[^()]|\([^()]*\))*\))?)
+    | (?P<tag>\*|[-\w]+|\|)
+    """,
+    re.X,
+)
+ATTR_RE = re.compile(
+    r"""\[\s*(?P<name>(?:[-\w:]*\|)?[-\w:]+)\s*(?:(?P<op>[~|^$*]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\s\]]+))\s*(?P<flag>[iIsS])?\s*)?\]"""
+)
+
+
+@dataclass
+class Compound:
+    tag: str | None = None
+    id: str | None = None
+    classes: list[str] = field(default_factory=list)
+    attrs: list[tuple[str, str | None, str, bool]] = field(default_factory=list)  # (name, op, value, ignore case)
+    pseudos: list[str] = field(default_factory=list)
+
+
+class UnsupportedSelector(ValueError):
+    pass
+
+
+def parse_selector(selector: str) -> list[tuple[str, Compound]]:
+    """
+    Split a complex selector into [(combinator, compound), ...] left to right; the first combinator is "".
+    """
+    parts: list[tuple[str, Compound]] = []
+    comb = ""
+    current: Compound | None = None
+    pos = 0
+    while pos < len(selector):
+        m = SELECTOR_TOKEN_RE.match(selector, pos)
+        if m is None:
+            raise UnsupportedSelector(selector)
+        pos = m.end()
+        kind, text = m.lastgroup, m.group()
+        if kind in ("ws", "comb"):
+            if current is not None:
+                parts.append((comb, current))
+                current = None
+                comb = " "
+            if kind == "comb":
+                comb = text
+            continue
+        if current is None:
+            current = Compound()
+        if kind == "tag":
+            if text == "|":
+                raise UnsupportedSelector(selector)
+            current.tag = None if text == "*" else text.lower()
+        elif kind == "id":
+            current.id = _unescape(text[1:])
+        elif kind == "cls":
+            current.classes.append(_unescape(text[1:]))
+        elif kind == "attr":
+            a = ATTR_RE.fullmatch(text)
+            if a is None:
+                raise UnsupportedSelector(selector)
+            value = next((v for v in (a.group("dq"), a.group("sq"), a.group("bare")) if v is not None), "")
+            current.attrs.append((a.group("name").lower(), a.group("op"), value, (a.group("flag") or "").lower() == "i"))
+        else:
+            current.pseudos.append(text)
+    if current is None:
+        raise UnsupportedSelector(selector)
+    parts.append((comb, current))
+    return parts
+
+
+def _unescape(ident: str) -> str:
+    return re.sub(r"\\(.)", r"\1", ident)
+
+
+def _attr_matches(el: Element, name: str, op: str | None, value: str, ignore_case: bool) -> bool:
+    if name not in el.attrs:
+        return False
+    if op is None:
+        return True
+    actual = el.attrs[name]
+    if ignore_case:
+        actual, value = actual.lower(), value.lower()
+    if op == "=":
+        return actual == value
+    if op == "~=":
+        return value in actual.split()
+    if op == "|=":
+        return actual == value or actual.startswith(value + "-")
+    if op == "^=":
+        return bool(value) and actual.startswith(value)
+    if op == "$=":
+        return bool(value) and actual.endswith(value)
+    return bool(value) and value in actual  # *=
+
+
+class FoldMatcher:
+    """
+    Decides which selectors can match an element in `visible` on first paint.
+    """
+
+    def __init__(self, visible: list[Element], assumed_classes: Iterable[str] = ()):
+        self.visible = visible
+        self.assumed = set(assumed_classes)
+        self._cache: dict[str, bool] = {}
+        self._by_id: dict[str, list[Element]] = {}
+        self._by_class: dict[str, list[Element]] = {}
+        self._by_tag: dict[str, list[Element]] = {}
+        for el in visible:
+            self._by_tag.setdefault(el.tag, []).append(el)
+            if "id" in el.attrs:
+                self._by_id.setdefault(el.attrs["id"], []).append(el)
+            for cls in el.classes:
+                self._by_class.setdefault(cls, []).append(el)
+
+    def matches(self, selector: str) -> bool:
+        hit = self._cache.get(selector)
+        if hit is None:
+            try:
+                parts = parse_selector(selector)
+            except UnsupportedSelector:
+                hit = True  # can't tell: keep it
+            else:
+                hit = any(self._match_at(el, parts, len(parts) - 1) for el in self._candidates(parts[-1][1]))
+            self._cache[selector] = hit
+        return hit
+
+    def _candidates(self, compound: Compound) -> list[Element]:
+        if compound.id is not None:
+            return self._by_id.get(compound.id, [])
+        real = [cls for cls in compound.classes if cls not in self.assumed]
+        if real:
+            return self._by_class.get(real[0], [])
+        if compound.tag is not None:
+            return self._by_tag.get(compound.tag, [])
+        return self.visible
+
+    def _compound_matches(self, el: Element, c: Compound) -> bool:
+        if c.tag is not None and el.tag != c.tag:
+            return False
+        if c.id is not None and el.attrs.get("id") != c.id:
+            return False
+        if c.classes:
+            classes = el.classes
+            if any(cls not in classes and cls not in self.assumed for cls in c.classes):
+                return False
+        if any(not _attr_matches(el, *attr) for attr in c.attrs):
+            return False
+        for pseudo in c.pseudos:
+            name = pseudo.lstrip(":").split("(", 1)[0].lower()
+            if pseudo.startswith("::"):
+                continue  # ::before / ::after / ::marker style the element they hang off
+            if name in DYNAMIC_PSEUDO_CLASSES:
+                return False
+            if name == "root" and el.tag != "html":
+                return False
+            # Structural and logical pseudo-classes (:first-child, :not(), :is(), ...): assume they match.
+        return True
+
+    def _match_at(self, el: Element, parts: list[tuple[str, Compound]], i: int) -> bool:
+        comb, compound = parts[i]
+        if not self._compound_matches(el, compound):
+            return False
+        if i == 0:
+            return True
+        if comb == ">":
+            return el.parent is not None and self._match_at(el.parent, parts, i - 1)
+        if comb == " ":
+            parent = el.parent
+            while parent is not None and parent.tag != "#document":
+                if self._match_at(parent, parts, i - 1):
+                    return True
+                parent = parent.parent
+            return False
+        siblings = el.parent.children if el.parent is not None else []
+        before = siblings[: siblings.index(el)]
+        if comb == "+":
+            return bool(before) and self._match_at(before[-1], parts, i - 1)
+        return any(self._match_at(sib, parts, i - 1) for sib in before)  # "~"
+
+
+# --- Extraction -------------------------------------------------------------------------------------------
+
+
+def _media_applies_on_screen(prelude: str) -> bool:
+    media = prelude[len("@media") :].strip().lower()
+    return not media or any(
+        not q.strip().startswith(("print", "only print", "speech")) for q in media.split(",")
+    )
+
+
+def _select(rules: Iterable, matcher: FoldMatcher, animations: set[str]) -> list:
+    kept: list = []
+    for rule in rules:
+        if isinstance(rule, StyleRule):
+            selectors = tuple(s for s in rule.selectors if matcher.matches(s))
+            if selectors:
+                kept.append(StyleRule(selectors=selectors, declarations=rule.declarations))
+                for m in ANIMATION_DECL_RE.finditer(rule.declarations):
+                    animations.update(re.split(r"[\s,]+", m.group(1)))
+        elif isinstance(rule, GroupRule):
+            if rule.prelude.lower().startswith("@media") and not _media_applies_on_screen(rule.prelude):
+                continue
+            inner = _select(rule.rules, matcher, animations)
+            if inner:
+                kept.append(GroupRule(prelude=rule.prelude, rules=tuple(inner)))
+        # Other at-rules (@font-face, @import, @charset) stay with the full stylesheet; @keyframes are
+        # added afterwards if a kept rule animates with them.
+    return kept
+
+
+def _keyframes(rules: Iterable, names: set[str]) -> list[AtRule]:
+    found = []
+    for rule in rules:
+        if isinstance(rule, AtRule) and rule.block is not None and "keyframes" in rule.prelude.split(" ", 1)[0].lower():
+            if rule.prelude.split(" ", 1)[-1].strip() in names:
+                found.append(rule)
+        elif isinstance(rule, GroupRule):
+            found.extend(_keyframes(rule.rules, names))
+    return found
+
+
+def critical_css(
+    doc: str,
+    stylesheets: Iterable[list],
+    page_type: str | None,
+    features: Iterable[str],
+    base_dirs: Iterable[str] | None = None,
+) -> str:
+    """
+    The critical subset of the given parsed stylesheets (in link order) for one page, serialized. With
+    `base_dirs` (each stylesheet's directory as seen from the page), relative url()s are rebased to the page.
+    """
+    stylesheets = list(stylesheets)
+    base_dirs = list(base_dirs) if base_dirs is not None else [""] * len(stylesheets)
+    assumed = set(RUNTIME_CLASSES)
+    for feature in features:
+        assumed.update(FEATURE_RUNTIME_CLASSES.get(feature, ()))
+    matcher = FoldMatcher(fold_elements(parse_dom(doc), page_type), assumed)
+
+    parts = []
+    for rules, base in zip(stylesheets, base_dirs, strict=True):
+        animations: set[str] = set()
+        kept = _select(rules, matcher, animations)
+        kept.extend(_keyframes(rules, animations))
+        parts.append(rebase_urls(serialize_rules(kept), base))
+    return "".join(parts)
+
+
+class StylesheetCache:
+    """
+    Parsed stylesheets by path, re-parsed only when the file changes (one instance per build worker).
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[Path, tuple[tuple[int, int], list]] = {}
+
+    def get(self, path: Path) -> list | None:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        entry = self._entries.get(path)
+        if entry is None or entry[0] != key:
+            entry = (key, parse_stylesheet(path.read_text(encoding="utf-8", errors="replace")))
+            self._entries[path] = entry
+        return entry[1]
@@ -1,10 +1,55 @@
+"""
+Export the visible text of every site page, as headings-only HTML, Markdown or JSONL, under export/.
+
+The pages exported are the ones the sitemap lists: discovered with the build's rules, minus redirect stubs,
+noindex pages and the legacy pages/en/ copies (see generate_sitemap). They are mirrored under export/
+(`en/prices/index.html` -> `export/en/prices/index.md`). Each page is streamed end to end: the source is read and fed to
+VisibleTextExtractor in chunks, and every text run is written to each chosen format's output file as soon as
+it is found, so memory use doesn't grow with the page or the export. Titles and languages come from the
+metadata index (page_metadata). Pages are exported in parallel with --jobs, and only pages whose source
+changed since the last export (see `.export-manifest.json`) are redone.
+
+Export files no exported page maps to are listed after a run but only deleted with --prune: export/ also
+holds the flat copies of the original hand-picked export (`export/tevekenysegeink.html` and friends), which
+are tracked and linked to from outside.
+
+Usage:
+  python scripts/export_visible_content_headers_only.py                    # headings-only HTML
+  python scripts/export_visible_content_headers_only.py --format md --format jsonl --jobs 0
+  python scripts/export_visible_content_headers_only.py --force            # re-export everything
+  python scripts/export_visible_content_headers_only.py --prune            # also delete stale export files
+"""
+
+import argparse
+import contextlib
+import hashlib
+import itertools
+import json
 import os
 import re
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from html import escape
 from html.parser import HTMLParser
-from typing import Iterable, List, Optional, Tuple
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
+from build import Page, discover_pages
+from generate_sitemap import SKIP_PREFIXES
+from page_metadata import MetadataIndex, PageMetadata
+from site_output import OutputBatch, add_dry_run_argument, temp_sibling
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+EXPORT_DIR = REPO_ROOT / "export"
+MANIFEST_PATH = REPO_ROOT / ".export-manifest.json"
+
+EXPORT_FORMATS = {"html": ".html", "md": ".md", "jsonl": ".jsonl"}
+
+# The extractor joins text that a chunk boundary splits, so the chunk size never changes the output.
+FEED_CHUNK_CHARS = 64 * 1024
 
 SKIP_TAGS = {
     "script",
@@ -23,13 +68,6 @@ def _collapse_ws(s: str) -> str:
     return re.sub(r"\s+", " ", s).strip()
 
 
-def extract_title(html: str) -> str:
-    m = re.search(r"<title[^>]*>(.*?)</title>", html, flags=re.IGNORECASE | re.DOTALL)
-    if not m:
-        return "Export"
-    return _collapse_ws(re.sub(r"<[^>]+>", "", m.group(1))) or "Export"
-
-
 def _attrs_to_dict(attrs: List[Tuple[str, Optional[str]]]) -> dict:
     d: dict = {}
     for k, v in attrs:
@@ -63,9 +101,21 @@ class VisibleTextExtractor(HTMLParser):
         self._in_body = False
         self._skip_depth = 0
         self._tag_stack: List[str] = []
+        self._text: List[str] = []  # data of the current text node, which may arrive in pieces across feeds
+        self._last: Optional[TextRun] = None
+        # Runs found since the last drain(); see iter_visible_text_runs.
         self.runs: List[TextRun] = []
 
+    def drain(self) -> List[TextRun]:
+        runs, self.runs = self.runs, []
+        return runs
+
+    def close(self) -> None:
+        super().close()
+        self._flush_text()
+
     def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self._flush_text()
         t = tag.lower()
         self._tag_stack.append(t)
 
@@ -86,6 +136,7 @@ class VisibleTextExtractor(HTMLParser):
         # The user requested exporting *all content* (including FAQ answers that are hidden in the UI).
 
     def handle_endtag(self, tag: str) -> None:
+        self._flush_text()
         t = tag.lower()
 
         if self._in_body and self._skip_depth > 0:
@@ -107,31 +158,48 @@ class VisibleTextExtractor(HTMLParser):
                 return int(t[1])
         return 6
 
+    def handle_comment(self, data: str) -> None:
+        self._flush_text()
+
     def handle_data(self, data: str) -> None:
-        if not self._in_body or self._skip_depth > 0:
+        if self._in_body and self._skip_depth == 0:
+            self._text.append(data)
+
+    def _flush_text(self) -> None:
+        if not self._text:
             return
-        text = _collapse_ws(data)
+        text = _collapse_ws("".join(self._text))
+        self._text = []
         if not text:
             return
 
         level = self._current_heading_level()
         # Drop consecutive duplicates (common with repeated UI labels)
-        if self.runs and self.runs[-1].text == text and self.runs[-1].level == level:
+        if self._last is not None and self._last.text == text and self._last.level == level:
             return
-        self.runs.append(TextRun(text=text, level=level))
+        self._last = TextRun(text=text, level=level)
+        self.runs.append(self._last)
 
 
-def extract_visible_text_runs(html: str) -> List[TextRun]:
+def iter_visible_text_runs(chunks: Iterable[str]) -> Iterator[TextRun]:
+    """
+    Yield the page's text runs as the parser finds them, feeding it the document one chunk at a time.
+    """
     parser = VisibleTextExtractor()
-    parser.feed(html)
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.drain()
     parser.close()
-    return parser.runs
+    yield from parser.drain()
+
+
+def read_chunks(path: Path) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        yield from iter(lambda: f.read(FEED_CHUNK_CHARS), "")
 
 
-def render_headers_only_html(title: str, lang: str, runs: Iterable[TextRun]) -> str:
-    body_lines = [f"<h{r.level}>{escape(r.text)}</h{r.level}>" for r in runs]
-    body = "\n".join(body_lines) + ("\n" if body_lines else "")
-    return (
+def iter_headers_only_html(title: str, lang: str, runs: Iterable[TextRun]) -> Iterator[str]:
+    yield (
         "<!DOCTYPE html>\n"
         f'<html lang="{escape(lang)}">\n'
         "<head>\n"
@@ -139,62 +207,211 @@ def render_headers_only_html(title: str, lang: str, runs: Iterable[TextRun]) ->
         f"  <title>{escape(title)}</title>\n"
         "</head>\n"
         "<body>\n"
-        f"{body}"
-        "</body>\n"
-        "</html>\n"
     )
+    for r in runs:
+        yield f"<h{r.level}>{escape(r.text)}</h{r.level}>\n"
+    yield "</body>\n</html>\n"
+
+
+def iter_markdown(title: str, lang: str, runs: Iterable[TextRun]) -> Iterator[str]:
+    # h1-h5 become ATX headings; level 6 is where body text lands, so it is written as plain paragraphs.
+    yield f"---\ntitle: {json.dumps(title, ensure_ascii=False)}\nlang: {lang}\n---\n"
+    for r in runs:
+        yield f"\n{'#' * r.level} {r.text}\n" if r.level < 6 else f"\n{r.text}\n"
+
+
+def iter_jsonl(title: str, lang: str, runs: Iterable[TextRun], source: str) -> Iterator[str]:
+    # One flat record per run, so the corpus can be grepped or loaded line by line.
+    for r in runs:
+        record = {"source": source, "lang": lang, "title": title, "level": r.level, "text": r.text}
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def export_path(rel: str, fmt: str) -> Path:
+    # Mirror the source tree so pages never collide (kapcsolat.html vs kapcsolat/index.html).
+    return EXPORT_DIR / (rel[: -len(".html")] + EXPORT_FORMATS[fmt])
+
+
+def export_page(chunks: Iterable[str], source: str, title: str, lang: str, files: Dict[str, TextIO]) -> None:
+    """
+    Stream one page into every format in `files` ({format: open file}) from a single parse.
+    """
+    streams = itertools.tee(iter_visible_text_runs(chunks), len(files))
+    pieces: List[Iterator[str]] = []
+    for fmt, stream in zip(files, streams):
+        if fmt == "html":
+            pieces.append(iter_headers_only_html(title, lang, stream))
+        elif fmt == "md":
+            pieces.append(iter_markdown(title, lang, stream))
+        else:
+            pieces.append(iter_jsonl(title, lang, stream, source))
+    # Advancing the formats in lockstep keeps tee's buffer at a run or two, however long the page is.
+    for row in itertools.zip_longest(*pieces):
+        for f, piece in zip(files.values(), row):
+            if piece is not None:
+                f.write(piece)
+
+
+@dataclass
+class ExportResult:
+    source: str
+    outputs: Dict[str, str]  # format -> temporary file holding it, to be staged with OutputBatch.write_file
+    error: Optional[str] = None
+
+
+def _export_source(source: str, title: str, lang: str, formats: Tuple[str, ...]) -> ExportResult:
+    outputs: Dict[str, str] = {}
+    try:
+        with contextlib.ExitStack() as stack:
+            files: Dict[str, TextIO] = {}
+            for fmt in formats:
+                f, tmp = stack.enter_context(temp_sibling(export_path(source, fmt)))
+                files[fmt] = f
+                outputs[fmt] = tmp
+            export_page(read_chunks(REPO_ROOT / source), source, title, lang, files)
+        return ExportResult(source=source, outputs=outputs)
+    except Exception:
+        return ExportResult(source=source, outputs={}, error=traceback.format_exc(limit=-3).rstrip())
+
+
+def export_pages(repo_root: Path, index: MetadataIndex) -> List[Tuple[Page, PageMetadata]]:
+    """
+    The pages worth exporting, with their metadata: the ones the sitemap lists.
+    """
+    selected = []
+    for page in discover_pages(repo_root):
+        if page.rel.startswith(SKIP_PREFIXES):
+            continue
+        meta = index.get(page.path)
+        if meta is not None and meta.indexable:
+            selected.append((page, meta))
+    return selected
+
+
+def stale_exports(pages: Iterable[str]) -> List[Path]:
+    # Export files that no exported page maps to, e.g. the flat export/<name>.html copies of the old
+    # hand-picked export or pages that were renamed since.
+    current = {export_path(rel, fmt) for rel in pages for fmt in EXPORT_FORMATS}
+    return sorted(
+        path
+        for path in EXPORT_DIR.rglob("*")
+        if path.suffix in EXPORT_FORMATS.values() and path.is_file() and path not in current
+    )
+
+
+def _exporter_digest() -> str:
+    # Changing this script (formats, extraction rules) invalidates every previous export.
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+
+def _load_manifest() -> Dict[str, dict]:
+    try:
+        data = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data.get("pages", {}) if isinstance(data, dict) and data.get("exporter") == _exporter_digest() else {}
 
 
-def detect_lang(html: str) -> str:
-    m = re.search(r"<html[^>]*\slang=['\"]([^'\"]+)['\"]", html, flags=re.IGNORECASE)
-    return (m.group(1).strip() if m else "hu") or "hu"
-
-
-def export_page(src_path: str, out_path: str) -> None:
-    with open(src_path, "r", encoding="utf-8", errors="replace") as f:
-        html = f.read()
-    title = extract_title(html)
-    lang = detect_lang(html)
-    runs = extract_visible_text_runs(html)
-    out_html = render_headers_only_html(title=title, lang=lang, runs=runs)
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    with open(out_path, "w", encoding="utf-8", newline="\n") as f:
-        f.write(out_html)
-
-
-def main() -> int:
-    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    export_dir = os.path.join(repo_root, "export")
-
-    pages: List[Tuple[str, str]] = [
-        (os.path.join(repo_root, "index.html"), os.path.join(export_dir, "index.html")),
-        (os.path.join(repo_root, "arak.html"), os.path.join(export_dir, "arak.html")),
-        (os.path.join(repo_root, "tevekenysegeink", "index.html"), os.path.join(export_dir, "tevekenysegeink.html")),
-        (
-            os.path.join(repo_root, "tevekenysegeink", "kozbeszerzes-ajanlatkeroknek", "index.html"),
-            os.path.join(export_dir, "kozbeszerzes-ajanlatkeroknek.html"),
-        ),
-        (
-            os.path.join(repo_root, "tevekenysegeink", "kozbeszerzes-ajanlattevoknek", "index.html"),
-            os.path.join(export_dir, "kozbeszerzes-ajanlattevoknek.html"),
-        ),
-    ]
-
-    missing = [src for src, _ in pages if not os.path.exists(src)]
-    if missing:
-        print("Missing source files:")
-        for m in missing:
-            print(" -", m)
-        return 2
-
-    for src, out in pages:
-        export_page(src_path=src, out_path=out)
-        print(f"Exported: {os.path.relpath(out, repo_root)}  <=  {os.path.relpath(src, repo_root)}")
+def _save_manifest(pages: Dict[str, dict]) -> None:
+    data = {"exporter": _exporter_digest(), "pages": dict(sorted(pages.items()))}
+    tmp = MANIFEST_PATH.with_name(MANIFEST_PATH.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent=1), encoding="utf-8")
+    os.replace(tmp, MANIFEST_PATH)
 
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export the visible text of every site page to export/.")
+    parser.add_argument(
+        "--format",
+        dest="formats",
+        action="append",
+        choices=sorted(EXPORT_FORMATS),
+        help="Output format; repeat for several (default: html).",
+    )
+    parser.add_argument("--force", action="store_true", help="Re-export every page, not just changed ones.")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes (0 = one per CPU; default: %(default)s).")
+    parser.add_argument("--prune", action="store_true", help="Delete export files no exported page maps to (default: list them).")
+    add_dry_run_argument(parser)
+    args = parser.parse_args(argv)
+    formats = tuple(dict.fromkeys(args.formats or ["html"]))
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    started = time.perf_counter()
+    manifest = {} if args.force else _load_manifest()
+    index = MetadataIndex(REPO_ROOT)
+    pages = export_pages(REPO_ROOT, index)
+    index.save()
+
+    todo: List[Tuple[str, str, str]] = []  # (source, title, lang)
+    stats: Dict[str, os.stat_result] = {}
+    for page, meta in pages:
+        st = page.path.stat()
+        stats[page.rel] = st
+        entry = manifest.get(page.rel)
+        up_to_date = (
+            entry is not None
+            and (entry["mtime_ns"], entry["size"]) == (st.st_mtime_ns, st.st_size)
+            and set(formats) <= set(entry["formats"])
+            and all(export_path(page.rel, fmt).exists() for fmt in formats)
+        )
+        if not up_to_date:
+            title = _collapse_ws(meta.title or "") or "Export"
+            lang = (meta.lang or "").strip() or "hu"
+            todo.append((page.rel, title, lang))
+
+    if jobs <= 1 or len(todo) <= 1:
+        results = [_export_source(source, title, lang, formats) for source, title, lang in todo]
+    else:
+        chunksize = max(1, len(todo) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_export_source, *zip(*todo), itertools.repeat(formats), chunksize=chunksize))
+
+    output = OutputBatch(REPO_ROOT, dry_run=args.dry_run)
+    failed = [result for result in results if result.error is not None]
+    for result in results:
+        for fmt, tmp in result.outputs.items():
+            output.write_file(export_path(result.source, fmt), tmp)
+    written = output.commit()
+    stale = stale_exports(stats)
+    prune = args.prune and not failed
+    for path in stale:
+        rel = path.relative_to(REPO_ROOT).as_posix()
+        if not prune:
+            print(f"Stale: {rel} (no exported page maps to it; --prune deletes it)")
+            continue
+        if not args.dry_run:
+            path.unlink()
+        print(f"{'Would remove' if args.dry_run else 'Removed'} stale {rel}")
+
+    if not args.dry_run:
+        for result in results:
+            if result.error is None:
+                st = stats[result.source]
+                previous = manifest.get(result.source, {}).get("formats", [])
+                manifest[result.source] = {
+                    "mtime_ns": st.st_mtime_ns,
+                    "size": st.st_size,
+                    "formats": sorted(set(previous) | set(formats)),
+                }
+        for rel in manifest.keys() - stats.keys():
+            del manifest[rel]
+        _save_manifest(manifest)
+
+    print(
+        f"Exported {len(results) - len(failed)} of {len(pages)} pages as {', '.join(formats)} "
+        f"in {time.perf_counter() - started:.2f}s ({len(pages) - len(results)} up to date), "
+        f"{'would write' if args.dry_run else 'wrote'} {len(written)} file(s){':' if written else '.'}"
+    )
+    for path in written:
+        print(f"- {path.relative_to(REPO_ROOT).as_posix()}")
+    if failed:
+        print(f"Failed to export {len(failed)} page(s):")
+        for result in failed:
+            print(f"- {result.source}:")
+            print("    " + result.error.replace("\n", "\n    "))
+        return 1
     return 0
 
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
-
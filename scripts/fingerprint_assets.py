@@ -0,0 +1,225 @@
+"""
+Content-hashed copies of the site's CSS and JS, and the page rewriting that points at them.
+
+Every css/*.css and js/*.js source gets a minified sibling named after a hash of its output
+(`css/main.css` -> `css/main.3f9a1c2b.css`), listed in `asset-manifest.json`. Pages then reference the hashed
+names, so those files can be served with `Cache-Control: public, max-age=31536000, immutable`: a changed file
+gets a new name instead of a bumped `?v=N`. The sources stay where they are and remain the files to edit;
+references are always resolved back to them first, so rewriting is idempotent and a page that still links
+`main.js?v=4` or an older hash is brought up to date too.
+
+CSS is minified by re-serializing the parsed rules (comments and layout whitespace dropped, see critical_css).
+Stylesheets that wouldn't get smaller (the ones already shipped minified) are copied as they are, like the
+JS sources.
+
+js/main.js additionally gets one bundle per page type in FEATURES_BY_PAGE, without the code of the features
+that page type doesn't use (see js_bundles). Bundles are hashed the same way and listed under
+"js/main.js#<page type>"; a page whose <body data-page/data-features> matches the table is pointed at its
+bundle, any other page at the full main.js. Page types with the same features share one file.
+
+Usage:
+  python scripts/fingerprint_assets.py             # write hashed assets + manifest, rewrite every page
+  python scripts/fingerprint_assets.py --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import posixpath
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from critical_css import parse_stylesheet, serialize_rules
+from js_bundles import MAIN_JS, BundleError, build_bundles, external_refs
+from set_page_features import BODY_RE, FEATURES_BY_PAGE
+from site_output import OutputBatch, add_dry_run_argument
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MANIFEST_PATH = REPO_ROOT / "asset-manifest.json"
+
+ASSET_DIRS = {"css": ".css", "js": ".js"}
+HASH_LEN = 8
+
+# "main.3f9a1c2b.css" -> the hash part; generated files are never sources themselves.
+FINGERPRINT_RE = re.compile(rf"\.[0-9a-f]{{{HASH_LEN}}}(?=\.(?:css|js|svg)$)")
+# href="..."/src="..." pointing at a .css/.js file, with an optional query (the old ?v=N cache busting).
+ASSET_REF_RE = re.compile(r"""(?P<attr>\b(?:href|src)=)(?P<q>["'])(?P<url>[^"'?#]+?\.(?:css|js))(?P<query>\?[^"'#]*)?(?P=q)""")
+DATA_PAGE_RE = re.compile(r'\sdata-page="([^"]*)"')
+DATA_FEATURES_RE = re.compile(r'\sdata-features="([^"]*)"')
+
+
+@dataclass(frozen=True)
+class Asset:
+    source: str  # repo-relative, e.g. "css/main.css"
+    output: str  # repo-relative hashed name, e.g. "css/main.3f9a1c2b.css"
+    text: str
+
+
+def strip_fingerprint(path: str) -> str:
+    return FINGERPRINT_RE.sub("", path)
+
+
+def is_fingerprinted(path: str) -> bool:
+    return FINGERPRINT_RE.search(path) is not None
+
+
+def minify_css(css: str) -> str:
+    # Most stylesheets are shipped minified already; re-serializing those gains nothing, so keep the source.
+    minified = serialize_rules(parse_stylesheet(css))
+    return minified if len(minified) < len(css) else css
+
+
+def asset_sources(repo_root: Path) -> list[Path]:
+    sources = []
+    for directory, suffix in ASSET_DIRS.items():
+        for path in sorted((repo_root / directory).glob(f"*{suffix}")):
+            if not is_fingerprinted(path.name):
+                sources.append(path)
+    return sources
+
+
+def main_js_callers(repo_root: Path) -> list[Path]:
+    # The other scripts and the partials: the only places that call into main.js by name.
+    scripts = [path for path in asset_sources(repo_root) if path.suffix == ".js" and path != repo_root / MAIN_JS]
+    return scripts + sorted((repo_root / "partials").glob("*.html"))
+
+
+def _hashed_asset(source: str, text: str) -> Asset:
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:HASH_LEN]
+    stem, ext = posixpath.splitext(source)
+    return Asset(source=source, output=f"{stem}.{digest}{ext}", text=text)
+
+
+def build_assets(repo_root: Path = REPO_ROOT) -> dict[str, Asset]:
+    """
+    Minify and hash every asset source, plus the main.js bundles. Returns {source rel or bundle key: Asset};
+    nothing is written.
+    """
+    assets: dict[str, Asset] = {}
+    for path in asset_sources(repo_root):
+        source = path.relative_to(repo_root).as_posix()
+        text = path.read_text(encoding="utf-8")
+        if path.suffix == ".css":
+            text = minify_css(text)
+        assets[source] = _hashed_asset(source, text)
+
+    if MAIN_JS in assets:
+        try:
+            bundles = build_bundles(assets[MAIN_JS].text, external_refs(main_js_callers(repo_root)))
+        except BundleError as exc:
+            print(f"Warning: can't split {MAIN_JS} into bundles ({exc}); every page gets the full file.")
+            bundles = {}
+        for page_type, text in bundles.items():
+            assets[f"{MAIN_JS}#{page_type}"] = _hashed_asset(MAIN_JS, text)
+    return assets
+
+
+def asset_manifest(assets: dict[str, Asset]) -> dict[str, str]:
+    return {source: asset.output for source, asset in sorted(assets.items())}
+
+
+def render_manifest(manifest: dict[str, str]) -> str:
+    return json.dumps(manifest, indent=2) + "\n"
+
+
+def page_bundle_type(doc: str) -> str | None:
+    """
+    The page type whose main.js bundle `doc` can use: its data-page, if its data-features are exactly that
+    type's FEATURES_BY_PAGE entry (main.js gates features on data-features, not on the page type).
+    """
+    body = BODY_RE.search(doc)
+    if body is None:
+        return None
+    page = DATA_PAGE_RE.search(body.group("attrs"))
+    features = DATA_FEATURES_RE.search(body.group("attrs"))
+    if page is None or features is None or page.group(1) not in FEATURES_BY_PAGE:
+        return None
+    return page.group(1) if set(features.group(1).split()) == set(FEATURES_BY_PAGE[page.group(1)]) else None
+
+
+def rewrite_asset_refs(doc: str, page_rel: str, manifest: dict[str, str]) -> str:
+    """
+    Point every local CSS/JS reference in `doc` at its hashed file, keeping the page's relative prefix and
+    dropping a `?v=N` query. main.js resolves to the page type's bundle where there is one. References to
+    files not in the manifest are left alone.
+    """
+    page_dir = posixpath.dirname(page_rel)
+    page_type = page_bundle_type(doc)
+
+    def replace(m: re.Match) -> str:
+        url = m.group("url")
+        if "//" in url or url.startswith(("/", "data:")):
+            return m.group(0)
+        logical = strip_fingerprint(url)
+        source = posixpath.normpath(posixpath.join(page_dir, logical))
+        target = (page_type and manifest.get(f"{source}#{page_type}")) or manifest.get(source)
+        if target is None:
+            return m.group(0)
+        query = m.group("query") or ""
+        if re.fullmatch(r"\?v=[\w.-]*", query):
+            query = ""
+        hashed_url = f"{posixpath.dirname(logical)}/{posixpath.basename(target)}" if "/" in logical else posixpath.basename(target)
+        return f"{m.group('attr')}{m.group('q')}{hashed_url}{query}{m.group('q')}"
+
+    return ASSET_REF_RE.sub(replace, doc)
+
+
+def stale_outputs(repo_root: Path, manifest: dict[str, str]) -> list[Path]:
+    # Hashed files from earlier runs that no source maps to any more.
+    current = set(manifest.values())
+    stale = []
+    for directory, suffix in ASSET_DIRS.items():
+        for path in sorted((repo_root / directory).glob(f"*{suffix}")):
+            if is_fingerprinted(path.name) and path.relative_to(repo_root).as_posix() not in current:
+                stale.append(path)
+    return stale
+
+
+def stage_assets(output: OutputBatch, repo_root: Path, assets: dict[str, Asset]) -> None:
+    for asset in {asset.output: asset for asset in assets.values()}.values():
+        output.write(repo_root / asset.output, asset.text)
+    output.write(repo_root / MANIFEST_PATH.name, render_manifest(asset_manifest(assets)))
+
+
+def remove_stale_outputs(repo_root: Path, manifest: dict[str, str], dry_run: bool) -> list[Path]:
+    stale = stale_outputs(repo_root, manifest)
+    for path in stale:
+        if not dry_run:
+            path.unlink()
+        print(f"{'Would remove' if dry_run else 'Removed'} stale {path.relative_to(repo_root).as_posix()}")
+    return stale
+
+
+def main(argv: list[str] | None = None) -> int:
+    from build import discover_pages, _read_page
+
+    parser = argparse.ArgumentParser(description="Write content-hashed CSS/JS and point every page at them.")
+    add_dry_run_argument(parser)
+    args = parser.parse_args(argv)
+
+    assets = build_assets(REPO_ROOT)
+    manifest = asset_manifest(assets)
+    output = OutputBatch(REPO_ROOT, dry_run=args.dry_run)
+    stage_assets(output, REPO_ROOT, assets)
+
+    pages = 0
+    for page in discover_pages(REPO_ROOT):
+        doc = _read_page(page.path)
+        if output.write(page.path, rewrite_asset_refs(doc, page.rel, manifest)):
+            pages += 1
+    changed = output.commit()
+    remove_stale_outputs(REPO_ROOT, manifest, args.dry_run)
+
+    print(
+        f"Fingerprinted {len(set(manifest.values()))} assets; {'would update' if args.dry_run else 'updated'} "
+        f"{len(changed) - pages} asset file(s) and {pages} page(s)."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,333 @@
+"""
+Generate sitemap.xml from the pages on disk.
+
+Every indexable page (not `noindex`, not a meta-refresh redirect stub) gets one <url>. Its <loc> is the
+page's own absolute <link rel="canonical">, falling back to `_canonical_path_for_file` (the breadcrumbs'
+URL logic) for pages that don't declare one. HU/EN translation pairs from HU_TO_EN / EN_TO_HU get reciprocal
+`xhtml:link` hreflang alternates (hu, en, and x-default -> hu), but only when both sides map to each other.
+
+<lastmod> follows the content: `.sitemap-state.json` keeps a SHA-256 of each page's own content as last
+published, and a page's date only moves when that changes. The digest covers the title, meta description,
+visible text and link/image targets, but not the shared header/footer placeholders, scripts, styles, inline
+SVG or asset fingerprints, so a site-wide rebuild (new navigation, new CSS hash) leaves every date alone. An
+icon counts by its slug, whether the page still has the <img> or the build inlined it (svg_icons).
+Pages the state doesn't know yet keep the <lastmod> the current sitemap already gives them, so regenerating
+never resets dates that crawlers have seen.
+
+Above --max-urls URLs (the protocol limit is 50,000), the URLs are split into sitemap-1.xml, sitemap-2.xml, ...
+and sitemap.xml becomes a sitemap index, so robots.txt keeps pointing at the same file.
+
+Usage:
+  python scripts/generate_sitemap.py
+  python scripts/generate_sitemap.py --dry-run
+  python scripts/generate_sitemap.py --check          # exit 1 if sitemap.xml is out of date
+  python scripts/generate_sitemap.py --max-urls 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import unquote
+from xml.sax.saxutils import escape, quoteattr
+
+from add_breadcrumbs_jsonld import BASE_URL, _canonical_path_for_file
+from build import discover_pages
+from fingerprint_assets import strip_fingerprint
+from html_blocks import find_blocks, splice_blocks
+from page_metadata import MetadataIndex
+from site_output import OutputBatch, add_dry_run_argument
+from svg_icons import icon_slug
+from sync_header_footer import EN_TO_HU, HU_TO_EN, PLACEHOLDER_IDS
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SITEMAP_PATH = REPO_ROOT / "sitemap.xml"
+STATE_PATH = REPO_ROOT / ".sitemap-state.json"
+STATE_VERSION = 2  # 1 hashed the whole file; its hashes aren't comparable, so the published dates carry over
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+XHTML_NS = "http://www.w3.org/1999/xhtml"
+MAX_URLS_PER_SITEMAP = 50_000
+
+SHARD_RE = re.compile(r"sitemap-(\d+)\.xml")
+
+# Legacy source copies of the EN pages (all noindex); the live EN pages are under en/.
+SKIP_PREFIXES = ("pages/en/",)
+
+# Elements whose text is not page content.
+NON_CONTENT_TAGS = {"script", "style", "svg", "template", "noscript"}
+# Attributes holding the link and image targets that belong to the content.
+CONTENT_URL_ATTRS = {"a": "href", "img": "src", "iframe": "src", "video": "src", "audio": "src", "source": "src"}
+VERSION_QUERY_RE = re.compile(r"\?v=[\w.-]*$")
+
+
+@dataclass
+class SitemapEntry:
+    rel: str
+    loc: str
+    sha256: str
+    lastmod: str = ""
+    alternates: dict[str, str] = field(default_factory=dict)  # hreflang -> URL
+
+
+class ContentDigest(HTMLParser):
+    """
+    SHA-256 over what a page says: text outside NON_CONTENT_TAGS, the meta description and content URLs.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._sha256 = hashlib.sha256()
+        self._skip = 0  # depth inside NON_CONTENT_TAGS
+
+    def _add(self, kind: str, value: str) -> None:
+        self._sha256.update(f"{kind}:{value}\n".encode("utf-8"))
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        a = {k.lower(): (v or "") for k, v in attrs}
+        if tag in NON_CONTENT_TAGS:
+            if tag == "svg" and self._skip == 0 and a.get("data-icon"):
+                self._add("icon", a["data-icon"])
+            self._skip += 1
+            return
+        if tag == "meta" and a.get("name", "").lower() == "description":
+            self._add("description", " ".join(a.get("content", "").split()))
+        elif self._skip == 0 and tag == "img" and a.get("src", "").lower().endswith(".svg"):
+            self._add("icon", icon_slug(unquote(a["src"])))
+        elif self._skip == 0 and a.get(CONTENT_URL_ATTRS.get(tag, "")):
+            url, hash_mark, fragment = a[CONTENT_URL_ATTRS[tag]].strip().partition("#")
+            self._add("url", strip_fingerprint(VERSION_QUERY_RE.sub("", url)) + hash_mark + fragment)
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag not in NON_CONTENT_TAGS:
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in NON_CONTENT_TAGS and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data: str) -> None:
+        text = " ".join(data.split())
+        if text and self._skip == 0:
+            self._add("text", text)
+
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
+
+
+def content_digest(doc: str) -> str:
+    """
+    Digest of the page's own content (see ContentDigest), with the header/footer placeholders cut out.
+    """
+    blocks = find_blocks(doc, PLACEHOLDER_IDS)
+    digest = ContentDigest()
+    digest.feed(splice_blocks(doc, blocks.values(), dict.fromkeys(blocks, "")))
+    digest.close()
+    return digest.hexdigest()
+
+
+def _page_rel(href: str) -> str:
+    # HU_TO_EN / EN_TO_HU targets are hrefs ("en/prices/", "./", "blog.html"); map them back to files.
+    href = href.removeprefix("./")
+    return f"{href}index.html" if not href or href.endswith("/") else href
+
+
+def _translation_pairs() -> list[tuple[str, str]]:
+    # Only true translations: the blog post -> EN blog listing fallback is not reciprocal, so it's dropped.
+    pairs = []
+    for hu_rel, en_href in HU_TO_EN.items():
+        en_rel = _page_rel(en_href)
+        if _page_rel(EN_TO_HU.get(en_rel, "")) == hu_rel:
+            pairs.append((hu_rel, en_rel))
+    return pairs
+
+
+def _loc_for_page(path: Path, canonical: str | None, lang: str) -> str | None:
+    if canonical and canonical.startswith(f"{BASE_URL}/"):
+        return canonical
+    canonical_path = _canonical_path_for_file(path, lang)
+    return f"{BASE_URL}{canonical_path}" if canonical_path is not None else None
+
+
+def collect_entries(repo_root: Path = REPO_ROOT) -> list[SitemapEntry]:
+    index = MetadataIndex(repo_root)
+    entries: dict[str, SitemapEntry] = {}
+    by_rel: dict[str, SitemapEntry] = {}
+    for page in discover_pages(repo_root):
+        if page.rel.startswith(SKIP_PREFIXES):
+            continue
+        doc = page.path.read_bytes().decode("utf-8", errors="replace")
+        meta = index.get(page.path, doc)
+        if meta is None or not meta.indexable:
+            continue
+        loc = _loc_for_page(page.path, meta.canonical, meta.language)
+        if loc is None:
+            continue
+        if loc in entries:
+            print(f"Warning: {page.rel} has the same URL as {entries[loc].rel} ({loc}); listing it once.")
+            continue
+        entry = SitemapEntry(rel=page.rel, loc=loc, sha256=content_digest(doc))
+        entries[loc] = by_rel[page.rel] = entry
+    index.save()
+
+    for hu_rel, en_rel in _translation_pairs():
+        hu, en = by_rel.get(hu_rel), by_rel.get(en_rel)
+        if hu is None or en is None:
+            continue
+        alternates = {"hu": hu.loc, "en": en.loc, "x-default": hu.loc}
+        hu.alternates = en.alternates = alternates
+
+    return sorted(entries.values(), key=lambda e: e.loc)
+
+
+def _published_lastmods(sitemap: Path) -> dict[str, str]:
+    # loc -> lastmod from the current sitemap (or from its shards, if it's an index).
+    try:
+        root = ET.parse(sitemap).getroot()
+    except (OSError, ET.ParseError):
+        return {}
+    ns = {"sm": SITEMAP_NS}
+    if root.tag == f"{{{SITEMAP_NS}}}sitemapindex":
+        lastmods: dict[str, str] = {}
+        for loc in root.iterfind("sm:sitemap/sm:loc", ns):
+            name = (loc.text or "").strip().rsplit("/", 1)[-1]
+            if SHARD_RE.fullmatch(name):
+                lastmods.update(_published_lastmods(sitemap.parent / name))
+        return lastmods
+    return {
+        (url.findtext("sm:loc", "", ns)).strip(): (url.findtext("sm:lastmod", "", ns)).strip()
+        for url in root.iterfind("sm:url", ns)
+    }
+
+
+def _load_state(path: Path) -> dict[str, dict]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data.get("pages", {}) if isinstance(data, dict) and data.get("version") == STATE_VERSION else {}
+
+
+def assign_lastmods(entries: list[SitemapEntry], state: dict[str, dict], published: dict[str, str], today: str) -> dict[str, dict]:
+    """
+    Set each entry's lastmod from the content-hash history and return the new state.
+    """
+    new_state: dict[str, dict] = {}
+    for entry in entries:
+        known = state.get(entry.loc)
+        if known is not None and known["sha256"] == entry.sha256:
+            entry.lastmod = known["lastmod"]
+        elif known is None and published.get(entry.loc):
+            # First sight of this page: trust the date crawlers already have.
+            entry.lastmod = published[entry.loc]
+        else:
+            entry.lastmod = today
+        new_state[entry.loc] = {"sha256": entry.sha256, "lastmod": entry.lastmod}
+    return new_state
+
+
+def render_urlset(entries: list[SitemapEntry]) -> str:
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<urlset xmlns="{SITEMAP_NS}" xmlns:xhtml="{XHTML_NS}">',
+    ]
+    for entry in entries:
+        lines.append("    <url>")
+        lines.append(f"        <loc>{escape(entry.loc)}</loc>")
+        lines.append(f"        <lastmod>{entry.lastmod}</lastmod>")
+        for hreflang, href in entry.alternates.items():
+            lines.append(f'        <xhtml:link rel="alternate" hreflang="{hreflang}" href={quoteattr(href)}/>')
+        lines.append("    </url>")
+    lines.append("</urlset>")
+    return "\n".join(lines) + "\n"
+
+
+def render_index(shards: list[tuple[str, str]]) -> str:
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', f'<sitemapindex xmlns="{SITEMAP_NS}">']
+    for name, lastmod in shards:
+        lines.append("    <sitemap>")
+        lines.append(f"        <loc>{escape(f'{BASE_URL}/{name}')}</loc>")
+        lines.append(f"        <lastmod>{lastmod}</lastmod>")
+        lines.append("    </sitemap>")
+    lines.append("</sitemapindex>")
+    return "\n".join(lines) + "\n"
+
+
+def render_sitemaps(entries: list[SitemapEntry], max_urls: int) -> dict[str, str]:
+    """
+    Filename -> XML. A single urlset in sitemap.xml, or shards plus an index once there are too many URLs.
+    """
+    if len(entries) <= max_urls:
+        return {SITEMAP_PATH.name: render_urlset(entries)}
+    files: dict[str, str] = {}
+    shards: list[tuple[str, str]] = []
+    for n, start in enumerate(range(0, len(entries), max_urls), start=1):
+        chunk = entries[start : start + max_urls]
+        name = f"sitemap-{n}.xml"
+        files[name] = render_urlset(chunk)
+        shards.append((name, max(e.lastmod for e in chunk)))
+    files[SITEMAP_PATH.name] = render_index(shards)
+    return files
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate sitemap.xml with hreflang alternates and content-based lastmod.")
+    parser.add_argument(
+        "--max-urls",
+        type=int,
+        default=MAX_URLS_PER_SITEMAP,
+        help="URLs per sitemap file before splitting into a sitemap index (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Write nothing; exit with 1 if sitemap.xml or .sitemap-state.json is out of date.",
+    )
+    add_dry_run_argument(parser)
+    args = parser.parse_args(argv)
+    if not 0 < args.max_urls <= MAX_URLS_PER_SITEMAP:
+        parser.error(f"--max-urls must be between 1 and {MAX_URLS_PER_SITEMAP}")
+
+    entries = collect_entries(REPO_ROOT)
+    today = datetime.now(timezone.utc).date().isoformat()
+    state = assign_lastmods(entries, _load_state(STATE_PATH), _published_lastmods(SITEMAP_PATH), today)
+    files = render_sitemaps(entries, args.max_urls)
+
+    output = OutputBatch(REPO_ROOT, dry_run=args.dry_run)
+    for name, text in files.items():
+        output.write(REPO_ROOT / name, text)
+    output.write(STATE_PATH, json.dumps({"version": STATE_VERSION, "pages": state}, indent=1) + "\n")
+    stale = sorted(p for p in REPO_ROOT.glob("sitemap-*.xml") if SHARD_RE.fullmatch(p.name) and p.name not in files)
+
+    if args.check:
+        outdated = [path.name for path in output.pending] + [path.name for path in stale]
+        for name in outdated:
+            print(f"Out of date: {name}")
+        print("Sitemap is up to date." if not outdated else "Run scripts/generate_sitemap.py to update it.")
+        return 1 if outdated else 0
+
+    changed = output.commit()
+    for path in stale:
+        if not args.dry_run:
+            os.unlink(path)
+        print(f"{'Would remove' if args.dry_run else 'Removed'} stale {path.name}")
+
+    shard_note = f" in {len(files) - 1} shards" if len(files) > 1 else ""
+    print(
+        f"Sitemap lists {len(entries)} URLs{shard_note}; "
+        f"{'would write' if args.dry_run else 'wrote'} {len(changed)} file(s)."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
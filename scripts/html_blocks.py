@@ -0,0 +1,106 @@
+"""
+Single-pass locator for `<div id="...">...</div>` blocks in a page.
+
+The document is tokenized once, left to right. Comments and the raw-text content of <script>, <style>,
+<textarea> and <template> are skipped as a whole, so a `<div` inside inline JS or a commented-out block
+can't unbalance the count. Every requested block is found in that one pass, and `splice_blocks` swaps
+any number of them in a single join, so replacing N regions costs O(document) rather than O(N * document).
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+
+
+TOKEN_RE = re.compile(r"<!--|<(?P<close>/?)(?P<tag>div|script|style|textarea|template)\b(?P<attrs>[^>]*)>", re.I)
+ID_RE = re.compile(r"""\bid\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.I)
+RAW_TEXT_END_RE = {
+    tag: re.compile(rf"</{tag}\s*>", re.I) for tag in ("script", "style", "textarea", "template")
+}
+
+
+@dataclass(frozen=True)
+class Block:
+    id: str
+    start: int  # start of the tag's line when the tag opens it (so `indent` is included), else the tag itself
+    end: int  # just past the matching </div>
+    indent: str  # whitespace before the tag on its line ("" when other content precedes it)
+
+
+def find_blocks(html: str, ids: Iterable[str]) -> dict[str, Block]:
+    """
+    Return the spans of the `<div id=...>` blocks named in `ids` (first occurrence of each).
+
+    Raises ValueError if a requested block is never closed.
+    """
+    wanted = set(ids)
+    found: dict[str, Block] = {}
+    # One entry per open <div>: (id if it's a wanted block else None, tag start).
+    stack: list[tuple[str | None, int]] = []
+    pos = 0
+    while True:
+        m = TOKEN_RE.search(html, pos)
+        if m is None:
+            break
+        if m.group(0) == "<!--":
+            end = html.find("-->", m.end())
+            pos = len(html) if end == -1 else end + 3
+            continue
+
+        tag = m.group("tag").lower()
+        if tag != "div":
+            if m.group("close"):
+                pos = m.end()
+                continue
+            end_m = RAW_TEXT_END_RE[tag].search(html, m.end())
+            pos = len(html) if end_m is None else end_m.end()
+            continue
+
+        pos = m.end()
+        if not m.group("close"):
+            block_id = None
+            if wanted:
+                id_m = ID_RE.search(m.group("attrs"))
+                if id_m is not None:
+                    value = next(g for g in id_m.groups() if g is not None)
+                    if value in wanted and value not in found:
+                        block_id = value
+            stack.append((block_id, m.start()))
+            continue
+
+        if not stack:
+            # Stray </div>: nothing to match, same as a browser would do.
+            continue
+        block_id, tag_start = stack.pop()
+        if block_id is None or block_id in found:
+            continue
+        line_start = html.rfind("\n", 0, tag_start) + 1
+        indent = html[line_start:tag_start]
+        if indent.strip(" \t"):
+            line_start, indent = tag_start, ""
+        found[block_id] = Block(id=block_id, start=line_start, end=m.end(), indent=indent)
+        if len(found) == len(wanted):
+            break
+
+    for block_id, _ in stack:
+        if block_id is not None and block_id not in found:
+            raise ValueError(f"Failed to find matching </div> for #{block_id} block")
+    return found
+
+
+def splice_blocks(html: str, blocks: Iterable[Block], replacements: Mapping[str, str]) -> str:
+    """
+    Replace each block whose id is in `replacements` with the given text, in one join.
+    """
+    parts: list[str] = []
+    pos = 0
+    for block in sorted((b for b in blocks if b.id in replacements), key=lambda b: b.start):
+        if block.start < pos:
+            raise ValueError(f"#{block.id} block overlaps another replaced block")
+        parts.append(html[pos : block.start])
+        parts.append(replacements[block.id])
+        pos = block.end
+    parts.append(html[pos:])
+    return "".join(parts)
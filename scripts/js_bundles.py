@@ -0,0 +1,353 @@
+"""
+Per-page-type builds of js/main.js that leave out the code of features a page doesn't use.
+
+main.js is one script of top-level function declarations plus a small boot block that calls each feature's
+entry point only when the page declares it in `<body data-features>`:
+
+    e.has("reference-search")&&initReferenceSearch(), ...
+
+The pages' data-features come from FEATURES_BY_PAGE (set_page_features.py), so for each feature set in that
+table the build knows which entry points can never run. The bundle for a feature set is main.js with every
+top-level function removed that is only reachable through those entry points; helpers shared with a kept
+feature or with the boot code stay. The boot block itself is kept verbatim: its calls to removed entry points
+sit behind `e.has(...)` checks that are false on those pages, so the missing names are never evaluated.
+Functions named in the other scripts or in partials/ (the header's `onclick="closeMobileSecondaryNav()"`)
+are global API and always stay; pages call main.js only through those.
+
+Splitting needs a real tokenizer (strings, template literals, regex literals and comments can all contain
+braces), so it is done here rather than with a regex. If main.js can't be split cleanly - the tokens don't
+reassemble to the source, or an entry point isn't a top-level function - `BundleError` is raised and the
+build keeps serving the full main.js.
+
+Usage:
+  python scripts/js_bundles.py   # print each page type's bundle size against the full main.js
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from set_page_features import FEATURES_BY_PAGE
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MAIN_JS = "js/main.js"
+
+# Feature name -> the top-level functions main.js's boot block calls for it.
+FEATURE_ENTRY_POINTS: dict[str, tuple[str, ...]] = {
+    "latest-blogs": ("loadLatestBlogs",),
+    "reference-search": ("initReferenceSearch",),
+    "reference-table-scrollbar": ("initReferenceTableScrollbar",),
+    "client-marquee": ("scheduleClientMarqueeInit",),
+    "client-marquee-bg": ("deferClientMarqueeBackground",),
+    "text-galleries": ("initTextGalleries",),
+    "square-patterns": ("deferSquarePatternsInit",),
+    "faq": ("initFaqAccordion",),
+    "services-row": ("initServicesRowAlignment",),
+    "drag-scroll": ("initHorizontalDragScroll",),
+}
+
+IDENT_RE = re.compile(r"[A-Za-z_$\u0080-\uffff][\w$\u0080-\uffff]*")
+NUMBER_RE = re.compile(r"\d[\w.]*|\.\d[\w]*")
+# After one of these a "/" starts a regex literal rather than a division.
+REGEX_AFTER_PUNCT = set("(,=:[!&|?{};+-*%<>~^")
+REGEX_AFTER_KEYWORDS = {
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw", "case", "do", "else",
+    "yield", "await",
+}
+
+
+class BundleError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Token:
+    kind: str  # "ident", "punct", "string", "template", "regex", "number", "comment", "space"
+    text: str
+    start: int
+
+
+@dataclass
+class TopLevelFunction:
+    name: str
+    start: int
+    end: int
+    refs: set[str] = field(default_factory=set)  # identifiers its body uses
+
+
+def _scan_string(js: str, i: int) -> int:
+    quote = js[i]
+    i += 1
+    while i < len(js):
+        c = js[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == quote:
+            return i + 1
+        if c == "\n":
+            break
+        i += 1
+    raise BundleError(f"unterminated string at offset {i}")
+
+
+def _scan_template_chunk(js: str, i: int) -> tuple[int, bool]:
+    # From just inside a template (after "`" or a closing "}"), up to and including "`" or "${".
+    # Returns (end, True if it stopped at "${").
+    while i < len(js):
+        c = js[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "`":
+            return i + 1, False
+        if c == "$" and js.startswith("${", i):
+            return i + 2, True
+        i += 1
+    raise BundleError("unterminated template literal")
+
+
+def _scan_regex(js: str, i: int) -> int:
+    i += 1
+    in_class = False
+    while i < len(js):
+        c = js[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "\n":
+            break
+        if c == "[":
+            in_class = True
+        elif c == "]":
+            in_class = False
+        elif c == "/" and not in_class:
+            i += 1
+            while i < len(js) and (js[i].isalnum() or js[i] in "_$"):
+                i += 1
+            return i
+        i += 1
+    raise BundleError(f"unterminated regex literal at offset {i}")
+
+
+def tokenize(js: str) -> list[Token]:
+    """
+    Split JavaScript into tokens precisely enough to match braces and find identifiers. Operators are
+    single-character "punct" tokens; the concatenated token texts always equal `js`.
+    """
+    tokens: list[Token] = []
+    template_depths: list[int] = []  # brace depth at each open "${"
+    depth = 0
+    prev: Token | None = None  # last token that isn't space or a comment
+    i, n = 0, len(js)
+    while i < n:
+        c = js[i]
+        if c.isspace():
+            j = i + 1
+            while j < n and js[j].isspace():
+                j += 1
+            kind = "space"
+        elif js.startswith("//", i):
+            j = js.find("\n", i)
+            j = n if j < 0 else j
+            kind = "comment"
+        elif js.startswith("/*", i):
+            j = js.find("*/", i + 2)
+            if j < 0:
+                raise BundleError("unterminated comment")
+            j += 2
+            kind = "comment"
+        elif c in "'\"":
+            j, kind = _scan_string(js, i), "string"
+        elif c == "`" or (c == "}" and template_depths and template_depths[-1] == depth):
+            if c == "}":
+                template_depths.pop()
+            j, opened = _scan_template_chunk(js, i + 1)
+            if opened:
+                template_depths.append(depth)
+            kind = "template"
+        elif c == "/" and (
+            prev is None
+            or (prev.kind == "punct" and prev.text in REGEX_AFTER_PUNCT)
+            or (prev.kind == "ident" and prev.text in REGEX_AFTER_KEYWORDS)
+        ):
+            j, kind = _scan_regex(js, i), "regex"
+        elif m := IDENT_RE.match(js, i):
+            j, kind = m.end(), "ident"
+        elif m := NUMBER_RE.match(js, i):
+            j, kind = m.end(), "number"
+        else:
+            j, kind = i + 1, "punct"
+            if c in "{([":
+                depth += 1
+            elif c in "})]":
+                depth -= 1
+        token = Token(kind, js[i:j], i)
+        tokens.append(token)
+        if kind not in ("space", "comment"):
+            prev = token
+        i = j
+    if depth != 0 or template_depths:
+        raise BundleError("unbalanced brackets")
+    return tokens
+
+
+def _identifier_refs(tokens: list[Token]) -> set[str]:
+    # Identifiers used as names, not as `.property` accesses.
+    refs = set()
+    prev: Token | None = None
+    for token in tokens:
+        if token.kind == "ident" and not (prev is not None and prev.kind == "punct" and prev.text == "."):
+            refs.add(token.text)
+        if token.kind not in ("space", "comment"):
+            prev = token
+    return refs
+
+
+def split_top_level(js: str) -> tuple[list[TopLevelFunction], set[str]]:
+    """
+    Find the top-level function declarations in `js`. Returns them (with the identifiers each one uses)
+    and the identifiers used by everything else at the top level.
+    """
+    tokens = tokenize(js)
+    if "".join(t.text for t in tokens) != js:
+        raise BundleError("tokens don't reassemble to the source")
+    code = [t for t in tokens if t.kind not in ("space", "comment")]
+
+    functions: list[TopLevelFunction] = []
+    outside: list[Token] = []
+    depth = 0
+    k = 0
+    while k < len(code):
+        token = code[k]
+        at_statement_start = k == 0 or (code[k - 1].kind == "punct" and code[k - 1].text in ";}")
+        if depth == 0 and at_statement_start and token.kind == "ident" and token.text in ("function", "async"):
+            start = k
+            if token.text == "async":
+                k += 1
+            if k < len(code) and code[k].text == "function":
+                k += 1
+                if k < len(code) and code[k].text == "*":
+                    k += 1
+                if k < len(code) and code[k].kind == "ident" and k + 1 < len(code) and code[k + 1].text == "(":
+                    name = code[k].text
+                    end = _matching_close(code, _matching_close(code, k + 1) + 1)
+                    body = code[start : end + 1]
+                    functions.append(
+                        TopLevelFunction(name, code[start].start, body[-1].start + 1, _identifier_refs(body))
+                    )
+                    k = end + 1
+                    continue
+            k = start
+        if token.kind == "punct":
+            depth += token.text in "{(["
+            depth -= token.text in "})]"
+        outside.append(token)
+        k += 1
+    return functions, _identifier_refs(outside)
+
+
+def _matching_close(code: list[Token], k: int) -> int:
+    # Index of the bracket closing the one at code[k] (skipping to the next "{" if code[k] isn't one).
+    while k < len(code) and code[k].text not in "({[":
+        k += 1
+    depth = 0
+    for j in range(k, len(code)):
+        if code[j].kind != "punct":
+            continue
+        if code[j].text in "({[":
+            depth += 1
+        elif code[j].text in ")}]":
+            depth -= 1
+            if depth == 0:
+                return j
+    raise BundleError("unbalanced brackets")
+
+
+def bundle_for_features(js: str, features: list[str] | set[str], external_refs: set[str] = frozenset()) -> str:
+    """
+    `js` without the top-level functions only the entry points of features outside `features` can reach.
+    `external_refs` are names other code may call, which are kept like the boot block's own references.
+    """
+    functions, roots = split_top_level(js)
+    by_name: dict[str, list[TopLevelFunction]] = {}
+    for fn in functions:
+        by_name.setdefault(fn.name, []).append(fn)
+    missing = sorted(name for names in FEATURE_ENTRY_POINTS.values() for name in names if name not in by_name)
+    if missing:
+        raise BundleError(f"feature entry points are not top-level functions: {', '.join(missing)}")
+
+    excluded = {name for feature, names in FEATURE_ENTRY_POINTS.items() if feature not in features for name in names}
+    # The boot block's calls to excluded entry points are gated off; other code's calls aren't.
+    pending = [name for name in roots if name in by_name and name not in excluded]
+    pending += [name for name in external_refs if name in by_name]
+    pending += [name for feature in features for name in FEATURE_ENTRY_POINTS.get(feature, ())]
+    reachable: set[str] = set()
+    while pending:
+        name = pending.pop()
+        if name in reachable:
+            continue
+        reachable.add(name)
+        for fn in by_name[name]:
+            pending.extend(ref for ref in fn.refs if ref in by_name and ref not in reachable)
+
+    # Declarations are hoisted, so dropping some never changes what the rest of the script sees.
+    parts = []
+    pos = 0
+    for fn in functions:
+        if fn.name not in reachable:
+            parts.append(js[pos : fn.start])
+            pos = fn.end
+    parts.append(js[pos:])
+    return "".join(parts)
+
+
+def external_refs(paths: list[Path]) -> set[str]:
+    # Every identifier-like word in the given files; over-matching only keeps more.
+    refs: set[str] = set()
+    for path in paths:
+        refs.update(IDENT_RE.findall(path.read_text(encoding="utf-8")))
+    return refs
+
+
+def build_bundles(js: str, external: set[str] = frozenset()) -> dict[str, str]:
+    """
+    Page type -> bundle of `js` (main.js), for every page type in FEATURES_BY_PAGE.
+    """
+    by_features: dict[frozenset[str], str] = {}
+    bundles: dict[str, str] = {}
+    for page_type, features in FEATURES_BY_PAGE.items():
+        key = frozenset(features)
+        if key not in by_features:
+            by_features[key] = bundle_for_features(js, key, external)
+        bundles[page_type] = by_features[key]
+    return bundles
+
+
+def main(argv: list[str] | None = None) -> int:
+    from fingerprint_assets import main_js_callers
+
+    parser = argparse.ArgumentParser(description="Report the per-page-type main.js bundle sizes.")
+    parser.parse_args(argv)
+
+    js = (REPO_ROOT / MAIN_JS).read_text(encoding="utf-8")
+    full = len(js.encode("utf-8"))
+    try:
+        bundles = build_bundles(js, external_refs(main_js_callers(REPO_ROOT)))
+    except BundleError as exc:
+        print(f"Can't split {MAIN_JS}: {exc}")
+        return 1
+    width = max(len(page_type) for page_type in bundles)
+    print(f"{MAIN_JS}: {full} bytes")
+    for page_type, text in bundles.items():
+        size = len(text.encode("utf-8"))
+        print(f"  {page_type:<{width}}  {size:6} bytes  {size / full:4.0%}  {' '.join(FEATURES_BY_PAGE[page_type])}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,7 +1,13 @@
+import argparse
 import os
+import posixpath
 import re
 from pathlib import Path
 
+from critical_css import StylesheetCache, critical_css
+from fingerprint_assets import strip_fingerprint
+from site_output import OutputBatch, add_dry_run_argument
+
 
 TARGET_CSS_FILENAMES = {
     "main.css",
@@ -30,16 +36,81 @@ NOSCRIPT_RE = re.compile(
     r'^(?P<indent>\s*)<noscript><link\s+rel="stylesheet"\s+href="(?P<href>[^"]+)"></noscript>\s*$'
 )
 
+# Generated by inline_critical_css; everything inside is replaced on each run.
+CRITICAL_STYLE_OPEN = "<style data-critical-css>"
+CRITICAL_BLOCK_RE = re.compile(r"^[ \t]*<style data-critical-css>.*?</style>[ \t]*\n?", re.M | re.S)
+
 
 def is_target_css_href(href: str) -> bool:
-    # We only touch the known global CSS bundle files, regardless of relative path.
+    # We only touch the known global CSS bundle files, regardless of relative path or content hash.
+    href = strip_fingerprint(href)
     return any(href.endswith("/" + name) or href.endswith(name) for name in TARGET_CSS_FILENAMES)
 
-def is_blocking_css_href(href: str) -> bool:
-    return any(href.endswith("/" + name) or href.endswith(name) for name in BLOCKING_CSS_FILENAMES)
-
-
-def normalize_css_loading(lines: list[str]) -> tuple[list[str], bool]:
+def is_blocking_css_href(href: str, blocking: set[str] | frozenset[str] = BLOCKING_CSS_FILENAMES) -> bool:
+    href = strip_fingerprint(href)
+    return any(href.endswith("/" + name) or href.endswith(name) for name in blocking)
+
+
+def has_critical_css(doc: str) -> bool:
+    return CRITICAL_STYLE_OPEN in doc
+
+
+def _body_data(doc: str, name: str) -> str | None:
+    body = re.search(r"<body[^>]*>", doc, flags=re.IGNORECASE)
+    if body is None:
+        return None
+    m = re.search(rf'\sdata-{name}="([^"]*)"', body.group(0))
+    return m.group(1) if m else None
+
+
+def inline_critical_css(doc: str, page_path: Path, cache: StylesheetCache) -> str:
+    """
+    Inline the page's critical CSS (see critical_css.py) in a <style data-critical-css> block just above its
+    first global stylesheet link, replacing the block from a previous run. The stylesheets are the target
+    files the page links, in link order; their relative url()s are rebased from the stylesheet's directory to
+    the page's. Pages without any (or whose stylesheets can't be read) get no block.
+    """
+    doc = CRITICAL_BLOCK_RE.sub("", doc)
+    lines = doc.splitlines(keepends=True)
+
+    first_line = None
+    hrefs: list[str] = []
+    for i, line in enumerate(lines):
+        m = STYLESHEET_RE.match(line) or PRELOAD_RE.match(line)
+        if m and is_target_css_href(m.group("href")):
+            if first_line is None:
+                first_line = i
+            if m.group("href") not in hrefs:
+                hrefs.append(m.group("href"))
+    if first_line is None:
+        return doc
+
+    sheets = []
+    base_dirs = []
+    for href in hrefs:
+        if "//" in href:
+            return doc
+        path = href.split("?", 1)[0].split("#", 1)[0]
+        # Always cut from the source file, even when the page already links its hashed copy.
+        rules = cache.get((page_path.parent / strip_fingerprint(path)).resolve())
+        if rules is None:
+            return doc
+        sheets.append(rules)
+        base_dirs.append(posixpath.dirname(path))
+
+    features = (_body_data(doc, "features") or "").split()
+    css = critical_css(doc, sheets, _body_data(doc, "page"), features, base_dirs)
+    if not css:
+        return doc
+    indent = re.match(r"[ \t]*", lines[first_line]).group(0)
+    block = f"{indent}{CRITICAL_STYLE_OPEN}\n{indent}{css}\n{indent}</style>\n"
+    return "".join(lines[:first_line]) + block + "".join(lines[first_line:])
+
+
+def normalize_css_loading(
+    lines: list[str], blocking: set[str] | frozenset[str] = BLOCKING_CSS_FILENAMES
+) -> tuple[list[str], bool]:
+    # With critical CSS inlined, pass blocking=frozenset(): every global stylesheet can then load async.
     handled: set[str] = set()
     out: list[str] = []
     changed = False
@@ -83,7 +154,7 @@ def normalize_css_loading(lines: list[str]) -> tuple[list[str], bool]:
 
             handled.add(href)
 
-            if is_blocking_css_href(href):
+            if is_blocking_css_href(href, blocking):
                 # Core CSS should be blocking to avoid FOUC / layout jumps.
                 out.append(f'{indent}<link rel="stylesheet" href="{href}">\n')
                 changed = True
@@ -116,8 +187,18 @@ def normalize_css_loading(lines: list[str]) -> tuple[list[str], bool]:
     return out, changed
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Normalize the global CSS <link> tags in every page.")
+    parser.add_argument(
+        "--no-critical",
+        action="store_true",
+        help="Don't inline per-page critical CSS; keep main.css/components.css render-blocking instead.",
+    )
+    add_dry_run_argument(parser)
+    args = parser.parse_args(argv)
+
     repo_root = Path(__file__).resolve().parent.parent
+    output = OutputBatch(repo_root, dry_run=args.dry_run)
     html_files: list[Path] = []
     for root, _, files in os.walk(repo_root):
         # Skip node_modules if it exists (not expected here, but safe).
@@ -127,6 +208,7 @@ def main() -> None:
             if f.lower().endswith(".html"):
                 html_files.append(Path(root) / f)
 
+    cache = StylesheetCache()
     changed_files: list[Path] = []
     for path in sorted(html_files):
         try:
@@ -135,15 +217,17 @@ def main() -> None:
             # Fall back to a more permissive read (keeps file editable on Windows locales).
             original = path.read_text(encoding="utf-8", errors="replace")
 
-        lines = original.splitlines(keepends=True)
-        new_lines, changed = normalize_css_loading(lines)
+        doc = CRITICAL_BLOCK_RE.sub("", original) if args.no_critical else inline_critical_css(original, path, cache)
+        lines = doc.splitlines(keepends=True)
+        new_lines, changed = normalize_css_loading(lines, frozenset() if has_critical_css(doc) else BLOCKING_CSS_FILENAMES)
+        changed = changed or doc != original
 
-        if changed and "".join(new_lines) != original:
-            path.write_text("".join(new_lines), encoding="utf-8")
+        if changed and "".join(new_lines) != original and output.write(path, "".join(new_lines)):
             changed_files.append(path)
+    output.commit()
 
     print(f"Processed {len(html_files)} HTML files.")
-    print(f"Updated {len(changed_files)} files:")
+    print(f"{'Would update' if args.dry_run else 'Updated'} {len(changed_files)} files:")
     for p in changed_files:
         print(f"- {p.relative_to(repo_root)}")
 
@@ -0,0 +1,222 @@
+"""
+One-pass page metadata extraction, plus an on-disk index so tools don't re-parse the site.
+
+`extract_metadata` walks a document once with HTMLParser and collects what the scripts otherwise dig out
+with separate regexes: <html lang>, <title>, the first <h1>, meta description / robots / refresh, canonical URL,
+hreflang alternates, the <body> data-* attributes (data-page / data-features), outbound links and referenced assets.
+
+`MetadataIndex` keeps those results in `.page-metadata.json`, keyed by repo-relative path and revalidated
+against (mtime, size), so a page is only parsed again after it changed on disk.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from html.parser import HTMLParser
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+INDEX_PATH = REPO_ROOT / ".page-metadata.json"
+INDEX_VERSION = 2
+
+# <link rel> values that point at other documents rather than at assets the page loads.
+NON_ASSET_LINK_RELS = {"canonical", "alternate", "author", "help", "license", "next", "prev", "search", "dns-prefetch", "preconnect"}
+
+
+@dataclass
+class PageMetadata:
+    lang: str | None = None  # as written in <html lang>, None if absent
+    title: str | None = None
+    h1: str | None = None
+    description: str | None = None
+    robots: str | None = None  # <meta name="robots" content>
+    refresh: str | None = None  # <meta http-equiv="refresh" content>, i.e. a client-side redirect
+    canonical: str | None = None
+    alternates: dict[str, str] = field(default_factory=dict)  # hreflang -> href
+    body: dict[str, str] = field(default_factory=dict)  # data-* attributes on <body>
+    links: list[str] = field(default_factory=list)  # <a href>, in document order, deduplicated
+    assets: list[str] = field(default_factory=list)  # stylesheets, scripts, images, media, icons
+
+    @property
+    def language(self) -> str:
+        # Same default as add_breadcrumbs_jsonld._get_lang: untagged pages are Hungarian.
+        return self.lang.strip().lower() if self.lang is not None else "hu"
+
+    @property
+    def indexable(self) -> bool:
+        # Pages a search engine should list: not noindex, and not a redirect stub.
+        return self.refresh is None and "noindex" not in (self.robots or "").lower()
+
+    @property
+    def page_type(self) -> str | None:
+        return self.body.get("data-page")
+
+    @property
+    def features(self) -> list[str]:
+        return self.body.get("data-features", "").split()
+
+
+class MetadataExtractor(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.meta = PageMetadata()
+        self._capture: str | None = None  # "title" / "h1" while inside the first such element
+        self._text: list[str] = []
+        self._seen_links: set[str] = set()
+        self._seen_assets: set[str] = set()
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        a = {k.lower(): (v or "") for k, v in attrs}
+        meta = self.meta
+
+        if tag == "html" and "lang" in a and meta.lang is None:
+            meta.lang = a["lang"]
+        elif tag == "body":
+            meta.body = {k: v for k, v in a.items() if k.startswith("data-")}
+        elif tag in ("title", "h1") and self._capture is None and getattr(meta, tag) is None:
+            self._capture = tag
+            self._text = []
+        elif tag == "meta":
+            name = a.get("name", "").lower()
+            if name == "description" and meta.description is None:
+                meta.description = a.get("content", "")
+            elif name == "robots" and meta.robots is None:
+                meta.robots = a.get("content", "")
+            elif a.get("http-equiv", "").lower() == "refresh" and meta.refresh is None:
+                meta.refresh = a.get("content", "")
+        elif tag == "link":
+            rels = set(a.get("rel", "").lower().split())
+            href = a.get("href")
+            if not href:
+                return
+            if "canonical" in rels and meta.canonical is None:
+                meta.canonical = href
+            elif "alternate" in rels and "hreflang" in a:
+                meta.alternates.setdefault(a["hreflang"], href)
+            elif not rels & NON_ASSET_LINK_RELS:
+                self._add_asset(href)
+        elif tag == "a":
+            href = a.get("href")
+            if href and href not in self._seen_links:
+                self._seen_links.add(href)
+                meta.links.append(href)
+        elif tag in ("script", "img", "source", "video", "audio", "iframe", "embed", "track", "input"):
+            for name in ("src", "poster"):
+                if a.get(name):
+                    self._add_asset(a[name])
+            for candidate in a.get("srcset", "").split(","):
+                url = candidate.strip().split(" ")[0]
+                if url:
+                    self._add_asset(url)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == self._capture:
+            # Same text as the regex helpers produced: tags dropped, entities decoded, outer whitespace stripped.
+            setattr(self.meta, tag, "".join(self._text).strip())
+            self._capture = None
+
+    def handle_data(self, data: str) -> None:
+        if self._capture is not None:
+            self._text.append(data)
+
+    def _add_asset(self, url: str) -> None:
+        if url not in self._seen_assets:
+            self._seen_assets.add(url)
+            self.meta.assets.append(url)
+
+
+def extract_metadata(doc: str) -> PageMetadata:
+    parser = MetadataExtractor()
+    parser.feed(doc)
+    parser.close()
+    return parser.meta
+
+
+class MetadataIndex:
+    """
+    Persistent path -> PageMetadata map for the site. Lookups stat the page and only re-parse it when its
+    (mtime, size) no longer matches the stored entry; call save() to write new entries back. Thread-safe.
+    """
+
+    def __init__(self, repo_root: Path = REPO_ROOT, path: Path | None = None):
+        self.repo_root = repo_root
+        self.path = path if path is not None else repo_root / INDEX_PATH.name
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        self._dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == INDEX_VERSION:
+            self._entries = data.get("pages", {})
+
+    def get(self, file_path: Path, doc: str | None = None) -> PageMetadata | None:
+        """
+        Metadata for a page on disk, or None if it can't be read. Pass `doc` if the caller already read the
+        page, so a stale entry is re-parsed without reading the file again.
+        """
+        rel = file_path.relative_to(self.repo_root).as_posix()
+        try:
+            st = file_path.stat()
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(rel)
+        if entry is not None and (entry["mtime_ns"], entry["size"]) == (st.st_mtime_ns, st.st_size):
+            return PageMetadata(**entry["meta"])
+        if doc is None:
+            try:
+                doc = file_path.read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                return None
+        meta = extract_metadata(doc)
+        self.put(file_path, st.st_mtime_ns, st.st_size, meta)
+        return meta
+
+    def put(self, file_path: Path, mtime_ns: int, size: int, meta: PageMetadata) -> None:
+        """
+        Record metadata a caller already extracted (e.g. the build, right after writing a page).
+        """
+        rel = file_path.relative_to(self.repo_root).as_posix()
+        with self._lock:
+            self._entries[rel] = {"mtime_ns": mtime_ns, "size": size, "meta": asdict(meta)}
+            self._dirty = True
+
+    def prune(self, keep: set[str]) -> None:
+        with self._lock:
+            for rel in self._entries.keys() - keep:
+                del self._entries[rel]
+                self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": INDEX_VERSION, "pages": dict(sorted(self._entries.items()))}
+            self._dirty = False
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def main() -> int:
+    # Refresh the whole index (only new or changed pages are parsed).
+    from build import discover_pages
+
+    index = MetadataIndex()
+    pages = discover_pages(REPO_ROOT)
+    for page in pages:
+        index.get(page.path)
+    index.prune({page.rel for page in pages})
+    index.save()
+    print(f"Indexed {len(pages)} pages in {index.path.relative_to(REPO_ROOT)}.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
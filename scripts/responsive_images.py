@@ -0,0 +1,415 @@
+"""
+Intrinsic image sizes read from the files themselves, and the <img> markup that uses them.
+
+Every AVIF, WebP, PNG, JPEG and SVG under images/ is measured from its own header (PNG IHDR, the WebP
+VP8/VP8L/VP8X frame header, the JPEG SOF segment, the AVIF `ispe` property, the SVG root's width/height or
+viewBox; nothing is decoded) and
+listed in `image-manifest.json` with its size in bytes. Variants of one image are the files that share a
+path stem (`slider_bg.avif` / `slider_bg.webp`); a variant that has the same dimensions as a sibling but more
+bytes is flagged with `larger_than`, since the sibling could be served instead.
+
+The page stage then gives every local <img>:
+  - `width`/`height` from the manifest, when it has neither, so the browser reserves its box (CLS);
+  - `loading="lazy"` and `decoding="async"`, unless it is above the fold (the same header + first sections
+    critical_css inlines styles for), where lazy loading would delay the LCP image;
+  - a <picture> with <source> elements for smaller AVIF/WebP variants of the same dimensions.
+Attributes a page already sets are never changed, and images already inside a <picture> aren't wrapped again.
+
+Re-encoding or resizing images needs an image library; this only measures and reports them.
+
+Usage:
+  python scripts/responsive_images.py             # write image-manifest.json, annotate every page's <img>
+  python scripts/responsive_images.py --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import posixpath
+import re
+import struct
+from dataclasses import dataclass, replace
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import unquote
+
+from critical_css import fold_elements, parse_dom
+from fingerprint_assets import is_fingerprinted
+from site_output import OutputBatch, add_dry_run_argument
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MANIFEST_PATH = REPO_ROOT / "image-manifest.json"
+IMAGE_DIR = "images"
+
+MIME_TYPES = {
+    ".avif": "image/avif",
+    ".webp": "image/webp",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".svg": "image/svg+xml",
+}
+# Offered as <source> alternatives, most efficient first.
+SOURCE_FORMATS = (".avif", ".webp")
+# PNG and WebP keep their dimensions in the first 30 bytes; AVIF's meta box and the JPEG frame header (after
+# any EXIF/ICC segments) are near the start of the file.
+HEADER_BYTES = 64 * 1024
+
+# Start-of-frame markers (baseline, progressive, lossless, arithmetic); not DHT (C4), JPG (C8) or DAC (CC).
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+SVG_ROOT_RE = re.compile(r"<svg\b[^>]*>", re.IGNORECASE)
+SVG_ATTR_RE = re.compile(r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+SVG_LENGTH_RE = re.compile(r"\s*([\d.]+)\s*(?:px)?\s*")
+
+
+@dataclass(frozen=True)
+class ImageInfo:
+    path: str  # repo-relative, e.g. "images/slider_bg.webp"
+    mime: str
+    width: int
+    height: int
+    bytes: int
+    larger_than: str | None = None  # a same-sized sibling variant with fewer bytes
+
+
+def _png_size(data: bytes) -> tuple[int, int] | None:
+    if data[:8] != b"\x89PNG\r\n\x1a\n" or data[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", data[16:24])
+
+
+def _webp_size(data: bytes) -> tuple[int, int] | None:
+    if data[:4] != b"RIFF" or data[8:12] != b"WEBP" or len(data) < 30:
+        return None
+    chunk = data[12:16]
+    if chunk == b"VP8 " and data[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and data[20] == 0x2F:
+        bits = int.from_bytes(data[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+    return None
+
+
+def _jpeg_size(data: bytes) -> tuple[int, int] | None:
+    if data[:2] != b"\xff\xd8":
+        return None
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:  # standalone markers, no length
+            pos += 2
+            continue
+        if marker in (0xD9, 0xDA):  # end of image / start of scan: no frame header before the data
+            return None
+        (length,) = struct.unpack(">H", data[pos + 2 : pos + 4])
+        if length < 2:
+            return None
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", data[pos + 5 : pos + 9])
+            return (width, height) if width and height else None
+        pos += 2 + length
+    return None
+
+
+def _boxes(data: bytes, start: int, end: int):
+    # ISO BMFF boxes in data[start:end] as (type, payload start, payload end).
+    pos = start
+    while pos + 8 <= end:
+        size, kind = struct.unpack(">I4s", data[pos : pos + 8])
+        header = 8
+        if size == 1:
+            size, header = struct.unpack(">Q", data[pos + 8 : pos + 16])[0], 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            return
+        yield kind, pos + header, min(pos + size, end)
+        pos += size
+
+
+def _avif_size(data: bytes) -> tuple[int, int] | None:
+    # meta (a full box: 4 bytes of version/flags) > iprp > ipco > ispe. Alpha planes and thumbnails carry
+    # their own ispe; the largest one is the image itself.
+    sizes = []
+    for kind, start, end in _boxes(data, 0, len(data)):
+        if kind != b"meta":
+            continue
+        for kind, start, end in _boxes(data, start + 4, end):
+            if kind != b"iprp":
+                continue
+            for kind, start, end in _boxes(data, start, end):
+                if kind != b"ipco":
+                    continue
+                for kind, start, end in _boxes(data, start, end):
+                    if kind == b"ispe" and end - start >= 12:
+                        sizes.append(struct.unpack(">II", data[start + 4 : start + 12]))
+    return max(sizes, key=lambda s: s[0] * s[1]) if sizes else None
+
+
+def _svg_length(value: str | None) -> float | None:
+    # Only absolute lengths count; "100%" or "2em" depend on where the image is used.
+    m = SVG_LENGTH_RE.fullmatch(value or "")
+    return float(m.group(1)) if m else None
+
+
+def _svg_size(data: bytes) -> tuple[int, int] | None:
+    root = SVG_ROOT_RE.search(data.decode("utf-8", errors="replace"))
+    if root is None:
+        return None
+    attrs = {name.lower(): a if a is not None else b for name, a, b in SVG_ATTR_RE.findall(root.group(0))}
+    width, height = _svg_length(attrs.get("width")), _svg_length(attrs.get("height"))
+    view_box = [float(v) for v in re.split(r"[\s,]+", attrs.get("viewbox", "").strip()) if v][2:4]
+    if len(view_box) == 2 and all(view_box):
+        vb_width, vb_height = view_box
+        if width is None and height is None:
+            width, height = vb_width, vb_height
+        elif height is None:
+            height = width * vb_height / vb_width
+        elif width is None:
+            width = height * vb_width / vb_height
+    if not width or not height:
+        return None
+    return round(width), round(height)
+
+
+SIZE_READERS = {
+    ".avif": _avif_size,
+    ".webp": _webp_size,
+    ".png": _png_size,
+    ".jpg": _jpeg_size,
+    ".jpeg": _jpeg_size,
+    ".svg": _svg_size,
+}
+
+
+def image_size(path: Path) -> tuple[int, int] | None:
+    """
+    (width, height) from the file's header, or None if the format isn't recognised.
+    """
+    reader = SIZE_READERS.get(path.suffix.lower())
+    if reader is None:
+        return None
+    with path.open("rb") as f:
+        data = f.read() if path.suffix.lower() == ".svg" else f.read(HEADER_BYTES)
+    try:
+        return reader(data)
+    except (struct.error, ValueError, IndexError):
+        return None
+
+
+def collect_images(repo_root: Path = REPO_ROOT) -> dict[str, ImageInfo]:
+    """
+    Measure every image under images/. Returns {repo-relative path: ImageInfo}, flagging oversized variants.
+    """
+    measured: dict[str, ImageInfo] = {}
+    for path in sorted((repo_root / IMAGE_DIR).rglob("*")):
+        mime = MIME_TYPES.get(path.suffix.lower())
+        # Generated files (the icon sprites) aren't images in their own right.
+        if mime is None or not path.is_file() or is_fingerprinted(path.name):
+            continue
+        rel = path.relative_to(repo_root).as_posix()
+        size = image_size(path)
+        if size is None:
+            print(f"Warning: can't read the dimensions of {rel}; it is left out of the image manifest.")
+            continue
+        measured[rel] = ImageInfo(rel, mime, size[0], size[1], path.stat().st_size)
+
+    images: dict[str, ImageInfo] = {}
+    for rel, info in measured.items():
+        smaller = [
+            other
+            for other in variants(measured, rel)
+            if (other.width, other.height) == (info.width, info.height) and other.bytes < info.bytes
+        ]
+        if smaller:
+            info = replace(info, larger_than=min(smaller, key=lambda o: o.bytes).path)
+        images[rel] = info
+    return images
+
+
+def variants(images: dict[str, ImageInfo], rel: str) -> list[ImageInfo]:
+    # The other formats of the same image: same path apart from the extension.
+    stem = posixpath.splitext(rel)[0]
+    return [images[f"{stem}{ext}"] for ext in MIME_TYPES if f"{stem}{ext}" in images and f"{stem}{ext}" != rel]
+
+
+def render_manifest(images: dict[str, ImageInfo]) -> str:
+    data = {}
+    for rel, info in sorted(images.items()):
+        entry = {"type": info.mime, "width": info.width, "height": info.height, "bytes": info.bytes}
+        if info.larger_than:
+            entry["larger_than"] = info.larger_than
+        data[rel] = entry
+    return json.dumps(data, indent=2) + "\n"
+
+
+def oversized_report(images: dict[str, ImageInfo]) -> list[str]:
+    lines = []
+    for info in images.values():
+        if info.larger_than:
+            other = images[info.larger_than]
+            lines.append(
+                f"{info.path} ({info.bytes / 1024:,.0f} KB) is {info.bytes / other.bytes:.1f}x the size of "
+                f"{other.path} ({other.bytes / 1024:,.0f} KB) at {info.width}x{info.height}"
+            )
+    return lines
+
+
+@dataclass
+class _ImgTag:
+    start: int
+    end: int
+    attrs: dict[str, str]
+    in_picture: bool
+
+
+class _ImgScanner(HTMLParser):
+    # Offsets of every <img> start tag, in document order (the same order parse_dom builds elements in).
+    def __init__(self, doc: str) -> None:
+        super().__init__(convert_charrefs=True)
+        self._line_starts = [0]
+        for m in re.finditer("\n", doc):
+            self._line_starts.append(m.end())
+        self._picture_depth = 0
+        self.tags: list[_ImgTag] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "picture":
+            self._picture_depth += 1
+        elif tag == "img":
+            line, col = self.getpos()
+            start = self._line_starts[line - 1] + col
+            text = self.get_starttag_text() or ""
+            self.tags.append(
+                _ImgTag(start, start + len(text), {k.lower(): v or "" for k, v in attrs}, self._picture_depth > 0)
+            )
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag == "picture":
+            self._picture_depth -= 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "picture" and self._picture_depth:
+            self._picture_depth -= 1
+
+
+def _image_rel(page_rel: str, src: str) -> str | None:
+    src = src.split("#", 1)[0].split("?", 1)[0]
+    if not src or "//" in src or src.startswith("data:"):
+        return None
+    if src.startswith("/"):
+        return unquote(src.lstrip("/"))
+    return posixpath.normpath(posixpath.join(posixpath.dirname(page_rel), unquote(src)))
+
+
+def _with_attrs(tag_text: str, extra: dict[str, str]) -> str:
+    # Append attributes just before the tag's closing ">" (or "/>"), leaving the rest byte-for-byte.
+    close = len(tag_text) - (2 if tag_text.endswith("/>") else 1)
+    head = tag_text[:close].rstrip()
+    added = "".join(f' {name}="{value}"' for name, value in extra.items())
+    return f"{head}{added}{tag_text[len(head):]}"
+
+
+def annotate_images(doc: str, page_rel: str, images: dict[str, ImageInfo], page_type: str | None) -> str:
+    """
+    Add dimensions, lazy loading and <picture> sources to the page's <img> tags (see the module docstring).
+    """
+    if "<img" not in doc:
+        return doc
+    scanner = _ImgScanner(doc)
+    scanner.feed(doc)
+    scanner.close()
+    tags = [(tag, images.get(_image_rel(page_rel, tag.attrs.get("src", "")) or "")) for tag in scanner.tags]
+    if not any(info for _, info in tags):
+        return doc
+
+    root = parse_dom(doc)
+    above_fold = {id(el) for el in fold_elements(root, page_type) if el.tag == "img"}
+    in_fold = [id(el) in above_fold for el in root.iter() if el.tag == "img"]
+    if len(in_fold) != len(tags):
+        in_fold = [True] * len(tags)  # can't tell which is which: don't lazy-load anything
+
+    parts = []
+    pos = 0
+    for (tag, info), eager in zip(tags, in_fold):
+        if info is None:
+            continue
+        extra: dict[str, str] = {}
+        if "width" not in tag.attrs and "height" not in tag.attrs:
+            extra.update(width=str(info.width), height=str(info.height))
+        if not eager:
+            if "loading" not in tag.attrs:
+                extra["loading"] = "lazy"
+            if "decoding" not in tag.attrs:
+                extra["decoding"] = "async"
+        text = doc[tag.start : tag.end]
+        new_text = _with_attrs(text, extra) if extra else text
+
+        sources = []
+        if not tag.in_picture:
+            src = tag.attrs["src"]
+            stem = src[: len(src) - len(posixpath.splitext(src)[1])]
+            for other in variants(images, info.path):
+                ext = posixpath.splitext(other.path)[1]
+                if (
+                    ext in SOURCE_FORMATS
+                    and (other.width, other.height) == (info.width, info.height)
+                    and other.bytes < info.bytes
+                ):
+                    sources.append((SOURCE_FORMATS.index(ext), f'<source type="{other.mime}" srcset="{stem}{ext}">'))
+        if sources:
+            new_text = f"<picture>{''.join(s for _, s in sorted(sources))}{new_text}</picture>"
+        if new_text != text:
+            parts.append(doc[pos : tag.start])
+            parts.append(new_text)
+            pos = tag.end
+    parts.append(doc[pos:])
+    return "".join(parts)
+
+
+def stage_image_manifest(output: OutputBatch, repo_root: Path, images: dict[str, ImageInfo]) -> None:
+    output.write(repo_root / MANIFEST_PATH.name, render_manifest(images))
+
+
+def main(argv: list[str] | None = None) -> int:
+    from build import discover_pages, _read_page
+    from page_metadata import MetadataIndex
+    from set_page_features import classify_page
+
+    parser = argparse.ArgumentParser(description="Measure images/ and annotate every page's <img> tags.")
+    add_dry_run_argument(parser)
+    args = parser.parse_args(argv)
+
+    images = collect_images(REPO_ROOT)
+    output = OutputBatch(REPO_ROOT, dry_run=args.dry_run)
+    index = MetadataIndex(REPO_ROOT)
+    stage_image_manifest(output, REPO_ROOT, images)
+    pages = 0
+    for page in discover_pages(REPO_ROOT):
+        doc = _read_page(page.path)
+        page_type = classify_page(page.rel, index.get(page.path, doc))
+        if output.write(page.path, annotate_images(doc, page.rel, images, page_type)):
+            pages += 1
+    output.commit()
+    index.save()
+
+    print(f"Measured {len(images)} images; {'would update' if args.dry_run else 'updated'} {pages} page(s).")
+    for line in oversized_report(images):
+        print(f"Oversized: {line}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,7 +1,11 @@
+import argparse
 import os
 import re
 from pathlib import Path
 
+from page_metadata import MetadataIndex, PageMetadata
+from site_output import OutputBatch, add_dry_run_argument
+
 
 FEATURES_BY_PAGE: dict[str, list[str]] = {
     "home": [
@@ -30,7 +34,12 @@ FEATURES_BY_PAGE: dict[str, list[str]] = {
 BODY_RE = re.compile(r"<body(?P<attrs>[^>]*)>", re.IGNORECASE)
 
 
-def classify_page(rel_posix: str) -> str:
+def classify_page(rel_posix: str, meta: PageMetadata | None = None) -> str:
+    # A page's own <body data-page> (from the metadata index) is its type; the path is only a first guess
+    # for pages that were never stamped, so a hand-set type (e.g. "contact" on kapcsolat/index.html) sticks.
+    if meta is not None and meta.page_type in FEATURES_BY_PAGE:
+        return meta.page_type
+
     # Normalize
     rel_posix = rel_posix.lstrip("./")
 
@@ -93,8 +102,14 @@ def stamp_body(html: str, page: str, features: list[str]) -> tuple[str, bool]:
     return new_html, new_html != html
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Stamp <body data-page/data-features> on every page.")
+    add_dry_run_argument(parser)
+    args = parser.parse_args(argv)
+
     repo_root = Path(__file__).resolve().parent.parent
+    index = MetadataIndex(repo_root)
+    output = OutputBatch(repo_root, dry_run=args.dry_run)
 
     html_files: list[Path] = []
     for root, _, files in os.walk(repo_root):
@@ -106,18 +121,30 @@ def main() -> None:
                 html_files.append(Path(root) / f)
 
     changed: list[Path] = []
+    metas: dict[Path, PageMetadata] = {}
     for path in sorted(html_files):
         rel_posix = str(path.relative_to(repo_root)).replace("\\", "/")
-        page = classify_page(rel_posix)
+        original = path.read_text(encoding="utf-8", errors="replace")
+        meta = index.get(path, original)
+        page = classify_page(rel_posix, meta)
         features = FEATURES_BY_PAGE.get(page, FEATURES_BY_PAGE["other"])
 
-        original = path.read_text(encoding="utf-8", errors="replace")
         updated, did_change = stamp_body(original, page, features)
-        if did_change:
-            path.write_text(updated, encoding="utf-8")
+        if did_change and output.write(path, updated):
             changed.append(path.relative_to(repo_root))
-
-    print(f"Stamped {len(changed)} pages with data-page/data-features:")
+            if meta is not None:
+                meta.body = {**meta.body, "data-page": page, "data-features": " ".join(features)}
+                metas[path] = meta
+    written = output.commit()
+    if not args.dry_run:
+        for path in written:
+            if path in metas:
+                # Stamping only touches the <body> data attributes.
+                st = path.stat()
+                index.put(path, st.st_mtime_ns, st.st_size, metas[path])
+    index.save()
+
+    print(f"{'Would stamp' if args.dry_run else 'Stamped'} {len(changed)} pages with data-page/data-features:")
     for p in changed:
         print(f"- {p}")
 
@@ -0,0 +1,179 @@
+"""
+Shared output layer for the site scripts: buffer a run's writes, then write only what really changed.
+
+Scripts stage their results with `OutputBatch.write(path, text)` and call `commit()` once at the end.
+Files whose bytes on disk already match are left untouched, so their mtimes - and the ETag /
+Last-Modified the server derives from them - stay stable across runs. Changed files are written to
+temporary siblings first and only renamed into place once all of them were written, so a failed run
+never leaves half the site updated. With `dry_run` nothing is written; commit() prints a unified
+diff of every pending change instead.
+
+Output too large to hold in memory can be streamed instead: write it into `temp_sibling(path)` (from any
+process) and stage the finished file with `OutputBatch.write_file(path, tmp)`. It then takes part in the
+same compare / rename / dry-run diff as text staged with write().
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import hashlib
+import os
+import shutil
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TextIO
+
+
+def add_dry_run_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Don't write anything; print a unified diff of the files that would change.",
+    )
+
+
+def _file_sha256(path: Path | str) -> bytes | None:
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    return digest.digest()
+
+
+def _unlink_quietly(path: Path | str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+@contextmanager
+def temp_sibling(path: Path) -> Iterator[tuple[TextIO, str]]:
+    """
+    Open a temporary text file next to `path` (so it can later be renamed over it). Yields (file, its path);
+    the file is removed again if the block raises.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            yield f, tmp
+    except BaseException:
+        _unlink_quietly(tmp)
+        raise
+
+
+class OutputBatch:
+    def __init__(self, repo_root: Path, dry_run: bool = False):
+        self.repo_root = repo_root
+        self.dry_run = dry_run
+        # Staged text, or the temporary file (see write_file) that holds it.
+        self._pending: dict[Path, bytes | Path] = {}
+
+    def write(self, path: Path, text: str) -> bool:
+        """
+        Stage `text` for `path`. Returns False (and stages nothing) if the file already has these bytes.
+        """
+        data = text.encode("utf-8")
+        try:
+            current = path.read_bytes()
+        except FileNotFoundError:
+            current = None
+        self._discard(path)
+        if current == data:
+            return False
+        self._pending[path] = data
+        return True
+
+    def write_file(self, path: Path, tmp: Path | str) -> bool:
+        """
+        Stage the finished temporary file `tmp` (see temp_sibling) for `path`, without reading it into memory.
+        The batch owns `tmp` from here on. Returns False (and deletes `tmp`) if `path` already has its bytes.
+        """
+        tmp = Path(tmp)
+        self._discard(path)
+        if _file_sha256(path) == _file_sha256(tmp):
+            _unlink_quietly(tmp)
+            return False
+        self._pending[path] = tmp
+        return True
+
+    def _discard(self, path: Path) -> None:
+        staged = self._pending.pop(path, None)
+        if isinstance(staged, Path):
+            _unlink_quietly(staged)
+
+    @property
+    def pending(self) -> list[Path]:
+        return sorted(self._pending)
+
+    def commit(self) -> list[Path]:
+        """
+        Write every staged file (or, in dry-run mode, print their diffs). Returns the changed paths.
+        """
+        changed = self.pending
+        try:
+            if self.dry_run:
+                self._print_diff(changed)
+            else:
+                self._replace_all(changed)
+        finally:
+            # Whatever wasn't renamed into place (dry run, or a failed commit) is dropped.
+            for staged in self._pending.values():
+                if isinstance(staged, Path):
+                    _unlink_quietly(staged)
+            self._pending.clear()
+        return changed
+
+    def _replace_all(self, paths: list[Path]) -> None:
+        staged: list[tuple[Path, str]] = []
+        # mkstemp creates 0600 files; new outputs get the mode a plain open() would have given them.
+        umask = os.umask(0)
+        os.umask(umask)
+        try:
+            for path in paths:
+                data = self._pending[path]
+                if isinstance(data, Path):
+                    tmp = str(data)
+                    staged.append((path, tmp))
+                else:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+                    staged.append((path, tmp))
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(data)
+                if path.exists():
+                    shutil.copymode(path, tmp)
+                else:
+                    os.chmod(tmp, 0o666 & ~umask)
+        except BaseException:
+            for _, tmp in staged:
+                _unlink_quietly(tmp)
+            raise
+        for path, tmp in staged:
+            os.replace(tmp, path)
+
+    def _print_diff(self, paths: list[Path]) -> None:
+        added = removed = 0
+        for path in paths:
+            rel = path.relative_to(self.repo_root).as_posix()
+            try:
+                old = path.read_text(encoding="utf-8", errors="replace").splitlines(keepends=True)
+            except FileNotFoundError:
+                old = []
+            data = self._pending[path]
+            new_bytes = data.read_bytes() if isinstance(data, Path) else data
+            new = new_bytes.decode("utf-8").splitlines(keepends=True)
+            for line in difflib.unified_diff(old, new, f"a/{rel}", f"b/{rel}"):
+                if line.startswith("+") and not line.startswith("+++"):
+                    added += 1
+                elif line.startswith("-") and not line.startswith("---"):
+                    removed += 1
+                print(line, end="" if line.endswith("\n") else "\n")
+        print(f"Dry run: {len(paths)} file(s) would change (+{added} -{removed} lines); nothing written.")
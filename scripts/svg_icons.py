@@ -0,0 +1,315 @@
+"""
+Small SVG icons from images/, minified and moved into the page instead of one <img> request each.
+
+An icon is an <img> of a local .svg that the page sizes at ICON_MAX_PX or less with its own width/height
+attributes (the header logo, sized by CSS, stays an <img>). Each icon is minified (comments, editor metadata
+and layout whitespace dropped, ids prefixed so icons can share a document) and then either
+
+  - inlined as an <svg>, if its markup is at most INLINE_MAX_BYTES - smaller than the round trip it saves, or
+  - turned into a <symbol> in the page's sprite, `images/icons.<hash>.svg`, and drawn with <use>. A page's
+    larger icons all go into one sprite; pages using the same icons share the file, and as it is named after
+    its content it can be cached like the fingerprinted CSS/JS.
+
+The replacement keeps the <img>'s other attributes (class, width, height, ...), turns its alt text into
+role="img" + aria-label (or aria-hidden for an empty alt), and carries `data-icon="<slug>"`, which is how a
+rebuild recognises it and brings it up to date with the icon's source. Icons containing scripts, styles or
+event handlers are left as they are.
+
+External <use> references don't load from file:// URLs; preview the site through dev_server.py.
+
+Usage:
+  python scripts/svg_icons.py             # inline/sprite the icons of every page, write the sprites
+  python scripts/svg_icons.py --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import posixpath
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import unquote
+
+from fingerprint_assets import HASH_LEN, is_fingerprinted
+from site_output import OutputBatch, add_dry_run_argument
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+ICON_DIR = "images"
+SPRITE_STEM = "icons"
+
+ICON_MAX_PX = 64
+INLINE_MAX_BYTES = 512
+
+SPRITE_RE = re.compile(rf"{SPRITE_STEM}\.[0-9a-f]{{{HASH_LEN}}}\.svg")
+IMG_RE = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+ICON_SVG_RE = re.compile(r"<svg\b[^>]*\sdata-icon=\"[^\"]*\"[^>]*>.*?</svg>", re.IGNORECASE | re.DOTALL)
+TAG_ATTR_RE = re.compile(r"""([^\s"'<>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?""")
+SVG_ROOT_RE = re.compile(r"<svg\b([^>]*)>(.*)</svg>", re.IGNORECASE | re.DOTALL)
+UNSAFE_RE = re.compile(r"<(?:script|style|foreignObject)\b|\son\w+\s*=", re.IGNORECASE)
+ID_RE = re.compile(r'\sid="([^"]+)"')
+
+# Dropped from icons: editor bookkeeping that doesn't affect rendering.
+EDITOR_ATTR_RE = re.compile(
+    r"""\s(?:project-id|export-id|cached|data-name|(?:sodipodi|inkscape|xmlns:(?:sodipodi|inkscape)):?[\w-]*)="[^"]*\""""
+)
+EDITOR_ELEMENT_RE = re.compile(
+    r"<\?xml.*?\?>|<!DOCTYPE[^>]*>|<!--.*?-->|<metadata\b.*?</metadata>|<(?:sodipodi|inkscape):[^>]*?(?:/>|>.*?</(?:sodipodi|inkscape):[^>]*>)",
+    re.IGNORECASE | re.DOTALL,
+)
+# Root <svg> attributes that describe the file rather than how the icon is painted.
+ROOT_ONLY_ATTRS = {"xmlns", "xmlns:xlink", "version", "width", "height", "viewbox", "id", "role", "x", "y", "class"}
+# <img> attributes that don't carry over to the <svg>.
+IMG_ONLY_ATTRS = {"src", "alt", "loading", "decoding", "fetchpriority", "srcset", "sizes"}
+# Attributes this module writes on the <svg>; everything else on it came from the page.
+GENERATED_ATTRS = {"viewbox", "role", "aria-label", "aria-hidden", "data-icon", "focusable"}
+
+
+def minify_svg(svg: str) -> str:
+    svg = EDITOR_ELEMENT_RE.sub("", svg)
+    svg = EDITOR_ATTR_RE.sub("", svg)
+    svg = re.sub(r">\s+<", "><", svg)
+    svg = re.sub(r"\s+", " ", svg)
+    svg = re.sub(r"\s*(/?>)", r"\1", svg)
+    # <path ...></path> -> <path .../>
+    svg = re.sub(r"<([\w:-]+)([^<>]*)></\1>", r"<\1\2/>", svg)
+    return svg.strip()
+
+
+def icon_slug(rel: str) -> str:
+    # "images/szakmai tagsag.svg" -> "szakmai-tagsag"
+    return re.sub(r"[^a-z0-9]+", "-", posixpath.splitext(posixpath.basename(rel))[0].lower()).strip("-")
+
+
+def _attrs(tag_attrs: str) -> list[tuple[str, str | None]]:
+    # Attributes in source order, values kept exactly as written (entities and all).
+    attrs = []
+    for m in TAG_ATTR_RE.finditer(tag_attrs):
+        value = next((v for v in m.groups()[1:] if v is not None), None)
+        attrs.append((m.group(1), value))
+    return attrs
+
+
+def _render_attrs(attrs: list[tuple[str, str | None]]) -> str:
+    return "".join(f" {name}" if value is None else f' {name}="{value}"' for name, value in attrs)
+
+
+@dataclass(frozen=True)
+class Icon:
+    slug: str
+    source: str  # repo-relative path of the .svg
+    view_box: str
+    paint: tuple[tuple[str, str], ...]  # root presentation attributes (fill, stroke, ...)
+    body: str  # minified children, ids prefixed with the slug
+
+    @property
+    def symbol_id(self) -> str:
+        return f"icon-{self.slug}"
+
+    def symbol(self) -> str:
+        return f'<symbol id="{self.symbol_id}" viewBox="{self.view_box}"{_render_attrs(list(self.paint))}>{self.body}</symbol>'
+
+    def inline(self, outer: str) -> str:
+        body = f"<g{_render_attrs(list(self.paint))}>{self.body}</g>" if self.paint else self.body
+        return f'<svg{outer} viewBox="{self.view_box}">{body}</svg>'
+
+
+def load_icon(path: Path, rel: str) -> Icon | None:
+    """
+    Parse and minify one icon file. None if it isn't a plain, self-contained SVG.
+    """
+    try:
+        svg = minify_svg(path.read_text(encoding="utf-8"))
+    except (OSError, UnicodeDecodeError):
+        return None
+    m = SVG_ROOT_RE.fullmatch(svg)
+    if m is None or UNSAFE_RE.search(svg) or "<svg" in m.group(2):
+        return None
+    root = {name.lower(): (name, value or "") for name, value in _attrs(m.group(1))}
+    view_box = root.get("viewbox", ("", ""))[1]
+    if not view_box:
+        width, height = root.get("width", ("", ""))[1], root.get("height", ("", ""))[1]
+        if not (width.isdigit() and height.isdigit()):
+            return None
+        view_box = f"0 0 {width} {height}"
+    paint = tuple((name, value) for key, (name, value) in root.items() if key not in ROOT_ONLY_ATTRS)
+
+    slug = icon_slug(rel)
+    body = m.group(2)
+    for old_id in ID_RE.findall(body):
+        new_id = f"{slug}-{old_id}"
+        body = body.replace(f'id="{old_id}"', f'id="{new_id}"')
+        body = re.sub(rf'(href="|url\(["\']?)#{re.escape(old_id)}\b', rf"\g<1>#{new_id}", body)
+    return Icon(slug=slug, source=rel, view_box=view_box, paint=paint, body=body)
+
+
+class IconLibrary:
+    """
+    The icon files under images/, loaded (and minified) on first use.
+    """
+
+    def __init__(self, repo_root: Path = REPO_ROOT):
+        self.repo_root = repo_root
+        self._by_rel: dict[str, Icon | None] = {}
+        self._rel_by_slug = {
+            icon_slug(rel): rel
+            for rel in (p.relative_to(repo_root).as_posix() for p in sorted((repo_root / ICON_DIR).glob("*.svg")))
+            if not is_fingerprinted(rel)
+        }
+
+    def get(self, rel: str) -> Icon | None:
+        if rel not in self._by_rel:
+            path = self.repo_root / rel
+            self._by_rel[rel] = load_icon(path, rel) if path.is_file() else None
+        return self._by_rel[rel]
+
+    def by_slug(self, slug: str) -> Icon | None:
+        rel = self._rel_by_slug.get(slug)
+        return self.get(rel) if rel is not None else None
+
+
+def icon_inputs(repo_root: Path) -> bytes:
+    # The icon sources' bytes, for the build's dependency hashes.
+    return b"".join(
+        path.read_bytes() for path in sorted((repo_root / ICON_DIR).glob("*.svg")) if not is_fingerprinted(path.name)
+    )
+
+
+def render_sprite(icons: list[Icon]) -> str:
+    symbols = "".join(icon.symbol() for icon in sorted(icons, key=lambda i: i.slug))
+    return f'<svg xmlns="http://www.w3.org/2000/svg" style="display:none">{symbols}</svg>\n'
+
+
+def sprite_rel(sprite: str) -> str:
+    return f"{ICON_DIR}/{SPRITE_STEM}.{hashlib.sha256(sprite.encode('utf-8')).hexdigest()[:HASH_LEN]}.svg"
+
+
+def _px(value: str | None) -> int | None:
+    return int(value) if value is not None and value.isdigit() else None
+
+
+def _icon_use(m: re.Match, page_rel: str, library: IconLibrary) -> tuple[Icon, list[tuple[str, str | None]], str | None] | None:
+    # (icon, the page's own attributes, alt text) for an icon <img> or a previously generated icon <svg>.
+    tag = m.group(0)
+    if tag[:4].lower() == "<img":
+        attrs = _attrs(tag[4:-1].rstrip("/"))
+        values = {name.lower(): value for name, value in attrs}
+        src = values.get("src") or ""
+        if not src.lower().endswith(".svg") or "//" in src or src.startswith("data:") or "srcset" in values:
+            return None
+        if any(name.startswith("on") for name in values):
+            return None
+        width, height = _px(values.get("width")), _px(values.get("height"))
+        if width is None or height is None or max(width, height) > ICON_MAX_PX:
+            return None
+        rel = unquote(src.lstrip("/")) if src.startswith("/") else posixpath.normpath(
+            posixpath.join(posixpath.dirname(page_rel), unquote(src))
+        )
+        icon = library.get(rel) if rel.startswith(f"{ICON_DIR}/") else None
+        if icon is None:
+            return None
+        return icon, [(n, v) for n, v in attrs if n.lower() not in IMG_ONLY_ATTRS], values.get("alt")
+
+    attrs = _attrs(tag[4 : tag.index(">")])
+    values = {name.lower(): value for name, value in attrs}
+    icon = library.by_slug(values.get("data-icon") or "")
+    if icon is None:
+        return None
+    return icon, [(n, v) for n, v in attrs if n.lower() not in GENERATED_ATTRS], values.get("aria-label")
+
+
+def rewrite_icons(doc: str, page_rel: str, library: IconLibrary) -> tuple[str, dict[str, str]]:
+    """
+    Replace the page's icon <img> tags (see the module docstring). Returns the new page and the sprite it
+    references ({repo-relative path: text}, empty if every icon was inlined).
+    """
+    if "<img" not in doc and "data-icon=" not in doc:
+        return doc, {}
+    uses = []
+    for regex in (IMG_RE, ICON_SVG_RE):
+        for m in regex.finditer(doc):
+            use = _icon_use(m, page_rel, library)
+            if use is not None:
+                uses.append((m.start(), m.end(), *use))
+    if not uses:
+        return doc, {}
+    uses.sort(key=lambda u: u[0])
+
+    inline: dict[str, bool] = {}
+    for _, _, icon, _, _ in uses:
+        if icon.slug not in inline:
+            inline[icon.slug] = len(icon.inline("").encode("utf-8")) <= INLINE_MAX_BYTES
+    sprite_icons = {icon.slug: icon for _, _, icon, _, _ in uses if not inline[icon.slug]}
+    sprites: dict[str, str] = {}
+    href = ""
+    if sprite_icons:
+        sprite = render_sprite(list(sprite_icons.values()))
+        rel = sprite_rel(sprite)
+        sprites[rel] = sprite
+        href = posixpath.relpath(rel, posixpath.dirname(page_rel) or ".")
+
+    parts = []
+    pos = 0
+    for start, end, icon, attrs, label in uses:
+        a11y = [("role", "img"), ("aria-label", label)] if label else [("aria-hidden", "true")]
+        outer = _render_attrs([*attrs, *a11y, ("data-icon", icon.slug)])
+        if inline[icon.slug]:
+            markup = icon.inline(outer)
+        else:
+            markup = f'<svg{outer}><use href="{href}#{icon.symbol_id}"></use></svg>'
+        parts.append(doc[pos:start])
+        parts.append(markup)
+        pos = end
+    parts.append(doc[pos:])
+    return "".join(parts), sprites
+
+
+def stale_sprites(repo_root: Path, referenced: set[str]) -> list[Path]:
+    return [
+        path
+        for path in sorted((repo_root / ICON_DIR).glob(f"{SPRITE_STEM}.*.svg"))
+        if SPRITE_RE.fullmatch(path.name) and path.relative_to(repo_root).as_posix() not in referenced
+    ]
+
+
+def remove_stale_sprites(repo_root: Path, referenced: set[str], dry_run: bool) -> list[Path]:
+    stale = stale_sprites(repo_root, referenced)
+    for path in stale:
+        if not dry_run:
+            path.unlink()
+        print(f"{'Would remove' if dry_run else 'Removed'} stale {path.relative_to(repo_root).as_posix()}")
+    return stale
+
+
+def main(argv: list[str] | None = None) -> int:
+    from build import discover_pages, _read_page
+
+    parser = argparse.ArgumentParser(description="Inline or sprite the small SVG icons of every page.")
+    add_dry_run_argument(parser)
+    args = parser.parse_args(argv)
+
+    library = IconLibrary(REPO_ROOT)
+    output = OutputBatch(REPO_ROOT, dry_run=args.dry_run)
+    referenced: set[str] = set()
+    pages = 0
+    for page in discover_pages(REPO_ROOT):
+        doc, sprites = rewrite_icons(_read_page(page.path), page.rel, library)
+        for rel, text in sprites.items():
+            output.write(REPO_ROOT / rel, text)
+        referenced.update(sprites)
+        if output.write(page.path, doc):
+            pages += 1
+    output.commit()
+    remove_stale_sprites(REPO_ROOT, referenced, args.dry_run)
+
+    print(
+        f"{'Would update' if args.dry_run else 'Updated'} {pages} page(s); "
+        f"{len(referenced)} sprite(s) in use."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,7 +1,16 @@
+from __future__ import annotations
+
+import argparse
 import os
+import posixpath
 import re
 from pathlib import Path
 
+from html_blocks import find_blocks, splice_blocks
+from page_metadata import MetadataIndex
+from set_page_features import classify_page
+from site_output import OutputBatch, add_dry_run_argument
+
 
 def compute_root_prefix(file_path: Path, repo_root: Path) -> str:
     rel = file_path.relative_to(repo_root)
@@ -39,6 +48,7 @@ HU_TO_EN = {
 
     # Folder-based pages
     "kapcsolat/index.html": "en/contact/",
+    "kapcsolat/koszonjuk/index.html": "en/contact/thank-you/",
     "tevekenysegeink/index.html": "en/services/",
     "tevekenysegeink/kozbeszerzes-ajanlatkeroknek/index.html": "en/services/contracting-authorities/",
     "tevekenysegeink/kozbeszerzes-ajanlatkeroknek/kozbeszerzes-ertekhatar/index.html": "en/services/contracting-authorities/value-thresholds/",
@@ -64,6 +74,7 @@ EN_TO_HU = {
 
     # Folder-based pages
     "en/contact/index.html": "kapcsolat/",
+    "en/contact/thank-you/index.html": "kapcsolat/koszonjuk/",
     "en/services/index.html": "tevekenysegeink/",
     "en/services/contracting-authorities/index.html": "tevekenysegeink/kozbeszerzes-ajanlatkeroknek/",
     "en/services/contracting-authorities/value-thresholds/index.html": "tevekenysegeink/kozbeszerzes-ajanlatkeroknek/kozbeszerzes-ertekhatar/",
@@ -92,26 +103,10 @@ def compute_lang_links(file_path: Path, repo_root: Path) -> dict[str, str]:
     return {"root": root, "huHref": hu_href, "enHref": en_href}
 
 
-HEADER_START_RE = re.compile(r'^(?P<indent>[ \t]*)<div\s+id="header-placeholder">', re.M)
-FOOTER_START_RE = re.compile(r'^(?P<indent>[ \t]*)<div\s+id="footer-placeholder">', re.M)
+# Non-site directories (the partials themselves contain the placeholder markers).
+SKIP_DIRS = {"export", "content", "scripts", "partials", "docs"}
 
-
-def find_matching_div_end(html: str, start_idx: int) -> int:
-    # Counts <div ...> and </div> from start_idx to find the matching closing tag of the
-    # outer div. Assumes no <div> tags inside scripts/comments in that block (true for our header/footer).
-    tag_re = re.compile(r"</div\b|<div\b", re.I)
-    count = 0
-    for m in tag_re.finditer(html, start_idx):
-        token = m.group(0).lower()
-        if token == "<div":
-            count += 1
-        else:
-            count -= 1
-            if count == 0:
-                # include the full closing tag
-                close_end = html.find(">", m.start())
-                return close_end + 1 if close_end != -1 else m.end()
-    raise ValueError("Failed to find matching </div> for placeholder block")
+PLACEHOLDER_IDS = ("header-placeholder", "footer-placeholder")
 
 
 def indent_block(block: str, indent: str) -> str:
@@ -120,18 +115,162 @@ def indent_block(block: str, indent: str) -> str:
     return "\n".join((indent + l) if l else "" for l in lines).rstrip() + "\n"
 
 
-def render_template(template: str, variables: dict[str, str]) -> str:
-    out = template
-    for k, v in variables.items():
-        out = out.replace("{{" + k + "}}", v)
-    return out
-
+# Variables each partial is rendered with (see assemble_page).
+HEADER_HU_VARIABLES = ("root", "huHref", "enHref")
+HEADER_EN_VARIABLES = ("root", "huHref", "enHref", "enSelfHref")
+FOOTER_VARIABLES = ("root",)
 
-def sync_file(path: Path, repo_root: Path, header_hu: str, header_en: str, footer: str) -> bool:
-    html = path.read_text(encoding="utf-8", errors="replace")
+PLACEHOLDER_RE = re.compile(r"\{\{(.*?)\}\}")
 
-    if 'id="header-placeholder"' not in html or 'id="footer-placeholder"' not in html:
-        return False
+# Page type (set_page_features.classify_page) -> the data-nav item highlighted in the header.
+ACTIVE_NAV_BY_PAGE = {
+    "home": "home",
+    "services": "services",
+    "pricing": "pricing",
+    "contact": "more",
+    "about": "more",
+    "references": "more",
+}
+NAV_LINK_CLASSES = {"nav-link", "dropdown-link", "lang-link"}
+HEADER_LINK_RE = re.compile(r'<a href="(?P<href>[^"]*)" class="(?P<cls>[^"]*)"(?P<rest>[^>]*)>')
+DATA_NAV_RE = re.compile(r'\bdata-nav="([^"]*)"')
+
+
+class TemplateError(ValueError):
+    pass
+
+
+class CompiledTemplate:
+    """
+    A partial parsed once into literal segments and variable slots, so rendering is a single join
+    instead of one str.replace pass per variable. Indented variants (the placeholder block's indent
+    differs between pages) are compiled on first use and cached per indent string.
+    """
+
+    def __init__(self, source: str, variables: tuple[str, ...], name: str = "<template>"):
+        self.source = source
+        self.variables = variables
+        self.name = name
+        self._literals, self._slots = _parse_template(source, variables, name)
+        self._indented: dict[str, CompiledTemplate] = {}
+
+    def render(self, values: dict[str, str]) -> str:
+        parts = [self._literals[0]]
+        for slot, literal in zip(self._slots, self._literals[1:]):
+            parts.append(values[slot])
+            parts.append(literal)
+        return "".join(parts)
+
+    def indented(self, indent: str) -> CompiledTemplate:
+        compiled = self._indented.get(indent)
+        if compiled is None:
+            # Values never contain newlines, so indenting the template is the same as indenting its output.
+            compiled = CompiledTemplate(indent_block(self.source, indent).rstrip("\n"), self.variables, self.name)
+            self._indented[indent] = compiled
+        return compiled
+
+
+def _parse_template(source: str, variables: tuple[str, ...], name: str) -> tuple[list[str], list[str]]:
+    literals: list[str] = []
+    slots: list[str] = []
+    problems: list[str] = []
+    pos = 0
+    for m in PLACEHOLDER_RE.finditer(source):
+        var = m.group(1)
+        line = source.count("\n", 0, m.start()) + 1
+        if var not in variables:
+            known = var in HEADER_EN_VARIABLES
+            problems.append(
+                f"line {line}: {m.group(0)} has no value in this template (available: {', '.join(variables)})"
+                if known
+                else f"line {line}: unknown placeholder {m.group(0)}"
+            )
+        literals.append(source[pos : m.start()])
+        slots.append(var)
+        pos = m.end()
+    literals.append(source[pos:])
+    for literal in literals:
+        if "{{" in literal or "}}" in literal:
+            problems.append("unbalanced '{{' / '}}'")
+            break
+    if problems:
+        raise TemplateError(f"{name}: " + "; ".join(problems))
+    return literals, slots
+
+
+def load_partials(repo_root: Path) -> tuple[CompiledTemplate, CompiledTemplate, CompiledTemplate]:
+    # Compiling up front reports template mistakes (in all partials at once) before any page is touched.
+    compiled: list[CompiledTemplate] = []
+    errors: list[str] = []
+    for name, variables in (
+        ("header-hu.html", HEADER_HU_VARIABLES),
+        ("header-en.html", HEADER_EN_VARIABLES),
+        ("footer.html", FOOTER_VARIABLES),
+    ):
+        source = (repo_root / "partials" / name).read_text(encoding="utf-8")
+        try:
+            compiled.append(CompiledTemplate(source, variables, f"partials/{name}"))
+        except TemplateError as exc:
+            errors.append(str(exc))
+    if errors:
+        raise TemplateError("\n".join(errors))
+    header_hu, header_en, footer = compiled
+    return header_hu, header_en, footer
+
+
+def _link_target(page_rel: str, href: str) -> str:
+    # Repo-relative file an in-site href points at ("../tevekenysegeink/" -> "tevekenysegeink/index.html").
+    target = posixpath.normpath(posixpath.join(posixpath.dirname(page_rel), href))
+    if href.endswith("/") or posixpath.basename(href) in (".", ".."):
+        target = posixpath.normpath(posixpath.join(target, "index.html"))
+    return target
+
+
+def mark_active_links(header: str, page_rel: str, page_type: str | None = None) -> str:
+    """
+    Render the navigation state main.js used to compute after load: the page type's top-level item and
+    the dropdown entries covering the page get `active`, and links to the page itself `aria-current`.
+    Without `page_type` (the page's data-page), the type is guessed from the path.
+    """
+    active_nav = ACTIVE_NAV_BY_PAGE.get(page_type or classify_page(page_rel))
+
+    def replace(m: re.Match) -> str:
+        classes = m.group("cls").split()
+        if not NAV_LINK_CLASSES.intersection(classes) or "//" in m.group("href"):
+            return m.group(0)
+        target = _link_target(page_rel, m.group("href"))
+        rest = m.group("rest")
+        active = False  # the current language's lang-link is already marked in its partial
+        if "nav-link" in classes:
+            nav = DATA_NAV_RE.search(rest)
+            active = nav is not None and nav.group(1) == active_nav
+        elif "dropdown-link" in classes:
+            # A section entry stays highlighted on the pages below it (e.g. the value-threshold checker).
+            section = target.removesuffix("index.html")
+            active = target == page_rel or (section.endswith("/") and page_rel.startswith(section))
+        if active and "active" not in classes:
+            classes.append("active")
+        if target == page_rel and "aria-current" not in rest:
+            rest += ' aria-current="page"'
+        return f'<a href="{m.group("href")}" class="{" ".join(classes)}"{rest}>'
+
+    return HEADER_LINK_RE.sub(replace, header)
+
+
+def assemble_page(
+    html: str,
+    path: Path,
+    repo_root: Path,
+    header_hu: CompiledTemplate,
+    header_en: CompiledTemplate,
+    footer: CompiledTemplate,
+    page_type: str | None = None,
+) -> str | None:
+    # Returns the page with its header/footer blocks re-rendered, or None if it has neither placeholder.
+    # Either block may be missing (the thank-you pages only have a header). Pure (no I/O), so the dev server
+    # can do the same substitution at request time.
+    if 'id="header-placeholder"' not in html and 'id="footer-placeholder"' not in html:
+        return None
 
     vars_common = compute_lang_links(path, repo_root)
     rel_str = str(path.relative_to(repo_root)).replace("\\", "/")
@@ -143,52 +282,72 @@ def sync_file(path: Path, repo_root: Path, header_hu: str, header_en: str, foote
     if is_en:
         vars_common = {**vars_common, "enSelfHref": compute_en_self_href(path, repo_root)}
 
-    new_header = render_template(header_tpl, vars_common)
-    new_footer = render_template(footer, {"root": vars_common["root"]})
-
-    # Replace header block
-    hm = HEADER_START_RE.search(html)
-    if not hm:
+    blocks = find_blocks(html, PLACEHOLDER_IDS)
+    if not blocks:
+        return None
+    replacements = {}
+    if "header-placeholder" in blocks:
+        header = header_tpl.indented(blocks["header-placeholder"].indent).render(vars_common)
+        replacements["header-placeholder"] = mark_active_links(header, rel_str, page_type)
+    if "footer-placeholder" in blocks:
+        replacements["footer-placeholder"] = footer.indented(blocks["footer-placeholder"].indent).render(vars_common)
+    return splice_blocks(html, blocks.values(), replacements)
+
+
+def sync_file(
+    path: Path,
+    repo_root: Path,
+    header_hu: CompiledTemplate,
+    header_en: CompiledTemplate,
+    footer: CompiledTemplate,
+    output: OutputBatch | None = None,
+    index: MetadataIndex | None = None,
+) -> bool:
+    # Returns True if the page changed; with `output`, the write is staged there instead of done here.
+    # With `index`, the nav state follows the page's recorded data-page rather than a guess from its path.
+    original = path.read_text(encoding="utf-8", errors="replace")
+    page_type = None
+    if index is not None:
+        page_type = classify_page(path.relative_to(repo_root).as_posix(), index.get(path, original))
+    html = assemble_page(original, path, repo_root, header_hu, header_en, footer, page_type)
+    if html is None:
         return False
-    h_indent = hm.group("indent")
-    h_start = hm.start()
-    h_end = find_matching_div_end(html, hm.start())
-    html = html[:h_start] + indent_block(new_header, h_indent) + html[h_end:]
-
-    # Replace footer block (search again on updated html)
-    fm = FOOTER_START_RE.search(html)
-    if not fm:
+    if output is not None:
+        return output.write(path, html)
+    if html == original:
         return False
-    f_indent = fm.group("indent")
-    f_start = fm.start()
-    f_end = find_matching_div_end(html, fm.start())
-    html = html[:f_start] + indent_block(new_footer, f_indent) + html[f_end:]
 
     path.write_text(html, encoding="utf-8")
     return True
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Re-render the shared header/footer blocks in every page.")
+    add_dry_run_argument(parser)
+    args = parser.parse_args(argv)
+
     repo_root = Path(__file__).resolve().parent.parent
 
-    header_hu = (repo_root / "partials" / "header-hu.html").read_text(encoding="utf-8")
-    header_en = (repo_root / "partials" / "header-en.html").read_text(encoding="utf-8")
-    footer = (repo_root / "partials" / "footer.html").read_text(encoding="utf-8")
+    header_hu, header_en, footer = load_partials(repo_root)
+    output = OutputBatch(repo_root, dry_run=args.dry_run)
+    index = MetadataIndex(repo_root)
 
     changed = []
     for root, _, files in os.walk(repo_root):
         # Skip non-site directories
         parts = Path(root).relative_to(repo_root).parts
-        if parts and parts[0] in {"export", "content", "scripts", "partials", "docs"}:
+        if parts and parts[0] in SKIP_DIRS:
             continue
         for f in files:
             if not f.lower().endswith(".html"):
                 continue
             path = Path(root) / f
-            if sync_file(path, repo_root, header_hu, header_en, footer):
+            if sync_file(path, repo_root, header_hu, header_en, footer, output, index):
                 changed.append(path.relative_to(repo_root))
+    output.commit()
+    index.save()
 
-    print(f"Updated {len(changed)} pages:")
+    print(f"{'Would update' if args.dry_run else 'Updated'} {len(changed)} pages:")
     for p in changed:
         print(f"- {p}")
 
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from add_breadcrumbs_jsonld import _upsert_breadcrumbs
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BLOCK = '    <!-- Breadcrumbs (JSON-LD) -->\n    <script type="application/ld+json">\n    {"@type": "BreadcrumbList"}\n    </script>'
+
+
+def _snapshot(root: Path) -> dict[str, str]:
+    return {
+        path.relative_to(root).as_posix(): hashlib.sha256(path.read_bytes()).hexdigest()
+        for path in root.rglob("*")
+        if path.is_file() and "__pycache__" not in path.parts
+    }
+
+
+def _build(root: Path, *args: str) -> str:
+    proc = subprocess.run(
+        [sys.executable, "scripts/build.py", *args], cwd=root, capture_output=True, text=True, check=True
+    )
+    return proc.stdout
+
+
+def _copy_site(root: Path) -> Path:
+    shutil.copytree(
+        REPO_ROOT,
+        root,
+        dirs_exist_ok=True,
+        ignore=shutil.ignore_patterns(".git", "__pycache__", ".pytest_cache", ".build-manifest.json", ".page-metadata.json"),
+    )
+    _build(root)
+    return root
+
+
+def _explained(output: str) -> dict[str, str]:
+    # "- arak.html (written): partials/footer.html changed" -> {"arak.html": "partials/footer.html changed"}
+    lines = (line[2:] for line in output.splitlines() if line.startswith("- ") and ": " in line)
+    return {rel.removesuffix(" (written)"): reasons for rel, reasons in (line.split(": ", 1) for line in lines)}
+
+
+@pytest.fixture(scope="module")
+def site(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return _copy_site(tmp_path_factory.mktemp("site"))
+
+
+@pytest.fixture
+def fresh_site(tmp_path: Path) -> Path:
+    # For tests that edit the tree.
+    return _copy_site(tmp_path / "site")
+
+
+def test_second_build_writes_nothing(site: Path) -> None:
+    before = _snapshot(site)
+    assert "wrote 0:" in _build(site)
+    assert _snapshot(site) == before
+
+
+def test_forced_rebuild_writes_nothing(site: Path) -> None:
+    # --force runs every stage over every page again, so any stage that isn't idempotent shows up here.
+    before = _snapshot(site)
+    assert "wrote 0:" in _build(site, "--force")
+    assert {rel for rel, digest in _snapshot(site).items() if before.get(rel) != digest} <= {".build-manifest.json"}
+
+
+def test_partial_edit_rebuilds_only_the_pages_using_it(fresh_site: Path) -> None:
+    footer = fresh_site / "partials" / "footer.html"
+    footer.write_text(footer.read_text(encoding="utf-8").replace("</footer>", "<!-- x --></footer>", 1), encoding="utf-8")
+    rebuilt = _explained(_build(fresh_site, "--explain"))
+    with_footer = {
+        path.relative_to(fresh_site).as_posix()
+        for path in fresh_site.rglob("*.html")
+        if 'id="footer-placeholder"' in path.read_text(encoding="utf-8") and "partials" not in path.parts
+    }
+    assert rebuilt and set(rebuilt) <= with_footer
+    assert all(reasons == "partials/footer.html changed" for reasons in rebuilt.values())
+    # The thank-you pages have a header only.
+    assert "kapcsolat/koszonjuk/index.html" not in rebuilt
+    assert "wrote 0:" in _build(fresh_site)
+
+
+def test_edited_and_touched_pages(fresh_site: Path) -> None:
+    page = fresh_site / "arak.html"
+    page.write_text(page.read_text(encoding="utf-8").replace("</body>", "<p>x</p>\n</body>"), encoding="utf-8")
+    os.utime(fresh_site / "blog.html")
+    out = _build(fresh_site, "--explain")
+    assert _explained(out) == {"arak.html": "page edited since the last build"}
+    assert "Built 1 of" in out
+    assert "Built 0 of" in _build(fresh_site)
+
+
+def test_parallel_build_matches_serial(tmp_path: Path) -> None:
+    sites = [_copy_site(tmp_path / name) for name in ("serial", "parallel")]
+    for root in sites:
+        header = root / "partials" / "header-hu.html"
+        header.write_text(header.read_text(encoding="utf-8").replace("Áraink", "Árak"), encoding="utf-8")
+    serial, parallel = _build(sites[0], "--force", "--explain"), _build(sites[1], "--force", "--explain", "--jobs", "3")
+    assert "3 jobs" in parallel
+    assert _explained(serial) == _explained(parallel) and _explained(serial)
+    # The manifests hold mtimes; everything else must be byte for byte the same.
+    generated = {".build-manifest.json", ".page-metadata.json"}
+    snapshots = [{rel: digest for rel, digest in _snapshot(root).items() if rel not in generated} for root in sites]
+    assert snapshots[0] == snapshots[1]
+
+
+@pytest.mark.parametrize(
+    "doc",
+    [
+        "<head>\n    <title>T</title>\n    <link rel=\"x\">\n</head>",
+        "<head>\n    <title>T</title>\n\n    \n\n    <link rel=\"x\">\n</head>",
+        "<head>\n    <title>T</title><link rel=\"x\">\n</head>",
+    ],
+)
+def test_breadcrumb_upsert_is_idempotent(doc: str) -> None:
+    once = _upsert_breadcrumbs(doc, BLOCK)
+    assert _upsert_breadcrumbs(once, BLOCK) == once
+    assert once.count("BreadcrumbList") == 1
+    assert f"</title>\n{BLOCK}\n" in once
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from critical_css import (
+    FoldMatcher,
+    StylesheetCache,
+    critical_css,
+    fold_elements,
+    parse_dom,
+    parse_stylesheet,
+    rebase_urls,
+    split_selector_list,
+)
+from optimize_css_links import inline_critical_css
+
+
+PAGE = """<!DOCTYPE html>
+<html lang="hu-HU">
+<head><title>T</title><style>.in-head { }</style></head>
+<body data-page="pricing">
+  <div id="site-header"><nav class="nav"><a class="nav-link active" href="/">Home</a><a class="nav-link" href="https://x.hu/">X</a></nav></div>
+  <main>
+    <section class="hero"><h1 class="title">Hi</h1><p class="lead">Lead</p><p class="note">Note</p><template><p class="tpl"></p></template></section>
+    <section class="second"><ul><li class="item"><input type="checkbox" data-State="Open"></li></ul></section>
+    <section class="third"><p class="below">Below the fold</p></section>
+  </main>
+  <script>var x = "<p class='scripted'>";</script>
+</body>
+</html>
+"""
+
+
+@pytest.fixture(scope="module")
+def matcher() -> FoldMatcher:
+    return FoldMatcher(fold_elements(parse_dom(PAGE), "pricing"), ["js-enabled", "active"])
+
+
+@pytest.mark.parametrize(
+    "selector",
+    [
+        "html",
+        ":root",
+        "body",
+        "#site-header .nav-link",
+        "#site-header > .nav > a",
+        ".nav a.active",
+        "h1 + p",
+        "h1 ~ .note",
+        ".lead + .note",
+        "main > section.second li",
+        ".hero *",
+        ".js-enabled .hero",
+        "html.js-enabled body",
+        "a[href]",
+        'a[href^="https:"]',
+        "a[href$='.hu/']",
+        "a[href*=x]",
+        "html[lang|=hu]",
+        "[class~=nav-link]",
+        '[data-state="open" i]',
+        "input[type=checkbox]",
+        ".title::before",
+        "p:first-child",
+        "p:not(.lead)",
+        "svg|rect",  # unsupported syntax: kept to be safe
+    ],
+)
+def test_selectors_that_can_match_above_the_fold(matcher: FoldMatcher, selector: str) -> None:
+    assert matcher.matches(selector)
+
+
+@pytest.mark.parametrize(
+    "selector",
+    [
+        ".below",
+        ".third p",
+        ".tpl",
+        ".scripted",
+        ".in-head",
+        "title",
+        "#missing",
+        ".hero > li",
+        ".note + h1",
+        ".note ~ .lead",
+        "section.hero.second",
+        ".nav-link:hover",
+        "a:focus-visible::after",
+        "p:root",
+        'a[href^=""]',
+        'a[href="/x"]',
+        '[data-state="open"]',
+        "html[lang|=hu-H]",
+        ".nav > .nav-link.missing",
+    ],
+)
+def test_selectors_that_cannot_match_above_the_fold(matcher: FoldMatcher, selector: str) -> None:
+    assert not matcher.matches(selector)
+
+
+def test_fold_depends_on_page_type() -> None:
+    home = FoldMatcher(fold_elements(parse_dom(PAGE), "home"))
+    assert home.matches(".hero .title")
+    assert not home.matches(".second .item")
+
+
+def test_split_selector_list_respects_nesting() -> None:
+    assert split_selector_list(' a, :is(b, c) d , [title="x,y"] ') == ("a", ":is(b, c) d", '[title="x,y"]')
+
+
+def test_critical_css_keeps_matching_rules_in_source_order() -> None:
+    css = """
+        /* comment { } */
+        .below { color: red }
+        .title, .below { font-weight: 700 }
+        @media (min-width: 40em) { .lead { margin: 0 } .below { margin: 1px } }
+        @media print { .title { color: black } }
+        .hero { animation: fade 1s }
+        @keyframes fade { from { opacity: 0 } to { opacity: 1 } }
+        @keyframes unused { to { opacity: 0 } }
+        .nav-link:hover { color: blue }
+        .has-square-patterns .hero { background: none }
+    """
+    out = critical_css(PAGE, [parse_stylesheet(css)], "pricing", ["square-patterns"])
+    assert out == (
+        ".title{font-weight: 700}"
+        "@media (min-width: 40em){.lead{margin: 0}}"
+        ".hero{animation: fade 1s}"
+        ".has-square-patterns .hero{background: none}"
+        "@keyframes fade{from { opacity: 0 } to { opacity: 1 }}"
+    )
+    # Without the feature, its runtime class isn't assumed.
+    assert ".has-square-patterns" not in critical_css(PAGE, [parse_stylesheet(css)], "pricing", [])
+
+
+@pytest.mark.parametrize(
+    "css, expected",
+    [
+        ("a{background:url(../images/bg.png)}", "a{background:url(../../images/bg.png)}"),
+        ("a{background:url( '../images/bg.png' )}", "a{background:url('../../images/bg.png')}"),
+        ('a{background:URL("img/x.svg#i")}', 'a{background:url("../../css/img/x.svg#i")}'),
+        ("a{background:image-set(url('../a.avif') 1x, url(../a.png) 2x)}", "a{background:image-set(url('../../a.avif') 1x, url(../../a.png) 2x)}"),
+        ("a{background:url(/images/bg.png)}", "a{background:url(/images/bg.png)}"),
+        ("a{background:url(https://x.hu/bg.png)}", "a{background:url(https://x.hu/bg.png)}"),
+        ("a{background:url('data:image/svg+xml;utf8,<svg/>')}", "a{background:url('data:image/svg+xml;utf8,<svg/>')}"),
+        ("a{filter:url(#shadow)}", "a{filter:url(#shadow)}"),
+        ("a{background:url()}", "a{background:url()}"),
+    ],
+)
+def test_rebase_urls(css: str, expected: str) -> None:
+    assert rebase_urls(css, "../../css") == expected
+
+
+def test_rebase_urls_from_the_same_directory_is_a_no_op() -> None:
+    css = "a{background:url(../images/bg.png)}"
+    assert rebase_urls(css, "") == css
+
+
+def test_inlined_css_on_a_nested_page_keeps_its_urls(tmp_path: Path) -> None:
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "main.css").write_text(".hero { background: url('../images/bg.png') }", encoding="utf-8")
+    page = tmp_path / "tevekenysegeink" / "palyazatiras" / "index.html"
+    page.parent.mkdir(parents=True)
+    doc = PAGE.replace("<title>T</title>", '<title>T</title>\n<link rel="stylesheet" href="../../css/main.3f9a1c2b.css">\n')
+    out = inline_critical_css(doc, page, StylesheetCache())
+    assert "<style data-critical-css>\n.hero{background: url('../../images/bg.png')}\n</style>" in out
+    assert (page.parent / "../../images/bg.png").resolve() == (tmp_path / "images" / "bg.png").resolve()
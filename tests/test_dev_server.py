@@ -0,0 +1,834 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+import zlib
+from pathlib import Path
+
+import pytest
+
+import dev_server
+from dev_server import (
+    LIVE_RELOAD_CLIENT,
+    MAX_RANGES,
+    FileCache,
+    LatencyHistogram,
+    LiveReload,
+    Metrics,
+    PartialRenderer,
+    RedirectTable,
+    Route,
+    RouteIndex,
+    StaticSite,
+    _negotiate_encoding,
+    _parse_ranges,
+)
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+# --- Range headers ----------------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-9", [(0, 9)]),
+        ("bytes=90-", [(90, 99)]),
+        ("bytes=50-500", [(50, 99)]),
+        ("BYTES = 0-0", [(0, 0)]),
+        # Suffix ranges: the last N bytes, all of them when N exceeds the size.
+        ("bytes=-10", [(90, 99)]),
+        ("bytes=-500", [(0, 99)]),
+        # Overlapping and unordered ranges are served as asked, in request order.
+        ("bytes=0-49,40-59", [(0, 49), (40, 59)]),
+        ("bytes=90-99, 0-9", [(90, 99), (0, 9)]),
+        # Unsatisfiable ranges are dropped; the satisfiable rest is still served.
+        ("bytes=200-300,0-9", [(0, 9)]),
+        ("bytes=-0,5-5", [(5, 5)]),
+    ],
+)
+def test_parse_ranges(header: str, expected: list[tuple[int, int]]) -> None:
+    assert _parse_ranges(header, 100) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=100-200", "bytes=-0", "bytes=200-300,150-"])
+def test_parse_ranges_unsatisfiable(header: str) -> None:
+    assert _parse_ranges(header, 100) == []
+
+
+def test_parse_ranges_empty_file_is_unsatisfiable() -> None:
+    assert _parse_ranges("bytes=0-", 0) == []
+    assert _parse_ranges("bytes=-5", 0) == []
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "items=0-9",
+        "bytes",
+        "bytes=",
+        "bytes=5",
+        "bytes=a-b",
+        "bytes=9-5",
+        "bytes=--5",
+        "bytes=1-2-3",
+        "bytes=0-9,",
+        "bytes=0-9,x",
+        ",".join(["bytes=0-0"] + ["1-1"] * MAX_RANGES),
+    ],
+)
+def test_parse_ranges_malformed_is_ignored(header: str) -> None:
+    assert _parse_ranges(header, 100) is None
+
+
+@pytest.fixture
+def static_site(tmp_path: Path) -> StaticSite:
+    (tmp_path / "data.txt").write_bytes(bytes(range(100)))
+    return StaticSite(tmp_path)
+
+
+def _header(response, name: str) -> str | None:
+    return next((value for key, value in response.headers if key == name), None)
+
+
+def _body(response) -> bytes:
+    if response.file is None:
+        return response.body
+    try:
+        parts = []
+        for seg in response.segments:
+            if isinstance(seg, bytes):
+                parts.append(seg)
+            else:
+                response.file.seek(seg[0])
+                parts.append(response.file.read(seg[1]))
+        return b"".join(parts)
+    finally:
+        response.close()
+
+
+def test_range_response(static_site: StaticSite) -> None:
+    response = static_site.respond("GET", "/data.txt", {"Range": "bytes=-10"})
+    assert response.status == 206
+    assert _header(response, "Content-Range") == "bytes 90-99/100"
+    assert _body(response) == bytes(range(90, 100))
+
+
+def test_overlapping_ranges_get_a_multipart_response(static_site: StaticSite) -> None:
+    response = static_site.respond("GET", "/data.txt", {"Range": "bytes=0-49,40-59"})
+    assert response.status == 206
+    assert _header(response, "Content-Type").startswith("multipart/byteranges; boundary=")
+    body = _body(response)
+    assert b"Content-Range: bytes 0-49/100" in body and b"Content-Range: bytes 40-59/100" in body
+    assert len(body) == int(_header(response, "Content-Length"))
+
+
+def test_unsatisfiable_range_response(static_site: StaticSite) -> None:
+    response = static_site.respond("GET", "/data.txt", {"Range": "bytes=100-"})
+    assert response.status == 416
+    assert _header(response, "Content-Range") == "bytes */100"
+
+
+def test_malformed_range_gets_the_full_body(static_site: StaticSite) -> None:
+    response = static_site.respond("GET", "/data.txt", {"Range": "bytes=9-5"})
+    assert response.status == 200
+    assert _body(response) == bytes(range(100))
+
+
+# --- File cache and conditional requests ------------------------------------------------------------------
+
+
+def _write(path: Path, data: bytes, mtime_ns: int | None = None) -> os.stat_result:
+    path.write_bytes(data)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path.stat()
+
+
+def test_file_cache_revalidates_against_the_file(tmp_path: Path) -> None:
+    path = tmp_path / "a.txt"
+    st = _write(path, b"one")
+    cache = FileCache()
+    assert cache.get(str(path), st) == b"one"
+    assert cache.get(str(path), st) == b"one"
+    assert (cache.hits, cache.misses) == (1, 1)
+    # An edit shows up without any invalidation, even when the size stays the same.
+    st = _write(path, b"two", st.st_mtime_ns + 10**9)
+    assert cache.get(str(path), st) == b"two"
+    assert cache.stats()["entries"] == 1 and cache.stats()["bytes"] == 3
+
+
+def test_file_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = FileCache(max_bytes=250)
+    stats = {name: _write(tmp_path / name, name.encode() * 100) for name in ("a", "b", "c")}
+    for name in ("a", "b", "a", "c"):
+        assert cache.get(str(tmp_path / name), stats[name]) == name.encode() * 100
+    assert cache.stats()["entries"] == 2 and cache.stats()["bytes"] == 200
+    # "b" was the least recently used; "a" was touched again before "c" came in.
+    misses = cache.misses
+    cache.get(str(tmp_path / "a"), stats["a"])
+    assert cache.misses == misses
+    cache.get(str(tmp_path / "b"), stats["b"])
+    assert cache.misses == misses + 1
+
+
+def test_file_cache_skips_large_files(tmp_path: Path) -> None:
+    cache = FileCache(max_bytes=1000, max_entry_bytes=50)
+    st = _write(tmp_path / "big.bin", bytes(100))
+    assert cache.get(str(tmp_path / "big.bin"), st) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_file_cache_invalidate_drops_every_coding(tmp_path: Path) -> None:
+    path = tmp_path / "a.css"
+    st = _write(path, b"a{color:red}" * 50)
+    cache = FileCache()
+    cache.get(str(path), st, "gzip")
+    assert cache.stats()["entries"] == 2
+    cache.invalidate(str(path))
+    assert (cache.stats()["entries"], cache.stats()["bytes"]) == (0, 0)
+    cache.get(str(path), st, "gzip")
+    assert (cache.hits, cache.misses) == (0, 4)
+
+
+@pytest.fixture
+def cached_site(tmp_path: Path) -> StaticSite:
+    (tmp_path / "data.txt").write_bytes(bytes(range(100)))
+    return StaticSite(tmp_path, file_cache=FileCache())
+
+
+def test_conditional_requests(cached_site: StaticSite) -> None:
+    response = cached_site.respond("GET", "/data.txt", {})
+    etag, last_modified = _header(response, "ETag"), _header(response, "Last-Modified")
+    assert response.status == 200 and _header(response, "Cache-Control") == "no-cache"
+    for headers in ({"If-None-Match": etag}, {"If-None-Match": f'"x", W/{etag}'}, {"If-Modified-Since": last_modified}):
+        response = cached_site.respond("GET", "/data.txt", headers)
+        assert response.status == 304 and response.body == b"" and _header(response, "ETag") == etag
+    # If-None-Match wins over If-Modified-Since.
+    response = cached_site.respond("GET", "/data.txt", {"If-None-Match": '"other"', "If-Modified-Since": last_modified})
+    assert response.status == 200 and _body(response) == bytes(range(100))
+    assert cached_site.respond("GET", "/data.txt", {"If-Modified-Since": "garbage"}).status == 200
+    assert cached_site.file_cache.hits >= 1
+
+
+def test_edited_file_gets_a_new_etag(cached_site: StaticSite) -> None:
+    etag = _header(cached_site.respond("GET", "/data.txt", {}), "ETag")
+    path = cached_site.root / "data.txt"
+    _write(path, b"changed", path.stat().st_mtime_ns + 10**9)
+    response = cached_site.respond("GET", "/data.txt", {"If-None-Match": etag})
+    assert response.status == 200 and _body(response) == b"changed"
+
+
+# --- Content-coding ---------------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("", None),
+        ("gzip, deflate, br", "gzip"),
+        ("deflate", "deflate"),
+        ("DEFLATE;q=1, gzip;q=0.5", "deflate"),
+        ("gzip;q=0, *", "deflate"),
+        ("*;q=0.1", "gzip"),
+        ("br, identity", None),
+        ("gzip;q=0, deflate;q=0", None),
+        ("gzip;q=high", None),
+    ],
+)
+def test_negotiate_encoding(header: str | None, expected: str | None) -> None:
+    assert _negotiate_encoding(header) == expected
+
+
+CSS = b"body { color: #222; margin: 0 auto; }\n" * 40
+
+
+@pytest.fixture
+def compressing_site(tmp_path: Path) -> StaticSite:
+    (tmp_path / "main.css").write_bytes(CSS)
+    (tmp_path / "small.css").write_bytes(b"a{}")
+    (tmp_path / "photo.webp").write_bytes(bytes(1000))
+    return StaticSite(tmp_path, file_cache=FileCache())
+
+
+@pytest.mark.parametrize("coding, decompress", [("gzip", gzip.decompress), ("deflate", zlib.decompress)])
+def test_compressed_response(compressing_site: StaticSite, coding: str, decompress) -> None:
+    plain = compressing_site.respond("GET", "/main.css", {})
+    response = compressing_site.respond("GET", "/main.css", {"Accept-Encoding": coding})
+    assert _header(response, "Content-Encoding") == coding and _header(response, "Vary") == "Accept-Encoding"
+    assert decompress(_body(response)) == CSS and int(_header(response, "Content-Length")) < len(CSS)
+    # Each coding is its own representation.
+    assert _header(response, "ETag") == _header(plain, "ETag")[:-1] + f'-{coding}"'
+    again = compressing_site.respond("GET", "/main.css", {"Accept-Encoding": coding, "If-None-Match": _header(response, "ETag")})
+    assert again.status == 304
+    assert compressing_site.respond("GET", "/main.css", {"If-None-Match": _header(response, "ETag")}).status == 200
+
+
+@pytest.mark.parametrize(
+    "target, headers, vary",
+    [
+        ("/small.css", {"Accept-Encoding": "gzip"}, "Accept-Encoding"),  # not worth it
+        ("/photo.webp", {"Accept-Encoding": "gzip"}, None),  # already compressed
+        ("/main.css", {"Accept-Encoding": "gzip", "Range": "bytes=0-9"}, "Accept-Encoding"),  # offsets refer to the file
+    ],
+)
+def test_identity_responses(compressing_site: StaticSite, target: str, headers: dict[str, str], vary: str | None) -> None:
+    response = compressing_site.respond("GET", target, headers)
+    assert _header(response, "Content-Encoding") is None
+    assert _header(response, "Vary") == vary
+
+
+def test_precompressed_sibling_is_preferred(compressing_site: StaticSite) -> None:
+    source = compressing_site.root / "main.css"
+    sibling = compressing_site.root / "main.css.gz"
+    sibling.write_bytes(gzip.compress(CSS, compresslevel=9))
+    response = compressing_site.respond("GET", "/main.css", {"Accept-Encoding": "gzip"})
+    assert _body(response) == sibling.read_bytes()
+    # A sibling older than the source is ignored.
+    mtime_ns = sibling.stat().st_mtime_ns
+    os.utime(source, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+    response = compressing_site.respond("GET", "/main.css", {"Accept-Encoding": "gzip"})
+    assert _body(response) == gzip.compress(CSS, compresslevel=dev_server.COMPRESS_LEVEL, mtime=0)
+
+
+# --- Route index --------------------------------------------------------------------------------------------
+
+
+@pytest.fixture
+def routed_site(tmp_path: Path) -> StaticSite:
+    for rel in (
+        "index.html",
+        "arak.html",
+        "kapcsolat.html",
+        "kapcsolat/index.html",
+        "pages/blog/uj-poszt.html",
+        "css/main.css",
+        ".git/config",
+        "404.html",
+    ):
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f'<html lang="hu"><body>{rel}</body></html>', encoding="utf-8")
+    return StaticSite(tmp_path, routes=RouteIndex(tmp_path))
+
+
+@pytest.mark.parametrize(
+    "url, rel",
+    [
+        ("/", "index.html"),
+        ("/arak.html", "arak.html"),
+        ("/arak", "arak.html"),
+        ("/css/main.css", "css/main.css"),
+        # The directory wins over the extension-less alias of its sibling page.
+        ("/kapcsolat/", "kapcsolat/index.html"),
+        ("/kapcsolat.html", "kapcsolat.html"),
+        # Canonical URLs from the breadcrumb rules.
+        ("/blog/uj-poszt", "pages/blog/uj-poszt.html"),
+    ],
+)
+def test_route_lookup(routed_site: StaticSite, url: str, rel: str) -> None:
+    assert routed_site.routes.lookup(url) == Route(path=str(routed_site.root / rel))
+    assert _body(routed_site.respond("GET", url, {})) == f'<html lang="hu"><body>{rel}</body></html>'.encode()
+
+
+def test_route_directory_slash(routed_site: StaticSite) -> None:
+    assert routed_site.routes.lookup("/kapcsolat") == Route(location="/kapcsolat/")
+    response = routed_site.respond("GET", "/kapcsolat?x=1", {})
+    assert response.status == 301 and _header(response, "Location") == "/kapcsolat/?x=1"
+    assert routed_site.routes.lookup("/.git/config") is None
+
+
+def test_route_misses_are_remembered_until_the_tree_changes(routed_site: StaticSite) -> None:
+    routes = routed_site.routes
+    routes.RELOAD_CHECK_SECONDS = 0
+    for _ in range(3):
+        response = routed_site.respond("GET", "/uj.html", {})
+        assert response.status == 404 and b"404.html" in response.body
+    assert routes.stats()["negative_entries"] == 1 and routes.stats()["negative_hits"] == 2
+
+    # Adding a file changes its directory's mtime, which rebuilds the index and forgets the misses.
+    (routed_site.root / "uj.html").write_text("new", encoding="utf-8")
+    mtime_ns = routed_site.root.stat().st_mtime_ns
+    os.utime(routed_site.root, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+    assert _body(routed_site.respond("GET", "/uj", {})) == b"new"
+    assert routes.stats()["rebuilds"] == 2 and routes.stats()["negative_entries"] == 0
+
+
+def test_route_negative_cache_is_bounded(routed_site: StaticSite) -> None:
+    routes = routed_site.routes
+    routes.MAX_MISSING = 2
+    for url in ("/a", "/b", "/c"):
+        routes.remember_missing(url)
+    assert not routes.is_missing("/a") and routes.is_missing("/b") and routes.is_missing("/c")
+
+
+def test_invalidate_rebuilds_routes_on_structural_changes(routed_site: StaticSite) -> None:
+    routes = routed_site.routes
+    routes.RELOAD_CHECK_SECONDS = 3600
+    assert routes.lookup("/") is not None
+    # The watcher reports changes long before the index would notice them itself.
+    (routed_site.root / "uj.html").write_text("new", encoding="utf-8")
+    routed_site.invalidate([str(routed_site.root / "uj.html")], structural=False)
+    assert routes.lookup("/uj") is None
+    routed_site.invalidate([str(routed_site.root / "uj.html")], structural=True)
+    assert routes.lookup("/uj") == Route(path=str(routed_site.root / "uj.html"))
+
+
+# --- Redirect rules ---------------------------------------------------------------------------------------
+
+
+def _table(tmp_path: Path, rules: str) -> RedirectTable:
+    path = tmp_path / "redirects.conf"
+    path.write_text(rules, encoding="utf-8")
+    return RedirectTable(path)
+
+
+def test_exact_redirect_beats_earlier_regex(tmp_path: Path) -> None:
+    table = _table(tmp_path, "RedirectMatch 301 ^/old(.*)$ /regex$1\nRedirect 302 /old /exact\n")
+    assert table.resolve("/old") == (302, "/exact")
+    assert table.resolve("/older") == (301, "/regexer")
+
+
+def test_first_of_duplicate_redirects_wins(tmp_path: Path) -> None:
+    table = _table(tmp_path, "Redirect 301 /a /first\nRedirect 302 /a /second\n")
+    assert table.resolve("/a") == (301, "/first")
+
+
+def test_prefix_redirect_appends_the_rest(tmp_path: Path) -> None:
+    table = _table(tmp_path, "Redirect /a /x\nRedirect /a/b /y/\nRedirect /c/ /z/\n")
+    assert table.resolve("/a/q/r") == (302, "/x/q/r")
+    # The longest matching prefix wins, whatever the file order.
+    assert table.resolve("/a/b/c") == (302, "/y/c")
+    assert table.resolve("/c/d") == (302, "/z/d")
+    # Only whole segments match.
+    assert table.resolve("/ab") is None
+
+
+def test_redirect_match_uses_the_first_matching_rule(tmp_path: Path) -> None:
+    table = _table(tmp_path, "RedirectMatch ^/p/(\\d+)$ /num/$1\nRedirectMatch ^/p/(.*)$ /any/$1\nRedirectMatch ^/p/x$ /never\n")
+    assert table.resolve("/p/12") == (302, "/num/12")
+    assert table.resolve("/p/x") == (302, "/any/x")
+
+
+def test_redirect_match_capture_groups(tmp_path: Path) -> None:
+    table = _table(
+        tmp_path,
+        "RedirectMatch 301 ^/blog/(\\d+)/([^/]+)$ /posts/$2?id=$1\n"
+        "RedirectMatch 301 ^/docs(/v\\d)?/(.*)$ /manual$1/$2$9\n",
+    )
+    assert table.resolve("/blog/12/hello") == (301, "/posts/hello?id=12")
+    # Unmatched and nonexistent groups expand to "".
+    assert table.resolve("/docs/intro") == (301, "/manual/intro")
+    assert table.resolve("/docs/v2/intro") == (301, "/manual/v2/intro")
+
+
+def test_redirect_keeps_the_query(tmp_path: Path) -> None:
+    table = _table(tmp_path, "Redirect /a /b\nRedirectMatch ^/c$ /d?x=1\n")
+    assert table.resolve("/a", "q=1") == (302, "/b?q=1")
+    # A target with its own query replaces the request's.
+    assert table.resolve("/c", "q=1") == (302, "/d?x=1")
+
+
+def test_redirect_statuses(tmp_path: Path) -> None:
+    table = _table(
+        tmp_path,
+        "Redirect gone /gone\nRedirect seeother /see /other\nRedirectPermanent /perm /p\nRedirect 308 /x /y\n"
+        "Redirect 301 /missing-target\nRedirectMatch 301 ^/bad(regex$ /z\n",
+    )
+    assert table.resolve("/gone") == (410, None)
+    assert table.resolve("/see") == (303, "/other")
+    assert table.resolve("/perm") == (301, "/p")
+    assert table.resolve("/x") == (308, "/y")
+    # Invalid lines are skipped.
+    assert table.resolve("/missing-target") is None
+    assert table.resolve("/bad(regex") is None
+
+
+def test_redirects_reload_when_the_file_changes(tmp_path: Path) -> None:
+    table = _table(tmp_path, "Redirect /a /b\n")
+    table.RELOAD_CHECK_SECONDS = 0
+    path = tmp_path / "redirects.conf"
+    mtime_ns = path.stat().st_mtime_ns
+    path.write_text("Redirect /a /c\n", encoding="utf-8")
+    os.utime(path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+    assert table.resolve("/a") == (302, "/c")
+
+
+def test_site_redirects() -> None:
+    table = RedirectTable(REPO_ROOT / "redirects.conf")
+    assert table.resolve("/kapcsolat.html") == (301, "/kapcsolat/")
+    assert table.resolve("/kozbeszerzes-ertekhatar/index.html") == (
+        301,
+        "/tevekenysegeink/kozbeszerzes-ajanlatkeroknek/kozbeszerzes-ertekhatar/",
+    )
+
+
+# --- Live reload ------------------------------------------------------------------------------------------
+
+
+def test_live_reload_fans_out_change_events() -> None:
+    hub = LiveReload()
+    first: list[bytes] = []
+    second: list[bytes] = []
+    hub.subscribe(first.append)
+    hub.subscribe(second.append)
+    hub.publish(["css/main.css"])
+    hub.unsubscribe(second.append)
+    hub.publish(["arak.html"])
+    assert first == [b'event: change\ndata: {"paths": ["css/main.css"]}\n\n', b'event: change\ndata: {"paths": ["arak.html"]}\n\n']
+    assert second == first[:1]
+
+
+@pytest.fixture
+def live_site(tmp_path: Path) -> StaticSite:
+    (tmp_path / "index.html").write_text("<html><body>\n" + "<p>x</p>\n" * 100 + "</BODY></html>\n", encoding="utf-8")
+    (tmp_path / "main.css").write_bytes(CSS)
+    return StaticSite(tmp_path, file_cache=FileCache(), live_reload=LiveReload())
+
+
+def test_live_reload_client_is_injected_into_pages(live_site: StaticSite) -> None:
+    response = live_site.respond("GET", "/index.html", {"Accept-Encoding": "gzip"})
+    body = _body(response)
+    # Served uncompressed, so the script can be spliced in just before </body>.
+    assert _header(response, "Content-Encoding") is None and int(_header(response, "Content-Length")) == len(body)
+    assert body.endswith(f"<script>{LIVE_RELOAD_CLIENT}</script>\n</BODY></html>\n".encode())
+    assert _header(response, "ETag").endswith('-lr"')
+    assert (live_site.root / "index.html").read_bytes().count(b"<script>") == 0
+
+    css = live_site.respond("GET", "/main.css", {"Accept-Encoding": "gzip"})
+    assert _header(css, "Content-Encoding") == "gzip" and b"<script>" not in gzip.decompress(_body(css))
+
+
+HOT_SWAP_HARNESS = """
+const links = LINKS.map((href) => ({ attr: href, href, getAttribute() { return this.attr; } }));
+let listener = null;
+let reloads = 0;
+globalThis.EventSource = class { constructor(url) { this.url = url; } addEventListener(type, fn) { listener = fn; } };
+globalThis.window = { EventSource, location: { href: PAGE, origin: new URL(PAGE).origin, reload() { reloads += 1; } } };
+globalThis.document = { querySelectorAll: () => links };
+Date.now = () => 42;
+CLIENT
+const results = EVENTS.map((paths) => {
+  listener({ data: JSON.stringify({ paths }) });
+  return { hrefs: links.map((link) => link.href), reloads };
+});
+console.log(JSON.stringify(results));
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node to run the client")
+def test_live_reload_client_swaps_stylesheets_by_source_name() -> None:
+    links = [
+        "../css/main.3f9a1c2b.css",  # built pages link the hashed copy of the edited source
+        "/css/main.css?v=2",
+        "../css/print.0badc0de.css",
+        "https://fonts.example.com/css/main.css",  # same path, another origin
+    ]
+    script = (
+        HOT_SWAP_HARNESS.replace("LINKS", json.dumps(links))
+        .replace("PAGE", json.dumps("http://localhost:8000/tevekenysegeink/"))
+        .replace("EVENTS", json.dumps([["css/main.css"], ["css/main.css", "arak.html"]]))
+        .replace("CLIENT", LIVE_RELOAD_CLIENT)
+    )
+    proc = subprocess.run(["node"], input=script, capture_output=True, text=True, timeout=30, check=True)
+    css_only, mixed = json.loads(proc.stdout)
+    assert css_only == {
+        "hrefs": [
+            "http://localhost:8000/css/main.css?livereload=42",
+            "http://localhost:8000/css/main.css?v=2&livereload=42",
+            "../css/print.0badc0de.css",
+            "https://fonts.example.com/css/main.css",
+        ],
+        "reloads": 0,
+    }
+    # Anything besides stylesheets reloads the page.
+    assert mixed == {"hrefs": css_only["hrefs"], "reloads": 1}
+
+
+# --- Request-time page assembly ---------------------------------------------------------------------------
+
+
+PAGE = '<html lang="hu"><body data-page="pricing">\n    <div id="header-placeholder"></div>\n    <main>x</main>\n</body></html>\n'
+
+
+@pytest.fixture
+def partial_site(tmp_path: Path) -> StaticSite:
+    partials = tmp_path / "partials"
+    partials.mkdir()
+    (partials / "header-hu.html").write_text(
+        '<div id="header-placeholder">\n<a href="{{root}}arak.html" class="nav-link" data-nav="pricing">Áraink</a>\n</div>\n',
+        encoding="utf-8",
+    )
+    (partials / "header-en.html").write_text('<div id="header-placeholder">\n<a href="{{enSelfHref}}">English</a>\n</div>\n', encoding="utf-8")
+    (partials / "footer.html").write_text('<div id="footer-placeholder">\n<a href="{{root}}">Főoldal</a>\n</div>\n', encoding="utf-8")
+    for rel, text in (("tevekenysegeink/arak.html", PAGE), ("plain.html", "<p>plain</p>"), ("docs/notes.html", PAGE)):
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text(text, encoding="utf-8")
+    return StaticSite(tmp_path, file_cache=FileCache(), partials=PartialRenderer(tmp_path))
+
+
+def _bump(path: Path, seconds: int = 1) -> None:
+    st = path.stat()
+    os.utime(path, ns=(st.st_mtime_ns + seconds * 10**9, st.st_mtime_ns + seconds * 10**9))
+
+
+def test_pages_are_assembled_at_request_time(partial_site: StaticSite) -> None:
+    response = partial_site.respond("GET", "/tevekenysegeink/arak.html", {})
+    assert _body(response).decode("utf-8") == (
+        '<html lang="hu"><body data-page="pricing">\n'
+        '    <div id="header-placeholder">\n'
+        '    <a href="../arak.html" class="nav-link active" data-nav="pricing">Áraink</a>\n'
+        "    </div>\n"
+        "    <main>x</main>\n"
+        "</body></html>\n"
+    )
+    assert (partial_site.root / "tevekenysegeink/arak.html").read_text(encoding="utf-8") == PAGE
+    assert "-p" in _header(response, "ETag")
+    again = partial_site.respond("GET", "/tevekenysegeink/arak.html", {"If-None-Match": _header(response, "ETag")})
+    assert again.status == 304
+    assert partial_site.partials.stats()["renders"] == 1 and partial_site.partials.stats()["hits"] == 1
+
+
+def test_partial_edits_show_up_on_the_next_request(partial_site: StaticSite) -> None:
+    first = partial_site.respond("GET", "/tevekenysegeink/arak.html", {})
+    header = partial_site.root / "partials" / "header-hu.html"
+    header.write_text(header.read_text(encoding="utf-8").replace("Áraink", "Árak"), encoding="utf-8")
+    _bump(header)
+    # The page itself didn't change, but its validators must.
+    response = partial_site.respond("GET", "/tevekenysegeink/arak.html", {"If-None-Match": _header(first, "ETag")})
+    assert response.status == 200 and ">Árak</a>" in _body(response).decode("utf-8")
+    assert _header(response, "Last-Modified") != _header(first, "Last-Modified")
+    assert partial_site.partials.stats()["renders"] == 2
+
+
+def test_assembled_pages_are_compressed(partial_site: StaticSite) -> None:
+    page = partial_site.root / "tevekenysegeink/arak.html"
+    page.write_text(PAGE.replace("<main>x</main>", "<main>" + "<p>x</p>" * 100 + "</main>"), encoding="utf-8")
+    plain = _body(partial_site.respond("GET", "/tevekenysegeink/arak.html", {}))
+    response = partial_site.respond("GET", "/tevekenysegeink/arak.html", {"Accept-Encoding": "gzip"})
+    assert _header(response, "Content-Encoding") == "gzip" and gzip.decompress(_body(response)) == plain
+    # Both codings are rendered from one assembly, and an invalidated page is assembled again.
+    assert partial_site.partials.stats()["renders"] == 1
+    partial_site.invalidate([str(page)], structural=False)
+    assert partial_site.partials.stats()["entries"] == 0
+    partial_site.respond("GET", "/tevekenysegeink/arak.html", {})
+    assert partial_site.partials.stats()["renders"] == 2
+
+
+@pytest.mark.parametrize("target", ["/plain.html", "/docs/notes.html"])
+def test_pages_without_placeholders_are_served_as_is(partial_site: StaticSite, target: str) -> None:
+    response = partial_site.respond("GET", target, {})
+    assert _body(response) == (partial_site.root / target[1:]).read_bytes()
+    assert "-p" not in _header(response, "ETag")
+
+
+def test_broken_partials_leave_pages_as_they_are(partial_site: StaticSite, capsys: pytest.CaptureFixture[str]) -> None:
+    footer = partial_site.root / "partials" / "footer.html"
+    footer.write_text("{{huHref}}", encoding="utf-8")
+    for _ in range(2):
+        assert _body(partial_site.respond("GET", "/tevekenysegeink/arak.html", {})) == PAGE.encode("utf-8")
+    # Reported once per edit, not on every request.
+    assert capsys.readouterr().err.count("[partials] partials/footer.html: line 1:") == 1
+
+
+# --- Metrics ----------------------------------------------------------------------------------------------
+
+
+def test_latency_percentiles_are_within_a_bucket() -> None:
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1000)
+    summary = histogram.summary_ms()
+    assert (summary["count"], summary["mean"], summary["max"]) == (100, 50.5, 100.0)
+    for key, expected in (("p50", 50), ("p95", 95), ("p99", 99)):
+        assert expected / 1.2 <= summary[key] <= expected * 1.2
+    assert LatencyHistogram().summary_ms()["p99"] == 0.0
+
+
+def test_metrics_per_route_and_access_log(tmp_path: Path) -> None:
+    log = tmp_path / "access.jsonl"
+    metrics = Metrics(access_log=log)
+    metrics.record("::1", "GET", "/arak?x=1", 200, 1000, 0.002)
+    metrics.record("::1", "GET", "/%C3%A1rak", 304, 0, 0.001)
+    metrics.record("::1", "HEAD", "/missing", 404, 0, 0.001)
+    metrics.close()
+    # Requests finishing after shutdown are still counted.
+    metrics.record("::1", "GET", "/arak", 200, 1000, 0.001)
+
+    report = metrics.snapshot(StaticSite(tmp_path))
+    assert (report["requests"], report["bytes_sent"], report["status"]) == (4, 2000, {"200": 2, "304": 1, "404": 1})
+    assert report["cache"] == {"files": None, "routes": None, "partials": None}
+    assert {route: stats["requests"] for route, stats in report["routes"].items()} == {"/arak": 2, "/missing": 1, "/árak": 1}
+    entries = [json.loads(line) for line in log.read_text(encoding="utf-8").splitlines()]
+    assert [(e["method"], e["target"], e["status"], e["bytes"], e["ms"]) for e in entries] == [
+        ("GET", "/arak?x=1", 200, 1000, 2.0),
+        ("GET", "/%C3%A1rak", 304, 0, 1.0),
+        ("HEAD", "/missing", 404, 0, 1.0),
+    ]
+
+
+def test_metrics_route_cardinality_is_capped(tmp_path: Path) -> None:
+    metrics = Metrics()
+    metrics.MAX_ROUTES = 2
+    for route in ("/a", "/b", "/c", "/d", "/a"):
+        metrics.record("::1", "GET", route, 404, 0, 0.001)
+    routes = metrics.snapshot(StaticSite(tmp_path))["routes"]
+    assert {route: stats["requests"] for route, stats in routes.items()} == {"/a": 2, "/b": 1, "(other)": 2}
+
+
+def test_metrics_endpoint(cached_site: StaticSite) -> None:
+    cached_site.metrics = Metrics()
+    cached_site.respond("GET", "/data.txt", {})
+    cached_site.respond("GET", "/data.txt", {})
+    cached_site.metrics.record("::1", "GET", "/data.txt", 200, 100, 0.001)
+
+    response = cached_site.respond("GET", "/__metrics?reset=1", {})
+    assert response.status == 200 and _header(response, "Cache-Control") == "no-store"
+    report = json.loads(response.body)
+    assert report["requests"] == 1 and list(report["routes"]) == ["/data.txt"]
+    assert report["cache"]["files"]["hits"] == 1 and report["cache"]["files"]["entries"] == 1
+    # ?reset=1 starts the counters over after reporting them.
+    assert json.loads(cached_site.respond("GET", "/__metrics", {}).body)["requests"] == 0
+
+
+# --- asyncio engine ---------------------------------------------------------------------------------------
+
+
+async def _read_response(reader: asyncio.StreamReader) -> tuple[int, dict[str, str], bytes]:
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, *lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+    headers = {name.lower(): value.strip() for name, _, value in (line.partition(":") for line in lines)}
+    body = await reader.readexactly(int(headers.get("content-length", "0")))
+    return int(status_line.split()[1]), headers, body
+
+
+def _serve(site: StaticSite, monkeypatch: pytest.MonkeyPatch, scenario, **kwargs) -> list[dict]:
+    """
+    Run `scenario(host, port)` against an AsyncSiteServer on a free port. Returns the errors the event loop
+    reported (exceptions escaping connection handlers end up there).
+    """
+    sock = dev_server._dual_stack_socket(0)
+    port = sock.getsockname()[1]
+    monkeypatch.setattr(dev_server, "_dual_stack_socket", lambda _port: sock)
+    errors: list[dict] = []
+
+    async def main() -> None:
+        asyncio.get_running_loop().set_exception_handler(lambda _loop, context: errors.append(context))
+        server = asyncio.create_task(dev_server.AsyncSiteServer(site, port, **kwargs).serve_forever())
+        try:
+            await asyncio.wait_for(scenario("127.0.0.1", port), 10)
+        finally:
+            server.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await server
+
+    asyncio.run(main())
+    return errors
+
+
+def test_async_keep_alive(static_site: StaticSite, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def scenario(host: str, port: int) -> None:
+        reader, writer = await asyncio.open_connection(host, port)
+        for _ in range(3):
+            writer.write(b"GET /data.txt HTTP/1.1\r\nHost: x\r\n\r\n")
+            status, headers, body = await _read_response(reader)
+            assert (status, body) == (200, bytes(range(100)))
+            assert headers.get("connection", "keep-alive").lower() != "close"
+        # Pipelined requests are answered in order on the same connection.
+        writer.write(b"HEAD /data.txt HTTP/1.1\r\n\r\nGET /missing HTTP/1.1\r\nConnection: close\r\n\r\n")
+        head = await reader.readuntil(b"\r\n\r\n")
+        assert head.startswith(b"HTTP/1.1 200") and b"Content-Length: 100" in head
+        status, headers, _ = await _read_response(reader)
+        assert status == 404 and headers["connection"].lower() == "close"
+        assert await reader.read() == b""
+        writer.close()
+
+    assert _serve(static_site, monkeypatch, scenario) == []
+
+
+def test_async_http10_closes_after_one_response(static_site: StaticSite, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def scenario(host: str, port: int) -> None:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"GET /data.txt HTTP/1.0\r\n\r\n")
+        status, _, body = await _read_response(reader)
+        assert (status, len(body)) == (200, 100)
+        assert await reader.read() == b""
+        writer.close()
+
+    assert _serve(static_site, monkeypatch, scenario) == []
+
+
+def test_async_idle_connection_times_out(static_site: StaticSite, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def scenario(host: str, port: int) -> None:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"GET /data.txt HTTP/1.1\r\n\r\n")
+        assert (await _read_response(reader))[0] == 200
+        # Then nothing: the server drops the connection once the keep-alive timeout passes.
+        started = time.monotonic()
+        assert await reader.read() == b""
+        assert time.monotonic() - started < 5
+        writer.close()
+
+    assert _serve(static_site, monkeypatch, scenario, idle_timeout=0.2) == []
+
+
+def test_async_bad_request(static_site: StaticSite, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def scenario(host: str, port: int) -> None:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"NONSENSE\r\n\r\n")
+        assert (await _read_response(reader))[0] == 400
+        assert await reader.read() == b""
+        writer.close()
+
+    assert _serve(static_site, monkeypatch, scenario) == []
+
+
+def test_async_live_reload_stream(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    site = StaticSite(tmp_path, live_reload=LiveReload())
+    # A closed tab is noticed when the next heartbeat fails to go out.
+    monkeypatch.setattr(dev_server, "LIVE_RELOAD_HEARTBEAT_SECONDS", 0.05)
+    unsubscribed = threading.Event()
+    monkeypatch.setattr(site.live_reload, "unsubscribe", lambda deliver: (LiveReload.unsubscribe(site.live_reload, deliver), unsubscribed.set()))
+
+    async def scenario(host: str, port: int) -> None:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"GET /__livereload HTTP/1.1\r\n\r\n")
+        head = await reader.readuntil(b"\r\n\r\n")
+        assert head.startswith(b"HTTP/1.1 200") and b"Content-Type: text/event-stream" in head
+        assert await reader.readuntil(b"\n\n") == b"retry: 1000\n\n"
+        # Published from the watcher thread.
+        await asyncio.to_thread(site.live_reload.publish, ["css/main.css"])
+        message = await reader.readuntil(b"\n\n")
+        while message == b": ping\n\n":
+            message = await reader.readuntil(b"\n\n")
+        assert message == b'event: change\ndata: {"paths": ["css/main.css"]}\n\n'
+        writer.close()
+        assert await asyncio.to_thread(unsubscribed.wait, 5)
+
+    assert _serve(site, monkeypatch, scenario) == []
+
+
+def test_async_requests_are_recorded(static_site: StaticSite, monkeypatch: pytest.MonkeyPatch) -> None:
+    static_site.metrics = Metrics()
+
+    async def scenario(host: str, port: int) -> None:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"GET /data.txt HTTP/1.1\r\n\r\n")
+        _, headers, _ = await _read_response(reader)
+        writer.write(f"HEAD /data.txt HTTP/1.1\r\nIf-None-Match: {headers['etag']}\r\nConnection: close\r\n\r\n".encode())
+        await reader.read()
+        writer.close()
+
+    assert _serve(static_site, monkeypatch, scenario) == []
+    stats = static_site.metrics.routes["/data.txt"]
+    assert (stats.requests, stats.bytes_sent, stats.status) == (2, 100, {200: 1, 304: 1})
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+import export_visible_content_headers_only as exporter
+from page_metadata import MetadataIndex
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+PAGES = {
+    "index.html": '<html lang="hu-HU"><head><title>Főoldal</title></head><body><h1>Főoldal</h1><p>Szöveg</p></body></html>',
+    "arak/index.html": "<html><head><title>Árak</title></head><body><h2>Árak</h2></body></html>",
+    "regi.html": '<html><head><meta http-equiv="refresh" content="0; url=/arak/"><title>Redirecting…</title></head><body>Redirecting…</body></html>',
+    "koszonjuk.html": '<html><head><meta name="robots" content="noindex"><title>Köszönjük</title></head><body>Köszönjük</body></html>',
+    "pages/en/index.html": '<html lang="en"><head><title>Home</title></head><body>Home</body></html>',
+}
+
+
+@pytest.fixture
+def site(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    for rel, html in PAGES.items():
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(html, encoding="utf-8")
+    (tmp_path / "export").mkdir()
+    (tmp_path / "export" / "tevekenysegeink.html").write_text("<h1>Old hand-picked export</h1>", encoding="utf-8")
+    monkeypatch.setattr(exporter, "REPO_ROOT", tmp_path)
+    monkeypatch.setattr(exporter, "EXPORT_DIR", tmp_path / "export")
+    monkeypatch.setattr(exporter, "MANIFEST_PATH", tmp_path / ".export-manifest.json")
+    return tmp_path
+
+
+def test_only_sitemap_pages_are_exported(site: Path) -> None:
+    pages = exporter.export_pages(site, MetadataIndex(site))
+    assert [page.rel for page, _ in pages] == ["arak/index.html", "index.html"]
+
+
+def test_site_export_skips_stubs_noindex_and_legacy_copies(tmp_path: Path) -> None:
+    index = MetadataIndex(REPO_ROOT, path=tmp_path / "index.json")
+    selected = {page.rel for page, _ in exporter.export_pages(REPO_ROOT, index)}
+    assert {"index.html", "tevekenysegeink/index.html", "en/index.html"} <= selected
+    assert not selected & {"tevekenysegeink.html", "redirect.html", "kapcsolat.html", "404.html"}
+    assert not any(rel.startswith("pages/en/") for rel in selected)
+
+
+def test_stale_exports_are_only_listed(site: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    assert exporter.main(["--format", "html", "--format", "md"]) == 0
+    out = capsys.readouterr().out
+    assert "Stale: export/tevekenysegeink.html" in out
+    assert (site / "export" / "tevekenysegeink.html").exists()
+    exported = sorted(p.relative_to(site).as_posix() for p in (site / "export").rglob("*") if p.is_file())
+    assert exported == [
+        "export/arak/index.html",
+        "export/arak/index.md",
+        "export/index.html",
+        "export/index.md",
+        "export/tevekenysegeink.html",
+    ]
+    html = (site / "export" / "index.html").read_text(encoding="utf-8")
+    assert '<html lang="hu-HU">' in html and "<title>Főoldal</title>" in html and "<h1>Főoldal</h1>" in html
+
+
+def test_prune_deletes_stale_exports(site: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    assert exporter.main(["--prune", "--dry-run"]) == 0
+    assert "Would remove stale export/tevekenysegeink.html" in capsys.readouterr().out
+    assert (site / "export" / "tevekenysegeink.html").exists()
+    assert exporter.main(["--prune"]) == 0
+    assert "Removed stale export/tevekenysegeink.html" in capsys.readouterr().out
+    assert not (site / "export" / "tevekenysegeink.html").exists()
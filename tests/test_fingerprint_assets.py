@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from fingerprint_assets import (
+    FINGERPRINT_RE,
+    asset_manifest,
+    build_assets,
+    is_fingerprinted,
+    minify_css,
+    page_bundle_type,
+    rewrite_asset_refs,
+    stale_outputs,
+    strip_fingerprint,
+)
+from set_page_features import FEATURES_BY_PAGE
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+MANIFEST = {
+    "css/main.css": "css/main.3f9a1c2b.css",
+    "js/main.js": "js/main.0badc0de.js",
+    "js/main.js#pricing": "js/main.11112222.js",
+    "js/site-config.js": "js/site-config.aaaabbbb.js",
+}
+PRICING_BODY = f'<body data-page="pricing" data-features="{" ".join(FEATURES_BY_PAGE["pricing"])}">'
+
+
+@pytest.mark.parametrize(
+    "ref, expected",
+    [
+        ('href="../../css/main.css"', 'href="../../css/main.3f9a1c2b.css"'),
+        ('href="../../css/main.css?v=7"', 'href="../../css/main.3f9a1c2b.css"'),
+        ("href='../../css/main.css?v=1.2'", "href='../../css/main.3f9a1c2b.css'"),
+        ('href="../../css/main.deadbeef.css"', 'href="../../css/main.3f9a1c2b.css"'),
+        ('href="../../css/main.deadbeef.css?v=2"', 'href="../../css/main.3f9a1c2b.css"'),
+        ('src="../../js/site-config.js?v=3"', 'src="../../js/site-config.aaaabbbb.js"'),
+        ('href="../../css/main.css?media=print"', 'href="../../css/main.3f9a1c2b.css?media=print"'),
+        # Not in the manifest, not local, or not resolving to the source: left alone.
+        ('href="../../css/other.css?v=2"', 'href="../../css/other.css?v=2"'),
+        ('href="https://cdn.example.com/css/main.css"', 'href="https://cdn.example.com/css/main.css"'),
+        ('href="/css/main.css"', 'href="/css/main.css"'),
+        ('href="css/main.css"', 'href="css/main.css"'),
+    ],
+)
+def test_rewrite_asset_refs(ref: str, expected: str) -> None:
+    doc = f"<head><link rel=\"stylesheet\" {ref}></head>"
+    out = rewrite_asset_refs(doc, "tevekenysegeink/jogorvoslat/index.html", MANIFEST)
+    assert out == f"<head><link rel=\"stylesheet\" {expected}></head>"
+    assert rewrite_asset_refs(out, "tevekenysegeink/jogorvoslat/index.html", MANIFEST) == out
+
+
+def test_rewrite_is_idempotent_across_manifest_changes() -> None:
+    doc = '<script src="js/site-config.js?v=4" defer></script>'
+    once = rewrite_asset_refs(doc, "arak.html", MANIFEST)
+    assert rewrite_asset_refs(once, "arak.html", MANIFEST) == once
+    # The next build hashes a changed source differently: the old hash is replaced, not appended to.
+    updated = rewrite_asset_refs(once, "arak.html", {"js/site-config.js": "js/site-config.ccccdddd.js"})
+    assert updated == '<script src="js/site-config.ccccdddd.js" defer></script>'
+
+
+def test_main_js_resolves_to_the_page_type_bundle() -> None:
+    doc = f'<script src="js/main.js?v=9"></script>{PRICING_BODY}'
+    assert page_bundle_type(doc) == "pricing"
+    assert rewrite_asset_refs(doc, "arak.html", MANIFEST).startswith('<script src="js/main.11112222.js">')
+    # Hand-edited features no longer match the table: the full script, which gates on data-features itself.
+    custom = doc.replace('data-features="', 'data-features="faq-extra ')
+    assert page_bundle_type(custom) is None
+    assert rewrite_asset_refs(custom, "arak.html", MANIFEST).startswith('<script src="js/main.0badc0de.js">')
+
+
+def test_fingerprint_helpers() -> None:
+    assert strip_fingerprint("css/main.3f9a1c2b.css") == "css/main.css"
+    assert strip_fingerprint("images/icons.0badc0de.svg") == "images/icons.svg"
+    assert strip_fingerprint("js/main.js") == "js/main.js"
+    assert not is_fingerprinted("js/jquery.min.js")
+    assert not FINGERPRINT_RE.search("css/main.3F9A1C2B.css")
+
+
+def test_minify_css_keeps_already_minified_sources() -> None:
+    assert minify_css("a {\n  color: red;\n}\n/* c */\n") == "a{color: red;}"
+    assert minify_css("a{color:red}") == "a{color:red}"
+
+
+def test_site_assets_match_the_committed_manifest() -> None:
+    manifest = asset_manifest(build_assets(REPO_ROOT))
+    assert manifest == json.loads((REPO_ROOT / "asset-manifest.json").read_text(encoding="utf-8"))
+    assert all((REPO_ROOT / output).is_file() for output in manifest.values())
+    assert stale_outputs(REPO_ROOT, manifest) == []
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import pytest
+
+from html_blocks import Block, find_blocks, splice_blocks
+
+
+def _inner(html: str, block: Block) -> str:
+    return html[block.start : block.end]
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        '<script>document.body.insertAdjacentHTML("beforeend", "<div>");</script>',
+        "<script>if (a </div> b) {}</script>",
+        "<style>.x::after { content: '</div>'; }</style>",
+        "<textarea><div></div></div></textarea>",
+        "<template><div class=\"card\"><div></template>",
+        "<template></div></div></template>",
+        "<!-- <div> --><!-- </div> -->",
+        "<SCRIPT type=\"text/x-template\"><div></SCRIPT >",
+    ],
+)
+def test_raw_text_and_template_contents_are_skipped(content: str) -> None:
+    html = f'<body>\n  <div id="site-header">\n    {content}\n  </div>\n  <p>after</p>\n</body>'
+    block = find_blocks(html, ["site-header"])["site-header"]
+    assert _inner(html, block) == f'  <div id="site-header">\n    {content}\n  </div>'
+    assert block.indent == "  "
+
+
+def test_block_inside_template_is_not_found() -> None:
+    html = '<template><div id="a">inert</div></template>\n<div id="a">live</div>'
+    block = find_blocks(html, ["a"])["a"]
+    assert _inner(html, block) == '<div id="a">live</div>'
+
+
+def test_first_occurrence_and_nesting() -> None:
+    html = '<div id="outer"><div><div id="inner"><div></div></div></div></div><div id="inner">second</div>'
+    blocks = find_blocks(html, ["outer", "inner", "missing"])
+    assert _inner(html, blocks["outer"]) == html[: html.index('<div id="inner">second')]
+    assert _inner(html, blocks["inner"]) == '<div id="inner"><div></div></div>'
+    assert "missing" not in blocks
+
+
+@pytest.mark.parametrize("attrs", ["id='a'", "id=a", 'class="x" ID = "a"'])
+def test_id_attribute_forms(attrs: str) -> None:
+    html = f"<DIV {attrs}>x</DIV>"
+    assert find_blocks(html, ["a"])["a"] == Block(id="a", start=0, end=len(html), indent="")
+
+
+def test_inline_block_has_no_indent() -> None:
+    html = '<p>x</p> <div id="a">y</div>'
+    block = find_blocks(html, ["a"])["a"]
+    assert (block.start, block.indent) == (html.index("<div"), "")
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        '<div id="a"><div></div>',
+        '<div id="a"><script>unterminated </div>',
+        '<div id="a"><!-- unterminated </div>',
+    ],
+)
+def test_unclosed_block_raises(html: str) -> None:
+    with pytest.raises(ValueError, match="#a"):
+        find_blocks(html, ["a"])
+
+
+def test_stray_close_tag_is_ignored() -> None:
+    html = '</div><div id="a">x</div>'
+    assert _inner(html, find_blocks(html, ["a"])["a"]) == '<div id="a">x</div>'
+
+
+def test_splice_blocks() -> None:
+    html = '<body>\n  <div id="a">1</div>\n  <main></main>\n  <div id="b">2</div>\n</body>'
+    blocks = find_blocks(html, ["a", "b"])
+    assert splice_blocks(html, blocks.values(), {"a": "A", "b": "B"}) == "<body>\nA\n  <main></main>\nB\n</body>"
+    assert splice_blocks(html, blocks.values(), {"b": "B"}) == '<body>\n  <div id="a">1</div>\n  <main></main>\nB\n</body>'
+
+
+def test_splice_overlapping_blocks_raises() -> None:
+    html = '<div id="a"><div id="b"></div></div>'
+    blocks = find_blocks(html, ["a", "b"])
+    with pytest.raises(ValueError, match="overlaps"):
+        splice_blocks(html, blocks.values(), {"a": "", "b": ""})
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from js_bundles import (
+    FEATURE_ENTRY_POINTS,
+    MAIN_JS,
+    BundleError,
+    bundle_for_features,
+    build_bundles,
+    split_top_level,
+    tokenize,
+)
+from set_page_features import FEATURES_BY_PAGE
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _kinds(js: str) -> list[tuple[str, str]]:
+    return [(t.kind, t.text) for t in tokenize(js) if t.kind != "space"]
+
+
+def test_tokens_reassemble_to_the_source() -> None:
+    js = (REPO_ROOT / MAIN_JS).read_text(encoding="utf-8")
+    assert "".join(t.text for t in tokenize(js)) == js
+
+
+@pytest.mark.parametrize(
+    "js, token",
+    [
+        ('s = "}{";', ("string", '"}{"')),
+        ("s = '\\'{';", ("string", "'\\'{'")),
+        ("re = /[/}]{2}/g;", ("regex", "/[/}]{2}/g")),
+        ("if (/{/.test(s)) {}", ("regex", "/{/")),
+        ("return /}/i;", ("regex", "/}/i")),
+        ("// } {\n", ("comment", "// } {")),
+        ("/* { */", ("comment", "/* { */")),
+        ("t = `a${ {b: 1}.b }c`;", ("template", "`a${")),
+    ],
+)
+def test_braces_inside_literals_and_comments(js: str, token: tuple[str, str]) -> None:
+    assert token in _kinds(js)
+    assert "".join(t.text for t in tokenize(js)) == js
+
+
+def test_slash_after_a_value_is_division() -> None:
+    assert [text for kind, text in _kinds("x = a / b / (c) / 2;") if kind == "punct"].count("/") == 3
+
+
+def test_nested_template_literals() -> None:
+    kinds = _kinds("t = `a${ `b${c}d` }e`;")
+    assert [text for kind, text in kinds if kind == "template"] == ["`a${", "`b${", "}d`", "}e`"]
+
+
+@pytest.mark.parametrize(
+    "js",
+    ["s = 'open", 's = "a\nb"', "t = `open", "t = `${a", "/* open", "re = /open", "f(", "}", "{ a: [1, 2 }"],
+)
+def test_broken_source_raises(js: str) -> None:
+    with pytest.raises(BundleError):
+        tokenize(js)
+
+
+def test_split_top_level() -> None:
+    js = (
+        "function a() { function inner() {} return b(); }\n"
+        "async function b() { return obj.c; }\n"
+        "function* gen() { yield 1; }\n"
+        "var f = function d() {};\n"
+        "if (x) { function e() {} }\n"
+        "a();"
+    )
+    functions, outside = split_top_level(js)
+    assert [fn.name for fn in functions] == ["a", "b", "gen"]
+    assert functions[0].refs >= {"inner", "b"}
+    # `obj.c` is a property access, not a reference to a function c.
+    assert "c" not in functions[1].refs and "obj" in functions[1].refs
+    assert {"a", "d", "e", "x"} <= outside
+    assert js[functions[0].start : functions[0].end] == "function a() { function inner() {} return b(); }"
+
+
+def _main_js(boot: str = "") -> str:
+    # Every entry point calls a private helper, and the FAQ and gallery features share one.
+    parts = []
+    for feature, names in FEATURE_ENTRY_POINTS.items():
+        for name in names:
+            helper = "sharedHelper" if feature in ("faq", "text-galleries") else f"{name}Helper"
+            parts.append(f"function {name}() {{ {helper}(); }}\nfunction {helper}() {{ return 1; }}\n")
+    boot = boot or " ".join(f'e.has("{f}")&&{names[0]}();' for f, names in FEATURE_ENTRY_POINTS.items())
+    return "function globalApi() { return 2; }\n" + "".join(dict.fromkeys(parts)) + f"(function(){{ {boot} }})();\n"
+
+
+def test_bundle_drops_unused_features_but_keeps_shared_helpers() -> None:
+    js = _main_js()
+    bundle = bundle_for_features(js, ["faq"])
+    assert "function initFaqAccordion()" in bundle
+    assert "function sharedHelper()" in bundle
+    assert "function initTextGalleries()" not in bundle
+    assert "function initReferenceSearch()" not in bundle and "initReferenceSearchHelper() {" not in bundle
+    # The boot block stays verbatim; its calls to removed functions sit behind e.has(...).
+    assert bundle.endswith(js[js.index("(function(){") :])
+    assert "function globalApi()" not in bundle
+
+
+def test_bundle_keeps_external_refs() -> None:
+    bundle = bundle_for_features(_main_js(), ["faq"], {"globalApi", "initReferenceSearch"})
+    assert "function globalApi()" in bundle
+    assert "function initReferenceSearch()" in bundle and "function initReferenceSearchHelper()" in bundle
+
+
+def test_bundle_with_all_features_is_the_whole_script() -> None:
+    js = _main_js(boot="globalApi();")
+    assert bundle_for_features(js, list(FEATURE_ENTRY_POINTS)) == js
+
+
+def test_missing_entry_point_raises() -> None:
+    js = _main_js().replace("function initFaqAccordion()", "var initFaqAccordion = function()")
+    with pytest.raises(BundleError, match="initFaqAccordion"):
+        bundle_for_features(js, ["faq"])
+
+
+def test_site_bundles() -> None:
+    js = (REPO_ROOT / MAIN_JS).read_text(encoding="utf-8")
+    bundles = build_bundles(js, {"closeMobileSecondaryNav"})
+    assert set(bundles) == set(FEATURES_BY_PAGE)
+    for page_type, features in FEATURES_BY_PAGE.items():
+        bundle = bundles[page_type]
+        assert len(bundle) <= len(js)
+        assert "function closeMobileSecondaryNav(" in bundle
+        for feature, names in FEATURE_ENTRY_POINTS.items():
+            for name in names:
+                assert (f"function {name}(" in bundle) == (feature in features), (page_type, name)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+import page_metadata
+from page_metadata import INDEX_VERSION, MetadataIndex, PageMetadata, extract_metadata
+
+
+PAGE = """<!DOCTYPE html>
+<html lang="hu-HU">
+<head>
+  <title>Árak &amp; díjak</title>
+  <meta name="description" content="Díjaink">
+  <meta name="robots" content="index, follow">
+  <link rel="canonical" href="https://sugallat.hu/arak">
+  <link rel="alternate" hreflang="en" href="https://sugallat.hu/en/prices/">
+  <link rel="preconnect" href="https://fonts.gstatic.com">
+  <link rel="stylesheet" href="css/main.css">
+  <link rel="icon" href="images/logo.png">
+  <script src="js/main.js" defer></script>
+</head>
+<body data-page="pricing" data-features="faq square-patterns" class="x">
+  <h1>Áraink <small>2026</small></h1>
+  <h1>Second</h1>
+  <a href="kapcsolat/">Kapcsolat</a> <a href="kapcsolat/">again</a>
+  <img src="images/a.webp" srcset="images/a-480.webp 480w, images/a.webp 960w">
+</body>
+</html>
+"""
+
+
+def test_extract_metadata() -> None:
+    meta = extract_metadata(PAGE)
+    assert meta == PageMetadata(
+        lang="hu-HU",
+        title="Árak & díjak",
+        h1="Áraink 2026",
+        description="Díjaink",
+        robots="index, follow",
+        canonical="https://sugallat.hu/arak",
+        alternates={"en": "https://sugallat.hu/en/prices/"},
+        body={"data-page": "pricing", "data-features": "faq square-patterns"},
+        links=["kapcsolat/"],
+        assets=["css/main.css", "images/logo.png", "js/main.js", "images/a.webp", "images/a-480.webp"],
+    )
+    assert (meta.language, meta.indexable, meta.page_type, meta.features) == ("hu-hu", True, "pricing", ["faq", "square-patterns"])
+
+
+@pytest.mark.parametrize(
+    "head, indexable",
+    [
+        ('<meta http-equiv="Refresh" content="0; url=/arak">', False),
+        ('<meta name="robots" content="NOINDEX, follow">', False),
+        ('<meta name="robots" content="nofollow">', True),
+        ("", True),
+    ],
+)
+def test_indexable(head: str, indexable: bool) -> None:
+    meta = extract_metadata(f"<html><head>{head}</head><body></body></html>")
+    assert meta.indexable is indexable
+    assert meta.language == "hu"
+
+
+@pytest.fixture
+def site(tmp_path: Path) -> Path:
+    (tmp_path / "arak.html").write_text(PAGE, encoding="utf-8")
+    return tmp_path
+
+
+def test_index_reparses_only_changed_pages(site: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    page = site / "arak.html"
+    index = MetadataIndex(site)
+    assert index.get(page).title == "Árak & díjak"
+    index.save()
+
+    parsed = []
+    monkeypatch.setattr(page_metadata, "extract_metadata", lambda doc: parsed.append(doc) or extract_metadata(doc))
+    reloaded = MetadataIndex(site)
+    assert reloaded.get(page) == extract_metadata(PAGE)
+    assert parsed == []
+
+    page.write_text(PAGE.replace("Árak &amp; díjak", "Új cím"), encoding="utf-8")
+    assert reloaded.get(page).title == "Új cím"
+    assert len(parsed) == 1
+    # A caller that already read the page passes it along instead of having it read again.
+    st = page.stat()
+    os.utime(page, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert reloaded.get(page, "<title>Given</title>").title == "Given"
+
+
+def test_index_put_prune_and_save(site: Path) -> None:
+    page = site / "arak.html"
+    index = MetadataIndex(site)
+    st = page.stat()
+    index.put(page, st.st_mtime_ns, st.st_size, PageMetadata(title="Recorded"))
+    index.put(site / "gone.html", 0, 0, PageMetadata(title="Gone"))
+    index.prune({"arak.html"})
+    index.save()
+    data = json.loads((site / ".page-metadata.json").read_text(encoding="utf-8"))
+    assert data["version"] == INDEX_VERSION and list(data["pages"]) == ["arak.html"]
+    assert MetadataIndex(site).get(page).title == "Recorded"
+
+
+def test_index_ignores_unreadable_or_old_files(site: Path) -> None:
+    path = site / ".page-metadata.json"
+    for text in ("not json", json.dumps({"version": INDEX_VERSION - 1, "pages": {"arak.html": {}}})):
+        path.write_text(text, encoding="utf-8")
+        assert MetadataIndex(site).get(site / "arak.html").title == "Árak & díjak"
+    assert MetadataIndex(site).get(site / "missing.html") is None
+
+
+def test_save_without_changes_writes_nothing(site: Path) -> None:
+    MetadataIndex(site).save()
+    assert not (site / ".page-metadata.json").exists()
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import struct
+from pathlib import Path
+
+import pytest
+
+from responsive_images import IMAGE_DIR, MIME_TYPES, collect_images, image_size
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _png(width: int, height: int) -> bytes:
+    ihdr = struct.pack(">II5B", width, height, 8, 6, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr + b"\0\0\0\0" + b"\0\0\0\0IEND\xaeB`\x82"
+
+
+def _jpeg_segment(marker: int, payload: bytes) -> bytes:
+    return bytes((0xFF, marker)) + struct.pack(">H", len(payload) + 2) + payload
+
+
+def _jpeg(width: int, height: int, sof: int = 0xC0) -> bytes:
+    app0 = _jpeg_segment(0xE0, b"JFIF\0\x01\x01\0\0\x01\0\x01\0\0")
+    exif = _jpeg_segment(0xE1, b"Exif\0\0" + b"\0" * 1000)
+    frame = _jpeg_segment(sof, struct.pack(">BHHB", 8, height, width, 1) + b"\x01\x11\0")
+    scan = _jpeg_segment(0xDA, b"\x01\x01\0\0\x3f\0")
+    return b"\xff\xd8" + app0 + exif + frame + scan + b"\x12\x34" + b"\xff\xd9"
+
+
+def _riff(chunk: bytes, payload: bytes) -> bytes:
+    body = b"WEBP" + chunk + struct.pack("<I", len(payload)) + payload
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def _webp_vp8(width: int, height: int) -> bytes:
+    return _riff(b"VP8 ", b"\x10\x02\0" + b"\x9d\x01\x2a" + struct.pack("<HH", width, height) + b"\0" * 10)
+
+
+def _webp_vp8l(width: int, height: int) -> bytes:
+    bits = (width - 1) | (height - 1) << 14
+    return _riff(b"VP8L", b"\x2f" + bits.to_bytes(4, "little") + b"\0" * 10)
+
+
+def _webp_vp8x(width: int, height: int) -> bytes:
+    return _riff(b"VP8X", b"\x10\0\0\0" + (width - 1).to_bytes(3, "little") + (height - 1).to_bytes(3, "little"))
+
+
+def _box(kind: bytes, payload: bytes, full: bool = False) -> bytes:
+    payload = (b"\0\0\0\0" if full else b"") + payload
+    return struct.pack(">I4s", len(payload) + 8, kind) + payload
+
+
+def _avif(*sizes: tuple[int, int]) -> bytes:
+    props = b"".join(_box(b"ispe", struct.pack(">II", w, h), full=True) for w, h in sizes)
+    ipco = _box(b"ipco", _box(b"pixi", b"\0\0\0\0\x03\x08\x08\x08") + props)
+    meta = _box(b"meta", _box(b"hdlr", b"\0" * 20, full=True) + _box(b"iprp", ipco), full=True)
+    return _box(b"ftyp", b"avif\0\0\0\0mif1avif") + meta + _box(b"mdat", b"\0" * 64)
+
+
+def _size(tmp_path: Path, name: str, data: bytes) -> tuple[int, int] | None:
+    path = tmp_path / name
+    path.write_bytes(data)
+    return image_size(path)
+
+
+@pytest.mark.parametrize(
+    "name, data",
+    [
+        ("a.png", _png(640, 480)),
+        ("a.jpg", _jpeg(640, 480)),
+        ("a.JPEG", _jpeg(640, 480, sof=0xC2)),
+        ("a.webp", _webp_vp8(640, 480)),
+        ("a.webp", _webp_vp8l(640, 480)),
+        ("a.webp", _webp_vp8x(640, 480)),
+        ("a.avif", _avif((640, 480))),
+        # Alpha planes and thumbnails have their own ispe; the largest is the image.
+        ("a.avif", _avif((160, 120), (640, 480), (320, 240))),
+    ],
+)
+def test_image_size(tmp_path: Path, name: str, data: bytes) -> None:
+    assert _size(tmp_path, name, data) == (640, 480)
+
+
+def test_jpeg_fill_bytes_and_standalone_markers(tmp_path: Path) -> None:
+    data = _jpeg(640, 480)
+    data = data[:2] + b"\xff\xff\xff\xd0" + data[2:]
+    assert _size(tmp_path, "a.jpg", data) == (640, 480)
+
+
+def _cuts(dims_end: int, *inside: int) -> list[int]:
+    # Lengths that cut a file short of the end of its dimension fields.
+    return sorted({0, 1, 2, 8, *inside, dims_end - 4, dims_end - 1})
+
+
+@pytest.mark.parametrize("n", _cuts(24, 12, 16, 20))
+def test_truncated_png(tmp_path: Path, n: int) -> None:
+    assert _size(tmp_path, "a.png", _png(640, 480)[:n]) is None
+
+
+@pytest.mark.parametrize("make", [_webp_vp8, _webp_vp8l, _webp_vp8x])
+@pytest.mark.parametrize("n", _cuts(30, 12, 16, 20, 22, 25))
+def test_truncated_webp(tmp_path: Path, make, n: int) -> None:
+    assert _size(tmp_path, "a.webp", make(640, 480)[:n]) is None
+
+
+JPEG_SOF_AT = _jpeg(640, 480).index(b"\xff\xc0")
+
+
+@pytest.mark.parametrize("n", _cuts(JPEG_SOF_AT + 9, 20, 500, JPEG_SOF_AT, JPEG_SOF_AT + 2))
+def test_truncated_jpeg(tmp_path: Path, n: int) -> None:
+    assert _size(tmp_path, "a.jpg", _jpeg(640, 480)[:n]) is None
+
+
+AVIF_ISPE_AT = _avif((640, 480)).index(b"ispe") - 4
+
+
+@pytest.mark.parametrize("n", _cuts(AVIF_ISPE_AT + 20, 24, 40, 60, AVIF_ISPE_AT, AVIF_ISPE_AT + 8))
+def test_truncated_avif(tmp_path: Path, n: int) -> None:
+    assert _size(tmp_path, "a.avif", _avif((640, 480))[:n]) is None
+
+
+@pytest.mark.parametrize(
+    "name, data",
+    [
+        ("a.png", b"\x89PNG\r\n\x1a\r" + _png(640, 480)[8:]),
+        ("a.png", _png(640, 480).replace(b"IHDR", b"IDAT")),
+        ("a.png", _jpeg(640, 480)),
+        ("a.jpg", _png(640, 480)),
+        ("a.jpg", b"\xff\xd8" + b"\x00" * 64),  # no marker where a segment should start
+        ("a.jpg", b"\xff\xd8\xff\xda" + _jpeg(640, 480)[2:]),  # scan data before any frame header
+        ("a.jpg", b"\xff\xd8\xff\xd9" + _jpeg(640, 480)[2:]),  # end of image first
+        ("a.jpg", b"\xff\xd8\xff\xe0\x00\x01" + _jpeg(640, 480)[2:]),  # segment length < 2
+        ("a.jpg", _jpeg(0, 480)),  # height/width 0: defined later by a DNL segment
+        ("a.jpg", _jpeg(640, 480, sof=0xC4)),  # DHT, not a frame header
+        ("a.webp", _webp_vp8(640, 480).replace(b"WEBP", b"WAVE")),
+        ("a.webp", _webp_vp8(640, 480).replace(b"\x9d\x01\x2a", b"\0\0\0")),
+        ("a.webp", _webp_vp8l(640, 480).replace(b"\x2f", b"\x2e", 1)),
+        ("a.webp", _riff(b"ALPH", b"\0" * 32)),
+        ("a.avif", _avif()),
+        ("a.avif", _box(b"ispe", struct.pack(">II", 640, 480), full=True)),  # ispe outside meta/iprp/ipco
+        ("a.avif", _avif((640, 480)).replace(struct.pack(">I4s", 20, b"ispe"), struct.pack(">I4s", 4, b"ispe"))),
+        ("a.avif", _avif((640, 480)).replace(struct.pack(">I4s", 20, b"ispe"), struct.pack(">I4s", 12, b"ispe"))),
+        ("a.avif", _avif((640, 480)).replace(struct.pack(">I4s", 20, b"ispe"), struct.pack(">I4s", 1, b"ispe"))),
+        ("a.avif", struct.pack(">I4s", 1, b"meta") + b"\0\0\0"),  # 64-bit size cut short
+        ("a.avif", struct.pack(">I4s", 3, b"meta") + b"\0" * 64),  # size smaller than the box header
+        ("a.gif", b"GIF89a\x80\x02\xe0\x01"),
+    ],
+    ids=lambda value: value if isinstance(value, str) else "",
+)
+def test_corrupt_or_unsupported_header(tmp_path: Path, name: str, data: bytes) -> None:
+    assert _size(tmp_path, name, data) is None
+
+
+def test_avif_box_extending_past_the_file_is_clamped(tmp_path: Path) -> None:
+    # An mdat (or any trailing box) whose declared size runs past EOF doesn't hide the meta box.
+    data = _avif((640, 480))
+    data = data.replace(struct.pack(">I4s", 72, b"mdat"), struct.pack(">I4s", 1 << 30, b"mdat"))
+    assert _size(tmp_path, "a.avif", data) == (640, 480)
+
+
+def test_site_images_are_all_measured(capsys: pytest.CaptureFixture[str]) -> None:
+    images = collect_images(REPO_ROOT)
+    assert "Warning" not in capsys.readouterr().out
+    on_disk = {
+        path.relative_to(REPO_ROOT).as_posix()
+        for path in (REPO_ROOT / IMAGE_DIR).rglob("*")
+        if path.suffix.lower() in MIME_TYPES
+    }
+    assert on_disk and set(images) <= on_disk
+    assert all(info.width > 0 and info.height > 0 for info in images.values())
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from site_output import OutputBatch, temp_sibling
+
+
+def _files(root: Path) -> dict[str, bytes]:
+    return {path.relative_to(root).as_posix(): path.read_bytes() for path in sorted(root.rglob("*")) if path.is_file()}
+
+
+def test_unchanged_files_are_not_rewritten(tmp_path: Path) -> None:
+    page = tmp_path / "page.html"
+    page.write_text("same", encoding="utf-8")
+    os.utime(page, ns=(1, 1))
+    batch = OutputBatch(tmp_path)
+    assert not batch.write(page, "same")
+    assert batch.commit() == []
+    assert page.stat().st_mtime_ns == 1
+
+
+def test_commit_writes_changed_and_new_files(tmp_path: Path) -> None:
+    old = tmp_path / "old.html"
+    old.write_text("before", encoding="utf-8")
+    old.chmod(0o640)
+    new = tmp_path / "sub" / "new.html"
+    batch = OutputBatch(tmp_path)
+    assert batch.write(old, "after")
+    assert batch.write(new, "fresh")
+    assert batch.commit() == [old, new]
+    assert old.read_text(encoding="utf-8") == "after" and new.read_text(encoding="utf-8") == "fresh"
+    # Existing files keep their mode; new ones get what open() would have given them.
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(old.stat().st_mode) == 0o640
+    assert stat.S_IMODE(new.stat().st_mode) == 0o666 & ~umask
+    assert _files(tmp_path).keys() == {"old.html", "sub/new.html"}
+
+
+def test_dry_run_writes_nothing(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    page = tmp_path / "page.html"
+    page.write_text("line one\nline two\n", encoding="utf-8")
+    before = _files(tmp_path)
+    batch = OutputBatch(tmp_path, dry_run=True)
+    batch.write(page, "line one\nline 2\n")
+    batch.write(tmp_path / "new" / "page.html", "new\n")
+    with temp_sibling(tmp_path / "streamed.txt") as (f, tmp):
+        f.write("streamed\n")
+    batch.write_file(tmp_path / "streamed.txt", tmp)
+
+    assert batch.commit() == [tmp_path / "new" / "page.html", page, tmp_path / "streamed.txt"]
+    assert _files(tmp_path) == before
+    assert not (tmp_path / "new").exists()
+    out = capsys.readouterr().out
+    assert "-line two\n+line 2\n" in out and "+streamed\n" in out
+    assert "Dry run: 3 file(s) would change (+3 -1 lines); nothing written." in out
+
+
+def test_write_file_stages_a_streamed_file(tmp_path: Path) -> None:
+    target = tmp_path / "export.md"
+    target.write_text("same\n", encoding="utf-8")
+    with temp_sibling(target) as (f, tmp):
+        f.write("same\n")
+    batch = OutputBatch(tmp_path)
+    # Identical content: nothing is staged and the temporary file is gone.
+    assert not batch.write_file(target, tmp)
+    assert not Path(tmp).exists()
+
+    with temp_sibling(target) as (f, tmp):
+        f.write("changed\n")
+    assert batch.write_file(target, tmp)
+    assert batch.commit() == [target]
+    assert target.read_text(encoding="utf-8") == "changed\n"
+    assert _files(tmp_path).keys() == {"export.md"}
+
+
+def test_temp_sibling_is_removed_on_error(tmp_path: Path) -> None:
+    with pytest.raises(RuntimeError):
+        with temp_sibling(tmp_path / "out.txt") as (f, tmp):
+            f.write("partial")
+            raise RuntimeError
+    assert not Path(tmp).exists()
+
+
+def test_restaging_a_path_replaces_the_earlier_text(tmp_path: Path) -> None:
+    page = tmp_path / "page.html"
+    batch = OutputBatch(tmp_path)
+    batch.write(page, "first")
+    with temp_sibling(page) as (f, tmp):
+        f.write("second")
+    batch.write_file(page, tmp)
+    batch.write(page, "third")
+    assert not Path(tmp).exists()
+    batch.commit()
+    assert page.read_text(encoding="utf-8") == "third"
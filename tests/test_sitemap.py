@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import pytest
+
+import generate_sitemap
+from generate_sitemap import SitemapEntry, assign_lastmods, content_digest
+
+
+PAGE = """<!DOCTYPE html>
+<html lang="hu-HU">
+<head>
+  <title>Árak</title>
+  <meta name="description" content="Díjak és  feltételek">
+  <link rel="stylesheet" href="css/main.css?v=3">
+  <script src="js/main.js?v=4" defer></script>
+</head>
+<body data-page="pricing">
+  <div id="header-placeholder"><nav><a class="nav-link" href="/">Főoldal</a></nav></div>
+  <main>
+    <h1>Árak</h1>
+    <p>Egy <a href="kapcsolat.html#urlap">ajánlatkérés</a> után.</p>
+    <img src="images/team.webp" alt="">
+    <img src="images/szakmai%20tagsag.svg" alt="Tagság" width="48" height="48">
+    <svg class="icon"><use href="#icon-phone"></use><title>Telefon</title></svg>
+  </main>
+  <div id="footer-placeholder"><footer>© 2025</footer></div>
+</body>
+</html>
+"""
+
+
+@pytest.mark.parametrize(
+    "old, new",
+    [
+        # Shared chrome: navigation, active link, footer.
+        ('<a class="nav-link" href="/">Főoldal</a>', '<a class="nav-link active" href="/">Kezdőlap</a><a href="/blog">Blog</a>'),
+        ("© 2025", "© 2026"),
+        # Build output: fingerprints, critical CSS, image dimensions, icons.
+        ('href="css/main.css?v=3"', 'href="css/main.3f9a1c2b.css"'),
+        ('src="js/main.js?v=4" defer', 'src="js/main.0badc0de.js" defer'),
+        ("<title>Árak</title>\n", "<title>Árak</title>\n<style data-critical-css>.hero{color:red}</style>\n"),
+        ('<img src="images/team.webp" alt="">', '<img src="images/team.webp" alt="" width="640" height="480">'),
+        ('<use href="#icon-phone"></use><title>Telefon</title>', '<use href="#icon-mail"></use>'),
+        (
+            '<img src="images/szakmai%20tagsag.svg" alt="Tagság" width="48" height="48">',
+            '<svg width="48" height="48" role="img" aria-label="Tagság" data-icon="szakmai-tagsag"><use href="icons.0badc0de.svg#szakmai-tagsag"></use></svg>',
+        ),
+        ("<p>Egy ", "<p>\n      Egy "),
+    ],
+)
+def test_digest_ignores_chrome_and_build_changes(old: str, new: str) -> None:
+    assert old in PAGE
+    assert content_digest(PAGE.replace(old, new)) == content_digest(PAGE)
+
+
+@pytest.mark.parametrize(
+    "old, new",
+    [
+        ("<h1>Árak</h1>", "<h1>Díjaink</h1>"),
+        ("Díjak és  feltételek", "Díjak"),
+        ("<title>Árak</title>", "<title>Árak 2026</title>"),
+        ('href="kapcsolat.html#urlap"', 'href="kapcsolat.html"'),
+        ('src="images/team.webp"', 'src="images/office.webp"'),
+        ("szakmai%20tagsag.svg", "kapcsolat.svg"),
+    ],
+)
+def test_digest_follows_content_changes(old: str, new: str) -> None:
+    assert old in PAGE
+    assert content_digest(PAGE.replace(old, new)) != content_digest(PAGE)
+
+
+def test_lastmod_moves_only_with_content() -> None:
+    def entries(doc: str) -> list[SitemapEntry]:
+        return [SitemapEntry(rel="arak.html", loc="https://sugallat.hu/arak", sha256=content_digest(doc))]
+
+    published = {"https://sugallat.hu/arak": "2025-01-02"}
+    first = entries(PAGE)
+    # A state from before the content digest (version 1) is dropped; the published date carries over.
+    state = assign_lastmods(first, {}, published, "2026-01-01")
+    assert first[0].lastmod == "2025-01-02"
+
+    rebuilt = entries(PAGE.replace("css/main.css?v=3", "css/main.3f9a1c2b.css").replace("© 2025", "© 2026"))
+    state = assign_lastmods(rebuilt, state, published, "2026-02-01")
+    assert rebuilt[0].lastmod == "2025-01-02"
+
+    edited = entries(PAGE.replace("<h1>Árak</h1>", "<h1>Díjaink</h1>"))
+    assign_lastmods(edited, state, published, "2026-03-01")
+    assert edited[0].lastmod == "2026-03-01"
+
+
+def test_committed_sitemap_is_up_to_date(capsys: pytest.CaptureFixture[str]) -> None:
+    # Fails when pages changed without `python scripts/generate_sitemap.py` being run and committed.
+    assert generate_sitemap.main(["--check"]) == 0, capsys.readouterr().out
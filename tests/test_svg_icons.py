@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from svg_icons import INLINE_MAX_BYTES, IconLibrary, icon_slug, minify_svg, rewrite_icons, stale_sprites
+
+
+SMALL = """<?xml version="1.0" encoding="UTF-8"?>
+<!-- Generator: Sketch -->
+<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" fill="none" stroke="#fff">
+    <metadata>editor junk</metadata>
+    <path d="M4 12h16"/>
+</svg>
+"""
+
+# Too large to inline, with an internal reference that must survive sharing a sprite.
+LARGE = (
+    '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 64 64">'
+    '<defs><linearGradient id="g"><stop offset="0"/></linearGradient></defs>'
+    + "".join(f'<circle cx="{i}" cy="{i}" r="3" fill="url(#g)"/>' for i in range(40))
+    + "</svg>"
+)
+
+UNSAFE = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 8 8"><path d="M0 0h8" onclick="x()"/></svg>'
+
+
+@pytest.fixture
+def library(tmp_path: Path) -> IconLibrary:
+    images = tmp_path / "images"
+    images.mkdir()
+    (images / "kis ikon.svg").write_text(SMALL, encoding="utf-8")
+    (images / "nagy.svg").write_text(LARGE, encoding="utf-8")
+    (images / "unsafe.svg").write_text(UNSAFE, encoding="utf-8")
+    return IconLibrary(tmp_path)
+
+
+def test_icon_slug() -> None:
+    assert icon_slug("images/szakmai tagsag.svg") == "szakmai-tagsag"
+    assert icon_slug("images/Atlathatosag.svg") == "atlathatosag"
+
+
+def test_minify_svg_drops_comments_and_editor_metadata() -> None:
+    svg = minify_svg(SMALL)
+    assert svg.startswith("<svg") and "<!--" not in svg and "metadata" not in svg and "\n" not in svg
+
+
+def test_small_icon_is_inlined(library: IconLibrary) -> None:
+    doc = '<p><img src="../images/kis%20ikon.svg" alt="Ikon" class="icon" width="24" height="24"></p>'
+    out, sprites = rewrite_icons(doc, "tevekenysegeink/index.html", library)
+    assert sprites == {}
+    assert out == (
+        '<p><svg class="icon" width="24" height="24" role="img" aria-label="Ikon" data-icon="kis-ikon" '
+        'viewBox="0 0 24 24"><g fill="none" stroke="#fff"><path d="M4 12h16"/></g></svg></p>'
+    )
+    assert len(library.by_slug("kis-ikon").inline("").encode("utf-8")) <= INLINE_MAX_BYTES
+
+
+def test_large_icon_goes_into_the_page_sprite(library: IconLibrary) -> None:
+    doc = '<img src="../../images/nagy.svg" alt="" width="48" height="48"><img src="/images/nagy.svg" alt="" width="32" height="32">'
+    out, sprites = rewrite_icons(doc, "en/services/index.html", library)
+    [(rel, sprite)] = sprites.items()
+    assert rel.startswith("images/icons.") and rel.endswith(".svg")
+    assert out.count(f'<use href="../../{rel}#icon-nagy"></use>') == 2
+    assert '<svg width="48" height="48" aria-hidden="true" data-icon="nagy">' in out
+    assert '<symbol id="icon-nagy" viewBox="0 0 64 64">' in sprite
+    assert 'id="nagy-g"' in sprite and 'fill="url(#nagy-g)"' in sprite and "#g)" not in sprite
+
+
+def test_rewrite_is_idempotent_and_follows_the_source(library: IconLibrary, tmp_path: Path) -> None:
+    doc = '<img src="images/kis%20ikon.svg" alt="Ikon" width="24" height="24">'
+    once, _ = rewrite_icons(doc, "index.html", library)
+    assert rewrite_icons(once, "index.html", library)[0] == once
+    (tmp_path / "images" / "kis ikon.svg").write_text(SMALL.replace("M4 12h16", "M4 4h16"), encoding="utf-8")
+    updated, _ = rewrite_icons(once, "index.html", IconLibrary(tmp_path))
+    assert 'd="M4 4h16"' in updated and 'aria-label="Ikon"' in updated
+
+
+@pytest.mark.parametrize(
+    "img",
+    [
+        '<img src="images/kis%20ikon.svg" alt="">',  # sized by CSS, like the header logo
+        '<img src="images/kis%20ikon.svg" alt="" width="128" height="128">',
+        '<img src="images/unsafe.svg" alt="" width="8" height="8">',
+        '<img src="images/missing.svg" alt="" width="8" height="8">',
+        '<img src="https://example.com/images/nagy.svg" alt="" width="8" height="8">',
+        '<img src="images/kis%20ikon.svg" alt="" width="8" height="8" onload="x()">',
+        '<img src="images/photo.webp" alt="" width="8" height="8">',
+    ],
+)
+def test_non_icons_are_left_alone(library: IconLibrary, img: str) -> None:
+    assert rewrite_icons(img, "index.html", library) == (img, {})
+
+
+def test_stale_sprites(tmp_path: Path) -> None:
+    images = tmp_path / "images"
+    images.mkdir()
+    for name in ("icons.0badc0de.svg", "icons.3f9a1c2b.svg", "icons.svg", "logo.svg"):
+        (images / name).write_text("<svg/>", encoding="utf-8")
+    assert stale_sprites(tmp_path, {"images/icons.3f9a1c2b.svg"}) == [images / "icons.0badc0de.svg"]
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+import pytest
+
+from sync_header_footer import (
+    FOOTER_VARIABLES,
+    HEADER_HU_VARIABLES,
+    CompiledTemplate,
+    TemplateError,
+    assemble_page,
+    indent_block,
+    load_partials,
+    mark_active_links,
+)
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_render_fills_every_slot() -> None:
+    template = CompiledTemplate('<a href="{{root}}">{{huHref}}</a>{{root}}', HEADER_HU_VARIABLES)
+    values = {"root": "../", "huHref": "./", "enHref": "en/"}
+    assert template.render(values) == '<a href="../">./</a>../'
+
+
+def test_render_matches_the_replace_loop_it_replaced() -> None:
+    header_hu, _, footer = load_partials(REPO_ROOT)
+    values = {"root": "../../", "huHref": "./", "enHref": "../../en/services/"}
+    for template in (header_hu, footer):
+        expected = template.source
+        for name in template.variables:
+            expected = expected.replace("{{" + name + "}}", values[name])
+        assert template.render(values) == expected
+        assert template.indented("    ").render(values) == indent_block(expected, "    ").rstrip("\n")
+
+
+def test_indented_variants_are_cached() -> None:
+    template = CompiledTemplate("<nav>\n\n  <a href=\"{{root}}\">x</a>\n</nav>\n", FOOTER_VARIABLES)
+    assert template.indented("  ") is template.indented("  ")
+    assert template.indented("  ") is not template.indented("\t")
+    assert template.indented("  ").render({"root": "./"}) == '  <nav>\n\n    <a href="./">x</a>\n  </nav>'
+
+
+@pytest.mark.parametrize(
+    "source, message",
+    [
+        ("<p>{{enSelfHref}}</p>", r"line 1: \{\{enSelfHref\}\} has no value in this template"),
+        ("<p>\n{{rooot}}</p>", r"line 2: unknown placeholder \{\{rooot\}\}"),
+        ("<p>{{root}</p>", "unbalanced"),
+        ("<p>root}}</p>", "unbalanced"),
+    ],
+)
+def test_template_mistakes_are_reported(source: str, message: str) -> None:
+    with pytest.raises(TemplateError, match=message):
+        CompiledTemplate(source, FOOTER_VARIABLES, "partials/footer.html")
+
+
+def test_load_partials_reports_every_broken_partial(tmp_path: Path) -> None:
+    (tmp_path / "partials").mkdir()
+    for name in ("header-hu.html", "header-en.html", "footer.html"):
+        (tmp_path / "partials" / name).write_text((REPO_ROOT / "partials" / name).read_text(encoding="utf-8"), encoding="utf-8")
+    (tmp_path / "partials" / "header-hu.html").write_text("{{enSelfHref}}", encoding="utf-8")
+    (tmp_path / "partials" / "footer.html").write_text("{{huHref}}", encoding="utf-8")
+    with pytest.raises(TemplateError) as exc:
+        load_partials(tmp_path)
+    assert str(exc.value).splitlines() == [
+        "partials/header-hu.html: line 1: {{enSelfHref}} has no value in this template (available: root, huHref, enHref)",
+        "partials/footer.html: line 1: {{huHref}} has no value in this template (available: root)",
+    ]
+
+
+HEADER = """<nav>
+  <a href="../../" class="nav-link" data-nav="home">Főoldal</a>
+  <a href="../../tevekenysegeink/" class="nav-link" data-nav="services">Szolgáltatásaink</a>
+  <a href="../../tevekenysegeink/kozbeszerzes-ajanlatkeroknek/" class="dropdown-link">Ajánlatkérőknek</a>
+  <a href="../../tevekenysegeink/jogorvoslat/" class="dropdown-link">Jogorvoslat</a>
+  <a href="../../arak.html" class="nav-link" data-nav="pricing">Áraink</a>
+  <a href="https://example.com/tevekenysegeink/" class="dropdown-link">Külső</a>
+  <a href="./" class="lang-link active" data-lang="hu">Magyar</a>
+</nav>"""
+
+
+def _links(html: str) -> dict[str, str]:
+    # Link text -> the opening tag's attributes after href.
+    return {m.group(2): m.group(1) for m in re.finditer(r'<a href="[^"]*"([^>]*)>([^<]*)</a>', html)}
+
+
+def test_mark_active_links_on_a_service_subpage() -> None:
+    links = _links(mark_active_links(HEADER, "tevekenysegeink/kozbeszerzes-ajanlatkeroknek/index.html"))
+    assert links["Szolgáltatásaink"] == ' class="nav-link active" data-nav="services"'
+    assert links["Ajánlatkérőknek"] == ' class="dropdown-link active" aria-current="page"'
+    assert links["Jogorvoslat"] == ' class="dropdown-link"'
+    assert links["Főoldal"] == ' class="nav-link" data-nav="home"'
+    assert links["Külső"] == ' class="dropdown-link"'
+    assert links["Magyar"] == ' class="lang-link active" data-lang="hu" aria-current="page"'
+
+
+def test_section_entry_stays_active_below_it() -> None:
+    page = "tevekenysegeink/kozbeszerzes-ajanlatkeroknek/kozbeszerzes-ertekhatar/index.html"
+    header = HEADER.replace('href="../../', 'href="../../../').replace('href="./"', 'href="../"')
+    links = _links(mark_active_links(header, page))
+    assert links["Ajánlatkérőknek"] == ' class="dropdown-link active"'
+    assert links["Szolgáltatásaink"] == ' class="nav-link active" data-nav="services"'
+
+
+def test_page_type_overrides_the_path_guess() -> None:
+    links = _links(mark_active_links(HEADER, "tevekenysegeink/kozbeszerzes-ajanlatkeroknek/index.html", "pricing"))
+    assert links["Áraink"] == ' class="nav-link active" data-nav="pricing"'
+    assert links["Szolgáltatásaink"] == ' class="nav-link" data-nav="services"'
+
+
+def test_mark_active_links_is_idempotent() -> None:
+    once = mark_active_links(HEADER, "tevekenysegeink/jogorvoslat/index.html")
+    assert mark_active_links(once, "tevekenysegeink/jogorvoslat/index.html") == once
+
+
+def _site(tmp_path: Path, rel: str, body: str) -> Path:
+    (tmp_path / "partials").mkdir()
+    (tmp_path / "partials" / "header-hu.html").write_text(
+        '<div id="header-placeholder">\n<a href="{{root}}arak.html" class="nav-link" data-nav="pricing">Áraink</a>\n'
+        '<a href="{{enHref}}" class="lang-link" data-lang="en">English</a>\n</div>\n',
+        encoding="utf-8",
+    )
+    (tmp_path / "partials" / "header-en.html").write_text(
+        '<div id="header-placeholder">\n<a href="{{enSelfHref}}" class="lang-link active">English</a>\n</div>\n', encoding="utf-8"
+    )
+    (tmp_path / "partials" / "footer.html").write_text('<div id="footer-placeholder">\n<a href="{{root}}">Főoldal</a>\n</div>\n', encoding="utf-8")
+    path = tmp_path / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(body, encoding="utf-8")
+    return path
+
+
+def test_assemble_page(tmp_path: Path) -> None:
+    body = (
+        '<body>\n    <div id="header-placeholder"><p>old</p></div>\n    <main>x</main>\n'
+        '    <div id="footer-placeholder"></div>\n</body>\n'
+    )
+    path = _site(tmp_path, "tevekenysegeink/arak.html", body)
+    header_hu, header_en, footer = load_partials(tmp_path)
+    page = assemble_page(body, path, tmp_path, header_hu, header_en, footer, "pricing")
+    assert page == (
+        "<body>\n"
+        '    <div id="header-placeholder">\n'
+        '    <a href="../arak.html" class="nav-link active" data-nav="pricing">Áraink</a>\n'
+        '    <a href="../en/" class="lang-link" data-lang="en">English</a>\n'
+        "    </div>\n"
+        "    <main>x</main>\n"
+        '    <div id="footer-placeholder">\n'
+        '    <a href="../">Főoldal</a>\n'
+        "    </div>\n"
+        "</body>\n"
+    )
+    assert assemble_page(page, path, tmp_path, header_hu, header_en, footer, "pricing") == page
+
+
+def test_assemble_page_without_placeholders(tmp_path: Path) -> None:
+    body = "<body><main>x</main></body>"
+    path = _site(tmp_path, "index.html", body)
+    assert assemble_page(body, path, tmp_path, *load_partials(tmp_path)) is None
+
+
+def test_site_pages_are_assembled() -> None:
+    # Every page type in the real header has a top-level item to highlight, and no page needs the old JS templates.
+    header_hu, header_en, footer = load_partials(REPO_ROOT)
+    for rel in ("index.html", "arak.html", "en/services/index.html", "tevekenysegeink/palyazatiras/index.html"):
+        path = REPO_ROOT / rel
+        html = path.read_text(encoding="utf-8")
+        page_type = re.search(r'<body[^>]*\sdata-page="([^"]*)"', html).group(1)
+        assembled = assemble_page(html, path, REPO_ROOT, header_hu, header_en, footer, page_type)
+        assert 'class="nav-link active"' in assembled
+        assert "header-footer-templates.js" not in assembled